@@ -5,17 +5,18 @@ sys.dont_write_bytecode = True
 import os
 import json
 import threading
-import subprocess
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-from fontTools.ttLib import TTFont
 
 # 定义项目根目录和核心模块目录
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CORE_DIR = PROJECT_ROOT / "Core"
 IMAGE_DIR = PROJECT_ROOT / "Image"
 sys.path.insert(0, str(CORE_DIR))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+import AudioCore
 
 
 class AudioExtractorApp:
@@ -55,14 +56,8 @@ class AudioExtractorApp:
         try:
             # 验证授权
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -76,24 +71,13 @@ class AudioExtractorApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -137,7 +121,7 @@ class AudioExtractorApp:
             self.video_path.set(file_path)
             # 如果音频路径为空，自动生成默认的MP3文件名
             if not self.audio_path.get():
-                self.audio_path.set(str(Path(file_path).with_suffix(".mp3")))
+                self.audio_path.set(AudioCore.default_audio_path(file_path))
 
     def select_audio(self):
         """选择音频输出文件对话框"""
@@ -198,7 +182,7 @@ class AudioExtractorApp:
             return
 
         # 检查FFmpeg是否可用
-        if not self.is_ffmpeg_available():
+        if not AudioCore.is_ffmpeg_available():
             messagebox.showerror("错误", "FFmpeg 未安装或不在系统路径中。")
             return
 
@@ -210,37 +194,14 @@ class AudioExtractorApp:
         thread = threading.Thread(target=self.run_extraction, args=(video_file, audio_file), daemon=True)
         thread.start()
 
-    def is_ffmpeg_available(self):
-        """检查FFmpeg是否已安装并可用"""
-        try:
-            subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
-
     def run_extraction(self, video_file, audio_file):
-        """执行音频提取命令"""
-        # 构建FFmpeg命令：从视频中提取音频流并转换为MP3格式
-        command = [
-            "ffmpeg",
-            "-i",           # 输入文件
-            video_file,     # 视频文件路径
-            "-q:a",         # 音频质量参数
-            "0",            # 最高质量
-            "-map",         # 选择流
-            "a",            # 仅音频流
-            "-y",           # 覆盖输出文件
-            audio_file      # 输出音频文件路径
-        ]
-
+        """执行音频提取（FFmpeg 调用见 Core/AudioCore.py）"""
         try:
-            # 执行FFmpeg命令
-            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+            AudioCore.extract_audio(video_file, audio_file)
             # 在主线程中更新UI
             self.root.after(0, lambda: self.on_extraction_success(audio_file))
-        except subprocess.CalledProcessError as exc:
-            # 获取错误信息
-            error_text = exc.stderr.strip().splitlines()[-1] if exc.stderr else "音频提取过程中发生错误。"
+        except ValueError as exc:
+            error_text = str(exc)
             self.root.after(0, lambda: self.on_extraction_failure(error_text))
 
     def on_extraction_success(self, audio_file):
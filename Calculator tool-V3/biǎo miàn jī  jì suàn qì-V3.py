@@ -1,20 +1,12 @@
 import json
 import os
 import math
-import subprocess
 from pathlib import Path
 from tkinter import Tk, Label, Entry, Button, StringVar, messagebox, ttk, PhotoImage
-try:
-    from PIL import Image, ImageTk
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
-try:
-    from fontTools.ttLib import TTFont
-    FONTTOOLS_AVAILABLE = True
-except ImportError:
-    FONTTOOLS_AVAILABLE = False
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
 
 class SurfaceAreaCalculator:
     def __init__(self, master):
@@ -150,14 +142,8 @@ class SurfaceAreaCalculator:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -208,24 +194,13 @@ class SurfaceAreaCalculator:
             self.master.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 12)
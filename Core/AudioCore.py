@@ -0,0 +1,101 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+音频处理核心函数
+视频音频提取工具与命令行(snow audio ...)共用的 FFmpeg 音频提取逻辑,这里不依赖 tkinter
+
+进度回调统一为 progress(已完成数量, 总数量)
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+
+# 批量提取时识别的视频格式
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov')
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def is_ffmpeg_available():
+    """检查FFmpeg是否已安装并可用"""
+    try:
+        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def default_audio_path(video_file, extension='.mp3'):
+    """默认的音频输出路径:与视频同目录同名,扩展名为 extension"""
+    return str(Path(video_file).with_suffix(extension))
+
+
+def extract_audio(video_file, audio_file):
+    """
+    用 FFmpeg 从视频中提取音频流(最高质量),输出格式由 audio_file 的扩展名决定
+
+    Raises:
+        ValueError: 输入无效、FFmpeg 不可用或提取失败(信息为 FFmpeg 输出的最后一行)
+    """
+    if not video_file or not Path(video_file).is_file():
+        raise ValueError("请选择有效的视频文件！")
+    if not audio_file:
+        raise ValueError("请输入音频输出路径！")
+    if not is_ffmpeg_available():
+        raise ValueError("FFmpeg 未安装或不在系统路径中。")
+
+    # 构建FFmpeg命令：从视频中提取音频流并转换为输出格式
+    command = [
+        "ffmpeg",
+        "-i",           # 输入文件
+        video_file,     # 视频文件路径
+        "-q:a",         # 音频质量参数
+        "0",            # 最高质量
+        "-map",         # 选择流
+        "a",            # 仅音频流
+        "-y",           # 覆盖输出文件
+        audio_file      # 输出音频文件路径
+    ]
+    try:
+        subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+    except subprocess.CalledProcessError as exc:
+        raise ValueError(exc.stderr.strip().splitlines()[-1] if exc.stderr else "音频提取过程中发生错误。")
+    return audio_file
+
+
+def extract_audio_batch(video_files, output_dir=None, extension='.mp3', progress=None):
+    """
+    批量提取音频,每个视频输出一个同名音频文件
+
+    Args:
+        output_dir: 输出目录,None 表示输出到各视频所在目录
+        extension: 输出音频的扩展名,如 .mp3、.wav
+
+    Returns:
+        list: 失败的 (视频路径, 错误信息) 列表
+    """
+    if not is_ffmpeg_available():
+        raise ValueError("FFmpeg 未安装或不在系统路径中。")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    failures = []
+    total = len(video_files)
+    _report(progress, 0, total)
+    for index, video_file in enumerate(video_files):
+        audio_file = default_audio_path(video_file, extension)
+        if output_dir:
+            audio_file = os.path.join(output_dir, os.path.basename(audio_file))
+        try:
+            extract_audio(video_file, audio_file)
+        except ValueError as e:
+            failures.append((video_file, str(e)))
+        _report(progress, index + 1, total)
+    return failures
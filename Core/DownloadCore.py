@@ -0,0 +1,296 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+下载核心函数
+Hugging Face 模型下载器、ModelScope 模型下载器、图片下载工具与命令行(snow download ...)
+共用的下载逻辑,这里不依赖 tkinter
+
+日志回调统一为 logger(一行文字),进度回调统一为 progress(已完成数量, 总数量)
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from LazyImport import lazy_import, lazy_from
+
+# 重型依赖按需导入，首次使用时才加载
+requests = lazy_import('requests')
+snapshot_download = lazy_from('huggingface_hub', 'snapshot_download')
+
+
+# 图片下载使用的请求头(B站图片需要 Referer)
+IMAGE_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://www.bilibili.com/",
+}
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def log_message(message, logger=None):
+    if logger:
+        logger(message)
+    else:
+        print(message)
+
+
+# ---------------- Hugging Face ----------------
+
+def normalize_repo_id(repo):
+    """把仓库 ID 或 huggingface.co 链接统一为 组织/仓库 形式"""
+    repo = repo.strip()
+    if repo.endswith("/"):
+        repo = repo[:-1]
+    match = re.search(r"huggingface\.co/(.+)", repo)
+    if match:
+        repo = match.group(1)
+    return repo
+
+
+def normalize_dest_path(dest, repo_id=None):
+    """解析目标目录,未指定时为当前目录下与仓库同名的目录"""
+    if dest:
+        normalized = os.path.normpath(os.path.expandvars(dest.strip()))
+        return Path(normalized).expanduser().resolve()
+    if repo_id is None:
+        raise ValueError("Destination directory or repo ID is required.")
+    repo_name = Path(repo_id).name
+    return (Path.cwd() / repo_name).resolve()
+
+
+def build_dest_dir(repo_id, dest):
+    return normalize_dest_path(dest, repo_id=repo_id)
+
+
+def ensure_clean_dest(dest_path, force):
+    """目标目录已存在时,force 为真则删除,否则抛出 FileExistsError"""
+    if dest_path.exists():
+        if not force:
+            raise FileExistsError(
+                f"Destination '{dest_path}' already exists. Use --force to overwrite."
+            )
+        shutil.rmtree(dest_path)
+
+
+def clone_repository(repo_id, dest_path, revision, token, logger=None):
+    """下载模型仓库并复制到 dest_path,token 为空时使用 HF_TOKEN 环境变量"""
+    auth_token = token or os.environ.get("HF_TOKEN")
+    log_message(f"Downloading model '{repo_id}' into '{dest_path}'...", logger)
+    cache_path = snapshot_download(
+        repo_id=repo_id,
+        revision=revision,
+        token=auth_token,
+        local_files_only=False,
+    )
+    if Path(cache_path) == dest_path:
+        log_message(f"Snapshot downloaded directly into '{dest_path}'.", logger)
+        return
+    log_message(f"Copying from cache to '{dest_path}'...", logger)
+    shutil.copytree(cache_path, dest_path)
+    log_message("Download complete.", logger)
+
+
+def download_snapshot(repo_id, dest_path, revision, token, logger=None):
+    """下载模型快照(仅文件)并复制到 dest_path,token 为空时使用 HF_TOKEN 环境变量"""
+    auth_token = token or os.environ.get("HF_TOKEN")
+    log_message(f"Downloading snapshot for '{repo_id}'...", logger)
+    cache_path = snapshot_download(
+        repo_id=repo_id,
+        revision=revision,
+        token=auth_token,
+        local_files_only=False,
+    )
+    if Path(cache_path) == dest_path:
+        log_message(f"Snapshot downloaded directly into '{dest_path}'.", logger)
+        return
+    log_message(f"Copying snapshot from cache to '{dest_path}'...", logger)
+    shutil.copytree(cache_path, dest_path)
+    log_message("Snapshot copy complete.", logger)
+
+
+# ---------------- ModelScope ----------------
+
+class ModelScopeDownloader:
+    """调用 modelscope 命令行下载模型或单个文件,命令输出逐行交给 log_callback"""
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback
+        self.download_process = None
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def download(self, model_name, file_name=None, local_dir=None):
+        """
+        Returns:
+            bool: modelscope 命令是否成功退出
+        """
+        if not model_name:
+            raise ValueError("模型名称不能为空")
+
+        self.log(f"[开始] 下载: {model_name}")
+        cmd = ["modelscope", "download", "--model", model_name]
+        if file_name:
+            cmd.extend([file_name, "--local_dir", local_dir or "."])
+        elif local_dir:
+            cmd.extend(["--local_dir", local_dir])
+
+        return self._run_command(cmd)
+
+    def _run_command(self, cmd):
+        try:
+            self.download_process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            for line in self.download_process.stdout:
+                self.log(line.strip())
+            self.download_process.wait()
+            return self.download_process.returncode == 0
+        except FileNotFoundError:
+            self.log("[错误] 未找到 modelscope 命令，请先安装: pip install modelscope")
+            raise RuntimeError("未找到 modelscope 命令！")
+        except Exception as e:
+            self.log(f"[错误] {e}")
+            raise
+
+    def cancel(self):
+        if self.download_process:
+            self.download_process.terminate()
+            self.log("[取消] 下载已取消")
+
+
+# ---------------- 图片下载 ----------------
+
+def parse_image_urls(text):
+    """从文本中按行取出以 http:// 或 https:// 开头的链接"""
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and (line.startswith("http://") or line.startswith("https://")):
+            urls.append(line)
+    return urls
+
+
+def sanitize_filename(url):
+    """从 URL 中提取合适的文件名"""
+    parsed = urlparse(url)
+    path = unquote(parsed.path)
+    filename = Path(path).name
+    # 去掉 @ 后面的尺寸信息 (如 @800w)
+    filename = re.sub(r'@[^.]+', '', filename)
+    # 如果文件名为空或只有扩展名，使用默认名
+    name, ext = os.path.splitext(filename)
+    if not name:
+        filename = f"downloaded_image{ext or '.png'}"
+    # 去掉 query 参数
+    if '?' in filename:
+        filename = filename.split('?')[0]
+    return filename
+
+
+def resolve_filename(dest_dir, base_filename):
+    """解决文件名冲突：如果文件已存在，添加序号后缀"""
+    name, ext = os.path.splitext(base_filename)
+    file_path = dest_dir / base_filename
+    if not file_path.exists():
+        return file_path
+    counter = 1
+    while True:
+        new_name = f"{name}_{counter}{ext}"
+        file_path = dest_dir / new_name
+        if not file_path.exists():
+            return file_path
+        counter += 1
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def download_image(url, dest_dir, session, should_cancel=None):
+    """
+    下载单张图片到 dest_dir(重名时自动加序号)
+
+    Args:
+        should_cancel: 返回 True 时终止下载并删除未完成的文件
+
+    Returns:
+        tuple: (成功与否, 消息)
+    """
+    file_path = resolve_filename(dest_dir, sanitize_filename(url))
+
+    try:
+        response = session.get(url, stream=True, timeout=30)
+        response.raise_for_status()
+
+        with open(file_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                if should_cancel is not None and should_cancel():
+                    f.close()
+                    try:
+                        file_path.unlink()
+                    except Exception:
+                        pass
+                    return False, "已终止"
+                if chunk:
+                    f.write(chunk)
+
+        return True, f"  → 保存至: {file_path.name} ({format_size(file_path.stat().st_size)})"
+
+    except requests.exceptions.RequestException as e:
+        return False, f"  ✗ 请求失败: {e}"
+    except Exception as e:
+        return False, f"  ✗ 错误: {e}"
+
+
+def download_images(urls, dest_dir, progress=None, on_file=None, should_cancel=None):
+    """
+    依次下载多张图片
+
+    Args:
+        on_file: 每下载完一张图片的回调,参数为 (URL, 是否成功, 消息)
+        should_cancel: 返回 True 时停止下载剩余图片
+
+    Returns:
+        tuple: (成功数, 失败数)
+    """
+    if not urls:
+        raise ValueError("请至少输入一个有效的图片 URL（以 http:// 或 https:// 开头）。")
+    dest_path = Path(dest_dir).expanduser().resolve()
+    dest_path.mkdir(parents=True, exist_ok=True)
+
+    session = requests.Session()
+    session.headers.update(IMAGE_REQUEST_HEADERS)
+    success_count = 0
+    fail_count = 0
+    _report(progress, 0, len(urls))
+    try:
+        for i, url in enumerate(urls, 1):
+            if should_cancel is not None and should_cancel():
+                break
+            ok, msg = download_image(url, dest_path, session, should_cancel)
+            if ok:
+                success_count += 1
+            else:
+                fail_count += 1
+            if on_file is not None:
+                on_file(url, ok, msg)
+            _report(progress, i, len(urls))
+    finally:
+        session.close()
+    return success_count, fail_count
@@ -0,0 +1,204 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+文件处理核心函数
+文件目录树生成器、空文件夹清理工具、文件时间修改器与命令行(snow file ...)共用的逻辑,
+这里不依赖 tkinter
+
+进度回调统一为 progress(已完成数量, 总数量)
+"""
+
+import os
+import subprocess
+from datetime import datetime
+
+
+# 目录树默认忽略的文件和文件夹
+DEFAULT_TREE_IGNORE = ['.git', '__pycache__', '.DS_Store']
+# 文件时间的输入格式
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+# ---------------- 目录树 ----------------
+
+def generate_dir_tree(path='.', ignore=None, prefix=''):
+    """生成 ├──/└── 样式的目录树文本,ignore 中的名称不显示"""
+    if ignore is None:
+        ignore = DEFAULT_TREE_IGNORE
+    try:
+        items = sorted(os.listdir(path))
+    except PermissionError:
+        return f"无法访问 {path}：权限不足\n"
+    result = ""
+    for i, item in enumerate(items):
+        if item in ignore:
+            continue
+        full_path = os.path.join(path, item)
+        is_last = i == len(items) - 1
+        # 添加当前项到结果
+        result += prefix + ('└── ' if is_last else '├── ') + item + '\n'
+        # 如果是目录，递归处理
+        if os.path.isdir(full_path):
+            new_prefix = prefix + ('    ' if is_last else '│   ')
+            result += generate_dir_tree(full_path, ignore, new_prefix)
+    return result
+
+
+def format_dir_tree(directory, ignore=None):
+    """带标题行的目录树文本(与目录树生成器窗口中显示的内容一致)"""
+    if not os.path.isdir(directory):
+        raise ValueError("请输入有效的目录路径")
+    ignore = DEFAULT_TREE_IGNORE if ignore is None else ignore
+    return f"目录结构（忽略: {', '.join(ignore)}）:\n\n" + generate_dir_tree(directory, ignore=ignore)
+
+
+def write_mindmap(directory, file_path):
+    """把目录结构保存为 markmap 思维导图 Markdown 文件"""
+    if not os.path.isdir(directory):
+        raise ValueError("请先选择有效目录并生成目录树")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write("# 目录结构思维导图\n\n")
+        f.write("```markmap\n")
+        f.write("{\n")
+        f.write('  "text": "' + os.path.basename(directory) + '",\n')
+        f.write('  "children": [\n')
+        _write_mindmap_items(directory, f, 1)
+        f.write("  ]\n")
+        f.write("}\n")
+        f.write("```\n")
+
+
+def _write_mindmap_items(path, file, depth):
+    items = sorted(os.listdir(path))
+    for i, item in enumerate(items):
+        full_path = os.path.join(path, item)
+        is_last = i == len(items) - 1
+
+        indent = "    " * depth
+        file.write(indent + '{\n')
+        file.write(indent + '  "text": "' + item + '",\n')
+
+        if os.path.isdir(full_path):
+            file.write(indent + '  "children": [\n')
+            _write_mindmap_items(full_path, file, depth + 1)
+            file.write(indent + '  ]\n')
+
+        file.write(indent + '}' + ('' if is_last else ',') + '\n')
+
+
+# ---------------- 空文件夹清理 ----------------
+
+def remove_empty_folders(folder):
+    """
+    自底向上删除文件夹中的空子文件夹(只含空文件夹的文件夹也会被删除,folder 本身保留)
+
+    Returns:
+        int: 删除的文件夹数
+    """
+    if not os.path.isdir(folder):
+        raise ValueError(f"目录不存在：{folder}")
+    count = 0
+    for root, dirs, files in os.walk(folder, topdown=False):
+        for dir_name in dirs:
+            dir_path = os.path.join(root, dir_name)
+            try:
+                if not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+                    count += 1
+            except Exception:
+                continue
+    return count
+
+
+# ---------------- 文件时间修改 ----------------
+
+def parse_time(time_str):
+    """解析 YYYY-MM-DD HH:MM:SS 格式的时间字符串为时间戳"""
+    try:
+        return datetime.strptime(time_str, TIME_FORMAT).timestamp()
+    except ValueError:
+        raise ValueError(f"时间格式不正确：{time_str}，请使用 YYYY-MM-DD HH:MM:SS 格式")
+
+
+def set_file_times(file_path, create_time=None, modify_time=None, access_time=None):
+    """
+    修改单个文件(或文件夹)的时间属性,为 None 的时间保持不变
+
+    Returns:
+        tuple: (是否成功, 信息)
+    """
+    try:
+        # 使用os.utime修改访问和修改时间
+        if access_time is not None or modify_time is not None:
+            stat = os.stat(file_path)
+            atime = access_time if access_time is not None else stat.st_atime
+            mtime = modify_time if modify_time is not None else stat.st_mtime
+            os.utime(file_path, (atime, mtime))
+
+        # Windows系统创建时间需要调用powershell
+        if create_time is not None:
+            create_time_str = datetime.fromtimestamp(create_time).strftime("%Y-%m-%dT%H:%M:%S")
+            quoted_path = file_path.replace("'", "''")
+            cmd = f'powershell -Command "(Get-Item -LiteralPath \'{quoted_path}\').CreationTime=\'{create_time_str}\'"'
+            completed = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            if completed.returncode != 0:
+                return False, completed.stderr.strip() or "修改创建时间失败"
+
+        return True, "成功"
+    except Exception as e:
+        return False, str(e)
+
+
+def list_time_targets(path, recursive=False):
+    """
+    列出需要修改时间的路径:单个文件;文件夹的顶层文件;
+    或递归时文件夹中的所有文件以及各级文件夹本身
+    """
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise ValueError("指定的路径不存在！")
+    if not recursive:
+        return [os.path.join(path, item) for item in os.listdir(path)
+                if os.path.isfile(os.path.join(path, item))]
+    targets = []
+    for root, dirs, files in os.walk(path):
+        targets.extend(os.path.join(root, name) for name in files)
+        targets.append(root)
+    return targets
+
+
+def modify_times(path, create_time=None, modify_time=None, access_time=None, recursive=False,
+                 progress=None, on_file=None):
+    """
+    修改文件或文件夹中文件的时间属性(时间为时间戳,None 表示不修改)
+
+    Args:
+        recursive: 文件夹时是否处理子文件夹(同时修改各级文件夹本身的时间)
+        on_file: 每处理完一个路径的回调,参数为 (路径, 是否成功, 信息)
+
+    Returns:
+        dict: {'success': 成功数, 'failed': 失败数, 'total': 总数}
+    """
+    if create_time is None and modify_time is None and access_time is None:
+        raise ValueError("请至少选择一种要修改的时间")
+    if create_time is not None and os.name != 'nt':
+        raise ValueError("只有 Windows 支持修改创建时间")
+    targets = list_time_targets(path, recursive)
+
+    results = {"success": 0, "failed": 0, "total": len(targets)}
+    _report(progress, 0, len(targets))
+    for index, target in enumerate(targets):
+        success, msg = set_file_times(target, create_time, modify_time, access_time)
+        results["success" if success else "failed"] += 1
+        if on_file is not None:
+            on_file(target, success, msg)
+        _report(progress, index + 1, len(targets))
+    return results
@@ -8,8 +8,13 @@ sys.dont_write_bytecode = True
 """
 
 import os
+import json
+import threading
 from pathlib import Path
-from fontTools.ttLib import TTFont
+
+
+# 字体元数据缓存文件:{字体路径: {"size": 文件大小, "mtime": 修改时间, "family": 字体族名称}}
+FONT_CACHE_PATH = Path(__file__).resolve().parent / "font_cache.json"
 
 
 class FontManager:
@@ -17,6 +22,8 @@ class FontManager:
     
     _instance = None
     _font_family = None
+    _registered_fonts = set()
+    _cache_lock = threading.Lock()
     _font_size_map = {
         'large': 48,
         'medium': 36,
@@ -62,33 +69,97 @@ class FontManager:
             return
         
         try:
-            # 使用 fonttools 获取字体名称
-            tt = TTFont(str(font_path))
-            font_name = None
-            for record in tt['name'].names:
-                if record.nameID == 1:  # Font Family
-                    font_name = record.toUnicode()
-                    break
-            
+            font_name = FontManager.get_family_name(font_path)
             if not font_name:
                 raise RuntimeError(f"无法从字体文件获取字体名称: {font_path}")
             
-            tt.close()
-            
-            # 使用 Windows API 注册字体
-            if os.name == 'nt':
-                import ctypes
-                GDI32 = ctypes.windll.gdi32
-                font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-                GDI32.AddFontResourceW(font_path_str)
-                print(f"[OK] 成功加载自定义字体: {font_path}")
-            
+            FontManager.register_font(font_path)
             FontManager._font_family = font_name
             
         except Exception as e:
             print(f"加载字体配置出错: {e}")
             FontManager._font_family = 'Arial'
     
+    @staticmethod
+    def _read_cache():
+        try:
+            with open(FONT_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _write_cache(cache):
+        # 打包版的 Core 目录可能只读,写入失败时仅放弃缓存
+        try:
+            tmp_path = FONT_CACHE_PATH.with_name(f"font_cache.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, FONT_CACHE_PATH)
+        except OSError:
+            pass
+    
+    @classmethod
+    def get_family_name(cls, font_path):
+        """
+        获取字体文件的字体族名称(nameID 1)
+        
+        结果按 (字体路径, 文件大小, 修改时间) 缓存在 Core/font_cache.json 中,
+        命中缓存时不会导入 fontTools,也不会解析字体文件
+        
+        Args:
+            font_path: 字体文件路径
+        
+        Returns:
+            str: 字体族名称,读取失败时返回 None
+        """
+        font_path = Path(font_path).resolve()
+        try:
+            stat = font_path.stat()
+        except OSError:
+            return None
+        
+        key = str(font_path)
+        with cls._cache_lock:
+            cache = cls._read_cache()
+            entry = cache.get(key)
+            if (isinstance(entry, dict) and entry.get('size') == stat.st_size
+                    and entry.get('mtime') == stat.st_mtime and entry.get('family')):
+                return entry['family']
+        
+        # 缓存未命中:使用 fonttools 解析字体名称
+        from fontTools.ttLib import TTFont
+        tt = TTFont(str(font_path), lazy=True)
+        try:
+            font_name = None
+            for record in tt['name'].names:
+                if record.nameID == 1:  # Font Family
+                    font_name = record.toUnicode()
+                    break
+        finally:
+            tt.close()
+        
+        if font_name:
+            with cls._cache_lock:
+                cache = cls._read_cache()
+                cache[key] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'family': font_name}
+                cls._write_cache(cache)
+        return font_name
+    
+    @classmethod
+    def register_font(cls, font_path):
+        """在 Windows 上注册字体文件(同一进程内只注册一次)"""
+        key = str(Path(font_path).resolve())
+        if os.name != 'nt' or key in cls._registered_fonts:
+            return
+        import ctypes
+        GDI32 = ctypes.windll.gdi32
+        font_path_str = key.encode('utf-16-le') + b'\x00'
+        GDI32.AddFontResourceW(font_path_str)
+        cls._registered_fonts.add(key)
+        print(f"[OK] 成功加载自定义字体: {font_path}")
+    
     @classmethod
     def get_font_family(cls):
         """获取字体族名称"""
@@ -0,0 +1,555 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+图片处理核心函数
+图片工具、B站图片压缩工具与命令行(snow img ... / snow bili ...)共用的格式转换、九宫格分割、
+ICO 转换、图片合成和封面/表情包压缩逻辑,这里不依赖 tkinter
+
+进度回调统一为 progress(已完成数量, 总数量)
+"""
+
+import io
+import os
+import math
+import random
+from pathlib import Path
+from typing import Tuple, Optional
+
+from LazyImport import lazy_import
+from JobScheduler import get_scheduler
+
+# 重型依赖按需导入，首次使用时才加载
+Image = lazy_import('PIL.Image')
+
+
+# 格式转换支持的图片格式
+SUPPORTED_FORMATS = ['jpg', 'jpeg', 'png', 'webp', 'bmp', 'gif', 'tiff', 'psd']
+# B站压缩工具支持的输入格式
+BILI_INPUT_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def list_images(input_dir, extensions=None):
+    """列出目录下(不含子目录)指定扩展名的图片文件名,按文件名排序"""
+    extensions = tuple(ext.lower() for ext in (extensions or ['.' + fmt for fmt in SUPPORTED_FORMATS]))
+    return sorted(f for f in os.listdir(input_dir) if f.lower().endswith(extensions))
+
+
+def convert_image(input_path, output_path, output_format, quality=95):
+    """
+    转换单张图片格式
+
+    Args:
+        output_format: 目标格式(见 SUPPORTED_FORMATS)
+        quality: 1-100,JPG/WEBP 为压缩质量,PNG 映射为压缩级别
+    """
+    quality = max(1, min(100, int(quality)))
+    # 根据格式设置保存参数
+    fmt = output_format.lower()
+    save_args = {'format': 'JPEG' if fmt == 'jpg' else fmt.upper()}
+    if fmt in ['jpg', 'jpeg', 'webp']:
+        save_args['quality'] = quality
+    elif fmt == 'png':
+        save_args['compress_level'] = 9 - int(quality / 11.11)  # 将1-100映射到9-0
+
+    with Image.open(input_path) as img:
+        # JPEG 不支持透明通道和调色板
+        if save_args['format'] == 'JPEG' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.save(output_path, **save_args)
+
+
+def convert_image_task(task):
+    """
+    进程池中执行的单张图片转换(参数打包为一个元组,便于 pickle)
+
+    Args:
+        task: (输入路径, 输出路径, 目标格式, 质量)
+
+    Returns:
+        None 表示成功,否则为错误提示文字
+    """
+    input_path, output_path, output_format, quality = task
+    try:
+        convert_image(input_path, output_path, output_format, quality)
+        return None
+    except Exception as e:
+        return describe_image_error(e)
+
+
+def convert_images(tasks, progress=None):
+    """
+    在 CPU 进程池中并行转换多张图片
+
+    Args:
+        tasks: [(输入路径, 输出路径, 目标格式, 质量), ...]
+
+    Returns:
+        tuple: (成功数量, [(输入路径, 错误信息), ...])
+    """
+    errors = get_scheduler().run_cpu(convert_image_task, tasks, progress=progress)
+    failed = [(task[0], error) for task, error in zip(tasks, errors) if error is not None]
+    return len(tasks) - len(failed), failed
+
+
+def convert_folder(input_dir, output_dir, output_format, quality=95, overwrite=True, progress=None):
+    """
+    批量转换目录中的图片
+
+    Returns:
+        tuple: (成功数量, [(文件名, 错误信息), ...])
+    """
+    image_files = list_images(input_dir)
+    if not image_files:
+        raise ValueError("指定目录中没有找到支持的图片文件")
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    failed = []
+    for filename in image_files:
+        name = os.path.splitext(filename)[0]
+        output_path = os.path.join(output_dir, f"{name}.{output_format}")
+        if not overwrite and os.path.exists(output_path):
+            failed.append((filename, "输出文件已存在"))
+        else:
+            tasks.append((os.path.join(input_dir, filename), output_path, output_format, quality))
+
+    def report(done, total):
+        _report(progress, done + len(failed), len(image_files))
+
+    success_count, errors = convert_images(tasks, report)
+    failed.extend((os.path.basename(path), error) for path, error in errors)
+    return success_count, failed
+
+
+def describe_image_error(error):
+    """把图片处理异常转换为提示文字"""
+    if isinstance(error, Image.DecompressionBombError):
+        return "图片尺寸过大，可能造成内存溢出"
+    if isinstance(error, IOError):
+        return f"文件读写错误: {str(error)}"
+    return f"未知错误: {str(error)}"
+
+
+def split_grid(input_path, output_dir, rows=3, cols=3, progress=None):
+    """
+    把图片等分为 rows x cols 块(默认九宫格),保存在 output_dir/<文件名>_split 目录下
+
+    Returns:
+        tuple: (输出子目录, 输出文件列表)
+    """
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    save_dir = os.path.join(output_dir, base_name + "_split")
+    os.makedirs(save_dir, exist_ok=True)
+
+    outputs = []
+    with Image.open(input_path) as img:
+        width, height = img.size
+        tile_width = width // cols
+        tile_height = height // rows
+        total = rows * cols
+        for i in range(rows):
+            for j in range(cols):
+                left = j * tile_width
+                upper = i * tile_height
+                tile = img.crop((left, upper, left + tile_width, upper + tile_height))
+                output_path = os.path.join(save_dir, f'{base_name}_tile_{i}_{j}.png')
+                tile.save(output_path)
+                outputs.append(output_path)
+                _report(progress, i * cols + j + 1, total)
+    return save_dir, outputs
+
+
+def parse_icon_size(size_text):
+    """解析 "64" 或 "64x64" 形式的图标尺寸,尺寸必须在 16-256 之间"""
+    try:
+        parts = [int(p) for p in str(size_text).lower().split('x')]
+    except ValueError:
+        raise ValueError("请输入有效的尺寸格式，如: 64x64")
+    if len(parts) == 1:
+        parts = parts * 2
+    if len(parts) != 2:
+        raise ValueError("请输入有效的尺寸格式，如: 64x64")
+    width, height = parts
+    if not (16 <= width <= 256 and 16 <= height <= 256):
+        raise ValueError("尺寸必须在16x16到256x256之间")
+    return width, height
+
+
+def convert_to_ico(input_path, output_path, size=(64, 64)):
+    """把图片缩放到指定尺寸并保存为 ICO 文件"""
+    with Image.open(input_path) as image:
+        resized_img = image.resize(tuple(size), Image.LANCZOS)
+        resized_img.save(output_path, format='ICO', sizes=[tuple(size)])
+
+
+# 图片合成支持的布局: 均匀分布、水平排列、垂直排列、随机分布
+COMBINE_LAYOUTS = ('uniform', 'horizontal', 'vertical', 'random')
+# 所选图片总大小超过该值时先把每张图片压缩到约 1 百万像素再合成
+COMBINE_COMPRESS_THRESHOLD = 10 * 1024 * 1024
+
+
+def combine_images(image_paths, layout='uniform', select_count=0, progress=None):
+    """
+    把多张图片合成为一张(白色背景的 RGB 图片)
+
+    Args:
+        layout: 布局(见 COMBINE_LAYOUTS)
+        select_count: 大于 0 且小于图片数时,随机选择该数量的图片参与合成
+        progress: 加载图片的进度回调
+
+    Returns:
+        PIL.Image.Image: 合成结果
+    """
+    if not image_paths:
+        raise ValueError("请先选择图片")
+    if layout not in COMBINE_LAYOUTS:
+        raise ValueError(f"未知的布局模式: {layout}")
+
+    # 随机选择指定数量的图片
+    if 0 < select_count < len(image_paths):
+        selected_paths = random.sample(list(image_paths), select_count)
+    else:
+        selected_paths = list(image_paths)
+
+    images = []
+    total_size = 0
+    _report(progress, 0, len(selected_paths))
+    for i, path in enumerate(selected_paths):
+        images.append(Image.open(path))
+        total_size += os.path.getsize(path)
+        _report(progress, i + 1, len(selected_paths))
+
+    # 自动压缩大图片
+    if total_size > COMBINE_COMPRESS_THRESHOLD:
+        images = [_shrink_for_combine(img) for img in images]
+
+    if layout == 'random':
+        return _random_layout(images)
+    if layout == 'horizontal':
+        return _horizontal_layout(images)
+    if layout == 'vertical':
+        return _vertical_layout(images)
+    return _uniform_layout(images)
+
+
+def save_combined(image, output_path):
+    """按扩展名保存合成结果(JPG 质量 95,其他扩展名交给 Pillow 判断格式)"""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in (".jpg", ".jpeg"):
+        image.save(output_path, "JPEG", quality=95)
+    elif ext == ".png":
+        image.save(output_path, "PNG")
+    elif ext == ".bmp":
+        image.save(output_path, "BMP")
+    else:
+        image.save(output_path)
+
+
+def combine_and_save(image_paths, output_path, layout='uniform', select_count=0, count=1, progress=None):
+    """
+    合成并保存 count 张图片(每张重新合成,随机选择/随机分布的结果各不相同),
+    count 大于 1 时文件名依次为 名称_1.扩展名、名称_2.扩展名……
+
+    Returns:
+        list: 保存的文件路径
+    """
+    base, ext = os.path.splitext(output_path)
+    saved = []
+    _report(progress, 0, count)
+    for i in range(count):
+        current_path = f"{base}_{i + 1}{ext}" if count > 1 else output_path
+        save_combined(combine_images(image_paths, layout, select_count), current_path)
+        saved.append(current_path)
+        _report(progress, i + 1, count)
+    return saved
+
+
+def _uniform_layout(images):
+    """均匀分布布局:近似正方形的网格,每格为最大图片的尺寸"""
+    img_count = len(images)
+    cols = math.ceil(math.sqrt(img_count))
+    rows = math.ceil(img_count / cols)
+    max_width = max(img.size[0] for img in images)
+    max_height = max(img.size[1] for img in images)
+
+    canvas = Image.new('RGB', (cols * max_width, rows * max_height), (255, 255, 255))
+    for i, img in enumerate(images):
+        canvas.paste(img, ((i % cols) * max_width, (i // cols) * max_height))
+    return canvas
+
+
+def _horizontal_layout(images):
+    """水平排列布局"""
+    total_width = sum(img.size[0] for img in images)
+    max_height = max(img.size[1] for img in images)
+    canvas = Image.new('RGB', (total_width, max_height), (255, 255, 255))
+    x_offset = 0
+    for img in images:
+        canvas.paste(img, (x_offset, 0))
+        x_offset += img.size[0]
+    return canvas
+
+
+def _vertical_layout(images):
+    """垂直排列布局"""
+    max_width = max(img.size[0] for img in images)
+    total_height = sum(img.size[1] for img in images)
+    canvas = Image.new('RGB', (max_width, total_height), (255, 255, 255))
+    y_offset = 0
+    for img in images:
+        canvas.paste(img, (0, y_offset))
+        y_offset += img.size[1]
+    return canvas
+
+
+def _random_layout(images):
+    """随机分布布局:正方形画布边长为总面积平方根的 1.5 倍,每张图片最多尝试 100 次不重叠的位置"""
+    total_area = sum(img.size[0] * img.size[1] for img in images)
+    canvas_size = int(math.sqrt(total_area) * 1.5)
+    canvas = Image.new('RGB', (canvas_size, canvas_size), (255, 255, 255))
+
+    placed = []
+    for img in images:
+        for _ in range(100):
+            x = random.randint(0, max(0, canvas_size - img.size[0]))
+            y = random.randint(0, max(0, canvas_size - img.size[1]))
+            new_rect = (x, y, x + img.size[0], y + img.size[1])
+            if not any(_check_overlap(new_rect, existing) for existing in placed):
+                canvas.paste(img, (x, y))
+                placed.append(new_rect)
+                break
+    return canvas
+
+
+def _check_overlap(rect1, rect2):
+    """检查两个矩形是否重叠"""
+    return not (rect1[2] <= rect2[0] or
+                rect1[0] >= rect2[2] or
+                rect1[3] <= rect2[1] or
+                rect1[1] >= rect2[3])
+
+
+def _shrink_for_combine(image):
+    """把超过约 1 百万像素的图片等比缩小到约 1 百万像素"""
+    original_size = image.size[0] * image.size[1]
+    target_size = 1024 * 1024
+    if original_size <= target_size:
+        return image
+    ratio = math.sqrt(target_size / original_size)
+    return image.resize((int(image.size[0] * ratio), int(image.size[1] * ratio)), Image.Resampling.LANCZOS)
+
+
+class BiliImageProcessor:
+    """B站封面与表情包压缩核心类"""
+    
+    def __init__(self):
+        # 定义图片类型的尺寸和大小限制
+        self.IMAGE_SPECS = {
+            'cover': {
+                'size': (360, 360),
+                'max_size': 300 * 1024,  # 300KB
+                'min_quality': 60,        # 最低质量限制
+                'allow_webp': False       # 不允许转换为WebP
+            },
+            'emoji': {
+                'size': (162, 162),
+                'max_size': 16 * 1024,    # 16KB
+                'min_quality': 30,        # 允许更低的质量
+                'allow_webp': True        # 允许转换为WebP
+            }
+        }
+        
+    def resize_image(self, image: 'Image.Image', target_size: Tuple[int, int]) -> 'Image.Image':
+        """调整图片尺寸，保持宽高比并优化图片质量"""
+        # 计算目标尺寸
+        target_ratio = target_size[0] / target_size[1]
+        img_ratio = image.width / image.height
+        
+        if img_ratio > target_ratio:
+            # 图片更宽，以高度为准
+            new_height = target_size[1]
+            new_width = int(new_height * img_ratio)
+        else:
+            # 图片更高，以宽度为准
+            new_width = target_size[0]
+            new_height = int(new_width / img_ratio)
+
+        # 使用高质量的重采样方法
+        resized = image.resize((new_width, new_height), 
+                             Image.Resampling.LANCZOS,
+                             reducing_gap=2.0)
+        
+        # 创建目标尺寸的新图片（居中放置）
+        new_img = Image.new('RGBA', target_size, (0, 0, 0, 0))
+        paste_x = (target_size[0] - new_width) // 2
+        paste_y = (target_size[1] - new_height) // 2
+        
+        # 如果是RGBA模式，使用alpha通道作为mask
+        if resized.mode == 'RGBA':
+            new_img.paste(resized, (paste_x, paste_y), resized)
+        else:
+            new_img.paste(resized, (paste_x, paste_y))
+        return new_img
+    
+    def compress_image(self, image: 'Image.Image', max_size: int, min_quality: int = 30) -> Optional[bytes]:
+        """压缩图片到指定大小以下"""
+        
+        def try_save_image(img: 'Image.Image', format: str, **save_args) -> Optional[bytes]:
+            """尝试保存图片并返回字节数据"""
+            buffer = io.BytesIO()
+            img.save(buffer, format, **save_args)
+            size = buffer.tell()
+            if size <= max_size:
+                buffer.seek(0)
+                return buffer.getvalue()
+            return None
+            
+        # 如果是RGBA模式（带透明通道）
+        if image.mode == 'RGBA':
+            # 1. 首先尝试直接优化PNG
+            result = try_save_image(image, 'PNG', optimize=True)
+            if result:
+                return result
+                
+            # 2. 尝试减少颜色数量
+            for colors in [256, 128, 64, 32]:
+                quantized = image.quantize(colors=colors, method=2)  # method=2 使用中位切分法
+                converted = quantized.convert('RGBA')  # 转回RGBA模式
+                result = try_save_image(converted, 'PNG', optimize=True)
+                if result:
+                    return result
+            
+            # 3. 尝试更激进的压缩方法
+            for colors in [256, 128, 64, 32]:
+                # 分离透明通道
+                rgb = image.convert('RGB')
+                alpha = image.split()[3]
+                
+                # 对RGB部分进行量化
+                quantized_rgb = rgb.quantize(colors=colors, method=2)
+                
+                # 重新组合透明通道
+                quantized_rgba = Image.new('RGBA', image.size)
+                quantized_rgba.paste(quantized_rgb, mask=alpha)
+                
+                result = try_save_image(quantized_rgba, 'PNG', optimize=True)
+                if result:
+                    return result
+                    
+            # 4. PNG 无法压缩到目标大小时，最后尝试WebP格式（支持透明度的有损压缩）
+            quality = 90
+            while quality >= min_quality:
+                result = try_save_image(image, 'WEBP', quality=quality, lossless=False)
+                if result:
+                    return result
+                quality -= 5
+                
+        else:  # 非透明图片使用JPEG
+            quality = 95
+            while quality >= min_quality:
+                result = try_save_image(image, 'JPEG', quality=quality, optimize=True)
+                if result:
+                    return result
+                quality -= 5
+        
+        return None
+    
+    def process_image(self, input_path: str, output_path: str, image_type: str) -> bool:
+        """处理单个图片,返回是否成功(失败原因见 compress_file)"""
+        try:
+            self.compress_file(input_path, output_path, image_type)
+            return True
+        except ValueError:
+            return False
+
+    def compress_file(self, input_path: str, output_path: str, image_type: str) -> int:
+        """
+        把单个图片调整到目标尺寸并压缩到大小上限以下
+
+        Returns:
+            int: 输出文件大小(字节)
+
+        Raises:
+            ValueError: 无法处理时,信息为失败原因
+        """
+        if image_type not in self.IMAGE_SPECS:
+            raise ValueError(f"未知的图片类型: {image_type}")
+        specs = self.IMAGE_SPECS[image_type]
+        if not os.path.exists(input_path):
+            raise ValueError(f"输入文件不存在: {input_path}")
+
+        # 确保输出目录存在
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        try:
+            with Image.open(input_path) as img:
+                # 转换颜色模式
+                if img.mode not in ['RGB', 'RGBA']:
+                    img = img.convert('RGBA')
+                resized_img = self.resize_image(img, specs['size'])
+                compressed_data = self.compress_image(resized_img, specs['max_size'], specs['min_quality'])
+        except Exception as e:
+            raise ValueError(f"处理图片时出错: {describe_image_error(e)}")
+        if compressed_data is None:
+            raise ValueError("无法将图片压缩到目标大小，请尝试手动优化图片")
+
+        try:
+            with open(output_path, 'wb') as f:
+                f.write(compressed_data)
+            # 验证输出文件可以被正常打开
+            with Image.open(output_path):
+                pass
+        except Exception as e:
+            raise ValueError(f"保存文件时出错: {str(e)}")
+        return len(compressed_data)
+
+
+def compress_bili_images(input_dir, output_dir, image_type, progress=None, on_file=None):
+    """
+    批量压缩 B站封面(cover)或表情包(emoji)图片
+
+    Args:
+        on_file: 每处理完一个文件的回调,参数为 (文件名, 是否成功, 信息),失败时信息为原因
+
+    Returns:
+        tuple: (图片总数, 失败的文件名列表)
+    """
+    if image_type not in BiliImageProcessor().IMAGE_SPECS:
+        raise ValueError(f"未知的图片类型: {image_type}")
+    if not os.path.exists(input_dir):
+        raise ValueError(f"输入目录不存在：{input_dir}")
+    image_files = [Path(input_dir) / name for name in list_images(input_dir, BILI_INPUT_EXTENSIONS)]
+    if not image_files:
+        raise ValueError("未找到支持的图片文件！\n支持的格式：PNG、JPG、JPEG")
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(str(img_path), str(Path(output_dir) / img_path.name), image_type) for img_path in image_files]
+
+    def on_item(index, error):
+        if on_file is not None:
+            on_file(image_files[index].name, error is None, error or "成功")
+
+    errors = get_scheduler().run_cpu(_compress_bili_task, tasks, progress=progress, on_item=on_item)
+    failed = [img_path.name for img_path, error in zip(image_files, errors) if error is not None]
+    return len(image_files), failed
+
+
+def _compress_bili_task(task):
+    """
+    进程池中执行的单张 B站图片压缩,task 为 (输入路径, 输出路径, 图片类型)
+
+    Returns:
+        None 表示成功,否则为失败原因
+    """
+    input_path, output_path, image_type = task
+    try:
+        BiliImageProcessor().compress_file(input_path, output_path, image_type)
+        return None
+    except ValueError as e:
+        return str(e)
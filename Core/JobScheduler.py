@@ -0,0 +1,409 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+后台任务调度模块
+所有工具共用的后台任务调度器:I/O 密集任务放入线程池,CPU 密集的批量任务放入进程池,
+每个任务带取消令牌和耗时统计;进度、完成、出错回调通过 Tk 的 after() 转回界面线程执行,
+界面线程不会被耗时操作阻塞
+
+用法:
+    job = get_scheduler().submit(split_pdf_by_count, path, out_dir, 10,
+                                 ui=self.root, on_progress=..., on_done=..., on_error=...)
+    job.cancel()
+"""
+
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+
+class JobCancelled(Exception):
+    """任务已被取消"""
+
+
+class CancelToken:
+    """取消令牌 - 任务在检查点调用 check(),已取消时抛出 JobCancelled"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise JobCancelled("任务已取消")
+
+
+class TkDispatcher:
+    """把回调转交给 Tk 界面线程执行(后台线程直接操作 Tk 控件并不安全)"""
+
+    def __init__(self, root, interval=30):
+        """必须在 Tk 界面线程中创建"""
+        self.root = root
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self.root.after(self.interval, self._poll)
+
+    @classmethod
+    def for_root(cls, root):
+        """获取(或创建)与窗口绑定的分发器"""
+        dispatcher = getattr(root, '_snow_dispatcher', None)
+        if dispatcher is None:
+            dispatcher = cls(root)
+            root._snow_dispatcher = dispatcher
+        return dispatcher
+
+    def post(self, callback, *args):
+        if not self._closed:
+            self._queue.put((callback, args))
+
+    def _poll(self):
+        try:
+            while True:
+                callback, args = self._queue.get_nowait()
+                try:
+                    callback(*args)
+                except Exception as e:
+                    print(f"界面回调出错: {e}")
+        except queue.Empty:
+            pass
+        try:
+            self.root.after(self.interval, self._poll)
+        except Exception:
+            # 窗口已销毁
+            self._closed = True
+
+
+class Job:
+    """一个后台任务的句柄"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, kind):
+        self.id = next(Job._ids)
+        self.name = name
+        self.kind = kind
+        self.token = CancelToken()
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.done_event = threading.Event()
+
+    def cancel(self):
+        """请求取消任务(在下一个检查点生效)"""
+        self.token.cancel()
+
+    @property
+    def elapsed(self):
+        """运行耗时秒数(尚未开始时为 0)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def queued(self):
+        """排队等待的秒数"""
+        return (self.started_at or time.perf_counter()) - self.submitted_at
+
+    def wait(self, timeout=None):
+        """等待任务结束,返回是否已结束"""
+        return self.done_event.wait(timeout)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status} {self.elapsed:.2f}s>"
+
+
+class JobScheduler:
+    """后台任务调度器 - 有上限的 I/O 线程池 + CPU 进程池"""
+
+    def __init__(self, io_workers=None, cpu_workers=None):
+        cpu_count = os.cpu_count() or 1
+        self.io_workers = io_workers or min(32, cpu_count + 4)
+        self.cpu_workers = cpu_workers or cpu_count
+        self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='snow-io')
+        self._cpu_pool = None
+        self._cpu_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.active = {}
+        # 最近完成的任务:[(任务名, 状态, 排队秒数, 运行秒数), ...]
+        self.history = []
+
+    # ---------------- 任务提交 ----------------
+
+    def submit(self, fn, *args, name=None, ui=None, on_progress=None, on_done=None, on_error=None,
+               on_cancel=None, with_progress=True, **kwargs):
+        """
+        在 I/O 线程池中运行 fn(*args, **kwargs)
+
+        Args:
+            fn: 任务函数;with_progress 为 True 时会额外传入 progress=回调,
+                回调在任务已取消时抛出 JobCancelled,因此每次报告进度都是一个取消检查点
+            ui: Tk 窗口,提供时所有回调都在界面线程中执行
+            on_progress: 进度回调 (已完成数量, 总数量)
+            on_done: 完成回调 (返回值)
+            on_error: 出错回调 (异常)
+            on_cancel: 取消回调 ()
+
+        Returns:
+            Job: 任务句柄
+        """
+        job = Job(name or getattr(fn, '__name__', 'job'), 'io')
+        dispatch = self._make_dispatch(ui)
+
+        def run():
+            if with_progress:
+                kwargs['progress'] = self._make_progress(job, dispatch, on_progress)
+            return fn(*args, **kwargs)
+
+        self._start(job, run, dispatch, on_done, on_error, on_cancel)
+        return job
+
+    def map_cpu(self, fn, items, name=None, ui=None, on_progress=None, on_done=None, on_error=None,
+                on_cancel=None, return_exceptions=False, max_workers=None):
+        """
+        在 CPU 进程池中对每个元素并行执行 fn(item),结果按输入顺序返回
+
+        fn 必须是模块顶层函数(需要能被 pickle);进程池无法启动时退回当前线程中顺序执行。
+        子进程异常退出时,当时正在执行的元素以 BrokenProcessPool 失败,其余元素在重建的进程池中继续
+
+        Args:
+            return_exceptions: 为 True 时单个元素出错不会使整个任务失败,异常对象作为该元素的结果
+            max_workers: 本批任务最多同时占用的进程数,默认使用整个进程池
+
+        Returns:
+            Job: 任务句柄,完成回调的参数为结果列表
+        """
+        items = list(items)
+        job = Job(name or getattr(fn, '__name__', 'job'), 'cpu')
+        dispatch = self._make_dispatch(ui)
+        progress = self._make_progress(job, dispatch, on_progress)
+
+        def run():
+            return self._run_cpu_batch(job, fn, items, progress, return_exceptions, max_workers=max_workers)
+
+        self._start(job, run, dispatch, on_done, on_error, on_cancel)
+        return job
+
+    def run_cpu(self, fn, items, progress=None, token=None, on_item=None, return_exceptions=False,
+                max_workers=None):
+        """
+        同步版本的 map_cpu,供已在后台线程中运行的任务(或命令行)直接调用
+
+        Args:
+            on_item: 每个元素完成时在当前线程中调用 (元素序号, 结果)
+            max_workers: 本批任务最多同时占用的进程数,默认使用整个进程池
+
+        Returns:
+            list: 按输入顺序排列的结果
+        """
+        job = Job(getattr(fn, '__name__', 'job'), 'cpu')
+        if token is not None:
+            job.token = token
+
+        def report(done, total):
+            job.token.check()
+            if progress is not None:
+                progress(done, total)
+
+        return self._run_cpu_batch(job, fn, list(items), report, return_exceptions, on_item, max_workers)
+
+    # ---------------- 内部实现 ----------------
+
+    def _make_dispatch(self, ui):
+        if ui is None:
+            return lambda callback, *args: callback(*args)
+        return TkDispatcher.for_root(ui).post
+
+    @staticmethod
+    def _make_progress(job, dispatch, on_progress):
+        def progress(done, total):
+            job.token.check()
+            if on_progress is not None:
+                dispatch(on_progress, done, total)
+        return progress
+
+    def _start(self, job, run, dispatch, on_done, on_error, on_cancel):
+        def worker():
+            job.started_at = time.perf_counter()
+            job.status = 'running'
+            try:
+                job.token.check()
+                job.result = run()
+                job.status = 'done'
+            except JobCancelled:
+                job.status = 'cancelled'
+            except Exception as e:
+                job.status = 'failed'
+                job.error = e
+            finally:
+                job.finished_at = time.perf_counter()
+                self._finish(job)
+
+            if job.status == 'done' and on_done is not None:
+                dispatch(on_done, job.result)
+            elif job.status == 'failed':
+                if on_error is not None:
+                    dispatch(on_error, job.error)
+                else:
+                    print(f"后台任务 {job.name} 出错: {job.error}")
+            elif job.status == 'cancelled' and on_cancel is not None:
+                dispatch(on_cancel)
+
+        with self._lock:
+            self.active[job.id] = job
+        self._io_pool.submit(worker)
+
+    def _finish(self, job):
+        with self._lock:
+            self.active.pop(job.id, None)
+            self.history.append((job.name, job.status, job.queued, job.elapsed))
+            del self.history[:-200]
+        job.done_event.set()
+
+    def _get_cpu_pool(self):
+        with self._cpu_lock:
+            if self._cpu_pool is None:
+                # 统一使用 spawn:与 Windows 行为一致,也避免在带 Tk 和多线程的进程中 fork
+                self._cpu_pool = ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._cpu_pool
+
+    def _reset_cpu_pool(self):
+        with self._cpu_lock:
+            pool, self._cpu_pool = self._cpu_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run_cpu_batch(self, job, fn, items, progress, return_exceptions, on_item=None, max_workers=None):
+        total = len(items)
+        results = [None] * total
+        if total == 0:
+            return results
+        # 同时在进程池中排队的元素数上限,其余元素在有空位时再提交,取消时无需撤回大量排队任务
+        window = max(1, min(max_workers or self.cpu_workers, self.cpu_workers))
+        try:
+            pool = self._get_cpu_pool()
+        except (OSError, RuntimeError) as e:
+            print(f"进程池不可用，改为顺序执行: {e}")
+            return self._run_serial(fn, items, progress, return_exceptions, on_item)
+
+        pending = {}
+        next_index = 0
+        finished = 0
+
+        def finish(index, result):
+            nonlocal finished
+            results[index] = result
+            finished += 1
+            if on_item is not None:
+                on_item(index, result)
+            progress(finished, total)
+
+        try:
+            while finished < total:
+                while next_index < total and len(pending) < window:
+                    pending[pool.submit(fn, items[next_index])] = next_index
+                    next_index += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = None
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        if not return_exceptions:
+                            raise
+                        broken = result = e
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        result = e
+                    finish(index, result)
+                if broken is not None:
+                    # 子进程异常退出(如某个文件导致 MuPDF/Pillow 崩溃):崩溃时仍在执行的元素都视为失败,
+                    # 不在当前进程中重试,否则同一个元素会让整个工具窗口退出;其余元素交给重建的进程池
+                    print(f"进程池异常，正在执行的任务记为失败并重建进程池: {broken}")
+                    for index in pending.values():
+                        finish(index, broken)
+                    pending.clear()
+                    self._reset_cpu_pool()
+                    pool = self._get_cpu_pool()
+        except BrokenProcessPool:
+            self._reset_cpu_pool()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+        return results
+
+    def _run_serial(self, fn, items, progress, return_exceptions, on_item=None):
+        results = []
+        for index, item in enumerate(items):
+            results.append(self._call(fn, item, return_exceptions))
+            if on_item is not None:
+                on_item(index, results[-1])
+            progress(index + 1, len(items))
+        return results
+
+    @staticmethod
+    def _call(fn, item, return_exceptions):
+        try:
+            return fn(item)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    # ---------------- 状态 ----------------
+
+    def cancel_all(self):
+        """取消所有正在运行和排队的任务"""
+        with self._lock:
+            jobs = list(self.active.values())
+        for job in jobs:
+            job.cancel()
+
+    def timing_summary(self):
+        """返回最近完成任务的耗时描述"""
+        with self._lock:
+            history = list(self.history[-10:])
+        return "\n".join(
+            f"{name:<24}{status:<10}排队 {queued * 1000:>7.0f} ms  运行 {elapsed:>8.2f} s"
+            for name, status, queued, elapsed in history
+        )
+
+    def shutdown(self, wait=False):
+        self.cancel_all()
+        self._io_pool.shutdown(wait=wait, cancel_futures=True)
+        self._reset_cpu_pool()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """获取进程内共享的调度器"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
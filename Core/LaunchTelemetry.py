@@ -0,0 +1,279 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+工具启动统计模块
+启动器每启动一次工具就在本地 SQLite 数据库中记录一行:启动方式、进程拉起耗时、
+首个窗口显示耗时、峰值内存和退出码,用于在"性能"标签页中按工具统计分位数
+
+首窗耗时由工具进程自己上报:启动器通过环境变量 SNOW_LAUNCH_ID / SNOW_LAUNCH_AT
+传入本次启动的编号和点击时刻,工具进程中的 Tk 主循环钩子在窗口显示后写回数据库
+"""
+
+import os
+import csv
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+
+TELEMETRY_DB_PATH = Path(__file__).resolve().parent / "launch_telemetry.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS launches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool TEXT NOT NULL,
+    mode TEXT,
+    launched_at REAL NOT NULL,
+    spawn_ms REAL,
+    first_window_ms REAL,
+    peak_rss_mb REAL,
+    exit_code INTEGER,
+    ended_at REAL
+)
+"""
+
+COLUMNS = ['id', 'tool', 'mode', 'launched_at', 'spawn_ms', 'first_window_ms', 'peak_rss_mb', 'exit_code', 'ended_at']
+
+# 子进程中的当前启动编号(共享宿主中每个工具线程各自一份)
+_child = threading.local()
+_hooks_installed = False
+
+
+def percentile(values, q):
+    """线性插值计算分位数,values 为空时返回 None"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def get_peak_rss_mb():
+    """当前进程的峰值内存(MB),无法获取时返回 None"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ('cb', wintypes.DWORD),
+                    ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t),
+                    ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t),
+                    ('PeakPagefileUsage', ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB,macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except Exception:
+        return None
+
+
+class LaunchTelemetry:
+    """工具启动记录的读写类"""
+
+    def __init__(self, db_path=TELEMETRY_DB_PATH):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            try:
+                conn = self._connect()
+                try:
+                    cursor = conn.execute(sql, params)
+                    conn.commit()
+                    return cursor.lastrowid
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"启动统计写入失败: {e}")
+                return None
+
+    def record_launch(self, tool, launched_at):
+        """
+        记录一次启动请求
+
+        Args:
+            tool: 工具脚本文件名
+            launched_at: 点击时刻(time.time())
+
+        Returns:
+            int: 启动编号,写入失败时返回 None
+        """
+        return self._execute(
+            "INSERT INTO launches (tool, launched_at) VALUES (?, ?)",
+            (tool, launched_at),
+        )
+
+    def record_spawn(self, launch_id, mode, spawn_ms):
+        """
+        记录启动方式和进程拉起耗时
+
+        Args:
+            mode: 启动方式('warm'/'cold'/'shared'/'isolated')
+            spawn_ms: 进程拉起(至工具脚本开始执行)的耗时
+        """
+        self._execute(
+            "UPDATE launches SET mode = ?, spawn_ms = ? WHERE id = ?",
+            (mode, spawn_ms, launch_id),
+        )
+
+    def record_first_window(self, launch_id, first_window_ms):
+        self._execute(
+            "UPDATE launches SET first_window_ms = ? WHERE id = ? AND first_window_ms IS NULL",
+            (first_window_ms, launch_id),
+        )
+
+    def record_peak_rss(self, launch_id, peak_rss_mb):
+        self._execute(
+            "UPDATE launches SET peak_rss_mb = MAX(COALESCE(peak_rss_mb, 0), ?) WHERE id = ?",
+            (peak_rss_mb, launch_id),
+        )
+
+    def record_exit(self, launch_id, exit_code):
+        self._execute(
+            "UPDATE launches SET exit_code = ?, ended_at = ? WHERE id = ?",
+            (exit_code, time.time(), launch_id),
+        )
+
+    def rows(self, limit=None):
+        """按时间倒序返回启动记录(字典列表)"""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM launches ORDER BY id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            try:
+                conn = self._connect()
+                try:
+                    return [dict(zip(COLUMNS, row)) for row in conn.execute(sql)]
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                return []
+
+    def summary(self):
+        """
+        按工具汇总启动记录
+
+        Returns:
+            list: [{'tool', 'count', 'failures', 'spawn_p50', 'spawn_p90', 'window_p50',
+                    'window_p90', 'window_p99', 'rss_p50', 'rss_max'}, ...],按首窗 p90 降序
+        """
+        grouped = {}
+        for row in self.rows():
+            grouped.setdefault(row['tool'], []).append(row)
+        result = []
+        for tool, rows in grouped.items():
+            spawn = [r['spawn_ms'] for r in rows]
+            window = [r['first_window_ms'] for r in rows]
+            rss = [r['peak_rss_mb'] for r in rows if r['peak_rss_mb'] is not None]
+            result.append({
+                'tool': tool,
+                'count': len(rows),
+                'failures': sum(1 for r in rows if r['exit_code'] not in (None, 0)),
+                'spawn_p50': percentile(spawn, 50),
+                'spawn_p90': percentile(spawn, 90),
+                'window_p50': percentile(window, 50),
+                'window_p90': percentile(window, 90),
+                'window_p99': percentile(window, 99),
+                'rss_p50': percentile(rss, 50),
+                'rss_max': max(rss) if rss else None,
+            })
+        result.sort(key=lambda item: item['window_p90'] or 0, reverse=True)
+        return result
+
+    def export_csv(self, csv_path):
+        """把全部启动记录导出为 CSV 文件"""
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(reversed(self.rows()))
+
+
+def set_current_launch(launch_id, launched_at):
+    """子进程中设置当前线程对应的启动编号(共享宿主中每个工具线程调用一次)"""
+    _child.launch = (launch_id, launched_at)
+    _child.reported = False
+
+
+def _current_launch():
+    launch = getattr(_child, 'launch', None)
+    if launch is None:
+        try:
+            launch = (int(os.environ['SNOW_LAUNCH_ID']), float(os.environ['SNOW_LAUNCH_AT']))
+        except (KeyError, ValueError):
+            return None
+        _child.launch = launch
+    return launch
+
+
+def report_peak_rss():
+    """子进程中把本进程的峰值内存写入当前启动记录"""
+    launch = _current_launch()
+    peak = get_peak_rss_mb()
+    if launch and peak is not None:
+        LaunchTelemetry().record_peak_rss(launch[0], peak)
+
+
+def install_child_hooks(report_rss_at_exit=True):
+    """
+    在工具进程中安装上报钩子:Tk 主循环开始、窗口显示后上报首窗耗时,
+    进程退出时上报峰值内存
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+
+    import atexit
+    import tkinter
+
+    original_mainloop = tkinter.Misc.mainloop
+
+    def report_first_window():
+        launch = _current_launch()
+        if not launch or getattr(_child, 'reported', False):
+            return
+        _child.reported = True
+        launch_id, launched_at = launch
+        LaunchTelemetry().record_first_window(launch_id, (time.time() - launched_at) * 1000)
+
+    def patched_mainloop(self, n=0):
+        # 进入主循环后的第一次空闲即窗口已完成绘制
+        self.after_idle(report_first_window)
+        return original_mainloop(self, n)
+
+    tkinter.Misc.mainloop = patched_mainloop
+    if report_rss_at_exit:
+        atexit.register(report_peak_rss)
@@ -0,0 +1,120 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+按需导入模块
+重型依赖(fitz、PyPDF2、pdf2docx、reportlab、requests、huggingface_hub 等)
+在第一次真正被使用时才导入,让工具窗口先显示出来
+"""
+
+import time
+import importlib
+import threading
+
+
+# 已完成的按需导入记录:[(模块名, 耗时秒数), ...]
+IMPORT_TIMES = []
+_import_lock = threading.RLock()
+
+
+def _import_module(module_name):
+    """导入模块并记录首次导入耗时"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with _import_lock:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        started_at = time.perf_counter()
+        module = importlib.import_module(module_name)
+        IMPORT_TIMES.append((module_name, time.perf_counter() - started_at))
+        return module
+
+
+class LazyModule:
+    """模块代理 - 第一次访问属性时才真正导入模块"""
+
+    def __init__(self, module_name):
+        self.__dict__['_module_name'] = module_name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = _import_module(self.__dict__['_module_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        state = "已导入" if self.__dict__['_module'] is not None else "未导入"
+        return f"<LazyModule {self.__dict__['_module_name']} ({state})>"
+
+
+class LazyAttribute:
+    """模块属性代理 - 用于替代 "from 模块 import 类/函数",调用或访问属性时才导入"""
+
+    def __init__(self, module_name, attr_name):
+        self._module_name = module_name
+        self._attr_name = attr_name
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            module = _import_module(self._module_name)
+            self._target = getattr(module, self._attr_name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        return f"<LazyAttribute {self._module_name}.{self._attr_name}>"
+
+
+def lazy_import(module_name):
+    """
+    按需导入模块
+
+    Args:
+        module_name: 模块名,如 'fitz'、'PIL.Image'
+
+    Returns:
+        LazyModule: 模块代理,用法与普通模块相同
+    """
+    return LazyModule(module_name)
+
+
+def lazy_from(module_name, attr_name):
+    """
+    按需导入模块中的类或函数,相当于延迟执行的 "from module_name import attr_name"
+
+    Returns:
+        LazyAttribute: 可直接调用的代理对象
+    """
+    return LazyAttribute(module_name, attr_name)
+
+
+def is_loaded(module_name):
+    """模块是否已经被导入"""
+    return module_name in sys.modules
+
+
+def get_import_report():
+    """返回按需导入耗时报告的文本"""
+    if not IMPORT_TIMES:
+        return "没有发生按需导入"
+    lines = [f"{name:<32}{seconds * 1000:>10.1f} ms" for name, seconds in IMPORT_TIMES]
+    return "\n".join(lines)
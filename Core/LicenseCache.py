@@ -0,0 +1,263 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+授权验证结果缓存模块
+LICENSE.exe 验证通过后写入一个带有效期、经 HMAC 签名的令牌(以授权文件的哈希为键),
+有效期内再次启动时直接使用令牌,不再阻塞等待 LICENSE.exe,并在后台线程中重新验证
+
+签名密钥由本机密钥和授权文件哈希派生:Windows 上本机密钥用 DPAPI 按当前用户加密保存,
+其他系统使用机器标识,令牌复制到其他电脑或其他用户下均无效。签名只用于发现令牌被手工修改
+或复制,不能防止本机同一用户有意伪造;读取时有效期最多按验证时间加 CACHE_TTL 计算,
+令牌中的时间被改动也不会延长缓存
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import hashlib
+import secrets
+import threading
+import subprocess
+from pathlib import Path
+
+
+# 令牌有效期:7 天
+CACHE_TTL = 7 * 24 * 3600
+# 令牌超过 1 天后,命中缓存的同时在后台重新验证
+REVALIDATE_AFTER = 24 * 3600
+
+
+class LicenseCache:
+    """授权验证缓存类"""
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_cache_dir():
+        """获取缓存目录(Windows 为 %LOCALAPPDATA%/snow_toolbox,其他系统为 ~/.cache/snow_toolbox)"""
+        base = os.environ.get('LOCALAPPDATA') or str(Path.home() / '.cache')
+        return Path(base) / 'snow_toolbox'
+
+    @staticmethod
+    def _cache_file():
+        return LicenseCache.get_cache_dir() / 'license_cache.json'
+
+    @staticmethod
+    def _dpapi(data, protect):
+        """用 Windows DPAPI(当前用户)加密或解密数据,失败时返回 None"""
+        import ctypes
+
+        class DataBlob(ctypes.Structure):
+            _fields_ = [('cbData', ctypes.c_ulong), ('pbData', ctypes.POINTER(ctypes.c_char))]
+
+        buffer = ctypes.create_string_buffer(data, len(data))
+        blob_in = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+        blob_out = DataBlob()
+        crypt32 = ctypes.windll.crypt32
+        function = crypt32.CryptProtectData if protect else crypt32.CryptUnprotectData
+        # CRYPTPROTECT_UI_FORBIDDEN
+        if not function(ctypes.byref(blob_in), None, None, None, None, 0x01, ctypes.byref(blob_out)):
+            return None
+        try:
+            return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+        finally:
+            ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+    @staticmethod
+    def _machine_secret():
+        """
+        本机密钥
+
+        Windows 上为随机生成、用 DPAPI 加密后保存的密钥(文件被复制到其他电脑或用户下无法解密);
+        其他系统使用机器标识
+        """
+        if sys.platform == 'win32':
+            secret_path = LicenseCache.get_cache_dir() / 'license_secret.bin'
+            try:
+                secret = LicenseCache._dpapi(secret_path.read_bytes(), protect=False)
+                if secret and len(secret) >= 32:
+                    return secret
+            except OSError:
+                pass
+            secret = secrets.token_bytes(32)
+            protected = LicenseCache._dpapi(secret, protect=True)
+            if protected:
+                try:
+                    secret_path.parent.mkdir(parents=True, exist_ok=True)
+                    secret_path.write_bytes(protected)
+                    return secret
+                except OSError:
+                    pass
+        for path in ('/etc/machine-id', '/var/lib/dbus/machine-id'):
+            try:
+                machine_id = Path(path).read_text(encoding='utf-8').strip()
+                if machine_id:
+                    return machine_id.encode('utf-8')
+            except OSError:
+                pass
+        import uuid
+        return str(uuid.getnode()).encode('utf-8')
+
+    @staticmethod
+    def _get_secret(key):
+        """签名密钥:由本机密钥和授权文件哈希派生"""
+        return hmac.new(LicenseCache._machine_secret(), key.encode('utf-8'), hashlib.sha256).digest()
+
+    @staticmethod
+    def license_key(license_exe_path):
+        """计算授权文件的哈希(LICENSE.exe 与同目录下的 LICENSE.txt)"""
+        license_exe_path = Path(license_exe_path)
+        digest = hashlib.sha256()
+        for path in (license_exe_path, license_exe_path.with_name('LICENSE.txt')):
+            try:
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+            except OSError:
+                digest.update(b'<missing>')
+        return digest.hexdigest()
+
+    @staticmethod
+    def _sign(payload, secret):
+        message = json.dumps(payload, sort_keys=True).encode('utf-8')
+        return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def load_token(key):
+        """
+        读取并校验缓存令牌
+
+        Returns:
+            dict: 有效的令牌内容,无效或过期时返回 None
+        """
+        try:
+            with open(LicenseCache._cache_file(), 'r', encoding='utf-8') as f:
+                token = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(token, dict):
+            return None
+        signature = token.pop('signature', '')
+        if token.get('key') != key:
+            return None
+        expected = LicenseCache._sign(token, LicenseCache._get_secret(key))
+        if not hmac.compare_digest(str(signature), expected):
+            return None
+        try:
+            verified_at = float(token.get('verified_at', 0))
+            expires_at = min(float(token.get('expires_at', 0)), verified_at + CACHE_TTL)
+        except (TypeError, ValueError):
+            return None
+        now = time.time()
+        # 验证时间在未来(改过系统时间或令牌)或已过期时作废
+        if verified_at > now + 300 or expires_at < now:
+            return None
+        return token
+
+    @staticmethod
+    def save_token(key):
+        """写入一个新的验证通过令牌"""
+        now = time.time()
+        token = {'key': key, 'verified_at': now, 'expires_at': now + CACHE_TTL}
+        token['signature'] = LicenseCache._sign(token, LicenseCache._get_secret(key))
+        cache_file = LicenseCache._cache_file()
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"license_cache.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(token, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def clear():
+        """删除缓存令牌"""
+        try:
+            LicenseCache._cache_file().unlink()
+        except OSError:
+            pass
+
+    @staticmethod
+    def run_license_exe(license_exe_path, timeout=10):
+        """
+        运行 LICENSE.exe 进行授权验证
+
+        Returns:
+            (bool, str) - (是否通过, 消息)
+        """
+        try:
+            result = subprocess.run(
+                [str(license_exe_path), '--quiet'],
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return False, "授权验证超时"
+        except Exception as e:
+            return False, f"授权验证出错：{str(e)}"
+
+        # 退出码为 0 表示验证通过
+        if result.returncode == 0:
+            return True, "授权验证通过"
+        error_msg = result.stderr.strip() if result.stderr else "授权验证失败"
+        return False, error_msg
+
+    @staticmethod
+    def verify(license_exe_path, timeout=10, on_revalidated=None):
+        """
+        验证授权,优先使用缓存令牌
+
+        Args:
+            license_exe_path: LICENSE.exe 路径
+            timeout: 运行 LICENSE.exe 的超时秒数
+            on_revalidated: 后台重新验证完成后的回调,参数为 (bool, str)
+
+        Returns:
+            (bool, str) - (是否通过, 消息)
+        """
+        license_exe_path = Path(license_exe_path)
+        if not license_exe_path.exists():
+            return False, "未找到授权验证程序：Core/LICENSE.exe"
+
+        key = LicenseCache.license_key(license_exe_path)
+        with LicenseCache._lock:
+            token = LicenseCache.load_token(key)
+        if token is not None:
+            if time.time() - token.get('verified_at', 0) > REVALIDATE_AFTER:
+                LicenseCache.revalidate_in_background(license_exe_path, key, timeout, on_revalidated)
+            return True, "授权验证通过（缓存）"
+
+        is_valid, message = LicenseCache.run_license_exe(license_exe_path, timeout)
+        with LicenseCache._lock:
+            if is_valid:
+                LicenseCache.save_token(key)
+            else:
+                LicenseCache.clear()
+        return is_valid, message
+
+    @staticmethod
+    def revalidate_in_background(license_exe_path, key=None, timeout=10, on_revalidated=None):
+        """在后台线程中重新运行 LICENSE.exe 并刷新或作废缓存令牌"""
+        def worker():
+            cache_key = key or LicenseCache.license_key(license_exe_path)
+            is_valid, message = LicenseCache.run_license_exe(license_exe_path, timeout)
+            with LicenseCache._lock:
+                if is_valid:
+                    LicenseCache.save_token(cache_key)
+                else:
+                    LicenseCache.clear()
+            if on_revalidated:
+                try:
+                    on_revalidated(is_valid, message)
+                except Exception as e:
+                    print(f"授权重新验证回调出错: {e}")
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
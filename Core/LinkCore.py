@@ -0,0 +1,80 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+链接处理核心函数
+B站带货链接分批处理工具与命令行(snow bili links)共用的链接提取与分批逻辑,这里不依赖 tkinter
+"""
+
+
+# 默认每批链接数量
+DEFAULT_BATCH_SIZE = 30
+
+
+def extract_url_from_line(line):
+    """从一行文本中提取URL链接,没有链接时返回空字符串"""
+    line = line.strip()
+    # 查找"http"或"https"开头的部分
+    url_start = line.find("http")
+    if url_start == -1:
+        return ""
+
+    # 提取从http开始到行尾或非URL字符前的部分
+    url = line[url_start:]
+    # 查找URL结束位置(遇到空格、引号、括号等符号时结束)
+    for end_char in [' ', '"', "'", ')', ']', '}', '>', '\t', '\n']:
+        end_pos = url.find(end_char)
+        if end_pos != -1:
+            url = url[:end_pos]
+
+    # 移除URL末尾可能存在的标点符号
+    while url and url[-1] in ['.', ',', ';', ':', '!', '?']:
+        url = url[:-1]
+
+    return url.strip()
+
+
+def parse_links(text, extract_only=False):
+    """
+    把输入文本按行整理为链接列表,忽略空行
+
+    Args:
+        extract_only: 只保留每行中的 URL(没有 URL 的行被丢弃)
+    """
+    links = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if extract_only:
+            url = extract_url_from_line(line)
+            if url:
+                links.append(url)
+        else:
+            links.append(line)
+    return links
+
+
+def split_links(links, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    将链接列表按指定大小分批
+    :param links: 链接列表
+    :param batch_size: 每批链接数量，默认为30
+    :return: 分批后的链接列表
+    """
+    if batch_size < 1:
+        raise ValueError("每批数量必须大于 0")
+    return [links[i:i + batch_size] for i in range(0, len(links), batch_size)]
+
+
+def format_batches(batches, batch_size):
+    """生成分批结果文本(与分批处理工具输出框中的内容一致)"""
+    total = sum(len(batch) for batch in batches)
+    output_text = f"共 {total} 条链接，分成 {len(batches)} 批，每批最多 {batch_size} 条：\n"
+    for i, batch in enumerate(batches, 1):
+        if i > 1:  # 第一组前不加空行
+            output_text += "\n"
+        output_text += f"第 {i} 批链接({len(batch)}条):\n"
+        output_text += "\n".join(batch)
+    return output_text
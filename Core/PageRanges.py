@@ -0,0 +1,181 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+页面选择模型
+用有序、互不相交的区间列表表示一个 PDF 中被选中的页面,几千页的文件全选时只占一个区间,
+勾选/取消单页用二分查找定位,合并时可以直接按区间复制页面
+
+页面索引从 0 开始;页码范围表达式中的页码从 1 开始,例如 "1-10,15,20-"
+"""
+
+from bisect import bisect_right
+
+
+class PageRanges:
+    """被选中页面的区间集合,区间为 [起始索引, 结束索引) 的半开区间"""
+
+    __slots__ = ('total', '_runs')
+
+    def __init__(self, total, runs=()):
+        """
+        Args:
+            total: 文件总页数
+            runs: 初始区间 [(起始, 结束), ...],结束不包含;可以无序、重叠,超出总页数的部分会被截掉
+        """
+        self.total = total
+        self._runs = []
+        for start, end in sorted(runs):
+            start, end = max(0, start), min(total, end)
+            if start >= end:
+                continue
+            if self._runs and start <= self._runs[-1][1]:
+                if end > self._runs[-1][1]:
+                    self._runs[-1] = (self._runs[-1][0], end)
+            else:
+                self._runs.append((start, end))
+
+    # ---------------- 构造 ----------------
+
+    @classmethod
+    def all(cls, total):
+        """选中全部页面"""
+        return cls(total, [(0, total)])
+
+    @classmethod
+    def from_pages(cls, total, pages):
+        """由页面索引序列构造"""
+        runs = []
+        for page in sorted(set(pages)):
+            if runs and page == runs[-1][1]:
+                runs[-1][1] = page + 1
+            else:
+                runs.append([page, page + 1])
+        return cls(total, runs)
+
+    @classmethod
+    def parse(cls, expression, total):
+        """
+        解析页码范围表达式
+
+        支持 "5"、"1-10"、"20-"(到最后一页)、"-5"(从第一页起),以逗号分隔;
+        空表达式或 "全部"/"all" 表示全部页面。超出总页数的页码会被忽略(同一个表达式用于
+        页数不同的多个文件时,较短的文件只选中存在的页面),格式错误时抛出 ValueError
+
+        >>> list(PageRanges.parse("2-3,9-", 10))
+        [1, 2, 8, 9]
+        >>> list(PageRanges.parse("20-", 10)), list(PageRanges.parse("15", 10))
+        ([], [])
+        >>> list(PageRanges.parse("1,20-", 10))
+        [0]
+        """
+        expression = expression.strip().replace('，', ',')
+        if not expression or expression.lower() in ('all', '全部'):
+            return cls.all(total)
+        runs = []
+        for part in expression.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                if '-' in part:
+                    start, end = (s.strip() for s in part.split('-', 1))
+                    start = int(start) if start else 1
+                    # "20-" 的起始页超出总页数时不选中任何页面,而不是视为格式错误
+                    end = int(end) if end else max(total, start)
+                else:
+                    start = end = int(part)
+            except ValueError:
+                raise ValueError(f"无效的页码范围: {part}")
+            if start < 1 or end < start:
+                raise ValueError(f"无效的页码范围: {part}")
+            runs.append((start - 1, end))
+        return cls(total, runs)
+
+    def copy(self):
+        selection = PageRanges(self.total)
+        selection._runs = list(self._runs)
+        return selection
+
+    # ---------------- 查询 ----------------
+
+    def _find(self, page):
+        """返回包含 page 的区间序号,不存在时返回 -1"""
+        index = bisect_right(self._runs, (page, float('inf'))) - 1
+        if index >= 0 and self._runs[index][1] > page:
+            return index
+        return -1
+
+    def __contains__(self, page):
+        return self._find(page) >= 0
+
+    def __len__(self):
+        return sum(end - start for start, end in self._runs)
+
+    def __iter__(self):
+        for start, end in self._runs:
+            yield from range(start, end)
+
+    def __bool__(self):
+        return bool(self._runs)
+
+    def __eq__(self, other):
+        return isinstance(other, PageRanges) and self.total == other.total and self._runs == other._runs
+
+    def __repr__(self):
+        return f"<PageRanges {self.to_expression()} / {self.total}>"
+
+    def is_all(self):
+        """是否选中了全部页面"""
+        return self._runs == [(0, self.total)] if self.total else True
+
+    def runs(self):
+        """连续页段列表 [(起始索引, 结束索引), ...],两端都包含"""
+        return [(start, end - 1) for start, end in self._runs]
+
+    def to_expression(self):
+        """转换为页码范围表达式(页码从 1 开始),可以被 parse 解析回来"""
+        parts = []
+        for start, end in self._runs:
+            if end - start == 1:
+                parts.append(str(start + 1))
+            elif end == self.total and start > 0:
+                parts.append(f"{start + 1}-")
+            else:
+                parts.append(f"{start + 1}-{end}")
+        return ",".join(parts)
+
+    # ---------------- 修改 ----------------
+
+    def add(self, page):
+        if not 0 <= page < self.total or page in self:
+            return
+        index = bisect_right(self._runs, (page, float('inf')))
+        joins_left = index > 0 and self._runs[index - 1][1] == page
+        joins_right = index < len(self._runs) and self._runs[index][0] == page + 1
+        if joins_left and joins_right:
+            self._runs[index - 1:index + 1] = [(self._runs[index - 1][0], self._runs[index][1])]
+        elif joins_left:
+            self._runs[index - 1] = (self._runs[index - 1][0], page + 1)
+        elif joins_right:
+            self._runs[index] = (page, self._runs[index][1])
+        else:
+            self._runs.insert(index, (page, page + 1))
+
+    def discard(self, page):
+        index = self._find(page)
+        if index < 0:
+            return
+        start, end = self._runs[index]
+        pieces = [(s, e) for s, e in ((start, page), (page + 1, end)) if s < e]
+        self._runs[index:index + 1] = pieces
+
+    def set(self, page, selected):
+        if selected:
+            self.add(page)
+        else:
+            self.discard(page)
+
+    def toggle(self, page):
+        self.set(page, page not in self)
@@ -0,0 +1,354 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+PDF 处理性能测试
+比较 PdfCore 中不同后端的耗时、吞吐量和峰值内存,每次测试在新的子进程中运行,
+峰值内存互不影响。未指定输入文件时自动生成测试用 PDF
+
+suite 在 10、1000、10000 页的测试文件上依次测试拆分、合并、加水印、渲染、提取文字的所有后端
+(单进程,只比较后端本身),给出每个操作最快的后端;用 --save 保存结果,之后用 --baseline
+与保存的结果比较,耗时超过基准一定比例时视为性能回退,返回值为 1
+
+用法:
+    python Core/PdfBenchmark.py merge
+    python Core/PdfBenchmark.py merge --files 200 --pages 20 --repeat 3
+    python Core/PdfBenchmark.py merge 输入1.pdf 输入2.pdf ...
+    python Core/PdfBenchmark.py images --count 200 --duplicates 0.25
+    python Core/PdfBenchmark.py images 图片1.jpg 图片2.jpg ...
+    python Core/PdfBenchmark.py suite --save baseline.json
+    python Core/PdfBenchmark.py suite --sizes 10,1000 --operation split --baseline baseline.json
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import PdfCore
+from LaunchTelemetry import get_peak_rss_mb
+
+
+def make_sample_pdfs(output_dir, files, pages):
+    """生成 files 个每个 pages 页的测试 PDF(带文字和矢量图形),返回路径列表"""
+    paths = []
+    for file_index in range(files):
+        document = PdfCore.fitz.open()
+        for page_index in range(pages):
+            page = document.new_page()
+            for line in range(30):
+                page.insert_text((50, 40 + line * 24), f"file {file_index} page {page_index} line {line} " * 3)
+            page.draw_rect(PdfCore.fitz.Rect(100, 500, 400, 700), color=(0, 0, 1), fill=(0.8, 0.9, 1))
+        path = os.path.join(output_dir, f"sample_{file_index:04d}.pdf")
+        document.save(path)
+        document.close()
+        paths.append(path)
+    return paths
+
+
+def make_sample_images(output_dir, count, duplicates=0.25, size=(2000, 1500)):
+    """生成 count 张测试 JPEG(噪点图,接近照片的压缩率),其中约 duplicates 比例与前面的图片内容相同"""
+    paths = []
+    unique = max(1, round(count * (1 - duplicates)))
+    for index in range(count):
+        path = os.path.join(output_dir, f"photo_{index:04d}.jpg")
+        if index < unique:
+            bands = [PdfCore.Image.effect_noise(size, 40 + 10 * band + index % 7) for band in range(3)]
+            PdfCore.Image.merge('RGB', bands).save(path, quality=90)
+        else:
+            shutil.copyfile(paths[index % unique], path)
+        paths.append(path)
+    return paths
+
+
+def make_fixture_pdf(path, pages):
+    """生成 pages 页的测试 PDF:10 页不同的文字和矢量图形页面循环重复"""
+    with PdfCore.fitz.open() as base:
+        for page_index in range(min(pages, 10)):
+            page = base.new_page()
+            for line in range(30):
+                page.insert_text((50, 40 + line * 24), f"fixture page {page_index} line {line} " * 3)
+            page.draw_rect(PdfCore.fitz.Rect(100, 500, 400, 700), color=(0, 0, 1), fill=(0.8, 0.9, 1))
+        with PdfCore.fitz.open() as document:
+            while document.page_count < pages:
+                document.insert_pdf(base, to_page=min(base.page_count, pages - document.page_count) - 1)
+            document.save(path, garbage=1)
+    return path
+
+
+def _images_with_insert_image(image_paths, output_file):
+    """改为流式写入之前的图片转 PDF 做法:全部图片用 insert_image 插入内存中的文档后一次保存"""
+    document = PdfCore.fitz.open()
+    try:
+        for img_path in image_paths:
+            with PdfCore.Image.open(img_path) as img:
+                width, height = img.width, img.height
+            page = document.new_page(width=width, height=height)
+            page.insert_image(PdfCore.fitz.Rect(0, 0, width, height), filename=img_path)
+        document.save(output_file)
+    finally:
+        document.close()
+    return len(image_paths)
+
+
+def _run_merge(backend, inputs, output_file):
+    return PdfCore.merge_pdfs([(path, None) for path in inputs], output_file, backend=backend)
+
+
+def _run_images(method, inputs, output_file):
+    if method == 'insert_image':
+        return _images_with_insert_image(inputs, output_file)
+    return PdfCore.images_to_pdf(inputs, output_file, workers=1)[0]
+
+
+# suite 中各操作的测试函数:(后端, 测试文件, 输出路径) -> 处理的页数;拆分和渲染的输出为目录
+
+def _suite_split(backend, pdf_path, output):
+    return PdfCore.split_pdf_by_count(pdf_path, output, 10, workers=1, backend=backend)[0]
+
+
+def _suite_merge(backend, pdf_path, output):
+    return PdfCore.merge_pdfs([(pdf_path, None), (pdf_path, None)], output, backend=backend)
+
+
+def _suite_watermark(backend, pdf_path, output):
+    return PdfCore.add_text_watermark(pdf_path, output, "BENCHMARK", backend=backend)
+
+
+def _suite_render(backend, pdf_path, output):
+    return len(PdfCore.pdf_to_images(pdf_path, output, 'png', dpi=50, workers=1)[1])
+
+
+def _suite_extract(backend, pdf_path, output):
+    texts = PdfCore.extract_text(pdf_path, backend=backend, workers=1)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write("\f".join(texts))
+    return len(texts)
+
+
+SUITE_OPERATIONS = {
+    'split': (_suite_split, ""),
+    'merge': (_suite_merge, ".pdf"),
+    'watermark': (_suite_watermark, ".pdf"),
+    'render': (_suite_render, ""),
+    'extract': (_suite_extract, ".txt"),
+}
+SUITE_SIZES = (10, 1000, 10000)
+
+
+def _output_size(path):
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    return os.path.getsize(path)
+
+
+def _run_once(args):
+    """子进程中执行一次测试,返回 (耗时秒数, 页数, 输出字节数, 峰值内存MB)"""
+    runner, variant, inputs, output_file = args
+    started = time.perf_counter()
+    page_count = runner(variant, inputs, output_file)
+    elapsed = time.perf_counter() - started
+    return elapsed, page_count, _output_size(output_file), get_peak_rss_mb()
+
+
+def _bench(runner, variants, inputs, repeat, work_dir, suffix=".pdf"):
+    """每个变体在新的子进程中运行 repeat 次,返回结果列表(格式见 bench_merge)"""
+    work_dir = work_dir or tempfile.mkdtemp(prefix="snow_bench_")
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for variant in variants:
+        timings = []
+        for run in range(repeat):
+            output_file = os.path.join(work_dir, f"output_{variant}_{run}{suffix}")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                elapsed, page_count, size, peak = pool.submit(
+                    _run_once, (runner, variant, inputs, output_file)).result()
+            if os.path.isdir(output_file):
+                shutil.rmtree(output_file)
+            else:
+                os.remove(output_file)
+            timings.append((elapsed, peak))
+        best = min(t for t, _ in timings)
+        results.append({
+            'backend': variant,
+            'pages': page_count,
+            'best_s': best,
+            'median_s': statistics.median(t for t, _ in timings),
+            'pages_per_s': page_count / best if best else 0,
+            'peak_rss_mb': max((p for _, p in timings if p is not None), default=None),
+            'output_mb': size / (1024 * 1024),
+        })
+    return results
+
+
+def bench_merge(inputs, backends=PdfCore.MERGE_BACKENDS, repeat=3, work_dir=None):
+    """
+    比较各合并后端
+
+    Returns:
+        list: [{'backend', 'pages', 'best_s', 'median_s', 'pages_per_s', 'peak_rss_mb', 'output_mb'}, ...]
+    """
+    return _bench(_run_merge, backends, inputs, repeat, work_dir)
+
+
+def bench_images(inputs, repeat=3, work_dir=None):
+    """比较图片转 PDF 的流式写入(JPEG 直接嵌入、重复图片只嵌入一次)与原来的 insert_image 做法"""
+    return _bench(_run_images, ('insert_image', 'stream'), inputs, repeat, work_dir)
+
+
+def bench_suite(sizes=SUITE_SIZES, operations=tuple(SUITE_OPERATIONS), repeat=1, work_dir=None):
+    """
+    在各页数的测试文件上测试各操作的所有后端
+
+    Returns:
+        dict: {(操作, 页数): 结果列表(格式见 bench_merge)}
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix="snow_bench_")
+    suite = {}
+    for size in sizes:
+        fixture = make_fixture_pdf(os.path.join(work_dir, f"fixture_{size}.pdf"), size)
+        for operation in operations:
+            runner, suffix = SUITE_OPERATIONS[operation]
+            suite[operation, size] = _bench(runner, PdfCore.PDF_BACKENDS[operation], fixture, repeat,
+                                            work_dir, suffix)
+    return suite
+
+
+def fastest_backends(suite):
+    """每个操作在最大的测试文件上最快的后端 {操作: 后端}"""
+    fastest = {}
+    for (operation, size), results in sorted(suite.items(), key=lambda item: item[0][1]):
+        fastest[operation] = min(results, key=lambda r: r['best_s'])['backend']
+    return fastest
+
+
+def suite_timings(suite):
+    """把 suite 结果转换为可保存为 JSON 的 {"操作/页数/后端": 最快耗时秒数}"""
+    return {f"{operation}/{size}/{r['backend']}": r['best_s']
+            for (operation, size), results in suite.items() for r in results}
+
+
+def find_regressions(timings, baseline, tolerance=0.2):
+    """
+    与基准结果比较,返回耗时超过基准 (1 + tolerance) 倍的测试 [(测试名, 基准秒数, 本次秒数), ...]
+
+    很短的测试(基准不到 0.05 秒)波动太大,不参与比较
+    """
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in sorted(timings.items())
+        if name in baseline and baseline[name] >= 0.05 and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def print_savings(baseline, result):
+    """输出 result 相对 baseline 节省的时间、文件大小和内存"""
+    time_saved = baseline['best_s'] - result['best_s']
+    bytes_saved = baseline['output_mb'] - result['output_mb']
+    print(f"{result['backend']} 相对 {baseline['backend']}: "
+          f"节省时间 {time_saved:.2f} 秒（{time_saved / baseline['best_s']:.0%}），"
+          f"节省空间 {bytes_saved:.1f} MB（{bytes_saved / baseline['output_mb']:.0%}）", end="")
+    if baseline['peak_rss_mb'] and result['peak_rss_mb']:
+        print(f"，峰值内存 {baseline['peak_rss_mb']:.0f} MB -> {result['peak_rss_mb']:.0f} MB")
+    else:
+        print()
+
+
+def print_results(title, results):
+    print(f"\n{title}")
+    print(f"{'后端':<10}{'页数':>8}{'最快(s)':>10}{'中位(s)':>10}{'页/秒':>10}{'峰值内存(MB)':>14}{'输出(MB)':>10}")
+    for r in results:
+        peak = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else "-"
+        print(f"{r['backend']:<10}{r['pages']:>8}{r['best_s']:>10.2f}{r['median_s']:>10.2f}"
+              f"{r['pages_per_s']:>10.0f}{peak:>14}{r['output_mb']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF 处理性能测试")
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+
+    p = sub.add_parser('merge', help="比较合并后端")
+    p.add_argument('inputs', nargs='*', help="要合并的 PDF(默认自动生成)")
+    p.add_argument('--files', type=int, default=100, help="自动生成的文件数")
+    p.add_argument('--pages', type=int, default=10, help="自动生成的每个文件页数")
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--backend', action='append', choices=PdfCore.MERGE_BACKENDS, help="只测试指定后端(可重复)")
+
+    p = sub.add_parser('images', help="比较图片转 PDF 的流式写入与 insert_image")
+    p.add_argument('inputs', nargs='*', help="图片文件(默认自动生成 JPEG)")
+    p.add_argument('--count', type=int, default=200, help="自动生成的图片数")
+    p.add_argument('--duplicates', type=float, default=0.25, help="自动生成的图片中重复图片的比例")
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('suite', help="在 10/1000/10000 页的测试文件上比较所有操作的后端")
+    p.add_argument('--sizes', default=",".join(map(str, SUITE_SIZES)), help="测试文件页数,逗号分隔")
+    p.add_argument('--operation', action='append', choices=list(SUITE_OPERATIONS), help="只测试指定操作(可重复)")
+    p.add_argument('--repeat', type=int, default=1)
+    p.add_argument('--save', help="把结果保存为 JSON,作为之后比较的基准")
+    p.add_argument('--baseline', help="与之前保存的 JSON 结果比较,发现性能回退时返回 1")
+    p.add_argument('--tolerance', type=float, default=0.2, help="允许比基准慢的比例(默认 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        return run_suite(args)
+
+    work_dir = tempfile.mkdtemp(prefix="snow_bench_")
+    try:
+        if args.command == 'merge':
+            inputs = args.inputs or make_sample_pdfs(work_dir, args.files, args.pages)
+            results = bench_merge(inputs, args.backend or PdfCore.MERGE_BACKENDS, args.repeat, work_dir)
+            print_results(f"合并 {len(inputs)} 个文件", results)
+        else:
+            inputs = args.inputs or make_sample_images(work_dir, args.count, args.duplicates)
+            results = bench_images(inputs, args.repeat, work_dir)
+            print_results(f"{len(inputs)} 张图片转 PDF", results)
+            print_savings(results[0], results[1])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+def run_suite(args):
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    operations = args.operation or list(SUITE_OPERATIONS)
+    work_dir = tempfile.mkdtemp(prefix="snow_bench_")
+    try:
+        suite = bench_suite(sizes, operations, args.repeat, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    for (operation, size), results in suite.items():
+        print_results(f"{operation} {size} 页", results)
+
+    print("\n各操作最快的后端:")
+    for operation, backend in fastest_backends(suite).items():
+        default = PdfCore.PDF_BACKENDS[operation][0]
+        note = "" if backend == default else f"（当前默认为 {default}）"
+        print(f"  {operation:<10}{backend}{note}")
+
+    timings = suite_timings(suite)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=2, ensure_ascii=False)
+        print(f"\n结果已保存到 {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(timings, baseline, args.tolerance)
+        if regressions:
+            print(f"\n性能回退(比基准慢 {args.tolerance:.0%} 以上):")
+            for name, before, after in regressions:
+                print(f"  {name}: {before:.2f}s -> {after:.2f}s")
+            return 1
+        print("\n与基准相比没有性能回退")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
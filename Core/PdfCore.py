@@ -0,0 +1,1458 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+PDF 处理核心函数
+PDF 工具窗口与命令行(snow pdf ...)共用的拆分、合并、加水印、转图片、图片转 PDF、转 Word、压缩逻辑,
+这里不依赖 tkinter,出错时抛出 ValueError(参数/文件无效)或原始异常,由调用方决定如何提示
+
+进度回调统一为 progress(已完成数量, 总数量)
+"""
+
+import io
+import os
+import re
+import math
+import time
+import tempfile
+import zlib
+import hashlib
+import functools
+
+from LazyImport import lazy_import, lazy_from
+from JobScheduler import get_scheduler, JobCancelled
+from PageRanges import PageRanges
+from PdfStreamWriter import PdfStreamWriter, extract_page
+
+# 重型依赖按需导入，首次使用时才加载
+PdfReader = lazy_from('PyPDF2', 'PdfReader')
+PdfWriter = lazy_from('PyPDF2', 'PdfWriter')
+fitz = lazy_import('fitz')
+Image = lazy_import('PIL.Image')
+Converter = lazy_from('pdf2docx', 'Converter')
+
+
+# 加水印可选的位置
+WATERMARK_POSITIONS = ('center', 'topleft', 'topright', 'bottomleft', 'bottomright', 'tile')
+# PDF 转图片支持的输出格式
+IMAGE_FORMATS = ('png', 'jpg')
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def parse_page_ranges(range_str, total_pages):
+    """
+    解析页码范围字符串(如 "1-3,5,7-9,12-"),返回去重排序后的页面索引列表(从 0 开始)
+
+    超出总页数的页码会被忽略,格式错误时抛出 ValueError;语法见 PageRanges.parse
+    """
+    if not range_str.strip():
+        return []
+    return list(PageRanges.parse(range_str, total_pages))
+
+
+def group_consecutive(page_indices):
+    """把排好序的页面索引按连续段分组:[0,1,2,5,6] -> [[0,1,2],[5,6]]"""
+    groups = []
+    for page in page_indices:
+        if groups and page == groups[-1][-1] + 1:
+            groups[-1].append(page)
+        else:
+            groups.append([page])
+    return groups
+
+
+def open_pdf_reader(pdf_path):
+    """打开 PDF 并检查页面数,文件无效时抛出 ValueError"""
+    if not os.path.exists(pdf_path):
+        raise ValueError("PDF文件不存在")
+    try:
+        reader = PdfReader(pdf_path)
+        total_pages = len(reader.pages)
+    except Exception as e:
+        raise ValueError(f"无效的PDF文件: {str(e)}")
+    if total_pages == 0:
+        raise ValueError("PDF文件没有有效页面")
+    return reader
+
+
+def open_pdf_document(pdf_path):
+    """用 PyMuPDF 打开 PDF 并检查页面数,文件无效时抛出 ValueError"""
+    if not os.path.exists(pdf_path):
+        raise ValueError("PDF文件不存在")
+    try:
+        document = fitz.open(pdf_path)
+    except Exception as e:
+        raise ValueError(f"无效的PDF文件: {str(e)}")
+    if not document.is_pdf or document.page_count == 0:
+        document.close()
+        raise ValueError("PDF文件没有有效页面")
+    return document
+
+
+# ---------------- 拆分 ----------------
+# 拆分先在当前进程中确定每个输出文件包含的页段 [(起始索引, 结束索引, 输出路径), ...],
+# 再由若干进程分批写出:每批只打开一次源文件,按页段复制页面
+
+# 按页数/范围/书签拆分可选的后端
+SPLIT_BACKENDS = ('pymupdf', 'pypdf2')
+
+
+def _write_chunks(pdf_path, chunks, on_chunk=None, backend='pymupdf'):
+    """在当前进程中打开一次源文件,依次写出各页段,返回输出文件列表"""
+    outputs = []
+    if backend == 'pypdf2':
+        reader = open_pdf_reader(pdf_path)
+        for start, end, output_file in chunks:
+            writer = PdfWriter()
+            for page_num in range(start, end + 1):
+                writer.add_page(reader.pages[page_num])
+            with open(output_file, 'wb') as f:
+                writer.write(f)
+            outputs.append(output_file)
+            if on_chunk is not None:
+                on_chunk(len(outputs))
+        return outputs
+
+    with fitz.open(pdf_path) as source:
+        for start, end, output_file in chunks:
+            with fitz.open() as output:
+                output.insert_pdf(source, from_page=start, to_page=end)
+                output.save(output_file, garbage=1)
+            outputs.append(output_file)
+            if on_chunk is not None:
+                on_chunk(len(outputs))
+    return outputs
+
+
+def _write_chunks_task(task):
+    """进程池中执行的一批页段"""
+    return _write_chunks(*task)
+
+
+def _write_split(pdf_path, chunks, progress, workers, backend='pymupdf'):
+    """写出拆分结果:页段较多时分批交给 CPU 进程池并行写出,每批完成即报告进度"""
+    if backend not in SPLIT_BACKENDS:
+        raise ValueError(f"未知的拆分后端: {backend}")
+    total = len(chunks)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or total < 2:
+        return _write_chunks(pdf_path, chunks, on_chunk=lambda done: _report(progress, done, total),
+                             backend=backend)
+
+    # 批数约为进程数的 4 倍:既能均衡负载,又不会让每个子进程反复打开大文件
+    size = -(-total // (workers * 4))
+    batches = [chunks[i:i + size] for i in range(0, total, size)]
+    written = [0]
+
+    def on_item(index, outputs):
+        written[0] += len(outputs)
+        _report(progress, written[0], total)
+
+    results = get_scheduler().run_cpu(_write_chunks_task, [(pdf_path, batch, None, backend) for batch in batches],
+                                      on_item=on_item, max_workers=workers)
+    return [path for outputs in results for path in outputs]
+
+
+def _split_target(pdf_path, output_dir):
+    """检查源文件并准备输出目录,返回 (总页数, 书签列表, 文件名前缀)"""
+    with open_pdf_document(pdf_path) as document:
+        total_pages = document.page_count
+        toc = document.get_toc(simple=True)
+    os.makedirs(output_dir, exist_ok=True)
+    return total_pages, toc, os.path.splitext(os.path.basename(pdf_path))[0]
+
+
+def split_pdf_by_count(pdf_path, output_dir, pages_per_file, progress=None, workers=None, backend='pymupdf'):
+    """
+    按页数拆分 PDF
+
+    Args:
+        workers: 最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中写出
+        backend: SPLIT_BACKENDS 之一,按页数/范围/书签拆分都支持
+
+    Returns:
+        tuple: (总页数, 输出文件列表)
+    """
+    if pages_per_file <= 0:
+        raise ValueError("页数必须大于0")
+    total_pages, _, base_name = _split_target(pdf_path, output_dir)
+    chunks = []
+    for start in range(0, total_pages, pages_per_file):
+        end = min(start + pages_per_file, total_pages)
+        chunks.append((start, end - 1, os.path.join(output_dir, f"{base_name}_p{start + 1}-{end}.pdf")))
+    return total_pages, _write_split(pdf_path, chunks, progress, workers, backend)
+
+
+def split_pdf_by_ranges(pdf_path, output_dir, range_str, progress=None, workers=None, backend='pymupdf'):
+    """
+    按页码范围拆分 PDF,连续的页面写入同一个文件
+
+    Returns:
+        tuple: (提取的页数, 输出文件列表)
+    """
+    total_pages, _, base_name = _split_target(pdf_path, output_dir)
+    selection = PageRanges.parse(range_str, total_pages) if range_str.strip() else None
+    if not selection:
+        raise ValueError("页码范围无效: 没有有效的页面被选择")
+    chunks = [
+        (start, end, os.path.join(output_dir, f"{base_name}_range_{start + 1}-{end + 1}.pdf"))
+        for start, end in selection.runs()
+    ]
+    return len(selection), _write_split(pdf_path, chunks, progress, workers, backend)
+
+
+def _safe_filename(title, limit=50):
+    """把书签标题转换为可用作文件名的文本"""
+    name = "".join("_" if c in '\\/:*?"<>|' or ord(c) < 32 else c for c in title).strip(" .")
+    return name[:limit] or "untitled"
+
+
+def get_outline_sections(toc, total_pages, level=1):
+    """
+    根据书签把页面分成若干段
+
+    Args:
+        toc: PyMuPDF get_toc(simple=True) 的结果 [[级别, 标题, 页码(从 1 开始)], ...]
+        level: 使用的最深书签级别,1 表示只按顶层书签拆分
+
+    Returns:
+        list: [(标题, 起始索引, 结束索引), ...];第一个书签之前的页面单独成为一段,
+              指向同一页的多个书签只保留第一个
+    """
+    starts = []
+    for entry_level, title, page in toc:
+        if entry_level > level or not 1 <= page <= total_pages:
+            continue
+        if starts and page - 1 <= starts[-1][1]:
+            continue
+        starts.append((title, page - 1))
+    if not starts:
+        return []
+    if starts[0][1] > 0:
+        starts.insert(0, ("开头", 0))
+    return [
+        (title, start, (starts[i + 1][1] if i + 1 < len(starts) else total_pages) - 1)
+        for i, (title, start) in enumerate(starts)
+    ]
+
+
+def split_pdf_by_bookmarks(pdf_path, output_dir, level=1, progress=None, workers=None, backend='pymupdf'):
+    """
+    按书签拆分 PDF,每个书签(到下一个书签之前)写入一个文件,文件名带序号和书签标题
+
+    Returns:
+        tuple: (总页数, 输出文件列表)
+    """
+    total_pages, toc, base_name = _split_target(pdf_path, output_dir)
+    sections = get_outline_sections(toc, total_pages, level)
+    if not sections:
+        raise ValueError("PDF没有可用的书签，无法按书签拆分")
+    width = len(str(len(sections)))
+    chunks = [
+        (start, end, os.path.join(output_dir, f"{base_name}_{index:0{width}d}_{_safe_filename(title)}.pdf"))
+        for index, (title, start, end) in enumerate(sections, 1)
+    ]
+    return total_pages, _write_split(pdf_path, chunks, progress, workers, backend)
+
+
+def _write_candidate(source, start, end, path):
+    """把页段写入 path 并返回文件字节数(PyMuPDF 直接写文件比 tobytes 快得多)"""
+    with fitz.open() as output:
+        output.insert_pdf(source, from_page=start, to_page=end)
+        output.save(path, garbage=1)
+    return os.path.getsize(path)
+
+
+_REFERENCE = re.compile(r"(\d+) 0 R")
+_STREAM_LENGTH = re.compile(r"/Length(?![0-9A-Za-z])\s*(\d+)(\s+0\s+R)?")
+_PAGE_NODE = re.compile(r"/Type\s*/Pages?(?![0-9A-Za-z])")
+# 每个对象在输出文件中的固定开销("n 0 obj ... endobj" 和交叉引用表条目),以及每个文件的固定开销
+_OBJECT_OVERHEAD = 40
+_FILE_OVERHEAD = 1024
+
+
+class _PageSizeEstimator:
+    """
+    估算页面写入新文件后的字节数:页面可达的每个对象(内容流、字体、图片等)只计一次,
+    同一输出文件中多页共用的资源不会重复计算
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.xref_count = document.xref_length()
+        # xref -> (估算字节数, 引用的对象, 是否为页面树节点)
+        self._info = {}
+
+    def _object_info(self, xref):
+        info = self._info.get(xref)
+        if info is None:
+            text = self.document.xref_object(xref, compressed=True)
+            size = len(text) + _OBJECT_OVERHEAD
+            match = _STREAM_LENGTH.search(text)
+            if match:
+                length = int(match.group(1))
+                if match.group(2):
+                    # 长度保存在间接对象中
+                    length = int(self.document.xref_object(length, compressed=True) or 0)
+                size += length
+            children = {int(m) for m in _REFERENCE.findall(text)}
+            info = (size, children, bool(_PAGE_NODE.search(text)))
+            self._info[xref] = info
+        return info
+
+    def page_objects(self, page_num):
+        """页面对象及其可达的全部对象(不经过 /Parent 进入页面树,也不进入其他页面)"""
+        document = self.document
+        page_xref = document.page_xref(page_num)
+        stack = []
+        for key in document.xref_get_keys(page_xref):
+            if key == "Parent":
+                continue
+            kind, value = document.xref_get_key(page_xref, key)
+            if kind in ("xref", "array", "dict"):
+                stack.extend(int(m) for m in _REFERENCE.findall(value))
+        objects = {page_xref}
+        while stack:
+            xref = stack.pop()
+            if xref in objects or not 0 < xref < self.xref_count:
+                continue
+            _, children, is_page_node = self._object_info(xref)
+            # 指向其他页面的引用(链接目标、注释的 /P)不会随本页复制
+            if is_page_node:
+                continue
+            objects.add(xref)
+            stack.extend(children)
+        return objects
+
+    def new_objects(self, page_num, known):
+        """把页面加入已包含 known 对象的文件时新增的对象集合,以及这些对象的估算字节数"""
+        objects = self.page_objects(page_num) - known
+        return objects, sum(self._object_info(xref)[0] for xref in objects)
+
+
+def _fit_pages(source, start, high, max_bytes, candidate, best):
+    """
+    用实际写出的大小确定从 start 开始、结束页小于 high 时不超过上限的最长页段
+
+    先倍增再二分,只写出 O(log n) 次;结果保存在 best 中,返回结束索引,单页超过上限时只包含该页
+    """
+    best_end = start
+    if _write_candidate(source, start, start, best) > max_bytes:
+        return best_end
+    step = 1
+    while best_end < high - 1:
+        end = min(best_end + step, high - 1)
+        if _write_candidate(source, start, end, candidate) > max_bytes:
+            high = end
+            break
+        os.replace(candidate, best)
+        best_end = end
+        step *= 2
+    low = best_end + 1
+    while low < high:
+        mid = (low + high) // 2
+        if _write_candidate(source, start, mid, candidate) <= max_bytes:
+            os.replace(candidate, best)
+            best_end = mid
+            low = mid + 1
+        else:
+            high = mid
+    return best_end
+
+
+# 估算值达到上限的这个比例后才实际序列化验证;每次验证后用实际大小校正估算,并把验证线提高到剩余距离的一半,
+# 因此每个文件只需验证 O(log n) 次。校正前估算超过上限这么多倍时直接认为放不下
+SIZE_CHECK_RATIO = 0.9
+SIZE_REJECT_RATIO = 1.2
+
+
+def split_pdf_by_size(pdf_path, output_dir, max_bytes, progress=None):
+    """
+    按文件大小拆分 PDF:从前往后依次装入尽可能多的页面,使每个输出文件不超过 max_bytes
+
+    每页的大小按它引用的对象估算,同一文件中共用的字体、图片只计一次;估算值远低于上限时直接装入,
+    接近上限时才实际写出验证,估算与实际结果的比例用于校正后续估算。
+    估算偏低导致写出时超限的文件再用倍增 + 二分查找确定结束页;单页本身超过上限时该页单独成为一个文件
+
+    Returns:
+        tuple: (总页数, 输出文件列表)
+    """
+    if max_bytes <= 0:
+        raise ValueError("文件大小上限必须大于0")
+    total_pages, _, base_name = _split_target(pdf_path, output_dir)
+    outputs = []
+    # 候选页段先写入临时文件,确定结束页后改名为输出文件
+    candidate = os.path.join(output_dir, f".{base_name}_candidate.tmp")
+    best = os.path.join(output_dir, f".{base_name}_best.tmp")
+    try:
+        with fitz.open(pdf_path) as source:
+            estimator = _PageSizeEstimator(source)
+            # 实际大小 / 估算大小,随每次验证更新
+            ratio = 1.0
+            start = 0
+            while start < total_pages:
+                known, estimate = estimator.new_objects(start, set())
+                estimate += _FILE_OVERHEAD
+                end, verified_end = start, None
+                check, reject = SIZE_CHECK_RATIO, SIZE_REJECT_RATIO
+                for page in range(start + 1, total_pages):
+                    objects, added = estimator.new_objects(page, known)
+                    raw = estimate + added
+                    projected = raw * ratio
+                    if projected > max_bytes * reject:
+                        break
+                    if projected > max_bytes * check:
+                        size = _write_candidate(source, start, page, candidate)
+                        if size > max_bytes:
+                            break
+                        os.replace(candidate, best)
+                        verified_end = page
+                        ratio = min(4.0, max(0.25, size / raw))
+                        check, reject = (1 + check) / 2, 1.0
+                    estimate = raw
+                    known |= objects
+                    end = page
+
+                if verified_end != end:
+                    size = _write_candidate(source, start, end, best)
+                    if size > max_bytes and end > start:
+                        end = _fit_pages(source, start, end, max_bytes, candidate, best)
+                    else:
+                        ratio = min(4.0, max(0.25, size / estimate))
+
+                output_file = os.path.join(output_dir, f"{base_name}_p{start + 1}-{end + 1}.pdf")
+                os.replace(best, output_file)
+                outputs.append(output_file)
+                start = end + 1
+                _report(progress, start, total_pages)
+    finally:
+        for path in (candidate, best):
+            if os.path.exists(path):
+                os.remove(path)
+    return total_pages, outputs
+
+
+# 合并可选的后端
+MERGE_BACKENDS = ('pymupdf', 'pypdf2')
+
+# 页数缓存:{绝对路径: (大小, 修改时间, 页数)}
+_page_count_cache = {}
+
+
+def get_page_count(pdf_path):
+    """
+    获取 PDF 页数(按文件大小和修改时间缓存,文件未变化时不再重新解析)
+
+    文件无效时抛出 ValueError
+    """
+    try:
+        stat = os.stat(pdf_path)
+    except OSError:
+        raise ValueError("PDF文件不存在")
+    key = os.path.abspath(pdf_path)
+    cached = _page_count_cache.get(key)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    try:
+        with fitz.open(pdf_path) as document:
+            if not document.is_pdf:
+                raise ValueError("不是PDF文件")
+            page_count = document.page_count
+    except Exception as e:
+        raise ValueError(f"无效的PDF文件: {str(e)}")
+    _page_count_cache[key] = (stat.st_size, stat.st_mtime_ns, page_count)
+    return page_count
+
+
+def _sorted_pages(pages):
+    return pages if isinstance(pages, PageRanges) else sorted(pages)
+
+
+def _merge_with_pypdf2(inputs, output_file, progress):
+    writer = PdfWriter()
+    page_count = 0
+    for index, (pdf_path, pages) in enumerate(inputs):
+        reader = PdfReader(pdf_path)
+        for page_index in (range(len(reader.pages)) if pages is None else _sorted_pages(pages)):
+            writer.add_page(reader.pages[page_index])
+            page_count += 1
+        _report(progress, index + 1, len(inputs))
+    if page_count == 0:
+        raise ValueError("没有选择任何页面")
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    return page_count
+
+
+def _merge_with_pymupdf(inputs, output_file, progress):
+    """
+    PyMuPDF 后端:每个输入只打开一次,按连续页段调用 insert_pdf 复制页面,
+    复制的对象保存在 MuPDF 的紧凑结构中,不会为每页创建 Python 对象
+    """
+    output = fitz.open()
+    page_count = 0
+    try:
+        for index, (pdf_path, pages) in enumerate(inputs):
+            with fitz.open(pdf_path) as source:
+                if pages is None:
+                    runs = [(0, source.page_count - 1)] if source.page_count else []
+                elif isinstance(pages, PageRanges):
+                    runs = pages.runs()
+                else:
+                    runs = [(group[0], group[-1]) for group in group_consecutive(sorted(set(pages)))]
+                for start, end in runs:
+                    output.insert_pdf(source, from_page=start, to_page=end)
+                    page_count += end - start + 1
+            _report(progress, index + 1, len(inputs))
+        if page_count == 0:
+            raise ValueError("没有选择任何页面")
+        output.save(output_file, garbage=1)
+    finally:
+        output.close()
+    return page_count
+
+
+def merge_pdfs(inputs, output_file, progress=None, backend='pymupdf'):
+    """
+    合并 PDF
+
+    Args:
+        inputs: [(PDF路径, 页面), ...],页面为 None(全部页面)、PageRanges 或页面索引列表;
+                PageRanges 按区间直接复制,不会展开成逐页列表
+        output_file: 输出文件路径
+        backend: 'pymupdf'(按页段复制,速度快)或 'pypdf2'
+
+    Returns:
+        int: 合并后的总页数
+    """
+    if not inputs:
+        raise ValueError("请先添加PDF文件")
+    if backend not in MERGE_BACKENDS:
+        raise ValueError(f"未知的合并后端: {backend}")
+    if backend == 'pypdf2':
+        return _merge_with_pypdf2(inputs, output_file, progress)
+    return _merge_with_pymupdf(inputs, output_file, progress)
+
+
+def _register_watermark_font(font_path):
+    """在 reportlab 中注册水印字体,返回字体名;未提供字体时使用内置的 Helvetica"""
+    if not font_path:
+        return 'Helvetica'
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_name = 'SnowWatermark-' + os.path.splitext(os.path.basename(str(font_path)))[0]
+    if font_name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(font_name, str(font_path)))
+    return font_name
+
+
+# 加水印可选的后端
+WATERMARK_BACKENDS = ('pymupdf', 'pypdf2')
+# 水印到页面边缘的距离,平铺水印之间的间距
+WATERMARK_MARGIN = 50
+TILE_ANGLE = 45
+
+
+def _text_spec(text, font_path, font_size, opacity, position):
+    """文本水印的参数(可哈希,用作水印页缓存的键)"""
+    if not text:
+        raise ValueError("水印文字不能为空")
+    if position not in WATERMARK_POSITIONS:
+        raise ValueError(f"未知的水印位置: {position}")
+    return ('text', text, str(font_path) if font_path else None, font_size, opacity, position)
+
+
+def _image_spec(image_path, scale, opacity, position):
+    """图片水印的参数,包含文件修改时间,图片被替换后不会用到旧的缓存"""
+    if not image_path or not os.path.isfile(image_path):
+        raise ValueError("水印图片不存在")
+    if not 0 < scale <= 1:
+        raise ValueError("图片缩放比例必须在 0 到 1 之间")
+    if position not in WATERMARK_POSITIONS:
+        raise ValueError(f"未知的水印位置: {position}")
+    return ('image', str(image_path), os.stat(image_path).st_mtime_ns, scale, opacity, position)
+
+
+def _anchor(position, width, height, item_width, item_height):
+    """水印内容左下角在页面(显示方向)中的坐标"""
+    right, top = width - WATERMARK_MARGIN - item_width, height - WATERMARK_MARGIN - item_height
+    return {
+        'center': ((width - item_width) / 2, (height - item_height) / 2),
+        'topleft': (WATERMARK_MARGIN, top),
+        'topright': (right, top),
+        'bottomleft': (WATERMARK_MARGIN, WATERMARK_MARGIN),
+        'bottomright': (right, WATERMARK_MARGIN),
+    }[position]
+
+
+def _tile(can, width, height, item_width, item_height, draw):
+    """以 TILE_ANGLE 倾斜、错行平铺铺满整个页面,draw(x, y) 在左下角为 (x, y) 处绘制一个水印"""
+    step_x = item_width + WATERMARK_MARGIN * 2
+    step_y = item_height + WATERMARK_MARGIN * 2
+    reach = math.hypot(width, height) / 2
+    can.saveState()
+    can.translate(width / 2, height / 2)
+    can.rotate(TILE_ANGLE)
+    for row in range(-int(reach // step_y) - 1, int(reach // step_y) + 2):
+        offset = step_x / 2 if row % 2 else 0
+        x = -reach - offset
+        while x < reach:
+            draw(x, row * step_y)
+            x += step_x
+    can.restoreState()
+
+
+def _draw_text(can, width, height, text, font_path, font_size, opacity, position):
+    font_name = _register_watermark_font(font_path)
+    can.setFillColorRGB(0.5, 0.5, 0.5, opacity)
+    can.setFont(font_name, font_size)
+    text_width = can.stringWidth(text, font_name, font_size)
+    if position == 'tile':
+        _tile(can, width, height, text_width, font_size, lambda x, y: can.drawString(x, y, text))
+    else:
+        can.drawString(*_anchor(position, width, height, text_width, font_size), text)
+
+
+def _draw_image(can, width, height, image_path, mtime, scale, opacity, position):
+    from reportlab.lib.utils import ImageReader
+
+    image = ImageReader(image_path)
+    image_width, image_height = image.getSize()
+    # 图片宽度按页面宽度的比例缩放
+    draw_width = width * scale
+    draw_height = draw_width * image_height / image_width
+    can.setFillAlpha(opacity)
+
+    # 平铺时同一图片在水印页中也只嵌入一次,各处绘制都引用它
+    def draw(x, y):
+        can.drawImage(image, x, y, draw_width, draw_height, mask='auto')
+
+    if position == 'tile':
+        _tile(can, width, height, draw_width, draw_height, draw)
+    else:
+        draw(*_anchor(position, width, height, draw_width, draw_height))
+
+
+@functools.lru_cache(maxsize=64)
+def _watermark_overlay(spec, width, height, rotation=0, origin=(0, 0)):
+    """
+    生成与页面同尺寸的单页水印 PDF(字节),按参数缓存,同一尺寸和旋转角度的页面共用一份
+
+    Args:
+        spec: _text_spec / _image_spec 的结果
+        width, height: 页面未旋转时的宽高
+        rotation: 页面的 /Rotate 角度,水印按旋转后的方向摆正
+        origin: 页面可见区域左下角在用户空间中的坐标
+    """
+    from reportlab.pdfgen import canvas
+
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=(origin[0] + width, origin[1] + height))
+    # 裁掉超出页面的平铺部分
+    path = can.beginPath()
+    path.rect(origin[0], origin[1], width, height)
+    can.clipPath(path, stroke=0, fill=0)
+    can.translate(*origin)
+    # 把坐标系转换为页面显示方向:(X, Y) 为旋转后看到的页面坐标
+    if rotation == 90:
+        can.translate(width, 0)
+        can.rotate(90)
+    elif rotation == 180:
+        can.translate(width, height)
+        can.rotate(180)
+    elif rotation == 270:
+        can.translate(0, height)
+        can.rotate(270)
+    if rotation in (90, 270):
+        width, height = height, width
+
+    if spec[0] == 'image':
+        _draw_image(can, width, height, *spec[1:])
+    else:
+        _draw_text(can, width, height, *spec[1:])
+    can.save()
+    return packet.getvalue()
+
+
+def create_text_watermark(text, font_path=None, font_size=40, opacity=0.3, position='center',
+                          page_size=None, rotation=0):
+    """创建文本水印页(默认 letter 尺寸),返回 PyPDF2 的 PdfReader"""
+    if page_size is None:
+        from reportlab.lib.pagesizes import letter
+        page_size = letter
+    spec = _text_spec(text, font_path, font_size, opacity, position)
+    return PdfReader(io.BytesIO(_watermark_overlay(spec, float(page_size[0]), float(page_size[1]), rotation)))
+
+
+def _watermark_with_pypdf2(pdf_path, output_file, spec, progress):
+    pdf = PdfReader(pdf_path)
+    total_pages = len(pdf.pages)
+    if total_pages == 0:
+        raise ValueError("PDF文件没有有效页面")
+    # 每种页面尺寸/旋转角度只解析一次水印页
+    overlays = {}
+    writer = PdfWriter()
+    for index, page in enumerate(pdf.pages):
+        box = page.cropbox
+        key = (float(box.left), float(box.bottom), float(box.width), float(box.height), page.rotation % 360)
+        overlay = overlays.get(key)
+        if overlay is None:
+            data = _watermark_overlay(spec, key[2], key[3], key[4], origin=(key[0], key[1]))
+            overlay = overlays[key] = PdfReader(io.BytesIO(data)).pages[0]
+        page.merge_page(overlay)
+        writer.add_page(page)
+        _report(progress, index + 1, total_pages)
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    return total_pages
+
+
+def _watermark_with_pymupdf(pdf_path, output_file, spec, progress):
+    """
+    PyMuPDF 后端:水印页按页面尺寸/旋转角度缓存,用 show_pdf_page 叠加到页面上;
+    同一水印页在输出文件中只生成一个 Form XObject,所有页面共同引用,文件大小不随页数成倍增长
+    """
+    document = open_pdf_document(pdf_path)
+    overlays = {}
+    try:
+        total_pages = document.page_count
+        for index, page in enumerate(document):
+            box = page.cropbox
+            key = (box.width, box.height, page.rotation % 360)
+            overlay = overlays.get(key)
+            if overlay is None:
+                overlay = overlays[key] = fitz.open("pdf", _watermark_overlay(spec, *key))
+            page.show_pdf_page(fitz.Rect(0, 0, box.width, box.height), overlay, 0)
+            _report(progress, index + 1, total_pages)
+        document.save(output_file, garbage=1, deflate=True)
+    finally:
+        for overlay in overlays.values():
+            overlay.close()
+        document.close()
+    return total_pages
+
+
+def _add_watermark(pdf_path, output_file, spec, progress, backend):
+    if backend not in WATERMARK_BACKENDS:
+        raise ValueError(f"未知的水印后端: {backend}")
+    if backend == 'pypdf2':
+        return _watermark_with_pypdf2(pdf_path, output_file, spec, progress)
+    return _watermark_with_pymupdf(pdf_path, output_file, spec, progress)
+
+
+def add_text_watermark(pdf_path, output_file, text, font_path=None, font_size=40, opacity=0.3,
+                       position='center', progress=None, backend='pymupdf'):
+    """
+    为 PDF 每一页添加文本水印,水印按页面实际尺寸和旋转角度摆放
+
+    Args:
+        position: WATERMARK_POSITIONS 之一,'tile' 表示倾斜平铺满整页
+        backend: 'pymupdf'(共享 XObject,速度快)或 'pypdf2'
+
+    Returns:
+        int: 处理的页数
+    """
+    spec = _text_spec(text, font_path, font_size, opacity, position)
+    return _add_watermark(pdf_path, output_file, spec, progress, backend)
+
+
+def add_image_watermark(pdf_path, output_file, image_path, scale=0.3, opacity=0.3, position='center',
+                        progress=None, backend='pymupdf'):
+    """
+    为 PDF 每一页添加图片水印(如 logo),PNG 的透明部分保持透明
+
+    Args:
+        scale: 图片宽度占页面宽度的比例
+        position: WATERMARK_POSITIONS 之一,'tile' 表示倾斜平铺满整页
+
+    Returns:
+        int: 处理的页数
+    """
+    spec = _image_spec(image_path, scale, opacity, position)
+    return _add_watermark(pdf_path, output_file, spec, progress, backend)
+
+
+def _watermark_task(task):
+    """进程池中为一个文件加水印"""
+    pdf_path, output_file, kwargs = task
+    if 'image_path' in kwargs:
+        return add_image_watermark(pdf_path, output_file, **kwargs)
+    return add_text_watermark(pdf_path, output_file, **kwargs)
+
+
+def watermark_output_path(pdf_path, output_dir):
+    """批量加水印时的输出文件路径"""
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, f"{base_name}_水印.pdf")
+
+
+def add_watermark_batch(pdf_paths, output_dir, progress=None, workers=None, **options):
+    """
+    为多个 PDF 添加水印,文件分配到 CPU 进程池并行处理,输出为 output_dir/<文件名>_水印.pdf
+
+    Args:
+        options: 提供 image_path 时为 add_image_watermark 的参数,否则为 add_text_watermark 的参数
+
+    进度按页数报告(每个文件完成时更新)
+
+    Returns:
+        tuple: (处理的总页数, 输出文件列表, [(无法处理的文件, 错误信息), ...])
+    """
+    if not pdf_paths:
+        raise ValueError("没有找到PDF文件")
+    # 在提交任务前检查参数,避免每个文件都报同样的错误
+    if 'image_path' in options:
+        _image_spec(options['image_path'], options.get('scale', 0.3), options.get('opacity', 0.3),
+                    options.get('position', 'center'))
+    else:
+        _text_spec(options.get('text'), options.get('font_path'), options.get('font_size', 40),
+                   options.get('opacity', 0.3), options.get('position', 'center'))
+    for key in ('font_path', 'image_path'):
+        if options.get(key):
+            options[key] = str(options[key])
+    os.makedirs(output_dir, exist_ok=True)
+
+    page_counts = []
+    for pdf_path in pdf_paths:
+        try:
+            page_counts.append(get_page_count(pdf_path))
+        except ValueError:
+            page_counts.append(0)
+    total = sum(page_counts)
+    tasks = [(pdf_path, watermark_output_path(pdf_path, output_dir), options) for pdf_path in pdf_paths]
+    done = [0]
+
+    def on_item(index, result):
+        done[0] += page_counts[index]
+        _report(progress, done[0], total)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < 2:
+        results = []
+        for index, task in enumerate(tasks):
+            try:
+                results.append(_watermark_task(task))
+            except Exception as e:
+                results.append(e)
+            on_item(index, results[-1])
+    else:
+        results = get_scheduler().run_cpu(_watermark_task, tasks, on_item=on_item, return_exceptions=True,
+                                          max_workers=workers)
+
+    page_total, outputs, failures = 0, [], []
+    for (pdf_path, output_file, _), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            failures.append((pdf_path, str(result)))
+        else:
+            page_total += result
+            outputs.append(output_file)
+    return page_total, outputs, failures
+
+
+def _render_pages(pdf_path, page_nums, output_subdir, pdf_name, img_format, dpi, quality, on_page=None):
+    """在当前进程中渲染指定页面,返回输出文件列表"""
+    document = fitz.open(pdf_path)
+    try:
+        # 默认 PDF DPI 是 72
+        zoom = dpi / 72
+        matrix = fitz.Matrix(zoom, zoom)
+        outputs = []
+        for page_num in page_nums:
+            pix = document[page_num].get_pixmap(matrix=matrix)
+            output_path = os.path.join(output_subdir, f"{pdf_name}_page_{page_num + 1}.{img_format}")
+            if img_format.lower() == "jpg":
+                pix.save(output_path, output="jpeg", jpg_quality=quality)
+            else:
+                pix.save(output_path)
+            outputs.append(output_path)
+            if on_page is not None:
+                on_page(len(outputs))
+    finally:
+        document.close()
+    return outputs
+
+
+def _render_pages_task(task):
+    """进程池中执行的一组页面渲染,每个子进程各自打开 PDF"""
+    return _render_pages(*task)
+
+
+def _chunk_pages(page_list, workers):
+    """把页面分成若干小块:块数约为进程数的 4 倍,既能均衡负载又能细粒度报告进度"""
+    size = max(1, min(8, -(-len(page_list) // (workers * 4))))
+    return [page_list[i:i + size] for i in range(0, len(page_list), size)]
+
+
+def pdf_to_images(pdf_path, output_dir, img_format='png', dpi=150, quality=95, pages=None, progress=None,
+                  workers=None):
+    """
+    把 PDF 页面渲染为图片,保存在 output_dir/<PDF文件名>_images 目录下
+
+    页面较多时分块交给 CPU 进程池并行渲染,每块写完即报告进度
+
+    Args:
+        img_format: 'png' 或 'jpg'
+        dpi: 渲染分辨率
+        quality: JPG 质量(1-100)
+        pages: 页面索引列表(从 0 开始),None 表示全部页面
+        workers: 最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中渲染
+
+    Returns:
+        tuple: (输出子目录, 输出文件列表)
+    """
+    if img_format.lower() not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的图片格式: {img_format}")
+    pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    output_subdir = os.path.join(output_dir, f"{pdf_name}_images")
+    os.makedirs(output_subdir, exist_ok=True)
+
+    if pages is None:
+        document = fitz.open(pdf_path)
+        try:
+            page_list = list(range(document.page_count))
+        finally:
+            document.close()
+    else:
+        page_list = sorted(pages)
+    total = len(page_list)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or total < 2:
+        outputs = _render_pages(pdf_path, page_list, output_subdir, pdf_name, img_format, dpi, quality,
+                                on_page=lambda done: _report(progress, done, total))
+        return output_subdir, outputs
+
+    chunks = _chunk_pages(page_list, workers)
+    tasks = [(pdf_path, chunk, output_subdir, pdf_name, img_format, dpi, quality) for chunk in chunks]
+    rendered = [0]
+
+    def on_item(index, outputs):
+        rendered[0] += len(outputs)
+        _report(progress, rendered[0], total)
+
+    results = get_scheduler().run_cpu(_render_pages_task, tasks, on_item=on_item, max_workers=workers)
+    return output_subdir, [path for outputs in results for path in outputs]
+
+
+# 图片转 PDF 时同时在内存中等待写出的图片数(每个进程)
+IMAGE_PDF_WINDOW = 4
+
+
+def _downsample_image(img, max_side, quality):
+    """把图片缩小到最长边不超过 max_side 像素,返回编码后的字节(有透明通道时为 PNG,否则为 JPEG)"""
+    scale = max_side / max(img.width, img.height)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    # JPEG 在解码时直接按 1/2、1/4、1/8 缩小,大幅减少解码时间和内存
+    img.draft('RGB', size)
+    has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    img = img.convert('RGBA' if has_alpha else ('L' if img.mode in ('1', 'L') else 'RGB'))
+    img = img.resize(size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    if has_alpha:
+        img.save(buffer, format='PNG')
+    else:
+        img.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def _jpeg_page(data, width, height, mode, icc_profile=None):
+    """
+    直接用 JPEG 文件内容(DCT 数据)构造单页页面对象,不解码也不重新编码
+
+    Returns:
+        tuple: 与 extract_page 相同格式的页面
+    """
+    colorspace = b"/DeviceGray" if mode == 'L' else b"/DeviceRGB"
+    objects = [
+        (1, b"<</Type/Page/MediaBox[0 0 %d %d]/Resources<</XObject<</Im0 3 0 R>>>>/Contents 2 0 R>>"
+         % (width, height), None),
+        (2, b"<<>>", b"q %d 0 0 %d 0 0 cm /Im0 Do Q" % (width, height)),
+    ]
+    if icc_profile:
+        # 保留嵌入的颜色配置文件,与 PyMuPDF 插入图片时的效果一致
+        objects.append((4, b"<</N %d/Alternate%s/Filter/FlateDecode>>" % (1 if mode == 'L' else 3, colorspace),
+                        zlib.compress(icc_profile)))
+        colorspace = b"[/ICCBased 4 0 R]"
+    objects.append((3, b"<</Type/XObject/Subtype/Image/Width %d/Height %d/ColorSpace%s/BitsPerComponent 8"
+                       b"/Filter/DCTDecode>>" % (width, height, colorspace), data))
+    return 1, objects
+
+
+def _image_to_page(img_path, max_side=None, quality=85):
+    """
+    把一张图片做成单页页面对象,供 PdfStreamWriter 写入
+
+    页面尺寸与原图像素尺寸一致;图片最长边超过 max_side 时先缩小再嵌入。
+    不需要缩小的 JPEG(灰度/RGB)直接嵌入原始 DCT 数据,其余格式交给 PyMuPDF 处理
+
+    Returns:
+        tuple: (文件内容摘要, 页面),内容相同的文件摘要相同
+    """
+    with open(img_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.width, img.height
+        if max_side and max(width, height) > max_side:
+            data = _downsample_image(img, max_side, quality)
+        elif img.format == 'JPEG' and img.mode in ('L', 'RGB'):
+            return digest, _jpeg_page(data, width, height, img.mode, img.info.get('icc_profile'))
+    with fitz.open() as document:
+        page = document.new_page(width=width, height=height)
+        page.insert_image(fitz.Rect(0, 0, width, height), stream=data)
+        return digest, extract_page(document, 0)
+
+
+def _image_to_page_task(task):
+    """进程池中处理一张图片"""
+    return _image_to_page(*task)
+
+
+def images_to_pdf(image_paths, output_file, progress=None, max_side=None, quality=85, workers=None):
+    """
+    按顺序把图片合成为 PDF,每张图片一页,页面尺寸与图片像素尺寸一致
+
+    每张图片处理完即按顺序流式写入输出文件,峰值内存与图片数量无关。需要缩小图片时,
+    解码、缩放和重新编码分批交给 CPU 进程池并行处理;嵌入原图只需读取文件,在当前进程中完成。
+    JPEG 原图直接嵌入,内容相同的图片只嵌入一次
+
+    Args:
+        max_side: 图片最长边的最大像素数,超过时缩小后再嵌入(页面尺寸不变),None 表示嵌入原图
+        quality: 缩小后重新编码的 JPEG 质量(1-100)
+        workers: 缩小图片时最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中处理
+
+    Returns:
+        tuple: (成功添加的图片数, [(无法处理的图片路径, 错误信息), ...], 重复图片节省的字节数)
+    """
+    if not image_paths:
+        raise ValueError("请先添加图片")
+    total = len(image_paths)
+    # 嵌入原图时主要是文件读写,交给子进程反而要多传一遍数据
+    workers = (workers or os.cpu_count() or 1) if max_side else 1
+    tasks = [(str(path), max_side, quality) for path in image_paths]
+    skipped = []
+
+    def write(task, result):
+        if isinstance(result, Exception):
+            skipped.append((task[0], str(result)))
+            return
+        digest, page = result
+        if not writer.add_duplicate(digest):
+            writer.add_page(page, key=digest)
+
+    with PdfStreamWriter(output_file) as writer:
+        if workers <= 1 or total < 2:
+            for index, task in enumerate(tasks):
+                try:
+                    result = _image_to_page(*task)
+                except Exception as e:
+                    result = e
+                write(task, result)
+                _report(progress, index + 1, total)
+        else:
+            window = workers * IMAGE_PDF_WINDOW
+            done = [0]
+
+            def on_item(index, result):
+                done[0] += 1
+                _report(progress, done[0], total)
+
+            for start in range(0, total, window):
+                batch = tasks[start:start + window]
+                results = get_scheduler().run_cpu(_image_to_page_task, batch, on_item=on_item,
+                                                  return_exceptions=True, max_workers=workers)
+                for task, result in zip(batch, results):
+                    write(task, result)
+                del results
+        if writer.page_count == 0:
+            raise ValueError("没有可以转换的图片")
+    return total - len(skipped), skipped, writer.saved_bytes
+
+
+def _parse_word_pages(pdf_path, pages, json_path, on_page=None):
+    """
+    在当前进程中用 pdf2docx 解析指定页面,把解析结果序列化到 json_path
+
+    与 Converter.parse_pages 相同,解析失败的页面会被跳过,其余页面照常输出
+
+    Returns:
+        int: 处理的页数
+    """
+    cv = Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(pages=pages).parse_document(**settings)
+        for index, page in enumerate(p for p in cv.pages if not p.skip_parsing):
+            try:
+                page.parse(**settings)
+            except Exception:
+                pass
+            if on_page is not None:
+                on_page(index + 1)
+        cv.serialize(json_path)
+    finally:
+        cv.close()
+    return len(pages)
+
+
+def _parse_word_pages_task(task):
+    """进程池中解析一组页面,每个子进程各自打开 PDF"""
+    return _parse_word_pages(*task)
+
+
+def pdf_to_word(pdf_path, output_file, pages=None, progress=None, workers=None):
+    """
+    把 PDF 转换为 Word 文档
+
+    最耗时的版面解析按页分块交给 CPU 进程池并行处理,每块的结果写入临时 JSON,
+    最后在当前进程中按页序还原并生成 docx。进度按已解析的页数报告
+
+    Args:
+        pages: 页面索引列表(从 0 开始),None 表示全部页面
+        workers: 最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中逐页解析
+
+    Returns:
+        int: 转换的页数
+    """
+    with open_pdf_document(pdf_path) as document:
+        total_pages = document.page_count
+    page_list = list(range(total_pages)) if pages is None else sorted(pages)
+    if not page_list:
+        raise ValueError("没有选择任何页面")
+    total = len(page_list)
+    workers = workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory(prefix="snow_word_") as temp_dir:
+        if workers <= 1 or total < 2:
+            chunks = [page_list]
+            json_paths = [os.path.join(temp_dir, "pages_0.json")]
+            _parse_word_pages(pdf_path, page_list, json_paths[0],
+                              on_page=lambda done: _report(progress, done, total))
+        else:
+            chunks = _chunk_pages(page_list, workers)
+            json_paths = [os.path.join(temp_dir, f"pages_{i}.json") for i in range(len(chunks))]
+            parsed = [0]
+
+            def on_item(index, count):
+                parsed[0] += count
+                _report(progress, parsed[0], total)
+
+            tasks = [(pdf_path, chunk, json_path) for chunk, json_path in zip(chunks, json_paths)]
+            get_scheduler().run_cpu(_parse_word_pages_task, tasks, on_item=on_item, max_workers=workers)
+
+        cv = Converter(pdf_path)
+        try:
+            cv.load_pages(pages=page_list)
+            for json_path in json_paths:
+                cv.deserialize(json_path)
+            cv.make_docx(output_file, **cv.default_settings)
+        finally:
+            cv.close()
+    return total
+
+
+def word_output_path(pdf_path, output_dir):
+    """批量转换时的输出文件路径"""
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, f"{base_name}.docx")
+
+
+def pdf_to_word_batch(pdf_paths, output_dir, progress=None, workers=None):
+    """
+    把多个 PDF 转换为 Word,输出为 output_dir/<文件名>.docx
+
+    文件依次转换,每个文件内部按页并行解析;进度按所有文件的总页数报告
+
+    Returns:
+        tuple: (转换的总页数, 输出文件列表, [(无法转换的文件, 错误信息), ...])
+    """
+    if not pdf_paths:
+        raise ValueError("没有找到PDF文件")
+    os.makedirs(output_dir, exist_ok=True)
+
+    page_counts = []
+    for pdf_path in pdf_paths:
+        try:
+            page_counts.append(get_page_count(pdf_path))
+        except ValueError:
+            page_counts.append(0)
+    total = sum(page_counts)
+
+    done, page_total, outputs, failures = 0, 0, [], []
+    for pdf_path, page_count in zip(pdf_paths, page_counts):
+        output_file = word_output_path(pdf_path, output_dir)
+        try:
+            page_total += pdf_to_word(pdf_path, output_file, workers=workers,
+                                      progress=lambda n, _, base=done: _report(progress, base + n, total))
+        except JobCancelled:
+            raise
+        except Exception as e:
+            failures.append((pdf_path, str(e)))
+        else:
+            outputs.append(output_file)
+        done += page_count
+        _report(progress, done, total)
+    return page_total, outputs, failures
+
+
+# ---------------- 压缩 ----------------
+# 先在当前进程中找出分辨率超过目标的图片(按页面上的显示尺寸计算 DPI),再分块交给进程池
+# 解码、缩小并编码为 JPEG;写回后由 PyMuPDF 合并重复对象、清理无用对象、压缩流并保存
+
+# 压缩预设:名称 -> (图片目标 DPI, JPEG 质量),None 表示不处理图片
+OPTIMIZE_PRESETS = {
+    'screen': (72, 50),
+    'ebook': (150, 70),
+    'print': (300, 85),
+    'lossless': (None, None),
+}
+# 图片分辨率超过目标 DPI 的这个倍数才缩小,避免为很小的收益重新编码
+IMAGE_DPI_THRESHOLD = 1.5
+# 这些编码的图片(黑白扫描件)已经很小,转为 JPEG 反而更大
+_KEEP_IMAGE_FILTERS = ('/JBIG2Decode', '/CCITTFaxDecode', '/JPXDecode')
+
+
+def _find_large_images(document, target_dpi):
+    """
+    找出需要缩小的图片
+
+    同一图片在多处显示时按最大的显示尺寸计算 DPI;图片蒙版、颜色键蒙版和黑白编码的图片不处理
+
+    Returns:
+        list: [(xref, 目标宽度, 目标高度), ...]
+    """
+    # xref -> (像素宽, 像素高, 最大显示面积);get_image_info(xrefs=True) 要解码图片计算摘要,这里不用
+    images = {}
+    masks = set()
+    for page in document:
+        for item in page.get_images(full=True):
+            xref, smask, width, height = item[:4]
+            if smask:
+                masks.add(smask)
+            try:
+                bbox = page.get_image_bbox(item)
+            except ValueError:
+                continue
+            if bbox.is_empty or bbox.is_infinite:
+                continue
+            area = abs(bbox.width * bbox.height)
+            previous = images.get(xref)
+            if previous is None or area > previous[2]:
+                images[xref] = (width, height, area)
+
+    targets = []
+    for xref, (width, height, area) in images.items():
+        if xref in masks or area <= 0:
+            continue
+        if document.xref_get_key(xref, 'ImageMask')[1] == 'true':
+            continue
+        if document.xref_get_key(xref, 'Mask')[0] == 'array':
+            continue
+        if any(f in document.xref_get_key(xref, 'Filter')[1] for f in _KEEP_IMAGE_FILTERS):
+            continue
+        dpi = math.sqrt(width * height / area) * 72
+        if dpi <= target_dpi * IMAGE_DPI_THRESHOLD:
+            continue
+        scale = target_dpi / dpi
+        targets.append((xref, max(1, round(width * scale)), max(1, round(height * scale))))
+    return targets
+
+
+def _downsample_pdf_images(pdf_path, items, quality, on_image=None):
+    """
+    在当前进程中缩小 PDF 中的若干图片,只返回比原数据小的结果
+
+    Returns:
+        list: [(xref, JPEG 数据, 宽度, 高度, 是否灰度) 或 None, ...]
+    """
+    results = []
+    with fitz.open(pdf_path) as document:
+        for xref, width, height in items:
+            pix = fitz.Pixmap(document, xref)
+            if pix.alpha:
+                pix = fitz.Pixmap(pix, 0)
+            if pix.n not in (1, 3):
+                pix = fitz.Pixmap(fitz.csRGB, pix)
+            gray = pix.n == 1
+            img = Image.frombytes('L' if gray else 'RGB', (pix.width, pix.height), pix.samples)
+            img = img.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=quality, optimize=True)
+            data = buffer.getvalue()
+            if len(data) < len(document.xref_stream_raw(xref)):
+                results.append((xref, data, width, height, gray))
+            else:
+                results.append(None)
+            if on_image is not None:
+                on_image(len(results))
+    return results
+
+
+def _downsample_pdf_images_task(task):
+    """进程池中处理一组图片,每个子进程各自打开 PDF"""
+    return _downsample_pdf_images(*task)
+
+
+def _replace_image(document, xref, data, width, height, gray):
+    """用 JPEG 数据替换图片对象的内容,保留软蒙版(/SMask 的尺寸可以与图片不同)"""
+    document.update_stream(xref, data, compress=False)
+    document.xref_set_key(xref, 'Filter', '/DCTDecode')
+    for key in ('DecodeParms', 'Decode'):
+        document.xref_set_key(xref, key, 'null')
+    document.xref_set_key(xref, 'Width', str(width))
+    document.xref_set_key(xref, 'Height', str(height))
+    document.xref_set_key(xref, 'BitsPerComponent', '8')
+    document.xref_set_key(xref, 'ColorSpace', '/DeviceGray' if gray else '/DeviceRGB')
+
+
+def optimize_pdf(pdf_path, output_file, preset='ebook', subset_fonts=True, progress=None, workers=None):
+    """
+    压缩 PDF:缩小分辨率过高的图片、子集化字体、合并重复对象、清理无用对象并压缩所有流
+    (结果可能比原文件大,例如原文件已经充分压缩时,由调用方决定是否使用)
+
+    Args:
+        preset: OPTIMIZE_PRESETS 中的预设名称
+        subset_fonts: 是否只保留字体中用到的字形
+        workers: 缩小图片时最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中处理
+
+    进度按图片数报告,最后一步为保存
+
+    Returns:
+        dict: {'before': 原文件字节数, 'after': 输出文件字节数, 'images': 缩小的图片数, 'elapsed': 耗时秒数}
+    """
+    if preset not in OPTIMIZE_PRESETS:
+        raise ValueError(f"未知的压缩预设: {preset}")
+    if os.path.abspath(pdf_path) == os.path.abspath(output_file):
+        raise ValueError("输出文件不能与原文件相同")
+    started = time.perf_counter()
+    target_dpi, quality = OPTIMIZE_PRESETS[preset]
+    document = open_pdf_document(pdf_path)
+    try:
+        targets = _find_large_images(document, target_dpi) if target_dpi else []
+        total = len(targets) + 1
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(targets) < 2:
+            results = [_downsample_pdf_images(pdf_path, targets, quality,
+                                              on_image=lambda done: _report(progress, done, total))]
+        else:
+            chunks = _chunk_pages(targets, workers)
+            done = [0]
+
+            def on_item(index, result):
+                done[0] += len(chunks[index])
+                _report(progress, done[0], total)
+
+            tasks = [(pdf_path, chunk, quality) for chunk in chunks]
+            results = get_scheduler().run_cpu(_downsample_pdf_images_task, tasks, on_item=on_item,
+                                              max_workers=workers)
+        images = 0
+        for chunk_results in results:
+            for result in chunk_results:
+                if result is not None:
+                    _replace_image(document, *result)
+                    images += 1
+
+        if subset_fonts:
+            try:
+                document.subset_fonts()
+            except Exception:
+                # 个别字体无法子集化时保留原字体
+                pass
+        document.save(output_file, garbage=4, deflate=True, deflate_images=True, deflate_fonts=True,
+                      use_objstms=1)
+    finally:
+        document.close()
+    _report(progress, total, total)
+    return {
+        'before': os.path.getsize(pdf_path),
+        'after': os.path.getsize(output_file),
+        'images': images,
+        'elapsed': time.perf_counter() - started,
+    }
+
+
+# ---------------- 提取文字 ----------------
+
+# 提取文字可选的后端
+EXTRACT_BACKENDS = ('pymupdf', 'pypdf2')
+
+
+def _extract_pages(pdf_path, page_nums, backend='pymupdf', on_page=None):
+    """在当前进程中提取指定页面的文字,返回与 page_nums 对应的文字列表"""
+    texts = []
+    if backend == 'pypdf2':
+        reader = open_pdf_reader(pdf_path)
+        for page_num in page_nums:
+            texts.append(reader.pages[page_num].extract_text() or "")
+            if on_page is not None:
+                on_page(len(texts))
+        return texts
+
+    with fitz.open(pdf_path) as document:
+        for page_num in page_nums:
+            texts.append(document[page_num].get_text())
+            if on_page is not None:
+                on_page(len(texts))
+    return texts
+
+
+def _extract_pages_task(task):
+    """进程池中提取一组页面的文字,每个子进程各自打开 PDF"""
+    return _extract_pages(*task)
+
+
+def extract_text(pdf_path, pages=None, progress=None, backend='pymupdf', workers=None):
+    """
+    逐页提取 PDF 中的文字
+
+    页面较多时分块交给 CPU 进程池并行提取
+
+    Args:
+        pages: 页面索引列表(从 0 开始),None 表示全部页面
+        backend: EXTRACT_BACKENDS 之一
+        workers: 最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中提取
+
+    Returns:
+        list: 与页面顺序对应的文字列表
+    """
+    if backend not in EXTRACT_BACKENDS:
+        raise ValueError(f"未知的提取后端: {backend}")
+    if pages is None:
+        with open_pdf_document(pdf_path) as document:
+            page_list = list(range(document.page_count))
+    else:
+        page_list = sorted(pages)
+    total = len(page_list)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or total < 2:
+        return _extract_pages(pdf_path, page_list, backend, on_page=lambda done: _report(progress, done, total))
+
+    chunks = _chunk_pages(page_list, workers)
+    done = [0]
+
+    def on_item(index, texts):
+        done[0] += len(texts)
+        _report(progress, done[0], total)
+
+    results = get_scheduler().run_cpu(_extract_pages_task, [(pdf_path, chunk, backend) for chunk in chunks],
+                                      on_item=on_item, max_workers=workers)
+    return [text for texts in results for text in texts]
+
+
+# ---------------- 后端 ----------------
+
+# 各操作可选的后端,第一个为默认后端(python Core/PdfBenchmark.py suite 测得最快的后端)
+PDF_BACKENDS = {
+    'split': SPLIT_BACKENDS,
+    'merge': MERGE_BACKENDS,
+    'watermark': WATERMARK_BACKENDS,
+    'render': ('pymupdf',),
+    'extract': EXTRACT_BACKENDS,
+}
@@ -0,0 +1,323 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+PDF 全文搜索索引
+逐页提取文件夹中所有 PDF 的文字(多个文件交给 CPU 进程池并行提取),保存在本地 SQLite FTS5
+全文索引(Core/search_index.db)中,之后的搜索只查询索引,不再打开 PDF
+
+索引按 (路径, 大小, 修改时间) 增量更新:未变化的文件直接跳过,变化的文件重新提取,
+已删除的文件从索引中移除。全文表使用 trigram 分词,中文不需要分词即可按任意子串搜索;
+不足 3 个字的关键词无法使用 trigram 索引,改为在(其他关键词筛选后的)页面中逐页匹配
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+import PdfCore
+from JobScheduler import JobCancelled, get_scheduler
+
+
+# 索引文件位置
+SEARCH_DB_PATH = Path(__file__).resolve().parent / "search_index.db"
+# 每次交给进程池的文件数(每个进程),提取结果写入索引后即释放
+SEARCH_INDEX_WINDOW = 8
+# 全文表的 rowid = 文档编号 << _PAGE_BITS | 页面索引,按文档删除页面时可以走 rowid 范围
+_PAGE_BITS = 20
+# trigram 分词能使用索引的最短关键词长度
+_MIN_MATCH_LENGTH = 3
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        page_count INTEGER NOT NULL
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(text, tokenize='trigram')",
+)
+
+
+def scan_pdfs(folder):
+    """
+    递归列出文件夹中的 PDF
+
+    Returns:
+        dict: {绝对路径: (大小, 修改时间 ns)}
+    """
+    found = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if not name.lower().endswith('.pdf'):
+                continue
+            path = os.path.abspath(os.path.join(root, name))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found[path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def _extract_document_task(pdf_path):
+    """进程池中提取一个 PDF 所有页面的文字"""
+    return PdfCore.extract_text(pdf_path, workers=1)
+
+
+def split_query(query):
+    """把搜索内容拆分为关键词:以空白分隔,双引号中的内容(可含空格)作为一个关键词"""
+    return [quoted or word for quoted, word in re.findall(r'"([^"]+)"|(\S+)', query)]
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def make_snippet(text, terms, width=40):
+    """截取页面文字中第一个关键词前后 width 个字符(连续空白合并为一个空格)"""
+    text = re.sub(r"\s+", " ", text).strip()
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    start = min(positions) if positions else 0
+    left = max(0, start - width)
+    right = min(len(text), start + width)
+    return ("…" if left > 0 else "") + text[left:right] + ("…" if right < len(text) else "")
+
+
+class PdfSearchIndex:
+    """
+    PDF 全文搜索索引(SQLite FTS5)
+
+    每次调用单独打开连接,可在任意线程中使用;写入由锁串行化,搜索可与索引更新同时进行
+    """
+
+    def __init__(self, db_path=SEARCH_DB_PATH):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            try:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+            except sqlite3.OperationalError as e:
+                conn.close()
+                raise ValueError(f"当前 SQLite 不支持 FTS5 trigram 全文索引(需要 3.34 以上版本): {e}")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    # ---------------- 更新索引 ----------------
+
+    def update_folder(self, folder, progress=None, workers=None):
+        """
+        增量更新文件夹(含子文件夹)中 PDF 的索引
+
+        Args:
+            progress: 进度回调 (已处理文件数, 需要提取的文件数)
+            workers: 最多使用的进程数,默认为 CPU 核数,1 表示在当前进程中提取
+
+        Returns:
+            dict: {'added', 'updated', 'removed', 'unchanged': 文件数, 'pages': 新提取的页数,
+                   'failures': [(无法提取的文件, 错误信息), ...], 'elapsed': 秒数}
+        """
+        if not os.path.isdir(folder):
+            raise ValueError(f"文件夹不存在: {folder}")
+        started = time.perf_counter()
+        folder = os.path.abspath(folder)
+        found = scan_pdfs(folder)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                indexed = {
+                    path: (doc_id, size, mtime_ns)
+                    for doc_id, path, size, mtime_ns in conn.execute(
+                        "SELECT id, path, size, mtime_ns FROM documents WHERE substr(path, 1, ?) = ?",
+                        (len(folder) + 1, os.path.join(folder, "")),
+                    )
+                }
+                removed = [path for path in indexed if path not in found]
+                for path in removed:
+                    self._delete_document(conn, indexed[path][0])
+                conn.commit()
+            finally:
+                conn.close()
+
+        changed = [path for path, stat in sorted(found.items())
+                   if path not in indexed or indexed[path][1:] != stat]
+        report = {
+            'added': 0,
+            'updated': 0,
+            'removed': len(removed),
+            'unchanged': len(found) - len(changed),
+            'pages': 0,
+            'failures': [],
+        }
+        self._index_documents(changed, found, report, progress, workers)
+        report['elapsed'] = time.perf_counter() - started
+        return report
+
+    def _index_documents(self, paths, stats, report, progress, workers):
+        """提取 paths 中各文件的文字并写入索引,每个文件提取完成后立即提交"""
+        total = len(paths)
+        _report(progress, 0, total)
+        workers = workers or os.cpu_count() or 1
+
+        def store(path, texts):
+            if isinstance(texts, Exception):
+                report['failures'].append((path, str(texts)))
+                return
+            report['updated' if self._store_document(path, stats[path], texts) else 'added'] += 1
+            report['pages'] += len(texts)
+
+        if total == 1 or workers <= 1:
+            for index, path in enumerate(paths):
+                try:
+                    # 只有一个文件时在文件内按页并行
+                    texts = PdfCore.extract_text(path, workers=workers if total == 1 else 1)
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    texts = e
+                store(path, texts)
+                _report(progress, index + 1, total)
+            return
+
+        window = workers * SEARCH_INDEX_WINDOW
+        done = [0]
+        for start in range(0, total, window):
+            batch = paths[start:start + window]
+
+            def on_item(index, texts, batch=batch):
+                store(batch[index], texts)
+                done[0] += 1
+                _report(progress, done[0], total)
+
+            get_scheduler().run_cpu(_extract_document_task, batch, on_item=on_item,
+                                    return_exceptions=True, max_workers=workers)
+
+    def _store_document(self, path, stat, texts):
+        """写入一个文件的页面文字,返回该文件之前是否已有索引"""
+        size, mtime_ns = stat
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+                if row:
+                    doc_id = row[0]
+                    self._delete_pages(conn, doc_id)
+                    conn.execute("UPDATE documents SET size = ?, mtime_ns = ?, page_count = ? WHERE id = ?",
+                                 (size, mtime_ns, len(texts), doc_id))
+                else:
+                    doc_id = conn.execute(
+                        "INSERT INTO documents (path, size, mtime_ns, page_count) VALUES (?, ?, ?, ?)",
+                        (path, size, mtime_ns, len(texts)),
+                    ).lastrowid
+                base = doc_id << _PAGE_BITS
+                conn.executemany("INSERT INTO pages (rowid, text) VALUES (?, ?)",
+                                 ((base + page_num, text) for page_num, text in enumerate(texts) if text.strip()))
+                conn.commit()
+            finally:
+                conn.close()
+        return bool(row)
+
+    @staticmethod
+    def _delete_pages(conn, doc_id):
+        conn.execute("DELETE FROM pages WHERE rowid BETWEEN ? AND ?",
+                     (doc_id << _PAGE_BITS, ((doc_id + 1) << _PAGE_BITS) - 1))
+
+    def _delete_document(self, conn, doc_id):
+        self._delete_pages(conn, doc_id)
+        conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    # ---------------- 搜索 ----------------
+
+    def search(self, query, folder=None, limit=200):
+        """
+        搜索包含所有关键词的页面(不区分大小写,关键词的拆分见 split_query)
+
+        Args:
+            folder: 只返回该文件夹(含子文件夹)中的结果,None 表示整个索引
+            limit: 最多返回的结果数
+
+        Returns:
+            list: [(PDF 路径, 页面索引, 摘要), ...],有可用索引的关键词时按相关度排序,否则按文件和页码排序
+        """
+        terms = split_query(query)
+        if not terms:
+            return []
+        long_terms = [term for term in terms if len(term) >= _MIN_MATCH_LENGTH]
+        short_terms = [term for term in terms if len(term) < _MIN_MATCH_LENGTH]
+
+        conditions, params = [], []
+        if long_terms:
+            conditions.append("pages MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in short_terms:
+            conditions.append("pages.text LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(term)}%")
+        if folder:
+            folder = os.path.join(os.path.abspath(folder), "")
+            conditions.append("substr(documents.path, 1, ?) = ?")
+            params.extend((len(folder), folder))
+        order = "pages.rank" if long_terms else "pages.rowid"
+        sql = (f"SELECT documents.path, pages.rowid, pages.text FROM pages "
+               f"JOIN documents ON documents.id = (pages.rowid >> {_PAGE_BITS}) "
+               f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?")
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"搜索失败: {e}")
+        finally:
+            conn.close()
+        mask = (1 << _PAGE_BITS) - 1
+        return [(path, rowid & mask, make_snippet(text, terms)) for path, rowid, text in rows]
+
+    def stats(self, folder=None):
+        """
+        Returns:
+            tuple: (已索引的文件数, 页数)
+        """
+        sql = "SELECT COUNT(*), COALESCE(SUM(page_count), 0) FROM documents"
+        params = ()
+        if folder:
+            folder = os.path.join(os.path.abspath(folder), "")
+            sql += " WHERE substr(path, 1, ?) = ?"
+            params = (len(folder), folder)
+        conn = self._connect()
+        try:
+            return tuple(conn.execute(sql, params).fetchone())
+        finally:
+            conn.close()
+
+
+_search_index = None
+
+
+def get_search_index():
+    """获取进程内共享的搜索索引"""
+    global _search_index
+    if _search_index is None:
+        _search_index = PdfSearchIndex()
+    return _search_index
@@ -0,0 +1,184 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+流式 PDF 写入器
+按顺序逐页写出 PDF:每页的对象写入文件后即释放,内存中只保留对象偏移量和页面编号,
+生成几千页的大文件时峰值内存与页数无关
+
+页面来自其他(通常只有一页的)PDF 文档:先用 extract_page 取出页面可达的全部对象
+(可以在子进程中完成,结果可 pickle),再由 PdfStreamWriter.add_page 重新编号后写入。
+内容相同的页面(如重复的图片)只写一次,之后的页面对象直接引用已写入的内容流和资源
+"""
+
+import os
+import re
+import zlib
+
+
+_REFERENCE = re.compile(rb"(?<![\d.])(\d+)\s+0\s+R(?![A-Za-z])")
+_LENGTH = re.compile(rb"/Length(?![0-9A-Za-z])\s*\d+(?:\s+0\s+R)?")
+_PARENT = re.compile(rb"/Parent\s*\d+\s+0\s+R")
+_PAGE_NODE = re.compile(rb"/Type\s*/Pages?(?![0-9A-Za-z])")
+_FILTER = re.compile(rb"/Filter(?![0-9A-Za-z])")
+
+# 输出文件中固定的对象编号
+_CATALOG = 1
+_PAGES = 2
+
+
+def extract_page(document, page_num, deflate=True):
+    """
+    取出 PyMuPDF 文档中一个页面可达的全部对象(不经过 /Parent 进入页面树,也不进入其他页面)
+
+    Args:
+        deflate: 是否压缩没有编码的流(如 PNG 解码后的像素数据)
+
+    Returns:
+        tuple: (页面对象编号, [(对象编号, 对象内容, 流数据或 None), ...]),
+               对象内容中已去掉 /Length,写入时按流数据重新生成
+    """
+    page_xref = document.page_xref(page_num)
+    objects, seen, stack = [], set(), [page_xref]
+    while stack:
+        xref = stack.pop()
+        if xref in seen:
+            continue
+        seen.add(xref)
+        source = document.xref_object(xref, compressed=True).encode('latin-1')
+        if xref == page_xref:
+            source = _PARENT.sub(b"", source)
+        elif _PAGE_NODE.search(source):
+            # 指向其他页面的引用写入时替换为 null
+            continue
+        stream = None
+        if document.xref_is_stream(xref):
+            stream = document.xref_stream_raw(xref)
+            source = _LENGTH.sub(b"", source)
+            if deflate and not _FILTER.search(source):
+                stream = zlib.compress(stream)
+                source = source.replace(b"<<", b"<</Filter/FlateDecode", 1)
+        objects.append((xref, source, stream))
+        stack.extend(int(m) for m in _REFERENCE.findall(source))
+    return page_xref, objects
+
+
+class PdfStreamWriter:
+    """
+    顺序写出 PDF 的写入器,用法:
+
+        with PdfStreamWriter(output_file) as writer:
+            writer.add_page(extract_page(document, 0))
+
+    正常退出时写入页面树、交叉引用表和文件尾;出现异常时删除未写完的文件
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self._file = open(output_file, 'wb')
+        self._file.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = {}
+        self._next_number = _PAGES + 1
+        self._pages = []
+        # 页面键 -> (已写入的页面对象内容, 该页写入的字节数)
+        self._written = {}
+        self.duplicates = 0
+        self.saved_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def _allocate(self):
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def _write_object(self, number, source, stream=None):
+        self._offsets[number] = self._file.tell()
+        write = self._file.write
+        write(b"%d 0 obj\n" % number)
+        if stream is None:
+            write(source)
+        else:
+            write(source.replace(b"<<", b"<</Length %d" % len(stream), 1))
+            write(b"\nstream\n")
+            write(stream)
+            write(b"\nendstream")
+        write(b"\nendobj\n")
+
+    def add_page(self, page, key=None):
+        """
+        写入 extract_page 取出的页面,页面追加到文档末尾
+
+        Args:
+            key: 页面内容的键(如图片文件的摘要),之后可用 add_duplicate 按键重复引用本页内容
+        """
+        page_xref, objects = page
+        numbers = {xref: self._allocate() for xref, _, _ in objects}
+        written = 0
+
+        def renumber(match):
+            number = numbers.get(int(match.group(1)))
+            return b"%d 0 R" % number if number is not None else b"null"
+
+        for xref, source, stream in objects:
+            source = _REFERENCE.sub(renumber, source)
+            if xref == page_xref:
+                source = source.replace(b"<<", b"<</Parent %d 0 R" % _PAGES, 1)
+                page_source = source
+            self._write_object(numbers[xref], source, stream)
+            written += len(source) + (len(stream) if stream is not None else 0)
+        self._pages.append(numbers[page_xref])
+        if key is not None:
+            self._written[key] = (page_source, written)
+
+    def add_duplicate(self, key):
+        """
+        追加一个与之前用 key 写入的页面内容相同的页面,只写入新的页面对象
+
+        Returns:
+            bool: 之前没有写入过该键时返回 False,调用方需要改用 add_page
+        """
+        written = self._written.get(key)
+        if written is None:
+            return False
+        page_source, size = written
+        number = self._allocate()
+        self._write_object(number, page_source)
+        self._pages.append(number)
+        self.duplicates += 1
+        self.saved_bytes += size - len(page_source)
+        return True
+
+    def close(self):
+        """写入页面树、目录、交叉引用表和文件尾并关闭文件"""
+        kids = b" ".join(b"%d 0 R" % number for number in self._pages)
+        self._write_object(_PAGES, b"<</Type/Pages/Count %d/Kids[%s]>>" % (len(self._pages), kids))
+        self._write_object(_CATALOG, b"<</Type/Catalog/Pages %d 0 R>>" % _PAGES)
+
+        write = self._file.write
+        xref_offset = self._file.tell()
+        size = self._next_number
+        write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        write(b"".join(b"%010d 00000 n \n" % self._offsets[number] for number in range(1, size)))
+        write(b"trailer\n<</Size %d/Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (size, _CATALOG, xref_offset))
+        self._file.close()
+
+    def abort(self):
+        """放弃写入并删除未完成的文件"""
+        self._file.close()
+        try:
+            os.remove(self.output_file)
+        except OSError:
+            pass
@@ -0,0 +1,526 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+PDF 缩略图模块
+PDF 工具共用的虚拟化缩略图条:只为可见区域(及左右少量缓冲)中的页面创建控件和渲染缩略图,
+渲染在后台线程中进行,像素数据直接以 PPM 格式交给 Tk 的 PhotoImage,不经过临时文件;
+已生成的缩略图保存在按内存上限淘汰的 LRU 缓存中,上千页的文档也不会卡住窗口
+
+缩略图同时写入磁盘缓存(Core/thumbnail_cache.db),以文件内容摘要 + 页码 + 缩略图尺寸为键,
+同一份 PDF 再次打开(即使改名或移动)时直接读取,超过容量上限时淘汰最久未使用的条目
+"""
+
+import os
+import time
+import zlib
+import queue
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+import tkinter as tk
+from tkinter import ttk
+
+from LazyImport import lazy_import
+from JobScheduler import TkDispatcher
+from PageRanges import PageRanges
+
+# 重型依赖按需导入，首次使用时才加载
+fitz = lazy_import('fitz')
+
+
+# 缩略图的最大宽高(像素),页面按比例缩放到该范围内
+THUMB_BOX = (120, 160)
+# 默认的缩略图内存上限
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# 磁盘缓存位置和默认容量上限
+THUMBNAIL_DB_PATH = Path(__file__).resolve().parent / "thumbnail_cache.db"
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+_DISK_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS thumbnails (
+        digest TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        box TEXT NOT NULL,
+        width INTEGER NOT NULL,
+        height INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (digest, page, box)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS thumbnails_last_used ON thumbnails (last_used)",
+)
+
+
+def render_thumbnail(document, page_num, box=THUMB_BOX):
+    """
+    把页面渲染为缩略图
+
+    Returns:
+        tuple: (宽, 高, PPM 数据)
+    """
+    page = document[page_num]
+    rect = page.rect
+    zoom = min(box[0] / max(rect.width, 1), box[1] / max(rect.height, 1))
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return pix.width, pix.height, pix.tobytes("ppm")
+
+
+class ThumbnailCache:
+    """按内存占用上限淘汰的 LRU 缩略图缓存"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, image, size):
+        """加入缓存,size 为图像占用的字节数"""
+        if key in self._items:
+            self.total_bytes -= self._items.pop(key)[1]
+        self._items[key] = (image, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def clear(self):
+        self._items.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """计算文件内容的 SHA-1 摘要"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailDiskCache:
+    """
+    持久化的缩略图缓存(SQLite)
+
+    文件摘要按 (路径, 大小, 修改时间) 记录,文件未变化时无需重新计算;
+    缩略图数据以 zlib 压缩后的 PPM 保存。每次调用单独打开连接,可在任意线程中使用
+    """
+
+    def __init__(self, db_path=THUMBNAIL_DB_PATH, max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _DISK_SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def fingerprint(self, path):
+        """
+        获取文件内容摘要(优先使用已记录的结果)
+
+        Returns:
+            str: 摘要,文件无法读取时返回 None
+        """
+        try:
+            stat = os.stat(path)
+            path = os.path.abspath(path)
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        "SELECT digest FROM fingerprints WHERE path = ? AND size = ? AND mtime_ns = ?",
+                        (path, stat.st_size, stat.st_mtime_ns),
+                    ).fetchone()
+                finally:
+                    conn.close()
+            if row:
+                return row[0]
+            digest = file_digest(path)
+            with self._lock:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime_ns, digest),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            return digest
+        except (OSError, sqlite3.Error) as e:
+            print(f"缩略图缓存无法识别文件 {path}: {e}")
+            return None
+
+    def get(self, digest, page_num, box=THUMB_BOX):
+        """
+        读取缩略图
+
+        Returns:
+            tuple: (宽, 高, PPM 数据),未缓存时返回 None
+        """
+        key = (digest, page_num, f"{box[0]}x{box[1]}")
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        "SELECT width, height, data FROM thumbnails WHERE digest = ? AND page = ? AND box = ?", key
+                    ).fetchone()
+                    if row:
+                        conn.execute(
+                            "UPDATE thumbnails SET last_used = ? WHERE digest = ? AND page = ? AND box = ?",
+                            (time.time(), *key),
+                        )
+                        conn.commit()
+                finally:
+                    conn.close()
+            if row:
+                return row[0], row[1], zlib.decompress(row[2])
+        except (sqlite3.Error, zlib.error) as e:
+            print(f"读取缩略图缓存失败: {e}")
+        return None
+
+    def put(self, digest, page_num, width, height, data, box=THUMB_BOX):
+        """写入缩略图,超出容量上限时淘汰最久未使用的条目"""
+        compressed = zlib.compress(data, 1)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO thumbnails "
+                        "(digest, page, box, width, height, data, size, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (digest, page_num, f"{box[0]}x{box[1]}", width, height, compressed,
+                         len(compressed), time.time()),
+                    )
+                    self._evict(conn)
+                    conn.commit()
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            print(f"写入缩略图缓存失败: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 一次淘汰到上限的 80%,避免每次写入都触发淘汰
+        excess = total - self.max_bytes * 0.8
+        removed = 0
+        victims = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM thumbnails ORDER BY last_used"):
+            victims.append((rowid,))
+            removed += size
+            if removed >= excess:
+                break
+        conn.executemany("DELETE FROM thumbnails WHERE rowid = ?", victims)
+        conn.execute(
+            "DELETE FROM fingerprints WHERE digest NOT IN (SELECT DISTINCT digest FROM thumbnails)"
+        )
+
+    def total_bytes(self):
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+                finally:
+                    conn.close()
+        except sqlite3.Error:
+            return 0
+
+
+_disk_cache = None
+
+
+def get_disk_cache():
+    """获取进程内共享的磁盘缓存"""
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = ThumbnailDiskCache()
+    return _disk_cache
+
+
+def load_thumbnail(pdf_path, page_num, box=THUMB_BOX):
+    """
+    获取单个页面的缩略图(优先读取共享的磁盘缓存,未缓存时渲染后写入),可在后台线程中调用
+
+    Returns:
+        tuple: (宽, 高, PPM 数据)
+    """
+    disk_cache = get_disk_cache()
+    digest = disk_cache.fingerprint(pdf_path)
+    cached = disk_cache.get(digest, page_num, box) if digest else None
+    if cached:
+        return cached
+    with fitz.open(pdf_path) as document:
+        width, height, data = render_thumbnail(document, page_num, box)
+    if digest:
+        disk_cache.put(digest, page_num, width, height, data, box)
+    return width, height, data
+
+
+class ThumbnailStrip(ttk.Frame):
+    """横向滚动的虚拟化 PDF 缩略图条,每页带一个选择复选框"""
+
+    SLOT_WIDTH = THUMB_BOX[0] + 20
+    SLOT_HEIGHT = THUMB_BOX[1] + 50
+    # 可见区域左右额外保留的页数
+    BUFFER_SLOTS = 2
+
+    def __init__(self, parent, on_toggle=None, cache_bytes=DEFAULT_CACHE_BYTES, disk_cache=True, **kwargs):
+        """
+        Args:
+            on_toggle: 用户勾选/取消某页时的回调 (页面索引, 是否选中)
+            cache_bytes: 缩略图缓存的内存上限
+            disk_cache: 是否使用共享的磁盘缓存
+        """
+        super().__init__(parent, **kwargs)
+        self.on_toggle = on_toggle
+        self.cache = ThumbnailCache(cache_bytes)
+        self.disk_cache = get_disk_cache() if disk_cache else None
+
+        self.canvas = tk.Canvas(self, bg="white", height=self.SLOT_HEIGHT, xscrollincrement=self.SLOT_WIDTH)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self._on_scroll)
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
+        self.scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_units(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_units(1))
+
+        self.pdf_path = None
+        self.page_count = 0
+        self._selected = PageRanges(0)
+        # 页面索引 -> {'image': 图像项, 'text': 占位文字项, 'window': 复选框窗口项,
+        #              'check': 复选框, 'var': 变量, 'photo': PhotoImage 或 None}
+        self._slots = {}
+        # 当前需要缩略图的页面(后台线程据此跳过已滚出可见区域的请求)
+        self._wanted = set()
+        self._generation = 0
+        self._requests = queue.Queue()
+        self._worker = None
+        self._post = TkDispatcher.for_root(self.winfo_toplevel()).post
+
+    # ---------------- 公共接口 ----------------
+
+    def load(self, pdf_path, page_count, selected=None):
+        """
+        显示新的 PDF
+
+        Args:
+            selected: 初始选中的页面(PageRanges 或页面索引序列),None 表示全部页面
+        """
+        self.clear()
+        self.pdf_path = pdf_path
+        self.page_count = page_count
+        self._selected = self._to_ranges(selected)
+        self.canvas.configure(scrollregion=(0, 0, page_count * self.SLOT_WIDTH, self.SLOT_HEIGHT))
+        self.canvas.xview_moveto(0)
+        self._refresh()
+
+    def clear(self):
+        """清空缩略图条"""
+        self._generation += 1
+        for page_num in list(self._slots):
+            self._remove_slot(page_num)
+        self._wanted.clear()
+        self.cache.clear()
+        self.pdf_path = None
+        self.page_count = 0
+        self._selected = PageRanges(0)
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+
+    def selected_pages(self):
+        """已选中的页面索引(升序)"""
+        return list(self._selected)
+
+    def selection(self):
+        """已选中页面的 PageRanges 副本"""
+        return self._selected.copy()
+
+    def set_selection(self, selected):
+        """替换选中页面(PageRanges 或页面索引序列,None 表示全部页面),不会重新渲染缩略图"""
+        self._selected = self._to_ranges(selected)
+        for page_num, slot in self._slots.items():
+            slot['var'].set(page_num in self._selected)
+
+    def set_all(self, selected):
+        """全选或全不选"""
+        self.set_selection(None if selected else [])
+
+    def _to_ranges(self, selected):
+        if selected is None:
+            return PageRanges.all(self.page_count)
+        if isinstance(selected, PageRanges):
+            return selected.copy()
+        return PageRanges.from_pages(self.page_count, selected)
+
+    def destroy(self):
+        self._generation += 1
+        self._requests.put(None)
+        super().destroy()
+
+    # ---------------- 滚动与可见区域 ----------------
+
+    def _on_scroll(self, *args):
+        self.canvas.xview(*args)
+
+    def _on_xscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _scroll_units(self, units):
+        self.canvas.xview_scroll(units, "units")
+
+    def _on_mousewheel(self, event):
+        self._scroll_units(-1 if event.delta > 0 else 1)
+
+    def _visible_range(self):
+        left = self.canvas.canvasx(0)
+        right = self.canvas.canvasx(max(self.canvas.winfo_width(), self.SLOT_WIDTH))
+        first = max(0, int(left // self.SLOT_WIDTH) - self.BUFFER_SLOTS)
+        last = min(self.page_count, int(right // self.SLOT_WIDTH) + 1 + self.BUFFER_SLOTS)
+        return range(first, last)
+
+    def _refresh(self):
+        """创建进入可见区域的页面控件,销毁离开可见区域的控件"""
+        if not self.page_count:
+            return
+        visible = self._visible_range()
+        for page_num in [p for p in self._slots if p not in visible]:
+            self._remove_slot(page_num)
+        self._wanted = set(visible)
+        for page_num in visible:
+            if page_num not in self._slots:
+                self._create_slot(page_num)
+
+    def _create_slot(self, page_num):
+        x = page_num * self.SLOT_WIDTH + self.SLOT_WIDTH // 2
+        photo = self.cache.get((self.pdf_path, page_num))
+        image_item = self.canvas.create_image(x, 5 + THUMB_BOX[1] // 2, image=photo if photo is not None else "")
+        text_item = None
+        if photo is None:
+            text_item = self.canvas.create_text(x, 5 + THUMB_BOX[1] // 2, text="加载中...", fill="gray")
+            self._request(page_num)
+
+        var = tk.BooleanVar(value=page_num in self._selected)
+        check = ttk.Checkbutton(
+            self.canvas,
+            text=f"第 {page_num + 1} 页",
+            variable=var,
+            command=lambda: self._on_check(page_num, var.get()),
+        )
+        window_item = self.canvas.create_window(x, THUMB_BOX[1] + 25, window=check)
+        self._slots[page_num] = {
+            'image': image_item, 'text': text_item, 'window': window_item,
+            'check': check, 'var': var, 'photo': photo,
+        }
+
+    def _remove_slot(self, page_num):
+        slot = self._slots.pop(page_num)
+        for item in (slot['image'], slot['text'], slot['window']):
+            if item is not None:
+                self.canvas.delete(item)
+        slot['check'].destroy()
+
+    def _on_check(self, page_num, selected):
+        self._selected.set(page_num, selected)
+        if self.on_toggle is not None:
+            self.on_toggle(page_num, selected)
+
+    # ---------------- 后台渲染 ----------------
+
+    def _request(self, page_num):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._render_loop, daemon=True)
+            self._worker.start()
+        self._requests.put((self._generation, self.pdf_path, page_num))
+
+    def _render_loop(self):
+        """后台线程:按请求顺序渲染仍在可见区域中的页面(优先读取磁盘缓存,每个线程单独打开文档)"""
+        document = None
+        document_key = None
+        digest = None
+        try:
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    break
+                generation, pdf_path, page_num = request
+                if generation != self._generation or page_num not in self._wanted:
+                    continue
+                try:
+                    if document_key != (generation, pdf_path):
+                        if document is not None:
+                            document.close()
+                            document = None
+                        document_key = (generation, pdf_path)
+                        digest = self.disk_cache.fingerprint(pdf_path) if self.disk_cache else None
+                    cached = self.disk_cache.get(digest, page_num) if digest else None
+                    if cached:
+                        width, height, data = cached
+                    else:
+                        if document is None:
+                            document = fitz.open(pdf_path)
+                        width, height, data = render_thumbnail(document, page_num)
+                        if digest:
+                            self.disk_cache.put(digest, page_num, width, height, data)
+                except Exception as e:
+                    print(f"生成第 {page_num + 1} 页缩略图失败: {e}")
+                    continue
+                self._post(self._on_rendered, generation, page_num, width, height, data)
+        finally:
+            if document is not None:
+                document.close()
+
+    def _on_rendered(self, generation, page_num, width, height, data):
+        """界面线程:把渲染结果转换为 PhotoImage 并显示"""
+        if generation != self._generation or not self.winfo_exists():
+            return
+        photo = tk.PhotoImage(data=data)
+        self.cache.put((self.pdf_path, page_num), photo, width * height * 4)
+        slot = self._slots.get(page_num)
+        if slot is None:
+            return
+        self.canvas.itemconfigure(slot['image'], image=photo)
+        if slot['text'] is not None:
+            self.canvas.delete(slot['text'])
+            slot['text'] = None
+        # 保留引用,防止 PhotoImage 被回收
+        slot['photo'] = photo
@@ -0,0 +1,686 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+snow 命令行入口
+不需要图形界面即可批量调用各工具的核心功能(与工具窗口共用 PdfCore / ImageCore / AudioCore /
+FileCore / LinkCore / DownloadCore 中的函数),
+可在脚本、定时任务或没有显示器的服务器上运行
+
+用法:
+    python snow.py pdf split 输入.pdf -o 输出目录 --pages-per-file 10
+    python snow.py pdf split 输入.pdf -o 输出目录 --ranges 1-3,5,7-9
+    python snow.py pdf split 输入.pdf -o 输出目录 --bookmarks 1
+    python snow.py pdf split 输入.pdf -o 输出目录 --max-size 10
+    python snow.py pdf merge 输出.pdf 输入1.pdf 输入2.pdf#1-10,15,20- ...
+    python snow.py pdf watermark 输入.pdf -o 输出.pdf --text 机密
+    python snow.py pdf watermark 输入目录 -o 输出目录 --text 机密 --position tile --workers 4
+    python snow.py pdf watermark 输入.pdf -o 输出.pdf --image logo.png --scale 0.2 --position bottomright
+    python snow.py pdf to-images 输入.pdf -o 输出目录 --format jpg --dpi 300 --workers 8
+    python snow.py pdf from-images 输出.pdf 图片或目录 ... --max-side 2000
+    python snow.py pdf to-word 输入.pdf -o 输出.docx --workers 4
+    python snow.py pdf optimize 输入.pdf -o 输出.pdf --preset ebook
+    python snow.py pdf extract 输入.pdf -o 输出.txt --pages 1-10
+    python snow.py pdf index PDF目录
+    python snow.py pdf search "关键词 另一个关键词" --folder PDF目录
+    python snow.py pdf to-word 输入目录 -o 输出目录
+    python snow.py img convert 图片或目录 -o 输出目录 --format webp
+    python snow.py img grid 图片 -o 输出目录
+    python snow.py img icon 图片 -o 输出.ico --size 64
+    python snow.py img combine 图片或目录 ... -o 输出.png --layout horizontal --count 3
+    python snow.py bili compress 输入目录 -o 输出目录 --type cover
+    python snow.py bili links 链接.txt -o 分批结果.txt --batch-size 30 --extract-only
+    python snow.py audio extract 视频或目录 ... -o 输出目录 --format wav
+    python snow.py file tree 目录 -o 目录树.txt --mindmap 思维导图.md
+    python snow.py file clean-empty 目录
+    python snow.py file touch 文件或目录 --modify "2024-01-01 08:00:00" --recursive
+    python snow.py download hf 组织/模型 -d 输出目录 --snapshot
+    python snow.py download modelscope 组织/模型 --local-dir 输出目录
+    python snow.py download images 链接或链接列表.txt ... -o 输出目录
+
+打包版在启动器可执行文件后加 snow 参数调用,如 "启动器.exe snow pdf split ..."
+"""
+
+import os
+import time
+import argparse
+from pathlib import Path
+
+import AudioCore
+import DownloadCore
+import FileCore
+import ImageCore
+import LinkCore
+import PdfCore
+import PdfSearchIndex
+from PageRanges import PageRanges
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_FONT_PATH = PROJECT_ROOT / "Image" / "AlibabaPuHuiTi-3-55-RegularL3.ttf"
+# 图片合成接受的图片格式(与图片合成工具的文件选择框一致)
+COMBINE_INPUT_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+
+
+class ProgressPrinter:
+    """在标准错误输出上显示 "描述 已完成/总数" 进度"""
+
+    def __init__(self, label, quiet=False):
+        self.label = label
+        self.quiet = quiet
+
+    def __call__(self, done, total):
+        if self.quiet:
+            return
+        end = "\n" if done >= total else ""
+        sys.stderr.write(f"\r{self.label} {done}/{total}{end}")
+        sys.stderr.flush()
+
+
+def _expand_inputs(paths, extensions):
+    """把命令行中的文件和目录展开为文件列表(目录中的文件按文件名排序)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in ImageCore.list_images(path, extensions))
+        else:
+            files.append(path)
+    return files
+
+
+def cmd_pdf_split(args):
+    progress = ProgressPrinter("拆分", args.quiet)
+    started = time.perf_counter()
+    if args.ranges:
+        page_count, outputs = PdfCore.split_pdf_by_ranges(args.input, args.output, args.ranges, progress,
+                                                          workers=args.workers, backend=args.backend)
+        message = f"PDF拆分完成! 共提取 {page_count} 页为 {len(outputs)} 个文件"
+    elif args.bookmarks:
+        page_count, outputs = PdfCore.split_pdf_by_bookmarks(args.input, args.output, args.bookmarks, progress,
+                                                             workers=args.workers, backend=args.backend)
+        message = f"PDF拆分完成! 共拆分 {page_count} 页为 {len(outputs)} 个文件"
+    elif args.max_size is not None:
+        page_count, outputs = PdfCore.split_pdf_by_size(args.input, args.output,
+                                                        int(args.max_size * 1024 * 1024), progress)
+        message = f"PDF拆分完成! 共拆分 {page_count} 页为 {len(outputs)} 个文件"
+    else:
+        page_count, outputs = PdfCore.split_pdf_by_count(args.input, args.output, args.pages_per_file, progress,
+                                                         workers=args.workers, backend=args.backend)
+        message = f"PDF拆分完成! 共拆分 {page_count} 页为 {len(outputs)} 个文件"
+    print(f"{message}（{time.perf_counter() - started:.1f} 秒）")
+    return 0
+
+
+def _parse_merge_input(arg):
+    """解析 "路径" 或 "路径#页面范围",返回 (路径, PageRanges 或 None)"""
+    if '#' not in arg or os.path.exists(arg):
+        return arg, None
+    path, expression = arg.rsplit('#', 1)
+    return path, PageRanges.parse(expression, PdfCore.get_page_count(path))
+
+
+def cmd_pdf_merge(args):
+    inputs = [_parse_merge_input(arg) for arg in args.inputs]
+    page_count = PdfCore.merge_pdfs(inputs, args.output, ProgressPrinter("合并", args.quiet), backend=args.backend)
+    print(f"PDF合并完成! 共 {page_count} 页，保存到: {args.output}")
+    return 0
+
+
+def cmd_pdf_watermark(args):
+    options = dict(
+        opacity=args.opacity,
+        position=args.position,
+        progress=ProgressPrinter("加水印", args.quiet),
+        backend=args.backend,
+    )
+    if args.image:
+        task = PdfCore.add_image_watermark
+        options.update(image_path=args.image, scale=args.scale)
+    else:
+        task = PdfCore.add_text_watermark
+        font_path = args.font or (DEFAULT_FONT_PATH if DEFAULT_FONT_PATH.exists() else None)
+        options.update(text=args.text, font_path=font_path, font_size=args.font_size)
+    started = time.perf_counter()
+    failures = []
+    if os.path.isdir(args.input):
+        # 输入为目录时批量处理其中所有 PDF,输出到目录
+        pdf_files = _expand_inputs([args.input], ('.pdf',))
+        page_count, outputs, failures = PdfCore.add_watermark_batch(
+            pdf_files, args.output, workers=args.workers, **options)
+        for path, error in failures:
+            print(f"{path}: {error}", file=sys.stderr)
+        summary = f"共 {len(outputs)} 个文件 {page_count} 页"
+    else:
+        page_count = task(args.input, args.output, **options)
+        summary = f"共 {page_count} 页"
+    elapsed = time.perf_counter() - started
+    print(f"PDF加水印完成! {summary}，保存到: {args.output}"
+          f"（{elapsed:.1f} 秒，{page_count / max(elapsed, 1e-6):.0f} 页/秒）")
+    return 1 if failures else 0
+
+
+def cmd_pdf_to_images(args):
+    pages = None
+    if args.pages:
+        document = PdfCore.fitz.open(args.input)
+        try:
+            total_pages = document.page_count
+        finally:
+            document.close()
+        pages = PdfCore.parse_page_ranges(args.pages, total_pages)
+        if not pages:
+            raise ValueError("页码范围无效: 没有有效的页面被选择")
+    started = time.perf_counter()
+    output_subdir, outputs = PdfCore.pdf_to_images(
+        args.input, args.output, args.format, args.dpi, args.quality, pages,
+        ProgressPrinter("转换", args.quiet), workers=args.workers,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"转换完成! 已保存 {len(outputs)} 个图像到 {output_subdir}"
+          f"（{elapsed:.1f} 秒，{len(outputs) / max(elapsed, 1e-6):.1f} 页/秒）")
+    return 0
+
+
+def cmd_pdf_from_images(args):
+    images = _expand_inputs(args.inputs, None)
+    started = time.perf_counter()
+    added, skipped, saved_bytes = PdfCore.images_to_pdf(images, args.output, ProgressPrinter("添加图片", args.quiet),
+                                           max_side=args.max_side, quality=args.quality, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    for path, error in skipped:
+        print(f"无法处理图片 {os.path.basename(path)}: {error}", file=sys.stderr)
+    print(f"已成功将 {added} 张图片转换为PDF，保存位置: {args.output}（{elapsed:.1f} 秒）")
+    if saved_bytes:
+        print(f"重复的图片只嵌入一次，节省 {saved_bytes / (1024 * 1024):.1f} MB")
+    return 1 if skipped else 0
+
+
+def cmd_pdf_to_word(args):
+    progress = ProgressPrinter("转换", args.quiet)
+    started = time.perf_counter()
+    if os.path.isdir(args.input):
+        # 输入为目录时批量转换其中所有 PDF,输出到目录
+        pdf_files = _expand_inputs([args.input], ('.pdf',))
+        output = args.output or args.input
+        page_count, outputs, failures = PdfCore.pdf_to_word_batch(pdf_files, output, progress, args.workers)
+        for path, error in failures:
+            print(f"{path}: {error}", file=sys.stderr)
+        summary = f"共 {len(outputs)} 个文件 {page_count} 页"
+    else:
+        output = args.output or os.path.splitext(args.input)[0] + ".docx"
+        pages = None
+        if args.pages:
+            pages = PdfCore.parse_page_ranges(args.pages, PdfCore.get_page_count(args.input))
+            if not pages:
+                raise ValueError("页码范围无效: 没有有效的页面被选择")
+        page_count = PdfCore.pdf_to_word(args.input, output, pages, progress, args.workers)
+        failures = []
+        summary = f"共 {page_count} 页"
+    elapsed = time.perf_counter() - started
+    print(f"PDF转换完成! {summary}，保存到: {output}"
+          f"（{elapsed:.1f} 秒，{page_count / max(elapsed, 1e-6):.1f} 页/秒）")
+    return 1 if failures else 0
+
+
+def cmd_pdf_optimize(args):
+    output = args.output or os.path.splitext(args.input)[0] + "_压缩.pdf"
+    report = PdfCore.optimize_pdf(args.input, output, args.preset, subset_fonts=not args.keep_fonts,
+                                  progress=ProgressPrinter("处理图片", args.quiet), workers=args.workers)
+    before, after = report['before'], report['after']
+    print(f"PDF压缩完成! {before / (1024 * 1024):.2f} MB -> {after / (1024 * 1024):.2f} MB"
+          f"（减少 {1 - after / before:.0%}），缩小图片 {report['images']} 张，"
+          f"用时 {report['elapsed']:.1f} 秒，保存到: {output}")
+    return 0
+
+
+def cmd_pdf_extract(args):
+    pages = None
+    if args.pages:
+        pages = PdfCore.parse_page_ranges(args.pages, PdfCore.get_page_count(args.input))
+        if not pages:
+            raise ValueError("页码范围无效: 没有有效的页面被选择")
+    texts = PdfCore.extract_text(args.input, pages, ProgressPrinter("提取", args.quiet or not args.output),
+                                 args.backend, args.workers)
+    # 页与页之间用换页符分隔
+    content = "\f".join(texts)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"提取完成! 共 {len(texts)} 页，保存到: {args.output}")
+    else:
+        sys.stdout.write(content)
+    return 0
+
+
+def cmd_pdf_index(args):
+    index = PdfSearchIndex.get_search_index()
+    failed = 0
+    for folder in args.folders:
+        report = index.update_folder(folder, ProgressPrinter("提取文字", args.quiet), args.workers)
+        for path, error in report['failures']:
+            print(f"{path}: {error}", file=sys.stderr)
+        failed += len(report['failures'])
+        documents, pages = index.stats(folder)
+        print(f"{folder}: 已索引 {documents} 个文件 {pages} 页（新增 {report['added']}，更新 {report['updated']}，"
+              f"移除 {report['removed']}，未变化 {report['unchanged']}，用时 {report['elapsed']:.1f} 秒）")
+    return 1 if failed else 0
+
+
+def cmd_pdf_search(args):
+    started = time.perf_counter()
+    hits = PdfSearchIndex.get_search_index().search(args.query, args.folder, args.limit)
+    for pdf_path, page_num, snippet in hits:
+        print(f"{pdf_path}:{page_num + 1}: {snippet}")
+    if not args.quiet:
+        print(f"共 {len(hits)} 页（{(time.perf_counter() - started) * 1000:.0f} 毫秒）", file=sys.stderr)
+    return 0 if hits else 1
+
+
+def cmd_img_convert(args):
+    if os.path.isdir(args.input):
+        success_count, failed = ImageCore.convert_folder(
+            args.input, args.output, args.format, args.quality,
+            overwrite=not args.no_overwrite,
+            progress=ProgressPrinter("转换", args.quiet),
+        )
+        for filename, error in failed:
+            print(f"{filename}: {error}", file=sys.stderr)
+        print(f"批量转换完成 - 成功: {success_count}, 失败: {len(failed)}")
+        return 1 if failed else 0
+
+    os.makedirs(args.output, exist_ok=True)
+    name = os.path.splitext(os.path.basename(args.input))[0]
+    output_path = os.path.join(args.output, f"{name}.{args.format}")
+    ImageCore.convert_image(args.input, output_path, args.format, args.quality)
+    print(f"图片转换完成! 保存到: {output_path}")
+    return 0
+
+
+def cmd_img_grid(args):
+    save_dir, outputs = ImageCore.split_grid(args.input, args.output, args.rows, args.cols,
+                                             ProgressPrinter("分割", args.quiet))
+    print(f"图片已成功分割为{len(outputs)}份，保存在 {save_dir}")
+    return 0
+
+
+def cmd_img_icon(args):
+    size = ImageCore.parse_icon_size(args.size)
+    ImageCore.convert_to_ico(args.input, args.output, size)
+    print(f"ICO文件已保存到: {args.output}")
+    return 0
+
+
+def cmd_img_combine(args):
+    image_paths = _expand_inputs(args.inputs, COMBINE_INPUT_EXTENSIONS)
+    saved = ImageCore.combine_and_save(image_paths, args.output, args.layout, args.select, args.count,
+                                       ProgressPrinter("合成", args.quiet))
+    print(f"已保存 {len(saved)} 张图片到: {os.path.dirname(os.path.abspath(args.output))}")
+    return 0
+
+
+def cmd_bili_compress(args):
+    def on_file(name, ok, message):
+        if not ok:
+            print(f"失败: {name}: {message}", file=sys.stderr)
+
+    total, failed = ImageCore.compress_bili_images(
+        args.input, args.output, args.type, ProgressPrinter("压缩", args.quiet), on_file
+    )
+    print(f"完成！成功处理 {total - len(failed)}/{total} 个文件")
+    return 1 if failed else 0
+
+
+def _read_text(path):
+    """读取文本文件,路径为 - 时读取标准输入"""
+    if path == '-':
+        return sys.stdin.read()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def cmd_bili_links(args):
+    links = LinkCore.parse_links(_read_text(args.input), args.extract_only)
+    if not links:
+        raise ValueError("没有有效的链接可处理！")
+    output_text = LinkCore.format_batches(LinkCore.split_links(links, args.batch_size), args.batch_size)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output_text)
+        print(f"共 {len(links)} 条链接，结果已保存到: {args.output}")
+    else:
+        print(output_text)
+    return 0
+
+
+def cmd_audio_extract(args):
+    video_files = _expand_inputs(args.inputs, AudioCore.VIDEO_EXTENSIONS)
+    if not video_files:
+        raise ValueError("未找到视频文件")
+    failures = AudioCore.extract_audio_batch(video_files, args.output, '.' + args.format,
+                                             ProgressPrinter("提取", args.quiet))
+    for video_file, error in failures:
+        print(f"{video_file}: {error}", file=sys.stderr)
+    print(f"完成！成功提取 {len(video_files) - len(failures)}/{len(video_files)} 个文件")
+    return 1 if failures else 0
+
+
+def cmd_file_tree(args):
+    ignore = FileCore.DEFAULT_TREE_IGNORE + (args.ignore or [])
+    tree = FileCore.format_dir_tree(args.directory, ignore)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(tree)
+        print(f"目录树已保存到: {args.output}")
+    else:
+        print(tree, end='')
+    if args.mindmap:
+        FileCore.write_mindmap(args.directory, args.mindmap)
+        print(f"思维导图已保存到: {args.mindmap}")
+    return 0
+
+
+def cmd_file_clean_empty(args):
+    count = FileCore.remove_empty_folders(args.directory)
+    print(f"已删除 {count} 个空文件夹")
+    return 0
+
+
+def cmd_file_touch(args):
+    times = {name: FileCore.parse_time(getattr(args, name)) if getattr(args, name) else None
+             for name in ('create', 'modify', 'access')}
+
+    def on_file(path, success, msg):
+        if not success:
+            print(f"{path}: {msg}", file=sys.stderr)
+
+    results = FileCore.modify_times(args.path, times['create'], times['modify'], times['access'],
+                                    recursive=args.recursive,
+                                    progress=ProgressPrinter("修改", args.quiet), on_file=on_file)
+    print(f"完成 - 成功: {results['success']}, 失败: {results['failed']}")
+    return 1 if results['failed'] else 0
+
+
+def cmd_download_hf(args):
+    repo_id = DownloadCore.normalize_repo_id(args.repo)
+    dest_path = DownloadCore.build_dest_dir(repo_id, args.dest)
+    DownloadCore.ensure_clean_dest(dest_path, args.force)
+    logger = (lambda message: None) if args.quiet else None
+    if args.snapshot:
+        DownloadCore.download_snapshot(repo_id, dest_path, args.revision, args.token, logger)
+    else:
+        DownloadCore.clone_repository(repo_id, dest_path, args.revision, args.token, logger)
+    print(f"已下载到: {dest_path}")
+    return 0
+
+
+def cmd_download_modelscope(args):
+    downloader = DownloadCore.ModelScopeDownloader(log_callback=None if args.quiet else print)
+    try:
+        success = downloader.download(args.model, args.file, args.local_dir)
+    except RuntimeError as e:
+        raise ValueError(str(e))
+    print("下载完成！" if success else "下载失败", file=sys.stdout if success else sys.stderr)
+    return 0 if success else 1
+
+
+def cmd_download_images(args):
+    urls = []
+    for source in args.sources:
+        if source.startswith(("http://", "https://")):
+            urls.append(source)
+        else:
+            urls.extend(DownloadCore.parse_image_urls(_read_text(source)))
+
+    def on_file(url, ok, msg):
+        if not ok:
+            print(f"{url}:{msg}", file=sys.stderr)
+
+    success_count, fail_count = DownloadCore.download_images(
+        urls, args.output, ProgressPrinter("下载", args.quiet), on_file
+    )
+    print(f"下载完成！成功: {success_count} 张 / 失败: {fail_count} 张 / 总计: {len(urls)} 张")
+    return 1 if fail_count else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='snow', description="宁宝工具集命令行")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不显示进度")
+    groups = parser.add_subparsers(dest='group', metavar='{pdf,img,bili,audio,file,download}')
+    groups.required = True
+
+    # ---- PDF 工具 ----
+    pdf = groups.add_parser('pdf', help="PDF工具").add_subparsers(dest='command')
+    pdf.required = True
+
+    p = pdf.add_parser('split', help="PDF拆分")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', required=True, help="输出目录")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument('--pages-per-file', type=int, default=1, help="按页数拆分：每份页数（默认 1）")
+    mode.add_argument('--ranges', help="按范围拆分：页码范围，如 1-3,5,7-9")
+    mode.add_argument('--bookmarks', type=int, metavar='LEVEL', help="按书签拆分：使用到第几级书签")
+    mode.add_argument('--max-size', type=float, metavar='MB', help="按大小拆分：每份最大 MB 数")
+    p.add_argument('--workers', type=int, help="最多使用的进程数（默认 CPU 核数）")
+    p.add_argument('--backend', choices=PdfCore.SPLIT_BACKENDS, default='pymupdf',
+                   help="拆分后端（默认 pymupdf；按大小拆分只支持 pymupdf）")
+    p.set_defaults(func=cmd_pdf_split)
+
+    p = pdf.add_parser('merge', help="PDF合并")
+    p.add_argument('output', help="输出PDF")
+    p.add_argument('inputs', nargs='+', help="按顺序合并的PDF，可用 路径#1-10,15,20- 只合并部分页面")
+    p.add_argument('--backend', choices=PdfCore.MERGE_BACKENDS, default='pymupdf', help="合并后端（默认 pymupdf）")
+    p.set_defaults(func=cmd_pdf_merge)
+
+    p = pdf.add_parser('watermark', help="PDF加水印")
+    p.add_argument('input', help="PDF 文件或包含 PDF 的目录")
+    p.add_argument('-o', '--output', required=True, help="输出PDF（输入为目录时为输出目录）")
+    kind = p.add_mutually_exclusive_group(required=True)
+    kind.add_argument('--text', help="水印文字")
+    kind.add_argument('--image', help="水印图片（如 logo.png）")
+    p.add_argument('--scale', type=float, default=0.3, help="图片宽度占页面宽度的比例（默认 0.3）")
+    p.add_argument('--font', help="TTF 字体文件（默认使用项目自带字体）")
+    p.add_argument('--font-size', type=int, default=40)
+    p.add_argument('--opacity', type=float, default=0.3)
+    p.add_argument('--position', choices=PdfCore.WATERMARK_POSITIONS, default='center', help="tile 为倾斜平铺满整页")
+    p.add_argument('--backend', choices=PdfCore.WATERMARK_BACKENDS, default='pymupdf',
+                   help="加水印后端（默认 pymupdf）")
+    p.add_argument('--workers', type=int, help="批量处理时最多使用的进程数（默认 CPU 核数）")
+    p.set_defaults(func=cmd_pdf_watermark)
+
+    p = pdf.add_parser('to-images', help="PDF转图片")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', required=True, help="输出目录")
+    p.add_argument('--format', choices=PdfCore.IMAGE_FORMATS, default='png')
+    p.add_argument('--dpi', type=int, default=150)
+    p.add_argument('--quality', type=int, default=95, help="JPG 质量 1-100")
+    p.add_argument('--pages', help="页码范围，如 1-3,5（默认全部页面）")
+    p.add_argument('--workers', type=int, help="并行渲染的进程数（默认 CPU 核数，1 为单进程）")
+    p.set_defaults(func=cmd_pdf_to_images)
+
+    p = pdf.add_parser('from-images', help="图片转PDF")
+    p.add_argument('output', help="输出PDF")
+    p.add_argument('inputs', nargs='+', help="图片文件或图片目录")
+    p.add_argument('--max-side', type=int, help="图片最长边超过此像素数时缩小后再嵌入（默认嵌入原图）")
+    p.add_argument('--quality', type=int, default=85, help="缩小后重新编码的 JPEG 质量 1-100")
+    p.add_argument('--workers', type=int, help="缩小图片时并行处理的进程数（默认 CPU 核数）")
+    p.set_defaults(func=cmd_pdf_from_images)
+
+    p = pdf.add_parser('to-word', help="PDF转Word")
+    p.add_argument('input', help="PDF 文件或包含 PDF 的目录")
+    p.add_argument('-o', '--output', help="输出 .docx（默认与输入同名；输入为目录时为输出目录）")
+    p.add_argument('--pages', help="页码范围，如 1-3,5（默认全部页面）")
+    p.add_argument('--workers', type=int, help="并行解析的进程数（默认 CPU 核数，1 为单进程）")
+    p.set_defaults(func=cmd_pdf_to_word)
+
+    p = pdf.add_parser('optimize', help="PDF压缩")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', help="输出PDF（默认为 原文件名_压缩.pdf）")
+    p.add_argument('--preset', choices=list(PdfCore.OPTIMIZE_PRESETS), default='ebook',
+                   help="screen=72 DPI，ebook=150 DPI，print=300 DPI，lossless=不处理图片（默认 ebook）")
+    p.add_argument('--keep-fonts', action='store_true', help="不做字体子集化")
+    p.add_argument('--workers', type=int, help="缩小图片时并行处理的进程数（默认 CPU 核数）")
+    p.set_defaults(func=cmd_pdf_optimize)
+
+    p = pdf.add_parser('extract', help="提取文字")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', help="输出文本文件（默认输出到标准输出，页与页之间用换页符分隔）")
+    p.add_argument('--pages', help="页码范围，如 1-3,5（默认全部页面）")
+    p.add_argument('--backend', choices=PdfCore.EXTRACT_BACKENDS, default='pymupdf', help="提取后端（默认 pymupdf）")
+    p.add_argument('--workers', type=int, help="并行提取的进程数（默认 CPU 核数，1 为单进程）")
+    p.set_defaults(func=cmd_pdf_extract)
+
+    p = pdf.add_parser('index', help="建立或增量更新全文搜索索引")
+    p.add_argument('folders', nargs='+', help="包含 PDF 的目录（含子目录）")
+    p.add_argument('--workers', type=int, help="并行提取的进程数（默认 CPU 核数，1 为单进程）")
+    p.set_defaults(func=cmd_pdf_index)
+
+    p = pdf.add_parser('search', help="在全文搜索索引中搜索")
+    p.add_argument('query', help="关键词，多个关键词用空格分隔，双引号中的内容作为整体搜索")
+    p.add_argument('--folder', help="只搜索该目录中的文件（默认整个索引）")
+    p.add_argument('--limit', type=int, default=50, help="最多显示的结果数（默认 50）")
+    p.set_defaults(func=cmd_pdf_search)
+
+    # ---- 图片工具 ----
+    img = groups.add_parser('img', help="图片工具").add_subparsers(dest='command')
+    img.required = True
+
+    p = img.add_parser('convert', help="图片格式转换")
+    p.add_argument('input', help="图片文件或图片目录")
+    p.add_argument('-o', '--output', required=True, help="输出目录")
+    p.add_argument('--format', choices=ImageCore.SUPPORTED_FORMATS, required=True)
+    p.add_argument('--quality', type=int, default=95)
+    p.add_argument('--no-overwrite', action='store_true', help="批量模式下跳过已存在的输出文件")
+    p.set_defaults(func=cmd_img_convert)
+
+    p = img.add_parser('grid', help="九宫格分割")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', required=True, help="输出目录")
+    p.add_argument('--rows', type=int, default=3)
+    p.add_argument('--cols', type=int, default=3)
+    p.set_defaults(func=cmd_img_grid)
+
+    p = img.add_parser('icon', help="图片转ICO")
+    p.add_argument('input')
+    p.add_argument('-o', '--output', required=True, help="输出 .ico")
+    p.add_argument('--size', default='64', help="尺寸，如 64 或 64x64（16-256）")
+    p.set_defaults(func=cmd_img_icon)
+
+    p = img.add_parser('combine', help="图片合成")
+    p.add_argument('inputs', nargs='+', help="图片文件或图片目录")
+    p.add_argument('-o', '--output', required=True, help="输出图片，扩展名决定格式（.jpg/.png/.bmp）")
+    p.add_argument('--layout', choices=ImageCore.COMBINE_LAYOUTS, default='uniform',
+                   help="uniform=均匀分布，horizontal=水平排列，vertical=垂直排列，random=随机分布")
+    p.add_argument('--select', type=int, default=0, help="随机选择的图片数（默认 0 表示全部）")
+    p.add_argument('--count', type=int, default=1, help="导出数量，大于 1 时文件名加 _1、_2 …")
+    p.set_defaults(func=cmd_img_combine)
+
+    # ---- B站工具 ----
+    bili = groups.add_parser('bili', help="B站工具").add_subparsers(dest='command')
+    bili.required = True
+
+    p = bili.add_parser('compress', help="封面与表情包图片批量压缩")
+    p.add_argument('input', help="输入目录")
+    p.add_argument('-o', '--output', required=True, help="输出目录")
+    p.add_argument('--type', choices=['cover', 'emoji'], default='cover', help="cover=封面，emoji=表情包")
+    p.set_defaults(func=cmd_bili_compress)
+
+    p = bili.add_parser('links', help="带货链接分批处理")
+    p.add_argument('input', help="每行一条链接的文本文件，- 表示标准输入")
+    p.add_argument('-o', '--output', help="保存分批结果的文本文件（默认输出到屏幕）")
+    p.add_argument('--batch-size', type=int, default=LinkCore.DEFAULT_BATCH_SIZE, help="每批链接数量（默认 30）")
+    p.add_argument('--extract-only', action='store_true', help="只提取每行中的链接")
+    p.set_defaults(func=cmd_bili_links)
+
+    # ---- 音频工具 ----
+    audio = groups.add_parser('audio', help="音频工具").add_subparsers(dest='command')
+    audio.required = True
+
+    p = audio.add_parser('extract', help="视频音频提取（需要 FFmpeg）")
+    p.add_argument('inputs', nargs='+', help="视频文件或视频目录")
+    p.add_argument('-o', '--output', help="输出目录（默认与视频相同的目录）")
+    p.add_argument('--format', choices=['mp3', 'wav'], default='mp3')
+    p.set_defaults(func=cmd_audio_extract)
+
+    # ---- 文件工具 ----
+    file = groups.add_parser('file', help="文件工具").add_subparsers(dest='command')
+    file.required = True
+
+    p = file.add_parser('tree', help="文件目录树生成")
+    p.add_argument('directory')
+    p.add_argument('-o', '--output', help="保存目录树的文本文件（默认输出到屏幕）")
+    p.add_argument('--mindmap', metavar='MD', help="同时保存 markmap 思维导图 Markdown 文件")
+    p.add_argument('--ignore', nargs='*', help="额外忽略的文件或文件夹名称")
+    p.set_defaults(func=cmd_file_tree)
+
+    p = file.add_parser('clean-empty', help="空文件夹清理")
+    p.add_argument('directory')
+    p.set_defaults(func=cmd_file_clean_empty)
+
+    p = file.add_parser('touch', help="文件时间修改")
+    p.add_argument('path', help="文件或文件夹")
+    p.add_argument('--create', metavar='TIME', help="创建时间 YYYY-MM-DD HH:MM:SS（仅 Windows）")
+    p.add_argument('--modify', metavar='TIME', help="修改时间 YYYY-MM-DD HH:MM:SS")
+    p.add_argument('--access', metavar='TIME', help="访问时间 YYYY-MM-DD HH:MM:SS")
+    p.add_argument('--recursive', action='store_true', help="包括子文件夹（同时修改各级文件夹本身的时间）")
+    p.set_defaults(func=cmd_file_touch)
+
+    # ---- 下载工具 ----
+    download = groups.add_parser('download', help="下载工具").add_subparsers(dest='command')
+    download.required = True
+
+    p = download.add_parser('hf', help="Hugging Face 模型下载")
+    p.add_argument('repo', help="模型仓库 ID 或 URL，如 bytedance-research/Lance")
+    p.add_argument('-d', '--dest', help="输出目录（默认当前目录下与仓库同名的目录）")
+    p.add_argument('-r', '--revision', help="分支、标签或提交")
+    p.add_argument('--token', help="访问令牌（默认使用 HF_TOKEN 环境变量）")
+    p.add_argument('--snapshot', action='store_true', help="只下载模型快照文件")
+    p.add_argument('--force', action='store_true', help="先删除已存在的输出目录")
+    p.set_defaults(func=cmd_download_hf)
+
+    p = download.add_parser('modelscope', help="ModelScope 模型下载（需要 modelscope 命令）")
+    p.add_argument('model', help="模型名称，如 Qwen/Qwen2.5-7B-Instruct")
+    p.add_argument('--file', help="只下载模型中的单个文件")
+    p.add_argument('--local-dir', help="输出目录")
+    p.set_defaults(func=cmd_download_modelscope)
+
+    p = download.add_parser('images', help="图片批量下载")
+    p.add_argument('sources', nargs='+', help="图片链接，或每行一条链接的文本文件（- 表示标准输入）")
+    p.add_argument('-o', '--output', default=str(Path.home() / "Downloads"), help="输出目录（默认 ~/Downloads）")
+    p.set_defaults(func=cmd_download_images)
+
+    return parser
+
+
+def _check_args(parser, args):
+    """检查 argparse 无法表达的参数组合,不支持时按参数错误退出"""
+    if getattr(args, 'func', None) is cmd_pdf_split and args.max_size is not None:
+        # 按大小拆分需要逐段写出验证大小,只能用 PyMuPDF 在当前进程中顺序执行
+        if args.backend != 'pymupdf':
+            parser.error("--max-size 只支持 --backend pymupdf")
+        if args.workers is not None:
+            parser.error("--max-size 按顺序拆分，不支持 --workers")
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    Returns:
+        int: 退出码(0 成功,1 部分或全部失败,2 参数错误)
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+    try:
+        return args.func(args)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"错误: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+工具启动耗时分析
+以 "python -X importtime" 运行工具脚本,在工具进入 Tk 主循环、首个窗口显示后立即关闭,
+统计每个工具的首窗耗时以及导入耗时最多的模块
+
+用法:
+    python Core/StartupProfile.py                 # 分析所有工具
+    python Core/StartupProfile.py 工具脚本.py ...  # 分析指定工具
+    python Core/StartupProfile.py --top 5         # 每个工具列出导入最慢的 5 个模块
+"""
+
+import os
+import json
+import time
+import subprocess
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+REPORT_PREFIX = "@@STARTUP@@"
+
+
+def find_tools():
+    """列出项目中所有工具脚本"""
+    return sorted(PROJECT_ROOT.glob("*/*-V3.py"))
+
+
+def parse_importtime(stderr_text):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        tuple: (所有模块自身耗时之和(微秒), [(顶层模块名, 累计耗时(微秒)), ...])
+    """
+    total_self = 0
+    top_level = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        total_self += self_us
+        name = parts[2].rstrip()
+        # 包名前只有一个空格的是被直接导入的顶层模块
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((name.strip(), cumulative_us))
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return total_self, top_level
+
+
+def profile_tool(tool_path, timeout=120):
+    """
+    分析单个工具的启动耗时
+
+    Returns:
+        dict: 包含 tool、window_ms、import_ms、top_imports、lazy_imports、error 的结果
+    """
+    env = os.environ.copy()
+    env['MAIN_APP_AUTHORIZED'] = '1'
+    started_at = time.time()
+    result = {'tool': Path(tool_path).name, 'window_ms': None, 'import_ms': None,
+              'top_imports': [], 'lazy_imports': [], 'error': None}
+    try:
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', str(Path(__file__).resolve()), '--child', str(tool_path)],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout,
+            env=env,
+        )
+    except subprocess.TimeoutExpired:
+        result['error'] = "超时"
+        return result
+
+    for line in proc.stdout.splitlines():
+        if line.startswith(REPORT_PREFIX):
+            report = json.loads(line[len(REPORT_PREFIX):])
+            if report.get('window_at'):
+                result['window_ms'] = (report['window_at'] - started_at) * 1000
+            result['lazy_imports'] = report.get('lazy_imports', [])
+            result['error'] = report.get('error')
+            break
+    else:
+        result['error'] = f"未进入主循环(退出码 {proc.returncode})"
+
+    total_self, top_level = parse_importtime(proc.stderr)
+    result['import_ms'] = total_self / 1000
+    result['top_imports'] = [(name, us / 1000) for name, us in top_level]
+    return result
+
+
+def _child_main(tool_path):
+    """子进程:运行工具脚本,在首个窗口显示后输出报告并退出"""
+    import runpy
+    import tkinter
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import LazyImport
+
+    def emit(**report):
+        report['lazy_imports'] = LazyImport.IMPORT_TIMES
+        sys.__stdout__.write(REPORT_PREFIX + json.dumps(report) + "\n")
+        sys.__stdout__.flush()
+
+    def patched_mainloop(self, n=0):
+        # 处理完挂起的绘制事件即视为首个窗口已显示
+        self.update()
+        emit(window_at=time.time())
+        self.destroy()
+        os._exit(0)
+
+    tkinter.Misc.mainloop = patched_mainloop
+    tkinter.mainloop = lambda n=0: patched_mainloop(tkinter._default_root, n)
+
+    sys.argv = [tool_path]
+    sys.path[0] = os.path.dirname(tool_path)
+    try:
+        runpy.run_path(tool_path, run_name='__main__')
+    except SystemExit:
+        pass
+    except Exception as e:
+        emit(window_at=None, error=f"{type(e).__name__}: {e}")
+
+
+def main(argv):
+    top = 3
+    if '--top' in argv:
+        index = argv.index('--top')
+        top = int(argv[index + 1])
+        del argv[index:index + 2]
+    tools = [Path(p) for p in argv] if argv else find_tools()
+
+    print(f"{'工具':<48}{'首窗耗时':>12}{'导入耗时':>12}  导入最慢的模块")
+    for tool_path in tools:
+        result = profile_tool(tool_path)
+        window = f"{result['window_ms']:.0f} ms" if result['window_ms'] is not None else "-"
+        imports = f"{result['import_ms']:.0f} ms" if result['import_ms'] is not None else "-"
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in result['top_imports'][:top])
+        print(f"{result['tool']:<48}{window:>12}{imports:>12}  {slowest}")
+        if result['lazy_imports']:
+            lazy = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in result['lazy_imports'])
+            print(f"{'':<48}按需导入: {lazy}")
+        if result['error']:
+            print(f"{'':<48}错误: {result['error']}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == '--child':
+        _child_main(sys.argv[2])
+    else:
+        main(sys.argv[1:])
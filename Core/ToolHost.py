@@ -0,0 +1,601 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+工具宿主进程模块
+启动器预先拉起若干"热"子进程并提前导入常用重型依赖,
+点击工具时直接把脚本交给空闲子进程用 runpy 执行,省去解释器冷启动和重复导入的开销
+
+另提供可选的共享宿主模式(SharedToolHost):一个常驻子进程通过管道接收请求,
+每个工具在其中的独立线程里运行,打包版重复启动工具时不再重复初始化整个程序包
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import subprocess
+from pathlib import Path
+
+from LaunchTelemetry import install_child_hooks, set_current_launch, report_peak_rss
+
+
+# 预热进程提前导入的模块(缺失的模块会被跳过)
+PRELOAD_MODULES = [
+    'tkinter',
+    'tkinter.ttk',
+    'tkinter.filedialog',
+    'tkinter.messagebox',
+    'PIL.Image',
+    'PIL.ImageTk',
+    'fitz',
+    'PyPDF2',
+    'numpy',
+    'sympy',
+]
+
+
+class ToolWorker:
+    """单个工具宿主子进程的句柄"""
+
+    def __init__(self, command, preload=True):
+        args = list(command)
+        if not preload:
+            args.append('--no-preload')
+        self.process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,
+            text=True,
+            encoding='utf-8',
+            env=os.environ.copy(),
+        )
+        self.ready = False
+        self.preload_seconds = None
+
+    def wait_ready(self):
+        """等待子进程完成预热,返回是否就绪"""
+        if self.ready:
+            return True
+        message = self._read_event()
+        if message and message.get('event') == 'ready':
+            self.ready = True
+            self.preload_seconds = message.get('preload')
+        return self.ready
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def run(self, tool_path, env=None):
+        """
+        把工具脚本交给子进程执行
+
+        Args:
+            tool_path: 工具脚本的绝对路径
+            env: 需要在子进程中追加的环境变量
+
+        Returns:
+            bool: 子进程是否确认已开始执行工具脚本
+        """
+        request = {'cmd': 'run', 'path': str(tool_path), 'env': env or {}}
+        try:
+            self.process.stdin.write(json.dumps(request) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return False
+        message = self._read_event()
+        started = bool(message and message.get('event') == 'started')
+        # 工具开始运行后不再与子进程通信
+        self._close_pipes()
+        return started
+
+    def terminate(self):
+        self._close_pipes()
+        if self.is_alive():
+            try:
+                self.process.terminate()
+            except OSError:
+                pass
+
+    def _read_event(self):
+        try:
+            line = self.process.stdout.readline()
+        except (OSError, ValueError):
+            return None
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def _close_pipes(self):
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                if stream:
+                    stream.close()
+            except OSError:
+                pass
+
+
+class ToolHost:
+    """工具宿主进程池 - 始终保持 pool_size 个预热完成的空闲子进程"""
+
+    def __init__(self, command, pool_size=1):
+        """
+        Args:
+            command: 启动宿主子进程的命令行(开发模式为 python ToolHost.py --worker)
+            pool_size: 常驻的预热子进程数量
+        """
+        self.command = list(command)
+        self.pool_size = max(0, int(pool_size))
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._filling = False
+        self.latencies = {'cold': [], 'warm': []}
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """在后台线程中补足预热子进程"""
+        with self._lock:
+            if self._filling or self._closed:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill_pool, daemon=True).start()
+
+    def _fill_pool(self):
+        try:
+            self._fill_pool_once()
+        finally:
+            with self._lock:
+                self._filling = False
+
+    def _fill_pool_once(self):
+        while not self._closed:
+            with self._lock:
+                self._idle = [w for w in self._idle if w.is_alive()]
+                if len(self._idle) >= self.pool_size:
+                    return
+            try:
+                worker = ToolWorker(self.command, preload=True)
+            except OSError as e:
+                print(f"预热进程启动失败: {e}")
+                return
+            if not worker.wait_ready():
+                worker.terminate()
+                return
+            with self._lock:
+                if self._closed:
+                    worker.terminate()
+                    return
+                self._idle.append(worker)
+
+    def _acquire(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop(0)
+                if worker.is_alive() and worker.ready:
+                    return worker
+                worker.terminate()
+        return None
+
+    def launch(self, tool_path, env=None, on_exit=None):
+        """
+        启动工具,优先使用预热子进程,没有空闲进程时现场拉起一个冷进程
+
+        Args:
+            tool_path: 工具脚本的绝对路径
+            env: 需要在子进程中追加的环境变量
+            on_exit: 工具进程退出时的回调,参数为退出码
+
+        Returns:
+            tuple: (模式 'warm'/'cold', 启动耗时秒数)
+        """
+        started_at = time.perf_counter()
+        worker = self._acquire()
+        mode = 'warm'
+        if worker is None:
+            mode = 'cold'
+            worker = ToolWorker(self.command, preload=False)
+            if not worker.wait_ready():
+                worker.terminate()
+                raise RuntimeError("工具宿主进程启动失败")
+        if not worker.run(tool_path, env):
+            worker.terminate()
+            raise RuntimeError("工具宿主进程未能执行工具脚本")
+        elapsed = time.perf_counter() - started_at
+        self.latencies[mode].append(elapsed)
+        if on_exit is not None:
+            _watch_exit(worker.process, on_exit)
+        # 用掉一个预热进程后立刻在后台补充
+        self.start()
+        return mode, elapsed
+
+    def average_latency(self, mode):
+        values = self.latencies.get(mode) or []
+        return sum(values) / len(values) if values else None
+
+    def latency_summary(self):
+        """返回冷/热启动平均耗时的简短描述"""
+        parts = []
+        for mode, label in (('cold', '冷启动'), ('warm', '预热启动')):
+            avg = self.average_latency(mode)
+            if avg is not None:
+                parts.append(f"{label}平均 {avg * 1000:.0f} ms ({len(self.latencies[mode])} 次)")
+        return ",".join(parts)
+
+    def shutdown(self):
+        """关闭所有空闲的预热子进程(正在运行工具的子进程不受影响)"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.terminate()
+
+
+class SharedToolHost:
+    """共享工具宿主 - 一个常驻子进程,每个工具在其中的独立线程(独立 Tk 解释器)中运行"""
+
+    def __init__(self, command, on_tool_failed=None, env=None):
+        """
+        Args:
+            command: 启动宿主子进程的命令行(会追加 --shared 参数)
+            on_tool_failed: 工具在共享进程中启动失败或宿主进程退出时的回调,参数为 (工具路径, 错误信息)
+            env: 宿主进程额外的环境变量,由其中的所有工具共用
+        """
+        self.command = list(command) + ['--shared']
+        self.on_tool_failed = on_tool_failed
+        self.env = dict(env or {})
+        self.latencies = []
+        self._process = None
+        self._next_id = 0
+        self._running = {}
+        self._pending = {}
+        self._exit_callbacks = {}
+        self._lock = threading.Lock()
+
+    def _ensure_process(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,
+            text=True,
+            encoding='utf-8',
+            env={**os.environ, **self.env},
+        )
+        line = self._process.stdout.readline()
+        if not line or json.loads(line).get('event') != 'ready':
+            self._process.kill()
+            self._process = None
+            raise RuntimeError("共享工具宿主进程启动失败")
+        threading.Thread(target=self._read_events, args=(self._process,), daemon=True).start()
+
+    def _read_events(self, process):
+        """后台读取宿主进程的事件"""
+        for line in process.stdout:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            request_id = event.get('id')
+            finished = event.get('event') in ('failed', 'exited')
+            with self._lock:
+                waiter = self._pending.pop(request_id, None)
+                tool_path = self._running.get(request_id)
+                on_exit = None
+                if finished:
+                    self._running.pop(request_id, None)
+                    on_exit = self._exit_callbacks.pop(request_id, None)
+            if waiter is not None:
+                waiter['event'] = event
+                waiter['done'].set()
+            if on_exit is not None:
+                _call_exit_callback(on_exit, 0 if event.get('event') == 'exited' else 1)
+            if event.get('event') == 'failed' and tool_path:
+                self._notify_failed(tool_path, event.get('error', ''))
+
+        # 宿主进程退出:已开始运行的工具视为崩溃,尚未确认启动的请求由 launch 抛出异常
+        with self._lock:
+            crashed = [path for request_id, path in self._running.items() if request_id not in self._pending]
+            exit_callbacks = [callback for request_id, callback in self._exit_callbacks.items()
+                              if request_id not in self._pending]
+            pending = list(self._pending.values())
+            self._running, self._pending, self._exit_callbacks = {}, {}, {}
+        for waiter in pending:
+            waiter['done'].set()
+        code = process.wait()
+        for on_exit in exit_callbacks:
+            _call_exit_callback(on_exit, code)
+        if code != 0:
+            for tool_path in crashed:
+                self._notify_failed(tool_path, f"共享工具宿主进程异常退出(退出码 {code})")
+
+    def _notify_failed(self, tool_path, error):
+        if self.on_tool_failed:
+            try:
+                self.on_tool_failed(tool_path, error)
+            except Exception as e:
+                print(f"工具失败回调出错: {e}")
+
+    def launch(self, tool_path, env=None, timeout=10, on_exit=None):
+        """
+        在共享宿主进程中启动工具
+
+        Args:
+            on_exit: 工具线程结束时的回调,参数为退出码(正常结束为 0,出错为 1,宿主进程崩溃时为其退出码)
+
+        Returns:
+            float: 启动耗时秒数(至工具脚本开始执行)
+        """
+        started_at = time.perf_counter()
+        with self._lock:
+            self._ensure_process()
+            self._next_id += 1
+            request_id = self._next_id
+            waiter = {'done': threading.Event(), 'event': None}
+            self._pending[request_id] = waiter
+            self._running[request_id] = str(tool_path)
+            if on_exit is not None:
+                self._exit_callbacks[request_id] = on_exit
+            request = {'cmd': 'run', 'id': request_id, 'path': str(tool_path), 'env': env or {}}
+            try:
+                self._process.stdin.write(json.dumps(request) + '\n')
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self._pending.pop(request_id, None)
+                self._running.pop(request_id, None)
+                self._exit_callbacks.pop(request_id, None)
+                raise RuntimeError("共享工具宿主进程已退出")
+        if not waiter['done'].wait(timeout) or not waiter['event'] or waiter['event'].get('event') != 'started':
+            with self._lock:
+                self._exit_callbacks.pop(request_id, None)
+            raise RuntimeError("共享工具宿主进程未能执行工具脚本")
+        elapsed = time.perf_counter() - started_at
+        self.latencies.append(elapsed)
+        return elapsed
+
+    def shutdown(self):
+        """关闭请求管道,宿主进程在所有工具窗口关闭后自行退出"""
+        process = self._process
+        if process is not None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+
+def _call_exit_callback(on_exit, code):
+    try:
+        on_exit(code)
+    except Exception as e:
+        print(f"工具退出回调出错: {e}")
+
+
+def _watch_exit(process, on_exit):
+    """在后台线程中等待进程退出并回调退出码"""
+    threading.Thread(target=lambda: _call_exit_callback(on_exit, process.wait()), daemon=True).start()
+
+
+def _send(stream, **event):
+    stream.write(json.dumps(event) + '\n')
+    stream.flush()
+
+
+def _preload_modules():
+    import importlib
+    for module_name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            continue
+
+
+def _show_launch_error(e):
+    try:
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("启动失败", f"工具启动失败：{e}")
+        root.destroy()
+    except Exception:
+        print(f"工具启动失败：{e}")
+
+
+def _install_thread_local_tk_root():
+    """
+    让 tkinter 的"默认根窗口"按线程区分
+
+    共享宿主中每个工具线程都会创建自己的 Tk 解释器,未指定 master 的
+    PhotoImage、StringVar、messagebox 等必须落在本线程的解释器上
+    """
+    import tkinter
+    from tkinter import commondialog, simpledialog
+
+    local = threading.local()
+    original_init = tkinter.Tk.__init__
+    original_destroy = tkinter.Tk.destroy
+
+    def patched_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        if getattr(local, 'root', None) is None:
+            local.root = self
+
+    def patched_destroy(self):
+        if getattr(local, 'root', None) is self:
+            local.root = None
+        original_destroy(self)
+
+    def get_default_root(what=None):
+        root = getattr(local, 'root', None)
+        if root is None:
+            if what:
+                raise RuntimeError(f"Too early to {what}: no default root window")
+            root = tkinter.Tk()
+        return root
+
+    def get_temp_root():
+        root = getattr(local, 'root', None)
+        if root is None:
+            root = tkinter.Tk()
+            root._temporary = True
+            root.withdraw()
+        return root
+
+    tkinter.Tk.__init__ = patched_init
+    tkinter.Tk.destroy = patched_destroy
+    tkinter._get_default_root = get_default_root
+    tkinter._get_temp_root = get_temp_root
+    commondialog._get_temp_root = get_temp_root
+    simpledialog._get_temp_root = get_temp_root
+
+
+def _exec_tool_script(tool_path):
+    """
+    以 __name__ == '__main__' 执行工具脚本,使用独立的全局命名空间
+
+    不使用 runpy.run_path:它会临时替换进程内唯一的 sys.modules['__main__'] 和 sys.argv[0],
+    多个工具线程同时运行时相互覆盖,恢复顺序错乱后 __main__ 会停留在某个工具脚本上,
+    spawn 方式启动的进程池子进程会重新加载这个(可能已经关闭的)工具脚本。
+    这里 sys.modules['__main__'] 始终是宿主入口脚本
+    """
+    import builtins
+
+    with open(tool_path, 'rb') as f:
+        code = compile(f.read(), tool_path, 'exec')
+    namespace = {
+        '__name__': '__main__',
+        '__file__': tool_path,
+        '__builtins__': builtins,
+        '__doc__': None,
+        '__package__': None,
+        '__spec__': None,
+        '__loader__': None,
+        '__cached__': None,
+    }
+    exec(code, namespace)
+
+
+def _shared_worker_loop(channel):
+    """
+    共享宿主:持续接收运行请求,每个工具在独立线程中运行
+
+    请求中的环境变量(启动编号等)只交给对应的工具线程,不写入进程共享的 os.environ;
+    所有工具共用的环境变量在创建 SharedToolHost 时通过 env 参数设置
+    """
+    channel_lock = threading.Lock()
+
+    def send(**event):
+        with channel_lock:
+            try:
+                _send(channel, **event)
+            except (OSError, ValueError):
+                pass
+
+    def run_tool(request_id, tool_path, env):
+        try:
+            set_current_launch(int(env['SNOW_LAUNCH_ID']), float(env['SNOW_LAUNCH_AT']))
+        except (KeyError, ValueError):
+            pass
+        try:
+            _exec_tool_script(tool_path)
+        except SystemExit:
+            pass
+        except BaseException as e:
+            send(event='failed', id=request_id, error=f"{type(e).__name__}: {e}")
+            return
+        finally:
+            # 共享进程只能统计到整个宿主进程的峰值内存
+            report_peak_rss()
+        send(event='exited', id=request_id)
+
+    _install_thread_local_tk_root()
+    install_child_hooks(report_rss_at_exit=False)
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if request.get('cmd') != 'run':
+            continue
+        tool_path = request['path']
+        env = request.get('env') or {}
+        thread = threading.Thread(target=run_tool, args=(request.get('id'), tool_path, env), name=os.path.basename(tool_path))
+        thread.start()
+        send(event='started', id=request.get('id'))
+    # 启动器关闭管道后不再接收请求,进程在所有工具线程结束后退出
+
+
+def worker_main(preload=True, shared=False):
+    """宿主子进程入口:预热 -> 等待运行请求 -> 用 runpy 执行工具脚本"""
+    # 协议通道独占原始 stdout,工具自身的 print 输出改走 stderr
+    channel = sys.stdout
+    sys.stdout = sys.stderr
+
+    started_at = time.perf_counter()
+    if preload:
+        _preload_modules()
+    _send(channel, event='ready', preload=time.perf_counter() - started_at)
+
+    if shared:
+        _shared_worker_loop(channel)
+        return
+
+    line = sys.stdin.readline()
+    if not line:
+        return
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError:
+        return
+    if request.get('cmd') != 'run':
+        return
+
+    os.environ.update(request.get('env') or {})
+    _send(channel, event='started')
+    try:
+        channel.close()
+    except OSError:
+        pass
+    run_main(request['path'])
+
+
+def run_main(tool_path):
+    """在当前进程中运行工具脚本(独立进程模式的入口),并安装启动统计钩子"""
+    import runpy
+
+    install_child_hooks()
+    # 与 "python 工具.py" 的运行环境保持一致
+    sys.argv = [tool_path]
+    sys.path[0] = os.path.dirname(tool_path)
+    try:
+        runpy.run_path(tool_path, run_name='__main__')
+    except SystemExit:
+        raise
+    except Exception as e:
+        _show_launch_error(e)
+        sys.exit(1)
+
+
+def get_worker_command():
+    """获取开发模式下启动宿主子进程的命令行"""
+    return [sys.executable, str(Path(__file__).resolve()), '--worker']
+
+
+def get_run_command(tool_path):
+    """获取开发模式下在独立进程中运行工具的命令行"""
+    return [sys.executable, str(Path(__file__).resolve()), '--run', str(tool_path)]
+
+
+if __name__ == '__main__':
+    if '--worker' in sys.argv:
+        worker_main(preload='--no-preload' not in sys.argv, shared='--shared' in sys.argv)
+    elif len(sys.argv) >= 3 and sys.argv[1] == '--run':
+        run_main(sys.argv[2])
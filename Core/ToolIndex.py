@@ -0,0 +1,156 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+工具目录索引模块
+每个工具分类目录只做一次 os.scandir,在后台线程中建立 "目录 -> 文件名集合" 的索引,
+启动时先使用上次保存的索引渲染界面,扫描完成后再刷新;
+之后定时检查各目录的修改时间,目录内容变化时自动重新扫描该目录
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+
+
+# 上次扫描结果的缓存文件
+INDEX_CACHE_PATH = Path(__file__).resolve().parent / "tool_index.json"
+
+
+class ToolIndex:
+    """工具目录索引类"""
+
+    def __init__(self, directories, cache_path=INDEX_CACHE_PATH):
+        """
+        Args:
+            directories: 需要建立索引的目录列表
+            cache_path: 索引缓存文件路径,为 None 时不读写缓存
+        """
+        self.directories = sorted({os.path.normpath(str(d)) for d in directories})
+        self.cache_path = cache_path
+        self._entries = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.scanned = False
+
+    def load_cached(self):
+        """读取上次保存的索引,返回是否读取成功"""
+        if not self.cache_path:
+            return False
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict):
+            return False
+        with self._lock:
+            for directory in self.directories:
+                names = data.get(directory)
+                if isinstance(names, list):
+                    self._entries[directory] = set(names)
+        return bool(self._entries)
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            data = {d: sorted(names) for d, names in self._entries.items()}
+        try:
+            tmp_path = Path(self.cache_path).with_name(f"tool_index.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _dir_mtime(directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _scan_dir(directory):
+        """单次 os.scandir 读取目录下的文件名"""
+        try:
+            with os.scandir(directory) as it:
+                return {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            return set()
+
+    def scan(self, directories=None):
+        """
+        扫描目录并更新索引
+
+        Args:
+            directories: 需要扫描的目录,默认扫描全部
+
+        Returns:
+            bool: 索引内容是否发生变化
+        """
+        changed = False
+        for directory in directories or self.directories:
+            mtime = self._dir_mtime(directory)
+            names = self._scan_dir(directory)
+            with self._lock:
+                if self._entries.get(directory) != names:
+                    self._entries[directory] = names
+                    changed = True
+                self._mtimes[directory] = mtime
+        self.scanned = True
+        if changed:
+            self._save_cache()
+        return changed
+
+    def changed_directories(self):
+        """通过目录修改时间找出内容可能发生变化的目录"""
+        with self._lock:
+            mtimes = dict(self._mtimes)
+        return [d for d in self.directories if self._dir_mtime(d) != mtimes.get(d)]
+
+    def contains(self, directory, file_name):
+        """
+        查询文件是否存在于索引中
+
+        Returns:
+            bool/None: 存在返回 True,不存在返回 False,目录尚未建立索引时返回 None
+        """
+        directory = os.path.normpath(str(directory))
+        with self._lock:
+            names = self._entries.get(directory)
+        if names is None:
+            return None
+        return file_name in names
+
+    def start_watching(self, on_change, interval=2.0):
+        """
+        在后台线程中完成首次扫描,之后每隔 interval 秒检查目录变化
+
+        Args:
+            on_change: 索引变化(以及首次扫描完成)时的回调,参数为是否首次扫描
+            interval: 检查目录修改时间的间隔秒数
+        """
+        def notify(first_scan):
+            try:
+                on_change(first_scan)
+            except Exception as e:
+                print(f"工具索引更新回调出错: {e}")
+
+        def worker():
+            self.scan()
+            notify(True)
+            while not self._stop.wait(interval):
+                directories = self.changed_directories()
+                if directories and self.scan(directories):
+                    notify(False)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def stop(self):
+        """停止目录监视"""
+        self._stop.set()
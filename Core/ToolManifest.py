@@ -0,0 +1,67 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+工具清单模块
+所有工具在 Core/tools.json 中登记(分类、分类目录、工具名称、脚本文件名,
+可选的 isolated 标记表示该工具始终在独立进程中运行),
+启动器只读取一次清单并缓存结果,新增工具时只需修改清单文件
+"""
+
+import json
+from pathlib import Path
+from functools import lru_cache
+
+
+MANIFEST_PATH = Path(__file__).resolve().parent / "tools.json"
+
+
+class ToolManifestError(Exception):
+    """工具清单格式错误"""
+
+
+@lru_cache(maxsize=None)
+def load_manifest(manifest_path=str(MANIFEST_PATH)):
+    """
+    读取工具清单(结果会被缓存,同一进程内只解析一次)
+
+    Returns:
+        tuple: (tools, category_map, isolated)
+            tools: {分类名称: {工具名称: 脚本文件名}},保持清单中的顺序
+            category_map: {分类名称: 分类目录名}
+            isolated: 标记为 isolated 的脚本文件名集合
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ToolManifestError(f"无法读取工具清单 {manifest_path}：{e}")
+
+    tools = {}
+    category_map = {}
+    isolated = set()
+    for category in data.get('categories', []):
+        try:
+            name = category['name']
+            category_map[name] = category['folder']
+            tools[name] = {tool['name']: tool['file'] for tool in category.get('tools', [])}
+            isolated.update(tool['file'] for tool in category.get('tools', []) if tool.get('isolated'))
+        except (KeyError, TypeError) as e:
+            raise ToolManifestError(f"工具清单格式错误：{e}")
+    return tools, category_map, frozenset(isolated)
+
+
+def get_tools():
+    """获取 {分类名称: {工具名称: 脚本文件名}}"""
+    return load_manifest()[0]
+
+
+def get_category_map():
+    """获取 {分类名称: 分类目录名}"""
+    return load_manifest()[1]
+
+
+def get_isolated_tools():
+    """获取必须在独立进程中运行的脚本文件名集合"""
+    return load_manifest()[2]
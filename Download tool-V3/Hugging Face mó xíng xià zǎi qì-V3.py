@@ -3,24 +3,22 @@ from __future__ import annotations
 
 import argparse
 import os
-import re
-import shutil
-import subprocess
 import sys
 import threading
 import tkinter as tk
 from pathlib import Path
 from tkinter import BooleanVar, StringVar, filedialog, messagebox, scrolledtext
-from fontTools.ttLib import TTFont
-
-from huggingface_hub import snapshot_download
-
-
-def log_message(message: str, logger=None) -> None:
-    if logger:
-        logger(message)
-    else:
-        print(message)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from DownloadCore import (
+    build_dest_dir,
+    clone_repository,
+    download_snapshot,
+    ensure_clean_dest,
+    normalize_dest_path,
+    normalize_repo_id,
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -61,85 +59,6 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def normalize_repo_id(repo: str) -> str:
-    repo = repo.strip()
-    if repo.endswith("/"):
-        repo = repo[:-1]
-    match = re.search(r"huggingface\.co/(.+)", repo)
-    if match:
-        repo = match.group(1)
-    return repo
-
-
-def normalize_dest_path(dest: str | None, repo_id: str | None = None) -> Path:
-    if dest:
-        normalized = os.path.normpath(os.path.expandvars(dest.strip()))
-        return Path(normalized).expanduser().resolve()
-    if repo_id is None:
-        raise ValueError("Destination directory or repo ID is required.")
-    repo_name = Path(repo_id).name
-    return (Path.cwd() / repo_name).resolve()
-
-
-def build_dest_dir(repo_id: str, dest: str | None) -> Path:
-    return normalize_dest_path(dest, repo_id=repo_id)
-
-
-def ensure_clean_dest(dest_path: Path, force: bool) -> None:
-    if dest_path.exists():
-        if not force:
-            raise FileExistsError(
-                f"Destination '{dest_path}' already exists. Use --force to overwrite."
-            )
-        shutil.rmtree(dest_path)
-
-
-def clone_repository(
-    repo_id: str,
-    dest_path: Path,
-    revision: str | None,
-    token: str | None,
-    logger=None,
-) -> None:
-    auth_token = token or os.environ.get("HF_TOKEN")
-    log_message(f"Downloading model '{repo_id}' into '{dest_path}'...", logger)
-    cache_path = snapshot_download(
-        repo_id=repo_id,
-        revision=revision,
-        token=auth_token,
-        local_files_only=False,
-    )
-    if Path(cache_path) == dest_path:
-        log_message(f"Snapshot downloaded directly into '{dest_path}'.", logger)
-        return
-    log_message(f"Copying from cache to '{dest_path}'...", logger)
-    shutil.copytree(cache_path, dest_path)
-    log_message("Download complete.", logger)
-
-
-def download_snapshot(
-    repo_id: str,
-    dest_path: Path,
-    revision: str | None,
-    token: str | None,
-    logger=None,
-) -> None:
-    auth_token = token or os.environ.get("HF_TOKEN")
-    log_message(f"Downloading snapshot for '{repo_id}'...", logger)
-    cache_path = snapshot_download(
-        repo_id=repo_id,
-        revision=revision,
-        token=auth_token,
-        local_files_only=False,
-    )
-    if Path(cache_path) == dest_path:
-        log_message(f"Snapshot downloaded directly into '{dest_path}'.", logger)
-        return
-    log_message(f"Copying snapshot from cache to '{dest_path}'...", logger)
-    shutil.copytree(cache_path, dest_path)
-    log_message("Snapshot copy complete.", logger)
-
-
 class HFCloneGUI:
     def __init__(self) -> None:
         # 首先检查授权
@@ -177,14 +96,8 @@ class HFCloneGUI:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -235,24 +148,13 @@ class HFCloneGUI:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         self.current_font = (font_name, 10)
         self.root.option_add("*Font", self.current_font)
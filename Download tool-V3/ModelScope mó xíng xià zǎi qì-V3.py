@@ -4,58 +4,16 @@ sys.dont_write_bytecode = True
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-import subprocess
 import threading
 import os
 from pathlib import Path
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from DownloadCore import ModelScopeDownloader
 
 ICON_PATH = "Image/icon.ico"
 
-class ModelScopeDownloader:
-    def __init__(self, log_callback=None):
-        self.log_callback = log_callback
-        self.download_process = None
-
-    def log(self, message):
-        if self.log_callback:
-            self.log_callback(message)
-
-    def download(self, model_name, file_name=None, local_dir=None):
-        if not model_name:
-            raise ValueError("模型名称不能为空")
-
-        self.log(f"[开始] 下载: {model_name}")
-        cmd = ["modelscope", "download", "--model", model_name]
-        if file_name:
-            cmd.extend([file_name, "--local_dir", local_dir or "."])
-        elif local_dir:
-            cmd.extend(["--local_dir", local_dir])
-
-        return self._run_command(cmd)
-
-    def _run_command(self, cmd):
-        try:
-            self.download_process = subprocess.Popen(
-                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
-            )
-            for line in self.download_process.stdout:
-                self.log(line.strip())
-            self.download_process.wait()
-            return self.download_process.returncode == 0
-        except FileNotFoundError:
-            self.log("[错误] 未找到 modelscope 命令，请先安装: pip install modelscope")
-            raise RuntimeError("未找到 modelscope 命令！")
-        except Exception as e:
-            self.log(f"[错误] {e}")
-            raise
-
-    def cancel(self):
-        if self.download_process:
-            self.download_process.terminate()
-            self.log("[取消] 下载已取消")
-
-
 class DownloaderGUI:
     def __init__(self, root):
         # 首先检查开源协议文档是否存在并验证完整性
@@ -86,14 +44,8 @@ class DownloaderGUI:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -145,28 +97,16 @@ class DownloaderGUI:
             self.root.option_add("*Font", self.current_font)
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             print(f"警告：无法从字体文件获取字体名称：{font_path}，将使用默认字体")
             self.current_font = ("Microsoft YaHei", 10)
             self.root.option_add("*Font", self.current_font)
-            tt.close()
             return
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
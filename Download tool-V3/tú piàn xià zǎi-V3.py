@@ -2,48 +2,16 @@
 from __future__ import annotations
 
 import os
-import re
-import subprocess
 import threading
 import tkinter as tk
 from pathlib import Path
 from tkinter import StringVar, filedialog, messagebox, scrolledtext
-from urllib.parse import unquote, urlparse
-
-import requests
-from fontTools.ttLib import TTFont
-
-
-def sanitize_filename(url: str) -> str:
-    """从 URL 中提取合适的文件名"""
-    parsed = urlparse(url)
-    path = unquote(parsed.path)
-    filename = Path(path).name
-    # 去掉 @ 后面的尺寸信息 (如 @800w)
-    filename = re.sub(r'@[^.]+', '', filename)
-    # 如果文件名为空或只有扩展名，使用默认名
-    name, ext = os.path.splitext(filename)
-    if not name:
-        filename = f"downloaded_image{ext or '.png'}"
-    # 去掉 query 参数
-    if '?' in filename:
-        filename = filename.split('?')[0]
-    return filename
-
-
-def resolve_filename(dest_dir: Path, base_filename: str) -> Path:
-    """解决文件名冲突：如果文件已存在，添加序号后缀"""
-    name, ext = os.path.splitext(base_filename)
-    file_path = dest_dir / base_filename
-    if not file_path.exists():
-        return file_path
-    counter = 1
-    while True:
-        new_name = f"{name}_{counter}{ext}"
-        file_path = dest_dir / new_name
-        if not file_path.exists():
-            return file_path
-        counter += 1
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+import DownloadCore
 
 
 class ImageDownloaderGUI:
@@ -70,14 +38,8 @@ class ImageDownloaderGUI:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
         return False
@@ -121,22 +83,13 @@ class ImageDownloaderGUI:
             self.root.destroy()
             return
 
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
 
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        # 使用 Windows API 注册字体
+        FontManager.register_font(font_path)
 
         self.current_font = (font_name, 10)
         self.root.option_add("*Font", self.current_font)
@@ -224,12 +177,7 @@ class ImageDownloaderGUI:
         raw_text = self.url_text.get("1.0", tk.END).strip()
         if not raw_text:
             return []
-        urls = []
-        for line in raw_text.splitlines():
-            line = line.strip()
-            if line and (line.startswith("http://") or line.startswith("https://")):
-                urls.append(line)
-        return urls
+        return DownloadCore.parse_image_urls(raw_text)
 
     def _on_start(self) -> None:
         urls = self._parse_urls()
@@ -253,67 +201,21 @@ class ImageDownloaderGUI:
         )
         thread.start()
 
-    def _download_one(self, url: str, dest_dir: Path, session: requests.Session) -> tuple[bool, str]:
-        """下载单张图片，返回 (成功与否, 消息)"""
-        base_name = sanitize_filename(url)
-        file_path = resolve_filename(dest_dir, base_name)
-
-        try:
-            response = session.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if self._cancel_flag:
-                        f.close()
-                        try:
-                            file_path.unlink()
-                        except Exception:
-                            pass
-                        return False, "已终止"
-                    if chunk:
-                        f.write(chunk)
-
-            file_size = file_path.stat().st_size
-            return True, f"  → 保存至: {file_path.name} ({self._format_size(file_size)})"
-
-        except requests.exceptions.RequestException as e:
-            return False, f"  ✗ 请求失败: {e}"
-        except Exception as e:
-            return False, f"  ✗ 错误: {e}"
-
     def _run_batch_download(self, urls: list[str], dest_dir: str) -> None:
         dest_path = Path(dest_dir).expanduser().resolve()
-        dest_path.mkdir(parents=True, exist_ok=True)
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                          "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Referer": "https://www.bilibili.com/",
-        }
-        session = requests.Session()
-        session.headers.update(headers)
-
-        success_count = 0
-        fail_count = 0
         total = len(urls)
+        done = [0]
 
-        for i, url in enumerate(urls, 1):
-            if self._cancel_flag:
-                self._append_log(f"\n下载被终止。")
-                break
-
-            self._append_log(f"[{i}/{total}] {url}")
-
-            ok, msg = self._download_one(url, dest_path, session)
+        def on_file(url: str, ok: bool, msg: str) -> None:
+            done[0] += 1
+            self._append_log(f"[{done[0]}/{total}] {url}")
             self._append_log(msg)
 
-            if ok:
-                success_count += 1
-            else:
-                fail_count += 1
-
-        session.close()
+        success_count, fail_count = DownloadCore.download_images(
+            urls, dest_path, on_file=on_file, should_cancel=lambda: self._cancel_flag
+        )
+        if self._cancel_flag:
+            self._append_log("\n下载被终止。")
 
         # 汇总
         self._append_log("")
@@ -329,14 +231,6 @@ class ImageDownloaderGUI:
                 f"批量下载完成！\n成功: {success_count} / 失败: {fail_count} / 总计: {total}\n保存目录:\n{dest_path}"
             ))
 
-    @staticmethod
-    def _format_size(size: int) -> str:
-        for unit in ('B', 'KB', 'MB', 'GB'):
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
-
     def run(self) -> None:
         self.root.mainloop()
 
@@ -1,11 +1,13 @@
 import os
 import sys
-import subprocess
 from pathlib import Path
 import json
 import tkinter as tk
 from tkinter import font, filedialog, messagebox
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+import FileCore
 
 
 class EmptyFolderCleaner:
@@ -33,14 +35,8 @@ class EmptyFolderCleaner:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -83,24 +79,13 @@ class EmptyFolderCleaner:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         self.current_font = (font_name, 10)
         self.root.option_add("*Font", self.current_font)
@@ -133,23 +118,10 @@ class EmptyFolderCleaner:
             return
             
         try:
-            count = self._remove_empty_folders(target_dir)
+            count = FileCore.remove_empty_folders(target_dir)
             messagebox.showinfo("完成", f"已删除 {count} 个空文件夹")
         except Exception as e:
             messagebox.showerror("错误", str(e))
-            
-    def _remove_empty_folders(self, folder):
-        count = 0
-        for root, dirs, files in os.walk(folder, topdown=False):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                try:
-                    if not os.listdir(dir_path):
-                        os.rmdir(dir_path)
-                        count += 1
-                except Exception:
-                    continue
-        return count
 
 if __name__ == "__main__":
     # Windows系统设置应用ID（必须在创建窗口之前）
@@ -3,36 +3,17 @@ import sys
 sys.dont_write_bytecode = True
 
 import os
-import subprocess
 from pathlib import Path
 from tkinter import *
 from tkinter import filedialog, messagebox
-from fontTools.ttLib import TTFont
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(__file__), "..", "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from FileCore import format_dir_tree, write_mindmap
 
 
-def generate_dir_tree(path='.', ignore=None, prefix=''):
-    if ignore is None:
-        ignore = ['.git', '__pycache__', '.DS_Store']
-    try:
-        items = sorted(os.listdir(path))
-    except PermissionError:
-        return f"无法访问 {path}：权限不足\n"
-    result = ""
-    for i, item in enumerate(items):
-        if item in ignore:
-            continue
-        full_path = os.path.join(path, item)
-        is_last = i == len(items) - 1
-        # 添加当前项到结果
-        result += prefix + ('└── ' if is_last else '├── ') + item + '\n'
-        # 如果是目录，递归处理
-        if os.path.isdir(full_path):
-            new_prefix = prefix + ('    ' if is_last else '│   ')
-            result += generate_dir_tree(full_path, ignore, new_prefix)
-    return result
 class DirTreeGUI:
     def __init__(self, root):
         """初始化应用界面和配置"""
@@ -83,14 +64,8 @@ class DirTreeGUI:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -141,24 +116,13 @@ class DirTreeGUI:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         self.font_family = font_name
         self.current_font = (self.font_family, 12)
@@ -205,10 +169,7 @@ class DirTreeGUI:
             self.output_text.insert(END, "请输入有效的目录路径")
             return
         self.output_text.delete('1.0', END)
-        ignore_list = ['.git', '__pycache__', '.DS_Store']
-        result = generate_dir_tree(directory, ignore=ignore_list)
-        self.output_text.insert(END, f"目录结构（忽略: {', '.join(ignore_list)}）:\n\n")
-        self.output_text.insert(END, result)
+        self.output_text.insert(END, format_dir_tree(directory))
     def save_result(self):
         result = self.output_text.get('1.0', END)
         if not result.strip():
@@ -240,36 +201,11 @@ class DirTreeGUI:
             return
             
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write("# 目录结构思维导图\n\n")
-                f.write("``markmap\n")
-                f.write("{\n")
-                f.write('  "text": "' + os.path.basename(directory) + '",\n')
-                f.write('  "children": [\n')
-                self._write_mindmap_items(directory, f, 1)
-                f.write("  ]\n")
-                f.write("}\n")
-                f.write("```\n")
+            write_mindmap(directory, file_path)
             messagebox.showinfo("成功", "思维导图文件已保存")
         except Exception as e:
             messagebox.showerror("错误", f"保存思维导图时出错: {str(e)}")
 
-    def _write_mindmap_items(self, path, file, depth):
-        items = sorted(os.listdir(path))
-        for i, item in enumerate(items):
-            full_path = os.path.join(path, item)
-            is_last = i == len(items) - 1
-            
-            indent = "    " * depth
-            file.write(indent + '{\n')
-            file.write(indent + '  "text": "' + item + '",\n')
-            
-            if os.path.isdir(full_path):
-                file.write(indent + '  "children": [\n')
-                self._write_mindmap_items(full_path, file, depth + 1)
-                file.write(indent + '  ]\n')
-            
-            file.write(indent + '}' + ('' if is_last else ',') + '\n')
     def clear_output(self):
         self.output_text.delete('1.0', END)
         self.dir_entry.delete(0, END)
@@ -2,13 +2,15 @@ import os
 import sys
 import time
 import random
-import subprocess
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import datetime
 import threading
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+import FileCore
 
 
 class TimeModifierApp:
@@ -160,14 +162,8 @@ class TimeModifierApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -185,24 +181,13 @@ class TimeModifierApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -239,80 +224,6 @@ class TimeModifierApp:
         except ValueError:
             return False
     
-    def parse_time(self, time_str):
-        """解析时间字符串为时间戳"""
-        dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-        return dt.timestamp()
-    
-    def modify_single_file(self, file_path, create_time, modify_time, access_time):
-        """修改单个文件的时间属性"""
-        try:
-            # Windows系统使用os.utime修改访问和修改时间
-            if self.apply_access_var.get() or self.apply_modify_var.get():
-                atime = access_time if self.apply_access_var.get() else os.stat(file_path).st_atime
-                mtime = modify_time if self.apply_modify_var.get() else os.stat(file_path).st_mtime
-                os.utime(file_path, (atime, mtime))
-            
-            # Windows系统创建时间需要使用win32api或subprocess调用powershell
-            if self.apply_create_var.get():
-                import subprocess
-                create_time_str = datetime.fromtimestamp(create_time).strftime("%Y-%m-%dT%H:%M:%S")
-                cmd = f'powershell -Command "(Get-Item \'{file_path}\').CreationTime=\'{create_time_str}\'"'
-                subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            
-            return True, "成功"
-        except Exception as e:
-            return False, str(e)
-    
-    def process_files(self, path, create_time, modify_time, access_time):
-        """处理文件或文件夹"""
-        results = {"success": 0, "failed": 0, "total": 0}
-        
-        if os.path.isfile(path):
-            # 处理单个文件
-            results["total"] = 1
-            success, msg = self.modify_single_file(path, create_time, modify_time, access_time)
-            if success:
-                results["success"] += 1
-            else:
-                results["failed"] += 1
-        
-        elif os.path.isdir(path):
-            # 处理文件夹
-            if self.recursive_var.get():
-                # 递归处理
-                for root, dirs, files in os.walk(path):
-                    for name in files:
-                        file_path = os.path.join(root, name)
-                        results["total"] += 1
-                        success, msg = self.modify_single_file(file_path, create_time, modify_time, access_time)
-                        if success:
-                            results["success"] += 1
-                        else:
-                            results["failed"] += 1
-                    
-                    # 如果需要也修改文件夹本身的时间
-                    if self.apply_create_var.get() or self.apply_modify_var.get() or self.apply_access_var.get():
-                        results["total"] += 1
-                        success, msg = self.modify_single_file(root, create_time, modify_time, access_time)
-                        if success:
-                            results["success"] += 1
-                        else:
-                            results["failed"] += 1
-            else:
-                # 仅处理顶层文件
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-                    if os.path.isfile(item_path):
-                        results["total"] += 1
-                        success, msg = self.modify_single_file(item_path, create_time, modify_time, access_time)
-                        if success:
-                            results["success"] += 1
-                        else:
-                            results["failed"] += 1
-        
-        return results
-    
     def start_modification(self):
         """开始修改"""
         path = self.path_var.get().strip()
@@ -339,9 +250,9 @@ class TimeModifierApp:
             return
         
         # 解析时间
-        create_time = self.parse_time(self.create_time_var.get()) if self.apply_create_var.get() else None
-        modify_time = self.parse_time(self.modify_time_var.get()) if self.apply_modify_var.get() else None
-        access_time = self.parse_time(self.access_time_var.get()) if self.apply_access_var.get() else None
+        create_time = FileCore.parse_time(self.create_time_var.get()) if self.apply_create_var.get() else None
+        modify_time = FileCore.parse_time(self.modify_time_var.get()) if self.apply_modify_var.get() else None
+        access_time = FileCore.parse_time(self.access_time_var.get()) if self.apply_access_var.get() else None
         
         # 在新线程中执行
         thread = threading.Thread(target=self.execute_modification, args=(path, create_time, modify_time, access_time))
@@ -353,7 +264,8 @@ class TimeModifierApp:
         self.status_var.set("正在处理...")
         
         try:
-            results = self.process_files(path, create_time, modify_time, access_time)
+            results = FileCore.modify_times(path, create_time, modify_time, access_time,
+                                            recursive=self.recursive_var.get())
             
             self.status_var.set(f"完成 - 成功: {results['success']}, 失败: {results['failed']}")
             
@@ -1,10 +1,11 @@
 import os
 import sys
-import subprocess
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
 
 # 单位字典定义为全局常量
 # 单位分类字典
@@ -202,14 +203,8 @@ def check_license():
         PROJECT_ROOT = Path(__file__).resolve().parent.parent
         CORE_DIR = PROJECT_ROOT / "Core"
         license_exe_path = CORE_DIR / "LICENSE.exe"
-        if license_exe_path.exists():
-            result = subprocess.run(
-                [str(license_exe_path), '--quiet'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
+        # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+        return LicenseCache.verify(license_exe_path, timeout=5)[0]
     except Exception as e:
         print(f"许可证验证异常: {e}")
         return False
@@ -226,24 +221,13 @@ def load_font():
         messagebox.showerror("错误", f"找不到字体文件：{font_path}")
         return None
     
-    # 使用 fonttools 获取字体名称
-    tt = TTFont(str(font_path))
-    font_name = None
-    for record in tt['name'].names:
-        if record.nameID == 1:  # Font Family
-            font_name = record.toUnicode()
-            break
+    # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+    font_name = FontManager.get_family_name(font_path)
     if not font_name:
         raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-    tt.close()
     
     # 使用 Windows API 注册字体
-    if os.name == 'nt':
-        import ctypes
-        GDI32 = ctypes.windll.gdi32
-        font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-        GDI32.AddFontResourceW(font_path_str)
-        print(f"成功加载自定义字体: {font_path}")
+    FontManager.register_font(font_path)
     
     from tkinter import font as tkfont
     current_font = (font_name, 10)
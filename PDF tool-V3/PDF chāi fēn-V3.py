@@ -6,9 +6,12 @@ import os
 import json
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, font
-from PyPDF2 import PdfReader, PdfWriter
 from pathlib import Path
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfCore import split_pdf_by_count, split_pdf_by_ranges, split_pdf_by_bookmarks, split_pdf_by_size
+from JobScheduler import get_scheduler
 
 
 class PDFSplitterApp:
@@ -31,7 +34,7 @@ class PDFSplitterApp:
         self.load_font()
         
         self.root.title("PDF拆分")
-        self.root.geometry("400x300")
+        self.root.geometry("420x360")
         self.input_file = None
         self.output_dir = None
         
@@ -71,6 +74,18 @@ class PDFSplitterApp:
             variable=self.mode_var, 
             value="page_range"
         ).grid(row=1, column=0, sticky="w", padx=5)
+        tk.Radiobutton(
+            self.option_frame, 
+            text="按书签拆分", 
+            variable=self.mode_var, 
+            value="bookmark"
+        ).grid(row=2, column=0, sticky="w", padx=5)
+        tk.Radiobutton(
+            self.option_frame, 
+            text="按大小拆分", 
+            variable=self.mode_var, 
+            value="file_size"
+        ).grid(row=3, column=0, sticky="w", padx=5)
         
         # 按页数拆分选项
         self.page_count_frame = tk.Frame(self.option_frame)
@@ -87,10 +102,32 @@ class PDFSplitterApp:
         self.range_entry = tk.Entry(self.page_range_frame, width=20)
         self.range_entry.pack(side=tk.LEFT)
         
+        # 按书签拆分选项：使用到第几级书签
+        self.bookmark_frame = tk.Frame(self.option_frame)
+        self.bookmark_frame.grid(row=2, column=1, sticky="w")
+        tk.Label(self.bookmark_frame, text="书签级别:").pack(side=tk.LEFT)
+        self.level_entry = tk.Entry(self.bookmark_frame, width=10)
+        self.level_entry.pack(side=tk.LEFT)
+        self.level_entry.insert(0, "1")
+        
+        # 按大小拆分选项
+        self.size_frame = tk.Frame(self.option_frame)
+        self.size_frame.grid(row=3, column=1, sticky="w")
+        tk.Label(self.size_frame, text="每份最大(MB):").pack(side=tk.LEFT)
+        self.size_entry = tk.Entry(self.size_frame, width=10)
+        self.size_entry.pack(side=tk.LEFT)
+        self.size_entry.insert(0, "10")
+        
         # 操作按钮区域
         self.action_frame = tk.Frame(root)
         self.action_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=5)
-        tk.Button(self.action_frame, text="拆分PDF", command=self.split_pdf).pack(side=tk.RIGHT, padx=5)
+        self.split_button = tk.Button(self.action_frame, text="拆分PDF", command=self.split_pdf)
+        self.split_button.pack(side=tk.RIGHT, padx=5)
+        self.cancel_button = tk.Button(self.action_frame, text="取消", command=self.cancel_split, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.status_label = tk.Label(self.action_frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.job = None
         
         # 应用字体到所有控件
         self.apply_font()
@@ -136,18 +173,11 @@ class PDFSplitterApp:
             return True
         
         try:
-            import subprocess
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -164,24 +194,13 @@ class PDFSplitterApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -227,104 +246,103 @@ class PDFSplitterApp:
         if dir:
             self.output_dir = dir
             self.output_label.config(text=dir)
-    def parse_page_ranges(self, range_str, total_pages):
-        """解析页码范围字符串，返回页面索引列表"""
-        ranges = []
-        parts = range_str.split(',')
-        for part in parts:
-            if '-' in part:
-                start, end = map(int, part.split('-'))
-                ranges.extend(range(start-1, min(end, total_pages)))
-            else:
-                page = int(part)
-                if page <= total_pages:
-                    ranges.append(page-1)
-        return sorted(list(set(ranges)))  # 去重并排序
     def split_pdf(self):
+        if self.job is not None:
+            return
         if not self.input_file:
             messagebox.showwarning("警告", "请先选择PDF文件")
             return
         if not self.output_dir:
             messagebox.showwarning("警告", "请先选择输出目录")
             return
-        try:
-            # 验证PDF文件有效性
-            if not os.path.exists(self.input_file):
-                messagebox.showerror("错误", "PDF文件不存在")
-                return   
+        if self.mode_var.get() == "page_count":
+            # 按页数拆分模式
             try:
-                reader = PdfReader(self.input_file)
-                if len(reader.pages) == 0:
-                    messagebox.showerror("错误", "PDF文件没有有效页面")
-                    return
-                total_pages = len(reader.pages)
-            except Exception as e:
-                messagebox.showerror("错误", f"无效的PDF文件: {str(e)}")
-                return        
-            base_name = os.path.splitext(os.path.basename(self.input_file))[0]
-            if self.mode_var.get() == "page_count":
-                # 按页数拆分模式
-                try:
-                    pages_per_file = int(self.page_entry.get())
-                    if pages_per_file <= 0:
-                        raise ValueError("页数必须大于0")
-                except ValueError:
-                    messagebox.showerror("错误", "请输入有效的页数")
-                    return
-                file_count = 0
-                for i in range(0, total_pages, pages_per_file):
-                    writer = PdfWriter()
-                    end = min(i + pages_per_file, total_pages)
-                    for j in range(i, end):
-                        writer.add_page(reader.pages[j])
-                    output_file = os.path.join(
-                        self.output_dir,
-                        f"{base_name}_p{i+1}-{end}.pdf"
-                    )
-                    with open(output_file, 'wb') as f:
-                        writer.write(f)
-                    file_count += 1
-                message = f"PDF拆分完成!\n共拆分 {total_pages} 页为 {file_count} 个文件"
-            else:
-                # 按范围拆分模式
-                range_str = self.range_entry.get().strip()
-                if not range_str:
-                    messagebox.showwarning("警告", "请输入有效的页码范围")
-                    return
-                try:
-                    page_indices = self.parse_page_ranges(range_str, total_pages)
-                    if not page_indices:
-                        raise ValueError("没有有效的页面被选择")
-                except ValueError as e:
-                    messagebox.showerror("错误", f"页码范围无效: {str(e)}")
-                    return
-                # 将连续页面分组
-                groups = []
-                current_group = [page_indices[0]]
-                for i in range(1, len(page_indices)):
-                    if page_indices[i] == page_indices[i-1] + 1:
-                        current_group.append(page_indices[i])
-                    else:
-                        groups.append(current_group)
-                        current_group = [page_indices[i]]
-                groups.append(current_group)
-                # 为每个分组创建PDF文件
-                for i, group in enumerate(groups):
-                    writer = PdfWriter()
-                    for page_idx in group:
-                        writer.add_page(reader.pages[page_idx])
-                    start_page = group[0] + 1
-                    end_page = group[-1] + 1
-                    output_file = os.path.join(
-                        self.output_dir,
-                        f"{base_name}_range_{start_page}-{end_page}.pdf"
-                    )
-                    with open(output_file, 'wb') as f:
-                        writer.write(f)
-                message = f"PDF拆分完成!\n共提取 {len(page_indices)} 页为 {len(groups)} 个文件"
-            messagebox.showinfo("成功", message)
-        except Exception as e:
-            messagebox.showerror("错误", f"拆分失败: {str(e)}")
+                pages_per_file = int(self.page_entry.get())
+                if pages_per_file <= 0:
+                    raise ValueError("页数必须大于0")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的页数")
+                return
+            task = split_pdf_by_count
+            argument = pages_per_file
+            summary = "共拆分 {} 页为 {} 个文件"
+        elif self.mode_var.get() == "bookmark":
+            # 按书签拆分模式
+            try:
+                level = int(self.level_entry.get())
+                if level <= 0:
+                    raise ValueError("书签级别必须大于0")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的书签级别")
+                return
+            task = split_pdf_by_bookmarks
+            argument = level
+            summary = "共拆分 {} 页为 {} 个文件"
+        elif self.mode_var.get() == "file_size":
+            # 按大小拆分模式
+            try:
+                max_mb = float(self.size_entry.get())
+                if max_mb <= 0:
+                    raise ValueError("文件大小必须大于0")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的文件大小")
+                return
+            task = split_pdf_by_size
+            argument = int(max_mb * 1024 * 1024)
+            summary = "共拆分 {} 页为 {} 个文件"
+        else:
+            # 按范围拆分模式
+            range_str = self.range_entry.get().strip()
+            if not range_str:
+                messagebox.showwarning("警告", "请输入有效的页码范围")
+                return
+            task = split_pdf_by_ranges
+            argument = range_str
+            summary = "共提取 {} 页为 {} 个文件"
+
+        # 在后台执行拆分，界面保持响应
+        self.set_running(True)
+        self.job = get_scheduler().submit(
+            task, self.input_file, self.output_dir, argument,
+            name="PDF拆分",
+            ui=self.root,
+            on_progress=self.on_split_progress,
+            on_done=lambda result: self.on_split_done(summary.format(result[0], len(result[1]))),
+            on_error=self.on_split_error,
+            on_cancel=self.on_split_cancel,
+        )
+
+    def cancel_split(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def set_running(self, running):
+        self.split_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        self.status_label.config(text="正在拆分..." if running else "")
+
+    def on_split_progress(self, done, total):
+        self.status_label.config(text=f"正在拆分... {done}/{total}")
+
+    def on_split_done(self, message):
+        elapsed = self.job.elapsed
+        self.job = None
+        self.set_running(False)
+        messagebox.showinfo("成功", f"PDF拆分完成!\n{message}\n耗时 {elapsed:.1f} 秒")
+
+    def on_split_error(self, error):
+        self.job = None
+        self.set_running(False)
+        if isinstance(error, ValueError):
+            messagebox.showerror("错误", str(error))
+        else:
+            messagebox.showerror("错误", f"拆分失败: {str(error)}")
+
+    def on_split_cancel(self):
+        self.job = None
+        self.set_running(False)
+        self.status_label.config(text="已取消")
 if __name__ == '__main__':
     root = tk.Tk()
     app = PDFSplitterApp(root)
@@ -4,13 +4,16 @@ sys.dont_write_bytecode = True
 
 import os
 import json
-import subprocess
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PyPDF2 import PdfReader, PdfWriter
-from PIL import Image, ImageTk
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+import PdfCore
+from JobScheduler import get_scheduler
+from PdfThumbnails import ThumbnailStrip
+from PageRanges import PageRanges
 
 from os.path import dirname, join
 
@@ -29,7 +32,7 @@ class PDFMergerApp:
             return
         
         self.root.title("PDF合并工具")
-        self.root.geometry("600x400")
+        self.root.geometry("700x660")
         
         # 设置窗口图标、加载字体并构建UI
         self.set_window_icon()
@@ -81,14 +84,8 @@ class PDFMergerApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -105,24 +102,13 @@ class PDFMergerApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -132,6 +118,7 @@ class PDFMergerApp:
         """构建用户界面"""
         self.input_files = []
         self.selected_pages = {}
+        self.page_counts = {}
         
         # 配置样式
         style = ttk.Style()
@@ -150,7 +137,7 @@ class PDFMergerApp:
         # 创建文件表格
         self.file_tree = ttk.Treeview(
             self.file_frame,
-            columns=("order", "name", "pages"),
+            columns=("order", "name", "pages", "range"),
             show="headings",
             selectmode="browse"
         )
@@ -159,11 +146,13 @@ class PDFMergerApp:
         self.file_tree.heading("order", text="合并顺序")
         self.file_tree.heading("name", text="文件名")
         self.file_tree.heading("pages", text="页数")
+        self.file_tree.heading("range", text="合并页面")
         
         # 设置列宽
         self.file_tree.column("order", width=80, anchor="center")
-        self.file_tree.column("name", width=300, anchor="w")
-        self.file_tree.column("pages", width=80, anchor="center")
+        self.file_tree.column("name", width=260, anchor="w")
+        self.file_tree.column("pages", width=70, anchor="center")
+        self.file_tree.column("range", width=160, anchor="w")
         
         self.file_tree.grid(row=0, column=0, sticky="nsew")
         
@@ -171,13 +160,36 @@ class PDFMergerApp:
         scrollbar = ttk.Scrollbar(self.file_frame, orient="vertical", command=self.file_tree.yview)
         scrollbar.grid(row=0, column=1, sticky="ns")
         self.file_tree.configure(yscrollcommand=scrollbar.set)
+        self.file_tree.bind("<<TreeviewSelect>>", lambda e: self.show_preview())
+        
+        # 页面预览区域：显示选中文件的缩略图，勾选要合并的页面
+        self.preview_frame = ttk.LabelFrame(self.root, text="页面预览")
+        self.preview_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
+        
+        # 页码范围输入：如 1-10,15,20-，留空或“全部”表示全部页面
+        range_frame = ttk.Frame(self.preview_frame)
+        range_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(range_frame, text="页面范围:").pack(side=tk.LEFT)
+        self.range_var = tk.StringVar()
+        self.range_entry = ttk.Entry(range_frame, textvariable=self.range_var, width=30)
+        self.range_entry.pack(side=tk.LEFT, padx=5)
+        self.range_entry.bind("<Return>", lambda e: self.apply_range())
+        ttk.Button(range_frame, text="应用", command=self.apply_range).pack(side=tk.LEFT, padx=2)
+        ttk.Button(range_frame, text="全部页面", command=lambda: self.select_all_pages(self.preview_file)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(range_frame, text="清空", command=lambda: self.clear_selection(self.preview_file)).pack(side=tk.LEFT, padx=2)
+        ttk.Label(range_frame, text="例: 1-10,15,20-", foreground="gray").pack(side=tk.LEFT, padx=5)
+        
+        self.preview_strip = ThumbnailStrip(self.preview_frame, on_toggle=self.on_preview_toggle)
+        self.preview_strip.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.preview_file = None
         
         # 配置主窗口网格权重
         self.root.grid_rowconfigure(1, weight=0)
+        self.root.grid_rowconfigure(2, weight=0)
         
         # 底部按钮区域
         self.bottom_frame = ttk.Frame(self.root)
-        self.bottom_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.bottom_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
         
         # 添加文件按钮
         add_btn = ttk.Button(
@@ -188,12 +200,12 @@ class PDFMergerApp:
         add_btn.pack(side=tk.LEFT, padx=5)
         
         # 合并文件按钮
-        merge_btn = ttk.Button(
+        self.merge_btn = ttk.Button(
             self.bottom_frame,
             text="合并文件",
             command=self.merge_pdfs
         )
-        merge_btn.pack(side=tk.LEFT, padx=5)
+        self.merge_btn.pack(side=tk.LEFT, padx=5)
         
         # 清空列表链接
         clear_link = tk.Label(
@@ -213,6 +225,7 @@ class PDFMergerApp:
             if messagebox.askyesno("确认", "确定要清空文件列表吗？"):
                 self.input_files.clear()
                 self.selected_pages.clear()
+                self.page_counts.clear()
                 self.file_tree.delete(*self.file_tree.get_children())
                 self.show_preview()
     
@@ -221,17 +234,20 @@ class PDFMergerApp:
         if files:
             for file in files:
                 if file not in self.input_files:
-                    self.input_files.append(file)
                     try:
-                        reader = PdfReader(file)
-                        page_count = len(reader.pages)
+                        # 只读取页数（按修改时间缓存），合并时再按页段复制
+                        page_count = PdfCore.get_page_count(file)
+                        self.input_files.append(file)
                         # 添加文件到表格
+                        # 默认合并全部页面，可在预览中取消勾选或输入页面范围
+                        self.page_counts[file] = page_count
+                        self.selected_pages[file] = PageRanges.all(page_count)
                         self.file_tree.insert("", "end", values=(
                             len(self.input_files),
                             os.path.basename(file),
-                            page_count
+                            page_count,
+                            self.describe_selection(file)
                         ))
-                        self.selected_pages[file] = []
                     except Exception as e:
                         messagebox.showerror("错误", f"无法读取文件 {file}: {str(e)}")
     
@@ -245,26 +261,84 @@ class PDFMergerApp:
             file = self.input_files[file_index]
             del self.input_files[file_index]
             del self.selected_pages[file]
+            del self.page_counts[file]
             self.file_tree.delete(self.file_tree.get_children()[file_index])
             # 更新剩余文件的序号
             for i, child in enumerate(self.file_tree.get_children()):
                 values = list(self.file_tree.item(child, "values"))
                 values[0] = i + 1
                 self.file_tree.item(child, values=values)
+            self.show_preview()
+    
+    def show_preview(self):
+        """在预览区域显示表格中选中的文件（未选中时清空）"""
+        selection = self.file_tree.selection()
+        if not selection:
+            self.preview_file = None
+            self.preview_strip.clear()
+            self.range_var.set("")
+            return
+        file = self.input_files[self.file_tree.index(selection[0])]
+        if file != self.preview_file:
+            self.preview_file = file
+            self.preview_strip.load(file, self.page_counts[file], selected=self.selected_pages[file])
+            self.range_var.set(self.selected_pages[file].to_expression())
+    
+    def describe_selection(self, file):
+        """表格中显示的页面选择"""
+        selection = self.selected_pages[file]
+        if selection.is_all():
+            return "全部"
+        if not selection:
+            return "未选择"
+        return selection.to_expression()
+    
+    def refresh_selection(self, file, update_preview=True):
+        """页面选择变化后更新表格、范围输入框和预览"""
+        index = self.input_files.index(file)
+        item = self.file_tree.get_children()[index]
+        values = list(self.file_tree.item(item, "values"))
+        values[3] = self.describe_selection(file)
+        self.file_tree.item(item, values=values)
+        if file == self.preview_file:
+            self.range_var.set(self.selected_pages[file].to_expression())
+            if update_preview:
+                self.preview_strip.set_selection(self.selected_pages[file])
+    
+    def on_preview_toggle(self, page, selected):
+        """预览中勾选/取消页面"""
+        if self.preview_file is not None:
+            self.selected_pages[self.preview_file].set(page, selected)
+            self.refresh_selection(self.preview_file, update_preview=False)
     
     def toggle_page(self, file, page):
-        if page in self.selected_pages[file]:
-            self.selected_pages[file].remove(page)
-        else:
-            self.selected_pages[file].append(page)
+        self.selected_pages[file].toggle(page)
+        self.refresh_selection(file)
     
-    def select_all_pages(self, file, reader):
-        """选择当前文件的所有页面"""
-        self.selected_pages[file] = list(range(len(reader.pages)))
+    def apply_range(self):
+        """把输入的页面范围应用到预览中的文件"""
+        file = self.preview_file
+        if file is None:
+            messagebox.showwarning("警告", "请先在列表中选择文件")
+            return
+        try:
+            self.selected_pages[file] = PageRanges.parse(self.range_var.get(), self.page_counts[file])
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        self.refresh_selection(file)
+    
+    def select_all_pages(self, file):
+        """选择文件的所有页面"""
+        if file is not None:
+            self.selected_pages[file] = PageRanges.all(self.page_counts[file])
+            self.refresh_selection(file)
     
     def clear_selection(self, file):
-        """清空当前文件的所有选择"""
-        self.selected_pages[file] = []
+        """清空文件的所有选择"""
+        if file is not None:
+            self.selected_pages[file] = PageRanges(self.page_counts[file])
+            self.refresh_selection(file)
     
     def merge_pdfs(self):
         if not self.input_files:
@@ -278,19 +352,30 @@ class PDFMergerApp:
         )
         
         if output_file:
-            try:
-                writer = PdfWriter()
-                for file in self.input_files:
-                    reader = PdfReader(file)
-                    for page_num in sorted(self.selected_pages[file]):
-                        writer.add_page(reader.pages[page_num])
-                
-                with open(output_file, 'wb') as f:
-                    writer.write(f)
-                
+            def on_done(page_count):
+                self.merge_btn.config(state=tk.NORMAL)
                 messagebox.showinfo("成功", f"PDF合并完成!\n保存到: {output_file}")
-            except Exception as e:
-                messagebox.showerror("错误", f"合并失败: {str(e)}")
+
+            def on_error(error):
+                self.merge_btn.config(state=tk.NORMAL)
+                messagebox.showerror("错误", f"合并失败: {str(error)}")
+
+            # 在后台合并，页面选择先复制一份，避免合并过程中被界面修改；
+            # 全选的文件传 None，按整个文件复制
+            inputs = []
+            for file in self.input_files:
+                selection = self.selected_pages[file]
+                inputs.append((file, None if selection.is_all() else selection.copy()))
+            self.merge_btn.config(state=tk.DISABLED)
+            get_scheduler().submit(
+                PdfCore.merge_pdfs,
+                inputs,
+                output_file,
+                name="PDF合并",
+                ui=self.root,
+                on_done=on_done,
+                on_error=on_error,
+            )
 
 if __name__ == '__main__':
     root = tk.Tk()
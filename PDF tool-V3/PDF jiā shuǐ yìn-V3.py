@@ -2,16 +2,15 @@
 import sys
 sys.dont_write_bytecode = True
 
-from PyPDF2 import PdfReader, PdfWriter
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
-import subprocess
 from pathlib import Path
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import io
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfCore import add_text_watermark, add_image_watermark, add_watermark_batch
+from JobScheduler import get_scheduler
 
 
 class PDFWatermarkApp:
@@ -79,14 +78,8 @@ class PDFWatermarkApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -103,28 +96,19 @@ class PDFWatermarkApp:
             self.master.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
         self.master.option_add("*Font", self.current_font)
+        # 水印文字使用同一个字体文件（在 reportlab 中注册）
+        self.font_path = font_path
 
     def build_ui(self):
         """构建用户界面"""
@@ -150,11 +134,21 @@ class PDFWatermarkApp:
         self.pdf_path = tk.StringVar()
         ttk.Entry(self.pdf_frame, textvariable=self.pdf_path, width=50).pack(side="left", padx=5)
         ttk.Button(self.pdf_frame, text="选择PDF", command=self.select_pdf).pack(side="left", padx=5)
+        # 选择文件夹时批量处理其中所有 PDF
+        ttk.Button(self.pdf_frame, text="选择文件夹", command=self.select_folder).pack(side="left", padx=5)
         
         # 水印选项
         self.options_frame = ttk.LabelFrame(self.main_frame, text="水印选项")
         self.options_frame.pack(fill="x", padx=5, pady=5)
         
+        # 水印类型
+        self.kind_frame = ttk.Frame(self.options_frame)
+        self.kind_frame.pack(fill="x", pady=5)
+        ttk.Label(self.kind_frame, text="类型:").pack(side="left", padx=5)
+        self.kind = tk.StringVar(value="text")
+        ttk.Radiobutton(self.kind_frame, text="文字", variable=self.kind, value="text").pack(side="left", padx=5)
+        ttk.Radiobutton(self.kind_frame, text="图片", variable=self.kind, value="image").pack(side="left", padx=5)
+        
         # 水印设置
         self.text_frame = ttk.Frame(self.options_frame)
         self.text_frame.pack(fill="x", pady=5)
@@ -173,6 +167,19 @@ class PDFWatermarkApp:
         ttk.Scale(self.text_frame, from_=0.1, to=1.0, variable=self.opacity, 
                  orient="horizontal", length=100).pack(side="left")
         
+        # 图片水印设置（透明度与文字水印共用）
+        self.image_frame = ttk.Frame(self.options_frame)
+        self.image_frame.pack(fill="x", pady=5)
+        
+        ttk.Label(self.image_frame, text="水印图片:").pack(side="left", padx=5)
+        self.image_path = tk.StringVar()
+        ttk.Entry(self.image_frame, textvariable=self.image_path, width=30).pack(side="left")
+        ttk.Button(self.image_frame, text="选择图片", command=self.select_image).pack(side="left", padx=5)
+        ttk.Label(self.image_frame, text="宽度占比(%):").pack(side="left", padx=5)
+        self.image_scale = tk.IntVar(value=30)
+        ttk.Spinbox(self.image_frame, from_=5, to=100, textvariable=self.image_scale,
+                   width=5).pack(side="left")
+        
         # 水印位置
         self.position_frame = ttk.Frame(self.options_frame)
         self.position_frame.pack(fill="x", pady=5)
@@ -180,7 +187,7 @@ class PDFWatermarkApp:
         ttk.Label(self.position_frame, text="位置:").pack(side="left", padx=5)
         self.position = tk.StringVar(value="center")
         positions = [("居中", "center"), ("左上", "topleft"), ("右上", "topright"), 
-                    ("左下", "bottomleft"), ("右下", "bottomright")]
+                    ("左下", "bottomleft"), ("右下", "bottomright"), ("平铺", "tile")]
         for text, value in positions:
             ttk.Radiobutton(self.position_frame, text=text, variable=self.position, 
                           value=value).pack(side="left", padx=5)
@@ -189,7 +196,16 @@ class PDFWatermarkApp:
         self.button_frame = ttk.Frame(self.main_frame)
         self.button_frame.pack(fill="x", padx=5, pady=10)
         
-        ttk.Button(self.button_frame, text="添加水印", command=self.add_watermark).pack(side="right", padx=5)
+        self.watermark_button = ttk.Button(self.button_frame, text="添加水印", command=self.add_watermark)
+        self.watermark_button.pack(side="right", padx=5)
+        self.cancel_button = ttk.Button(self.button_frame, text="取消", command=self.cancel_watermark, state="disabled")
+        self.cancel_button.pack(side="right", padx=5)
+        
+        self.progress = ttk.Progressbar(self.button_frame, length=200, mode="determinate")
+        self.progress.pack(side="left", padx=5)
+        self.status_label = ttk.Label(self.button_frame, text="")
+        self.status_label.pack(side="left", padx=5)
+        self.job = None
 
     
     def select_pdf(self):
@@ -200,78 +216,135 @@ class PDFWatermarkApp:
         if file_path:
             self.pdf_path.set(file_path)
     
-    def create_text_watermark(self):
-        """创建文本水印PDF"""
-        packet = io.BytesIO()
-        can = canvas.Canvas(packet, pagesize=letter)
-        can.setFillColorRGB(0.5, 0.5, 0.5, self.opacity.get())
-        can.setFont(self.current_font[0], self.font_size.get())
-        
-        text = self.watermark_text.get()
-        width, height = letter
-        
-        # 根据位置设置文本坐标
-        position = self.position.get()
-        if position == "center":
-            x, y = width/2, height/2
-            can.drawCentredString(x, y, text)
-        elif position == "topleft":
-            x, y = 50, height - 50
-            can.drawString(x, y, text)
-        elif position == "topright":
-            x, y = width - 50, height - 50
-            can.drawRightString(x, y, text)
-        elif position == "bottomleft":
-            x, y = 50, 50
-            can.drawString(x, y, text)
-        elif position == "bottomright":
-            x, y = width - 50, 50
-            can.drawRightString(x, y, text)
-        
-        can.save()
-        packet.seek(0)
-        return PdfReader(packet)
+    def select_image(self):
+        file_path = filedialog.askopenfilename(
+            title="选择水印图片",
+            filetypes=[("图片文件", "*.png *.jpg *.jpeg *.bmp *.gif")]
+        )
+        if file_path:
+            self.image_path.set(file_path)
+            self.kind.set("image")
+    
+    def select_folder(self):
+        folder = filedialog.askdirectory(title="选择包含PDF的文件夹")
+        if folder:
+            self.pdf_path.set(folder)
     
     def add_watermark(self):
-        """添加水印到PDF"""
+        """添加水印到PDF（选择的是文件夹时批量处理其中所有PDF）"""
+        if self.job is not None:
+            return
         pdf_path = self.pdf_path.get()
         if not pdf_path:
-            messagebox.showwarning("警告", "请先选择PDF文件")
+            messagebox.showwarning("警告", "请先选择PDF文件或文件夹")
             return
         
-        try:
-            # 读取原始PDF
-            pdf = PdfReader(pdf_path)
-            if len(pdf.pages) == 0:
-                messagebox.showerror("错误", "PDF文件没有有效页面")
+        if self.kind.get() == "image":
+            if not self.image_path.get():
+                messagebox.showwarning("警告", "请先选择水印图片")
                 return
-            
-            # 获取文本水印
-            watermark = self.create_text_watermark()
-            
-            # 创建PDF写入器
-            writer = PdfWriter()
-            
-            # 为每一页添加水印
-            for page in pdf.pages:
-                page.merge_page(watermark.pages[0])
-                writer.add_page(page)
-            
-            # 保存文件
+            single_task = add_image_watermark
+            options = dict(
+                image_path=self.image_path.get(),
+                scale=self.image_scale.get() / 100,
+                opacity=self.opacity.get(),
+                position=self.position.get(),
+            )
+        else:
+            single_task = add_text_watermark
+            options = dict(
+                text=self.watermark_text.get(),
+                font_path=self.font_path,
+                font_size=self.font_size.get(),
+                opacity=self.opacity.get(),
+                position=self.position.get(),
+            )
+        if os.path.isdir(pdf_path):
+            pdf_files = sorted(
+                os.path.join(pdf_path, name) for name in os.listdir(pdf_path)
+                if name.lower().endswith(".pdf")
+            )
+            if not pdf_files:
+                messagebox.showwarning("警告", "文件夹中没有PDF文件")
+                return
+            output_dir = filedialog.askdirectory(title="选择输出文件夹")
+            if not output_dir:
+                return
+            task, args = add_watermark_batch, (pdf_files, output_dir)
+            destination = output_dir
+        else:
+            # 选择保存位置
             output_path = filedialog.asksaveasfilename(
                 title="保存加水印的PDF",
                 defaultextension=".pdf",
                 filetypes=[("PDF文件", "*.pdf")]
             )
-            
-            if output_path:
-                with open(output_path, "wb") as output_file:
-                    writer.write(output_file)
-                messagebox.showinfo("成功", f"PDF加水印完成!\n保存到: {output_path}")
+            if not output_path:
+                return
+            task, args = single_task, (pdf_path, output_path)
+            destination = output_path
         
-        except Exception as e:
-            messagebox.showerror("错误", f"加水印过程中发生错误: {str(e)}")
-
+        # 在后台添加水印，界面保持响应
+        self.set_running(True)
+        self.job = get_scheduler().submit(
+            task,
+            *args,
+            **options,
+            name="PDF加水印",
+            ui=self.master,
+            on_progress=self.on_watermark_progress,
+            on_done=lambda result: self.on_watermark_done(result, destination),
+            on_error=self.on_watermark_error,
+            on_cancel=self.on_watermark_cancel,
+        )
+    
+    def cancel_watermark(self):
+        if self.job is not None:
+            self.job.cancel()
+    
+    def set_running(self, running):
+        self.watermark_button.config(state="disabled" if running else "normal")
+        self.cancel_button.config(state="normal" if running else "disabled")
+        self.progress["value"] = 0
+        self.status_label.config(text="正在添加水印..." if running else "")
+    
+    def on_watermark_progress(self, done, total):
+        self.progress["maximum"] = max(total, 1)
+        self.progress["value"] = done
+        elapsed = self.job.elapsed if self.job is not None else 0
+        rate = f"，{done / elapsed:.0f} 页/秒" if elapsed > 0 else ""
+        self.status_label.config(text=f"{done}/{total} 页{rate}")
+    
+    def on_watermark_done(self, result, destination):
+        elapsed = self.job.elapsed
+        self.job = None
+        self.set_running(False)
+        if isinstance(result, tuple):
+            page_count, outputs, failures = result
+            message = f"PDF加水印完成!\n共处理 {len(outputs)} 个文件"
+            if failures:
+                message += f"，{len(failures)} 个文件失败:\n" + "\n".join(
+                    f"{os.path.basename(path)}: {error}" for path, error in failures[:10]
+                )
+        else:
+            page_count = result
+            message = "PDF加水印完成!"
+        rate = page_count / elapsed if elapsed > 0 else 0
+        self.status_label.config(text=f"{page_count} 页，{elapsed:.1f} 秒，{rate:.0f} 页/秒")
+        messagebox.showinfo("成功", f"{message}\n保存到: {destination}")
+    
+    def on_watermark_error(self, error):
+        self.job = None
+        self.set_running(False)
+        if isinstance(error, ValueError):
+            messagebox.showerror("错误", str(error))
+        else:
+            messagebox.showerror("错误", f"加水印过程中发生错误: {str(error)}")
+    
+    def on_watermark_cancel(self):
+        self.job = None
+        self.set_running(False)
+        self.status_label.config(text="已取消")
 
 if __name__ == "__main__":
     root = tk.Tk()
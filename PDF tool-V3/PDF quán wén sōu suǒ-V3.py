@@ -0,0 +1,377 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import os
+import time
+import subprocess
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfSearchIndex import get_search_index
+from PdfThumbnails import load_thumbnail
+from JobScheduler import get_scheduler
+
+
+class PDFSearchApp:
+    # 预览缩略图的最大宽高(像素)
+    PREVIEW_BOX = (240, 320)
+    # 输入停止多久后开始搜索(毫秒)
+    SEARCH_DELAY = 150
+    # 最多显示的搜索结果数
+    MAX_RESULTS = 500
+
+    def __init__(self, master):
+        self.master = master
+
+        # 首先检查授权
+        if not self.check_license():
+            messagebox.showerror(
+                "错误",
+                "缺少授权！无法使用！请先获取授权！\n"
+            )
+            master.destroy()
+            return
+
+        self.master.title("PDF全文搜索")
+
+        # 设置窗口图标、加载字体并构建UI
+        self.set_window_icon()
+        self.load_font()
+        self.build_ui()
+
+    def set_window_icon(self):
+        """设置应用程序窗口图标"""
+        PROJECT_ROOT = Path(__file__).resolve().parent.parent
+        IMAGE_DIR = PROJECT_ROOT / "Image"
+
+        icon_ico_path = IMAGE_DIR / "icon.ico"
+        icon_png_path = IMAGE_DIR / "icon.png"
+
+        # Windows系统设置应用ID
+        if os.name == 'nt':
+            try:
+                import ctypes
+                ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("snow_toolbox_master.PDFSearchApp")
+            except Exception:
+                pass
+
+        # 尝试设置ICO图标
+        if icon_ico_path.exists():
+            try:
+                self.master.iconbitmap(default=str(icon_ico_path))
+            except Exception:
+                try:
+                    self.master.iconbitmap(str(icon_ico_path))
+                except Exception:
+                    pass
+
+        # 尝试设置PNG图标
+        if hasattr(self.master, "iconphoto") and icon_png_path.exists():
+            try:
+                self.icon_image = tk.PhotoImage(file=str(icon_png_path))
+                self.master.iconphoto(True, self.icon_image)
+            except Exception:
+                pass
+
+    def check_license(self):
+        """检查开源协议文档是否存在并验证完整性"""
+        # 如果通过主程序启动（环境变量已设置），则跳过授权验证
+        if os.environ.get('MAIN_APP_AUTHORIZED') == '1':
+            return True
+
+        try:
+            # 验证授权
+            PROJECT_ROOT = Path(__file__).resolve().parent.parent
+            CORE_DIR = PROJECT_ROOT / "Core"
+            license_exe_path = CORE_DIR / "LICENSE.exe"
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
+        except Exception as e:
+            print(f"许可证验证异常: {e}")
+            return False
+
+    def load_font(self):
+        """从 TTF 字体文件中加载字体"""
+        PROJECT_ROOT = Path(__file__).resolve().parent.parent
+        IMAGE_DIR = PROJECT_ROOT / "Image"
+
+        font_path = IMAGE_DIR / "AlibabaPuHuiTi-3-55-RegularL3.ttf"
+
+        if not font_path.exists():
+            messagebox.showerror("错误", f"找不到字体文件：{font_path}")
+            self.master.destroy()
+            return
+
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
+        if not font_name:
+            raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
+
+        # 使用 Windows API 注册字体
+        FontManager.register_font(font_path)
+
+        self.current_font = (font_name, 10)
+        self.master.option_add("*Font", self.current_font)
+
+    def build_ui(self):
+        """构建用户界面"""
+        # 配置样式
+        style = ttk.Style()
+        style.configure(".", font=self.current_font)
+        style.configure("TButton", font=self.current_font)
+        style.configure("TLabel", font=self.current_font)
+        style.configure("TEntry", font=self.current_font)
+        style.configure("TLabelFrame", font=self.current_font)
+        style.configure("Treeview", font=self.current_font)
+        style.configure("Treeview.Heading", font=self.current_font)
+
+        # 主框架
+        self.main_frame = ttk.Frame(self.master)
+        self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # 文件夹选择与索引
+        self.folder_frame = ttk.LabelFrame(self.main_frame, text="PDF文件夹")
+        self.folder_frame.pack(fill="x", padx=5, pady=5)
+
+        self.folder_path = tk.StringVar()
+        ttk.Entry(self.folder_frame, textvariable=self.folder_path, width=50).pack(side="left", padx=5, pady=5)
+        ttk.Button(self.folder_frame, text="选择文件夹", command=self.select_folder).pack(side="left", padx=5)
+        self.index_button = ttk.Button(self.folder_frame, text="更新索引", command=self.update_index)
+        self.index_button.pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(self.folder_frame, text="取消", command=self.cancel_index, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        self.progress = ttk.Progressbar(self.folder_frame, length=150, mode="determinate")
+        self.progress.pack(side="left", padx=5)
+
+        # 搜索框:输入时即时搜索,多个关键词用空格分隔,双引号中的内容作为整体搜索
+        self.search_frame = ttk.Frame(self.main_frame)
+        self.search_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(self.search_frame, text="搜索:").pack(side="left", padx=5)
+        self.query = tk.StringVar()
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.query, width=60)
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=5)
+        self.search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+
+        # 搜索结果与页面预览
+        self.result_frame = ttk.Frame(self.main_frame)
+        self.result_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.tree = ttk.Treeview(self.result_frame, columns=("file", "page", "snippet"), show="headings", height=16)
+        self.tree.heading("file", text="文件")
+        self.tree.heading("page", text="页码")
+        self.tree.heading("snippet", text="内容")
+        self.tree.column("file", width=180)
+        self.tree.column("page", width=50, anchor="center")
+        self.tree.column("snippet", width=380)
+        scrollbar = ttk.Scrollbar(self.result_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="left", fill="y")
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.show_preview())
+        self.tree.bind("<Double-1>", lambda e: self.open_selected())
+
+        self.preview_frame = ttk.LabelFrame(self.result_frame, text="页面预览（双击结果打开文件）")
+        self.preview_frame.pack(side="left", fill="y", padx=(10, 0))
+        self.preview_label = ttk.Label(self.preview_frame, anchor="center")
+        self.preview_label.pack(padx=5, pady=5)
+        self.preview_image = None
+
+        # 状态栏
+        self.status_label = ttk.Label(self.main_frame, text="选择文件夹后建立索引，之后即可即时搜索")
+        self.status_label.pack(fill="x", padx=10, pady=5)
+
+        self.index = get_search_index()
+        self.job = None
+        # 结果编号 -> (PDF 路径, 页面索引)
+        self.hits = {}
+        self._search_after = None
+        self._search_generation = 0
+        self._preview_key = None
+
+    def select_folder(self):
+        folder = filedialog.askdirectory(title="选择包含PDF的文件夹")
+        if folder:
+            self.folder_path.set(folder)
+            self.update_index()
+
+    # ---------------- 索引 ----------------
+
+    def update_index(self):
+        """在后台增量更新所选文件夹的索引"""
+        if self.job is not None:
+            return
+        folder = self.folder_path.get()
+        if not folder:
+            messagebox.showwarning("警告", "请先选择文件夹")
+            return
+
+        self.set_indexing(True)
+        self.job = get_scheduler().submit(
+            self.index.update_folder,
+            folder,
+            name="PDF全文索引",
+            ui=self.master,
+            on_progress=self.on_index_progress,
+            on_done=self.on_index_done,
+            on_error=self.on_index_error,
+            on_cancel=self.on_index_cancel,
+        )
+
+    def cancel_index(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def set_indexing(self, running):
+        self.index_button.config(state="disabled" if running else "normal")
+        self.cancel_button.config(state="normal" if running else "disabled")
+        self.progress["value"] = 0
+        if running:
+            self.status_label.config(text="正在检查文件...")
+
+    def on_index_progress(self, done, total):
+        self.progress["maximum"] = max(total, 1)
+        self.progress["value"] = done
+        self.status_label.config(text=f"正在提取文字 {done}/{total}")
+
+    def on_index_done(self, report):
+        self.job = None
+        self.set_indexing(False)
+        documents, pages = self.index.stats(self.folder_path.get())
+        summary = (f"已索引 {documents} 个文件 {pages} 页（新增 {report['added']}，更新 {report['updated']}，"
+                   f"移除 {report['removed']}，用时 {report['elapsed']:.1f} 秒）")
+        if report['failures']:
+            summary += f"，{len(report['failures'])} 个文件无法读取"
+        self.status_label.config(text=summary)
+        if report['failures']:
+            details = "\n".join(f"{os.path.basename(path)}: {error}" for path, error in report['failures'][:10])
+            messagebox.showwarning("提示", f"以下文件无法读取，未加入索引:\n{details}")
+        self.search()
+
+    def on_index_error(self, error):
+        self.job = None
+        self.set_indexing(False)
+        self.status_label.config(text="")
+        messagebox.showerror("错误", str(error) if isinstance(error, ValueError) else f"建立索引时发生错误: {error}")
+
+    def on_index_cancel(self):
+        self.job = None
+        self.set_indexing(False)
+        # 已提取的文件已经写入索引,下次更新时跳过
+        self.status_label.config(text="已取消，已处理的文件保留在索引中")
+
+    # ---------------- 搜索 ----------------
+
+    def schedule_search(self):
+        """输入停止 SEARCH_DELAY 毫秒后再搜索,连续输入时只搜索最后一次"""
+        if self._search_after is not None:
+            self.master.after_cancel(self._search_after)
+        self._search_after = self.master.after(self.SEARCH_DELAY, self.search)
+
+    def search(self):
+        """在后台线程中查询索引,过期的结果直接丢弃"""
+        self._search_after = None
+        self._search_generation += 1
+        generation = self._search_generation
+        query = self.query.get().strip()
+        if not query:
+            self.show_results(generation, [], 0)
+            return
+        started = time.perf_counter()
+        get_scheduler().submit(
+            self.index.search,
+            query,
+            self.folder_path.get() or None,
+            self.MAX_RESULTS,
+            name="PDF全文搜索",
+            ui=self.master,
+            with_progress=False,
+            on_done=lambda hits: self.show_results(generation, hits, time.perf_counter() - started),
+            on_error=lambda error: self.status_label.config(text=str(error)),
+        )
+
+    def show_results(self, generation, hits, elapsed):
+        if generation != self._search_generation:
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.hits = {}
+        for pdf_path, page_num, snippet in hits:
+            item = self.tree.insert("", "end", values=(os.path.basename(pdf_path), page_num + 1, snippet))
+            self.hits[item] = (pdf_path, page_num)
+        if self.query.get().strip():
+            more = f"（只显示前 {self.MAX_RESULTS} 条）" if len(hits) >= self.MAX_RESULTS else ""
+            files = len({pdf_path for pdf_path, _, _ in hits})
+            self.status_label.config(text=f"在 {files} 个文件中找到 {len(hits)} 页{more}，用时 {elapsed * 1000:.0f} 毫秒")
+        self.clear_preview()
+
+    # ---------------- 预览 ----------------
+
+    def selected_hit(self):
+        selection = self.tree.selection()
+        return self.hits.get(selection[0]) if selection else None
+
+    def show_preview(self):
+        """在后台渲染选中结果所在页面的缩略图(共用缩略图磁盘缓存)"""
+        hit = self.selected_hit()
+        if hit is None or hit == self._preview_key:
+            return
+        self._preview_key = hit
+        pdf_path, page_num = hit
+        self.preview_frame.config(text=f"{os.path.basename(pdf_path)} 第 {page_num + 1} 页")
+        get_scheduler().submit(
+            load_thumbnail,
+            pdf_path,
+            page_num,
+            self.PREVIEW_BOX,
+            name="PDF页面预览",
+            ui=self.master,
+            with_progress=False,
+            on_done=lambda result: self.on_preview(hit, result),
+            on_error=lambda error: self.on_preview_error(hit, error),
+        )
+
+    def on_preview(self, hit, result):
+        if hit != self._preview_key:
+            return
+        # 保留引用,防止 PhotoImage 被回收
+        self.preview_image = tk.PhotoImage(data=result[2])
+        self.preview_label.configure(image=self.preview_image, text="")
+
+    def on_preview_error(self, hit, error):
+        if hit != self._preview_key:
+            return
+        self.preview_image = None
+        self.preview_label.configure(image="", text=f"无法预览: {error}")
+
+    def clear_preview(self):
+        self._preview_key = None
+        self.preview_image = None
+        self.preview_label.configure(image="", text="")
+        self.preview_frame.config(text="页面预览（双击结果打开文件）")
+
+    def open_selected(self):
+        """用系统默认程序打开选中结果所在的 PDF"""
+        hit = self.selected_hit()
+        if hit is None:
+            return
+        pdf_path = hit[0]
+        if not os.path.exists(pdf_path):
+            messagebox.showwarning("提示", f"文件已被移动或删除，请更新索引:\n{pdf_path}")
+            return
+        try:
+            if sys.platform == 'win32':
+                os.startfile(pdf_path)
+            elif sys.platform == 'darwin':  # macOS
+                subprocess.Popen(['open', pdf_path])
+            else:  # Linux
+                subprocess.Popen(['xdg-open', pdf_path])
+        except Exception as e:
+            print(f"无法打开文件: {str(e)}")
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = PDFSearchApp(root)
+    root.mainloop()
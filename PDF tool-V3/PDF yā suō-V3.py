@@ -0,0 +1,263 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import os
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfCore import optimize_pdf
+from JobScheduler import get_scheduler
+
+
+class PDFCompressApp:
+    # 压缩预设 (显示名称, 预设名称)
+    PRESETS = [
+        ("屏幕 (72 DPI，最小)", "screen"),
+        ("电子书 (150 DPI)", "ebook"),
+        ("打印 (300 DPI)", "print"),
+        ("无损 (不处理图片)", "lossless"),
+    ]
+
+    def __init__(self, master):
+        self.master = master
+
+        # 首先检查授权
+        if not self.check_license():
+            messagebox.showerror(
+                "错误",
+                "缺少授权！无法使用！请先获取授权！\n"
+            )
+            master.destroy()
+            return
+
+        self.master.title("PDF压缩")
+
+        # 设置窗口图标、加载字体并构建UI
+        self.set_window_icon()
+        self.load_font()
+        self.build_ui()
+
+    def set_window_icon(self):
+        """设置应用程序窗口图标"""
+        PROJECT_ROOT = Path(__file__).resolve().parent.parent
+        IMAGE_DIR = PROJECT_ROOT / "Image"
+
+        icon_ico_path = IMAGE_DIR / "icon.ico"
+        icon_png_path = IMAGE_DIR / "icon.png"
+
+        # Windows系统设置应用ID
+        if os.name == 'nt':
+            try:
+                import ctypes
+                ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("snow_toolbox_master.PDFCompressApp")
+            except Exception:
+                pass
+
+        # 尝试设置ICO图标
+        if icon_ico_path.exists():
+            try:
+                self.master.iconbitmap(default=str(icon_ico_path))
+            except Exception:
+                try:
+                    self.master.iconbitmap(str(icon_ico_path))
+                except Exception:
+                    pass
+
+        # 尝试设置PNG图标
+        if hasattr(self.master, "iconphoto") and icon_png_path.exists():
+            try:
+                self.icon_image = tk.PhotoImage(file=str(icon_png_path))
+                self.master.iconphoto(True, self.icon_image)
+            except Exception:
+                pass
+
+    def check_license(self):
+        """检查开源协议文档是否存在并验证完整性"""
+        # 如果通过主程序启动（环境变量已设置），则跳过授权验证
+        if os.environ.get('MAIN_APP_AUTHORIZED') == '1':
+            return True
+
+        try:
+            # 验证授权
+            PROJECT_ROOT = Path(__file__).resolve().parent.parent
+            CORE_DIR = PROJECT_ROOT / "Core"
+            license_exe_path = CORE_DIR / "LICENSE.exe"
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
+        except Exception as e:
+            print(f"许可证验证异常: {e}")
+            return False
+
+    def load_font(self):
+        """从 TTF 字体文件中加载字体"""
+        PROJECT_ROOT = Path(__file__).resolve().parent.parent
+        IMAGE_DIR = PROJECT_ROOT / "Image"
+
+        font_path = IMAGE_DIR / "AlibabaPuHuiTi-3-55-RegularL3.ttf"
+
+        if not font_path.exists():
+            messagebox.showerror("错误", f"找不到字体文件：{font_path}")
+            self.master.destroy()
+            return
+
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
+        if not font_name:
+            raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
+
+        # 使用 Windows API 注册字体
+        FontManager.register_font(font_path)
+
+        self.current_font = (font_name, 10)
+        self.master.option_add("*Font", self.current_font)
+
+    def build_ui(self):
+        """构建用户界面"""
+        # 配置样式
+        style = ttk.Style()
+        style.configure(".", font=self.current_font)
+        style.configure("TButton", font=self.current_font)
+        style.configure("TLabel", font=self.current_font)
+        style.configure("TEntry", font=self.current_font)
+        style.configure("TRadiobutton", font=self.current_font)
+        style.configure("TCheckbutton", font=self.current_font)
+        style.configure("TLabelFrame", font=self.current_font)
+
+        # 主框架
+        self.main_frame = ttk.Frame(self.master)
+        self.main_frame.pack(padx=10, pady=10)
+
+        # PDF文件选择
+        self.pdf_frame = ttk.LabelFrame(self.main_frame, text="PDF文件")
+        self.pdf_frame.pack(fill="x", padx=5, pady=5)
+
+        self.pdf_path = tk.StringVar()
+        ttk.Entry(self.pdf_frame, textvariable=self.pdf_path, width=50).pack(side="left", padx=5)
+        ttk.Button(self.pdf_frame, text="选择PDF", command=self.select_pdf).pack(side="left", padx=5)
+
+        # 压缩预设
+        self.preset_frame = ttk.LabelFrame(self.main_frame, text="压缩程度")
+        self.preset_frame.pack(fill="x", padx=5, pady=5)
+
+        self.preset = tk.StringVar(value="ebook")
+        for text, value in self.PRESETS:
+            ttk.Radiobutton(self.preset_frame, text=text, variable=self.preset,
+                            value=value).pack(anchor="w", padx=5)
+
+        # 其他选项
+        self.subset_fonts = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.main_frame, text="只保留字体中用到的字形（字体子集化）",
+                        variable=self.subset_fonts).pack(anchor="w", padx=10, pady=5)
+
+        # 操作按钮
+        self.button_frame = ttk.Frame(self.main_frame)
+        self.button_frame.pack(fill="x", padx=5, pady=10)
+
+        self.compress_button = ttk.Button(self.button_frame, text="开始压缩", command=self.compress_pdf)
+        self.compress_button.pack(side="right", padx=5)
+        self.cancel_button = ttk.Button(self.button_frame, text="取消", command=self.cancel_compress, state="disabled")
+        self.cancel_button.pack(side="right", padx=5)
+
+        self.progress = ttk.Progressbar(self.button_frame, length=200, mode="determinate")
+        self.progress.pack(side="left", padx=5)
+
+        # 压缩结果
+        self.status_label = ttk.Label(self.main_frame, text="")
+        self.status_label.pack(fill="x", padx=10, pady=5)
+        self.job = None
+
+    def select_pdf(self):
+        file_path = filedialog.askopenfilename(
+            title="选择PDF文件",
+            filetypes=[("PDF文件", "*.pdf")]
+        )
+        if file_path:
+            self.pdf_path.set(file_path)
+
+    def compress_pdf(self):
+        """在后台压缩PDF"""
+        if self.job is not None:
+            return
+        pdf_path = self.pdf_path.get()
+        if not pdf_path:
+            messagebox.showwarning("警告", "请先选择PDF文件")
+            return
+
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        output_path = filedialog.asksaveasfilename(
+            title="保存压缩后的PDF",
+            initialdir=os.path.dirname(pdf_path),
+            initialfile=f"{base_name}_压缩.pdf",
+            defaultextension=".pdf",
+            filetypes=[("PDF文件", "*.pdf")]
+        )
+        if not output_path:
+            return
+
+        self.set_running(True)
+        self.job = get_scheduler().submit(
+            optimize_pdf,
+            pdf_path,
+            output_path,
+            preset=self.preset.get(),
+            subset_fonts=self.subset_fonts.get(),
+            name="PDF压缩",
+            ui=self.master,
+            on_progress=self.on_compress_progress,
+            on_done=lambda report: self.on_compress_done(report, output_path),
+            on_error=self.on_compress_error,
+            on_cancel=self.on_compress_cancel,
+        )
+
+    def cancel_compress(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def set_running(self, running):
+        self.compress_button.config(state="disabled" if running else "normal")
+        self.cancel_button.config(state="normal" if running else "disabled")
+        self.progress["value"] = 0
+        self.status_label.config(text="正在压缩..." if running else "")
+
+    def on_compress_progress(self, done, total):
+        self.progress["maximum"] = max(total, 1)
+        self.progress["value"] = done
+        if done < total:
+            self.status_label.config(text=f"正在处理图片 {done}/{total - 1}")
+        else:
+            self.status_label.config(text="正在保存...")
+
+    def on_compress_done(self, report, output_path):
+        self.job = None
+        self.set_running(False)
+        before, after = report['before'], report['after']
+        summary = (f"{before / (1024 * 1024):.2f} MB → {after / (1024 * 1024):.2f} MB"
+                   f"（减少 {1 - after / before:.0%}），缩小图片 {report['images']} 张，"
+                   f"用时 {report['elapsed']:.1f} 秒")
+        self.status_label.config(text=summary)
+        if after >= before:
+            messagebox.showwarning("提示", f"压缩后的文件没有变小，原文件可能已经充分压缩。\n{summary}")
+        else:
+            messagebox.showinfo("成功", f"PDF压缩完成!\n{summary}\n保存到: {output_path}")
+
+    def on_compress_error(self, error):
+        self.job = None
+        self.set_running(False)
+        if isinstance(error, ValueError):
+            messagebox.showerror("错误", str(error))
+        else:
+            messagebox.showerror("错误", f"压缩过程中发生错误: {str(error)}")
+
+    def on_compress_cancel(self):
+        self.job = None
+        self.set_running(False)
+        self.status_label.config(text="已取消")
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = PDFCompressApp(root)
+    root.mainloop()
@@ -3,14 +3,16 @@ import sys
 sys.dont_write_bytecode = True
 
 import tkinter as tk
-from tkinter import filedialog, messagebox
-from pdf2docx import Converter
+from tkinter import filedialog, messagebox, ttk
 import os
 import traceback
-import subprocess
 from pathlib import Path
 from typing import Callable, Optional
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfCore import pdf_to_word, pdf_to_word_batch
+from JobScheduler import get_scheduler
 
 
 class ConfigManager:
@@ -71,75 +73,67 @@ class PDFConverter:
         """
         self.update_status = update_status
         self.update_ui = update_ui
-        self.cv = None
     
-    def convert(self, pdf_path: str, output_path: str) -> bool:
-        """将PDF转换为Word文档
+    def convert(self, pdf_path: str, output_path: str, master: tk.Tk,
+                on_success: Callable[[], None], on_finish: Callable[[], None],
+                on_progress: Optional[Callable[[int, int], None]] = None):
+        """在后台将PDF转换为Word文档
         
         Args:
-            pdf_path: PDF文件路径
-            output_path: 输出Word文件路径
+            pdf_path: PDF文件路径，或PDF文件路径列表（批量转换）
+            output_path: 输出Word文件路径（批量转换时为输出文件夹）
+            master: tkinter主窗口，回调在其界面线程中执行
+            on_success: 转换成功的回调
+            on_finish: 转换结束（无论成功、失败或取消）的回调
+            on_progress: 每解析完一批页面时的回调 (已完成页数, 总页数)
             
         Returns:
-            转换是否成功
+            后台任务，可调用其 cancel() 取消转换
         """
-        try:
-            self.update_status("正在转换...")
-            self.update_ui()
-            
-            # 创建转换器实例
-            self.cv = Converter(pdf_path)
-            total_pages = len(self.cv.pages)
-            
-            # 尝试使用tqdm进行进度显示
-            try:
-                self._convert_with_tqdm(output_path, total_pages)
-            except ImportError:
-                self._convert_simple(output_path, total_pages)
-            
-            self.update_status("转换完成!")
-            return True
-            
-        except Exception as e:
+        def on_done(result):
+            elapsed = job.elapsed
+            if isinstance(result, tuple):
+                total_pages, outputs, failures = result
+                message = f"已完成转换: {len(outputs)} 个文件，共 {total_pages} 页"
+                if failures:
+                    message += f"，{len(failures)} 个文件失败"
+                    print("\n".join(f"{path}: {error}" for path, error in failures))
+            else:
+                total_pages = result
+                message = f"已完成转换: 共 {total_pages} 页"
+            self.update_status(f"{message}（{elapsed:.1f} 秒）")
+            on_finish()
+            on_success()
+        
+        def on_error(e):
             error_message = ErrorHandler.handle_error(e, self.update_status)
+            on_finish()
             ErrorHandler.show_error(error_message)
-            return False
-        finally:
-            if self.cv:
-                self.cv.close()
-    
-    def _convert_with_tqdm(self, output_path: str, total_pages: int):
-        """使用tqdm库进行带进度条的转换
-        
-        Args:
-            output_path: 输出Word文件路径
-            total_pages: PDF总页数
-        """
-        from tqdm import tqdm
         
-        # 创建进度条
-        with tqdm(total=total_pages, desc="转换进度", unit="页") as progress_bar:
-            # 一次性转换所有页面
-            self.cv.convert(output_path)
-            # 更新进度条
-            progress_bar.update(total_pages)
-            self.update_status(f"已完成转换: 共 {total_pages} 页")
-            self.update_ui()
-    
-    def _convert_simple(self, output_path: str, total_pages: int):
-        """使用简单模式进行转换（无tqdm库时）
+        def on_cancel():
+            self.update_status("已取消转换")
+            on_finish()
         
-        Args:
-            output_path: 输出Word文件路径
-            total_pages: PDF总页数
-        """
-        self.update_status("正在转换(简单模式)...")
-        self.update_ui()
+        def report(done, total):
+            elapsed = job.elapsed
+            rate = f"，{done / elapsed:.1f} 页/秒" if elapsed > 0 else ""
+            self.update_status(f"正在转换: {done}/{total} 页{rate}")
+            if on_progress is not None:
+                on_progress(done, total)
         
-        # 一次性转换所有页面
-        self.cv.convert(output_path)
-        self.update_status(f"已完成转换: 共 {total_pages} 页 (简单模式)")
-        self.update_ui()
+        self.update_status("正在转换...")
+        task = pdf_to_word_batch if isinstance(pdf_path, list) else pdf_to_word
+        # 页面分块交给多个进程并行解析，界面线程只接收进度
+        job = get_scheduler().submit(
+            task, pdf_path, output_path,
+            name="PDF转Word",
+            ui=master,
+            on_progress=report,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_cancel,
+        )
+        return job
 
 
 class UIComponents:
@@ -171,13 +165,21 @@ class UIComponents:
         
         tk.Entry(file_frame, textvariable=self.pdf_path, width=50).pack(side="left", padx=5)
         tk.Button(file_frame, text="选择PDF", command=self.app.select_pdf).pack(side="left", padx=5)
+        tk.Button(file_frame, text="选择文件夹", command=self.app.select_folder).pack(side="left", padx=5)
     
     def create_action_frame(self):
         """创建操作按钮区域"""
         action_frame = tk.Frame(self.master)
         action_frame.pack(padx=10, pady=5, fill="x")
         
-        tk.Button(action_frame, text="转换为Word", command=self.app.convert_to_word).pack(side="right", padx=5)
+        self.convert_button = tk.Button(action_frame, text="转换为Word", command=self.app.convert_to_word)
+        self.convert_button.pack(side="right", padx=5)
+        self.cancel_button = tk.Button(action_frame, text="取消", command=self.app.cancel_conversion,
+                                       state=tk.DISABLED)
+        self.cancel_button.pack(side="right", padx=5)
+        
+        self.progress = ttk.Progressbar(action_frame, length=250, mode="determinate")
+        self.progress.pack(side="left", padx=5)
     
     def create_status_bar(self):
         """创建状态栏"""
@@ -197,6 +199,22 @@ class UIComponents:
         """
         self.status_var.set(message)
     
+    def update_progress(self, done: int, total: int):
+        """更新进度条
+        
+        Args:
+            done: 已完成页数
+            total: 总页数
+        """
+        self.progress["maximum"] = max(total, 1)
+        self.progress["value"] = done
+    
+    def set_running(self, running: bool):
+        """切换转换中/空闲状态下的按钮和进度条"""
+        self.convert_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        self.progress["value"] = 0
+    
     def update_ui(self):
         """强制更新UI"""
         self.master.update()
@@ -274,14 +292,8 @@ class PDFtoWordApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -298,24 +310,13 @@ class PDFtoWordApp:
             self.master.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -329,6 +330,7 @@ class PDFtoWordApp:
         
         # 初始化PDF转换器
         self.converter = PDFConverter(self.ui.update_status, self.ui.update_ui)
+        self.job = None
 
     def select_pdf(self):
         """选择PDF文件"""
@@ -340,24 +342,59 @@ class PDFtoWordApp:
             self.ui.pdf_path.set(file_path)
             self.ui.update_status(f"已选择: {os.path.basename(file_path)}")
     
+    def select_folder(self):
+        """选择包含PDF的文件夹，批量转换其中所有PDF"""
+        folder = filedialog.askdirectory(title="选择包含PDF的文件夹")
+        if folder:
+            self.ui.pdf_path.set(folder)
+            self.ui.update_status(f"已选择文件夹: {os.path.basename(folder)}")
+    
     def convert_to_word(self):
-        """将PDF转换为Word文档"""
+        """将PDF转换为Word文档（选择的是文件夹时批量转换其中所有PDF）"""
+        if self.job is not None:
+            return
         pdf_path = self.ui.pdf_path.get()
         if not pdf_path:
-            messagebox.showwarning("警告", "请先选择PDF文件")
+            messagebox.showwarning("警告", "请先选择PDF文件或文件夹")
             return
         
-        output_path = filedialog.asksaveasfilename(
-            title="保存Word文档",
-            defaultextension=".docx",
-            filetypes=[("Word文档", "*.docx")]
-        )
+        if os.path.isdir(pdf_path):
+            pdf_files = sorted(
+                os.path.join(pdf_path, name) for name in os.listdir(pdf_path)
+                if name.lower().endswith(".pdf")
+            )
+            if not pdf_files:
+                messagebox.showwarning("警告", "文件夹中没有PDF文件")
+                return
+            output_path = filedialog.askdirectory(title="选择输出文件夹")
+            source = pdf_files
+        else:
+            output_path = filedialog.asksaveasfilename(
+                title="保存Word文档",
+                defaultextension=".docx",
+                filetypes=[("Word文档", "*.docx")]
+            )
+            source = pdf_path
         
         if not output_path:
             return
         
-        if self.converter.convert(pdf_path, output_path):
-            messagebox.showinfo("成功", f"PDF转换完成!\n保存到: {output_path}")
+        self.ui.set_running(True)
+        self.job = self.converter.convert(
+            source, output_path, self.master,
+            on_success=lambda: messagebox.showinfo("成功", f"PDF转换完成!\n保存到: {output_path}"),
+            on_finish=self.on_conversion_finish,
+            on_progress=self.ui.update_progress,
+        )
+    
+    def cancel_conversion(self):
+        """取消正在进行的转换"""
+        if self.job is not None:
+            self.job.cancel()
+    
+    def on_conversion_finish(self):
+        self.job = None
+        self.ui.set_running(False)
 
 
 def main():
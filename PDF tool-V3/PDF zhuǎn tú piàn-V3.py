@@ -4,17 +4,20 @@ sys.dont_write_bytecode = True
 
 import os
 import sys
-import threading
-import subprocess
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
-import fitz  
-from PIL import Image, ImageTk
-import tempfile
-import shutil
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from LazyImport import lazy_import
+from PdfCore import pdf_to_images
+from JobScheduler import get_scheduler
+from PdfThumbnails import ThumbnailStrip
+
+# 重型依赖按需导入，首次使用时才加载
+fitz = lazy_import('fitz')
 
 
 class PDFToImageApp:
@@ -87,14 +90,8 @@ class PDFToImageApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -111,24 +108,13 @@ class PDFToImageApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -153,12 +139,9 @@ class PDFToImageApp:
         self.output_format = tk.StringVar(value="png")
         self.dpi = tk.IntVar(value=300)
         self.quality = tk.IntVar(value=90)
-        self.selected_pages = []
+        self.workers = tk.IntVar(value=os.cpu_count() or 1)
         self.all_pages = tk.BooleanVar(value=True)
         self.total_pages = 0
-        self.pdf_document = None
-        self.preview_images = []
-        self.temp_dir = tempfile.mkdtemp()
         
         # 创建主框架
         self.main_frame = ttk.Frame(self.root)
@@ -208,21 +191,9 @@ class PDFToImageApp:
         self.page_info = ttk.Label(control_frame, text="未选择PDF文件")
         self.page_info.pack(side=tk.LEFT, padx=5)
         
-        # 预览区域 - 使用Canvas和Scrollbar
-        self.preview_canvas_frame = ttk.Frame(preview_frame)
-        self.preview_canvas_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        self.preview_canvas = tk.Canvas(self.preview_canvas_frame, bg="white")
-        self.preview_scrollbar = ttk.Scrollbar(self.preview_canvas_frame, orient=tk.HORIZONTAL, command=self.preview_canvas.xview)
-        
-        self.preview_canvas.configure(xscrollcommand=self.preview_scrollbar.set)
-        self.preview_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        self.preview_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # 创建预览内容框架
-        self.preview_content = ttk.Frame(self.preview_canvas)
-        self.preview_canvas.create_window((0, 0), window=self.preview_content, anchor=tk.NW)
-        self.preview_content.bind("<Configure>", lambda e: self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all")))
+        # 预览区域 - 只渲染可见页面的虚拟化缩略图条
+        self.preview_strip = ThumbnailStrip(preview_frame, on_toggle=self._toggle_page)
+        self.preview_strip.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def _create_settings_section(self):
         """创建设置区域"""
@@ -256,6 +227,10 @@ class PDFToImageApp:
         dpi_combo = ttk.Combobox(dpi_frame, textvariable=self.dpi, values=dpi_values, width=5)
         dpi_combo.pack(side=tk.LEFT, padx=5)
         
+        # 并行渲染的进程数
+        ttk.Label(dpi_frame, text="进程数:").pack(side=tk.LEFT, padx=5)
+        ttk.Spinbox(dpi_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.workers, width=4).pack(side=tk.LEFT, padx=5)
+        
         # 质量设置 (仅对JPEG有效)
         quality_scale_frame = ttk.Frame(quality_frame)
         quality_scale_frame.pack(fill=tk.X, padx=5, pady=2)
@@ -285,6 +260,11 @@ class PDFToImageApp:
         # 转换按钮
         self.convert_btn = ttk.Button(action_frame, text="开始转换", command=self._start_conversion)
         self.convert_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        # 取消按钮
+        self.cancel_btn = ttk.Button(action_frame, text="取消", command=self._cancel_conversion, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.job = None
     
     def _select_pdf(self):
         """选择PDF文件"""
@@ -306,31 +286,17 @@ class PDFToImageApp:
     def _load_pdf(self, pdf_path):
         """加载PDF文件并生成预览"""
         try:
-            # 关闭之前打开的文档
-            if self.pdf_document:
-                self.pdf_document.close()
-            
-            # 打开新文档
-            self.pdf_document = fitz.open(pdf_path)
-            self.total_pages = len(self.pdf_document)
+            # 只读取页数，缩略图由预览条在后台按需渲染
+            with fitz.open(pdf_path) as document:
+                self.total_pages = document.page_count
             
             # 更新页面信息
             self.page_info.config(text=f"共 {self.total_pages} 页")
             
-            # 清除之前的预览
-            for widget in self.preview_content.winfo_children():
-                widget.destroy()
-            
-            # 清除之前的预览图像
-            self.preview_images.clear()
-            
-            # 重置页面选择
-            self.selected_pages = list(range(self.total_pages))
+            # 显示预览并重置页面选择
+            self.preview_strip.load(pdf_path, self.total_pages)
             self.all_pages.set(True)
             
-            # 生成预览
-            self._generate_previews()
-            
             # 设置默认输出目录为PDF所在目录
             if not self.output_dir.get():
                 self.output_dir.set(os.path.dirname(pdf_path))
@@ -341,92 +307,14 @@ class PDFToImageApp:
             messagebox.showerror("错误", f"无法加载PDF文件: {str(e)}")
             self.status_var.set("加载PDF失败")
     
-    def _generate_previews(self):
-        """生成PDF页面预览"""
-        if not self.pdf_document:
-            return
-        
-        # 清理临时目录
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        
-        # 创建预览框架
-        preview_frames = []
-        
-        # 为每一页创建预览
-        for page_num in range(self.total_pages):
-            # 创建页面框架
-            page_frame = ttk.Frame(self.preview_content)
-            page_frame.pack(side=tk.LEFT, padx=5, pady=5)
-            
-            # 获取页面
-            page = self.pdf_document[page_num]
-            
-            # 渲染页面为图像
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-            
-            # 保存为临时图像
-            temp_img_path = os.path.join(self.temp_dir, f"preview_{page_num}.png")
-            pix.save(temp_img_path)
-            
-            # 使用PIL加载图像
-            img = Image.open(temp_img_path)
-            img_tk = ImageTk.PhotoImage(img)
-            
-            # 保存引用以防止垃圾回收
-            self.preview_images.append(img_tk)
-            
-            # 创建图像标签
-            img_label = ttk.Label(page_frame, image=img_tk)
-            img_label.pack(padx=2, pady=2)
-            
-            # 创建复选框
-            var = tk.BooleanVar(value=True)
-            check = ttk.Checkbutton(
-                page_frame, 
-                text=f"第 {page_num + 1} 页", 
-                variable=var,
-                command=lambda pn=page_num, v=var: self._toggle_page(pn, v.get())
-            )
-            check.pack(padx=2, pady=2)
-            
-            preview_frames.append((page_frame, var))
-        
-        # 更新Canvas滚动区域
-        self.preview_canvas.update_idletasks()
-        self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
-    
     def _toggle_page_selection(self):
         """切换全部页面/选择页面模式"""
-        all_pages = self.all_pages.get()
-        
-        # 更新所有页面的选择状态
-        for widget in self.preview_content.winfo_children():
-            for child in widget.winfo_children():
-                if isinstance(child, ttk.Checkbutton):
-                    if all_pages:
-                        child.state(['selected'])
-                    else:
-                        child.state(['!selected'])
-        
-        # 更新选择的页面列表
-        if all_pages:
-            self.selected_pages = list(range(self.total_pages))
-        else:
-            self.selected_pages = []
+        self.preview_strip.set_all(self.all_pages.get())
     
     def _toggle_page(self, page_num, selected):
         """切换单个页面的选择状态"""
-        if selected and page_num not in self.selected_pages:
-            self.selected_pages.append(page_num)
-        elif not selected and page_num in self.selected_pages:
-            self.selected_pages.remove(page_num)
-        
         # 更新全选复选框状态
-        if len(self.selected_pages) == self.total_pages:
-            self.all_pages.set(True)
-        else:
-            self.all_pages.set(False)
+        self.all_pages.set(self.preview_strip.selection().is_all())
     
     def _update_quality_label(self, *args):
         """更新质量标签"""
@@ -445,88 +333,80 @@ class PDFToImageApp:
             return
         
         # 检查是否已选择页面
-        if not self.selected_pages:
+        page_list = self.preview_strip.selected_pages()
+        if not page_list:
             messagebox.showwarning("警告", "请至少选择一个页面进行转换")
             return
         
         # 禁用转换按钮
         self.convert_btn.config(state=tk.DISABLED)
-        
-        # 在新线程中执行转换
-        threading.Thread(target=self._convert_pdf_to_images, daemon=True).start()
+        self.cancel_btn.config(state=tk.NORMAL)
+        
+        # 设置进度条
+        self.progress["maximum"] = len(page_list)
+        self.progress["value"] = 0
+        
+        # 在后台任务中执行转换
+        self.job = get_scheduler().submit(
+            pdf_to_images,
+            self.pdf_path.get(), self.output_dir.get(), self.output_format.get(),
+            self.dpi.get(), self.quality.get(),
+            pages=page_list,
+            workers=self._get_workers(),
+            name="PDF转图片",
+            ui=self.root,
+            on_progress=self._on_conversion_progress,
+            on_done=self._on_conversion_done,
+            on_error=self._on_conversion_error,
+            on_cancel=self._on_conversion_cancel,
+        )
+    
+    def _cancel_conversion(self):
+        """取消正在进行的转换"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("正在取消...")
     
-    def _convert_pdf_to_images(self):
-        """将PDF转换为图像"""
+    def _get_workers(self):
+        """读取进程数设置，输入无效时使用 CPU 核数"""
         try:
-            # 获取设置
-            pdf_path = self.pdf_path.get()
-            output_dir = self.output_dir.get()
-            img_format = self.output_format.get()
-            dpi = self.dpi.get()
-            quality = self.quality.get()
-            
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 获取PDF文件名（不含扩展名）
-            pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
-            
-            # 创建输出子目录
-            output_subdir = os.path.join(output_dir, f"{pdf_name}_images")
-            os.makedirs(output_subdir, exist_ok=True)
-            
-            # 设置进度条
-            total_pages = len(self.selected_pages)
-            self.progress["maximum"] = total_pages
-            self.progress["value"] = 0
-            
-            # 计算缩放因子
-            zoom = dpi / 72  # 默认PDF DPI是72
-            
-            # 转换选定的页面
-            for i, page_num in enumerate(sorted(self.selected_pages)):
-                # 更新状态
-                self.status_var.set(f"正在转换第 {page_num + 1} 页 ({i + 1}/{total_pages})")
-                self.root.update_idletasks()
-                
-                # 获取页面
-                page = self.pdf_document[page_num]
-                
-                # 渲染页面为图像
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # 确定输出文件名
-                output_filename = f"{pdf_name}_page_{page_num + 1}.{img_format}"
-                output_path = os.path.join(output_subdir, output_filename)
-                
-                # 保存图像
-                if img_format.lower() == "jpg":
-                    # 对于JPEG，我们需要特殊处理以应用质量设置
-                    pix.save(output_path, output_format="jpeg", jpg_quality=quality)
-                else:
-                    pix.save(output_path)
-                
-                # 更新进度条
-                self.progress["value"] = i + 1
-                self.root.update_idletasks()
-            
-            # 完成
-            self.status_var.set(f"转换完成! 已保存 {total_pages} 个图像到 {output_subdir}")
-            messagebox.showinfo("完成", f"已成功将 {total_pages} 页转换为图像\n保存位置: {output_subdir}")
-            
-            # 在文件资源管理器中打开输出目录
-            self._open_output_folder(output_subdir)
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"转换过程中出错: {str(e)}")
-            self.status_var.set("转换失败")
-        
-        finally:
-            # 重新启用转换按钮
-            self.convert_btn.config(state=tk.NORMAL)
-            # 重置进度条
-            self.progress["value"] = 0
+            return max(1, int(self.workers.get()))
+        except (tk.TclError, ValueError):
+            return os.cpu_count() or 1
+    
+    def _on_conversion_progress(self, done, total):
+        # 更新状态和进度条，同时显示渲染速度
+        elapsed = self.job.elapsed if self.job is not None else 0
+        speed = f"，{done / elapsed:.1f} 页/秒" if elapsed > 0 else ""
+        self.status_var.set(f"正在转换 ({done}/{total}{speed})")
+        self.progress["value"] = done
+    
+    def _on_conversion_done(self, result):
+        output_subdir, outputs = result
+        elapsed = self.job.elapsed
+        self._finish_conversion()
+        self.status_var.set(f"转换完成! 已保存 {len(outputs)} 个图像到 {output_subdir}"
+                            f"（耗时 {elapsed:.1f} 秒，{len(outputs) / max(elapsed, 1e-6):.1f} 页/秒）")
+        messagebox.showinfo("完成", f"已成功将 {len(outputs)} 页转换为图像\n保存位置: {output_subdir}")
+        
+        # 在文件资源管理器中打开输出目录
+        self._open_output_folder(output_subdir)
+    
+    def _on_conversion_error(self, error):
+        self._finish_conversion()
+        messagebox.showerror("错误", f"转换过程中出错: {str(error)}")
+        self.status_var.set("转换失败")
+    
+    def _on_conversion_cancel(self):
+        self._finish_conversion()
+        self.status_var.set("已取消转换")
+    
+    def _finish_conversion(self):
+        """重新启用转换按钮并重置进度条"""
+        self.job = None
+        self.convert_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress["value"] = 0
     
     def _open_output_folder(self, folder_path):
         """在文件资源管理器中打开输出文件夹"""
@@ -560,16 +440,6 @@ class PDFToImageApp:
     
     def _on_closing(self):
         """关闭应用程序时的清理工作"""
-        # 关闭PDF文档
-        if self.pdf_document:
-            self.pdf_document.close()
-        
-        # 清理临时目录
-        try:
-            shutil.rmtree(self.temp_dir)
-        except:
-            pass
-        
         # 关闭窗口
         self.root.destroy()
 
@@ -4,18 +4,28 @@ sys.dont_write_bytecode = True
 
 import os
 import sys
-import subprocess
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
-import fitz  # PyMuPDF
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from PdfCore import images_to_pdf
+from JobScheduler import get_scheduler
 
 
 class ImageToPDFApp:
     """图片转PDF应用程序主类"""
     
+    # 图片尺寸选项 -> 最长边像素数（None 表示嵌入原图）
+    IMAGE_SIZES = {
+        "原图": None,
+        "最长边 3000": 3000,
+        "最长边 2000": 2000,
+        "最长边 1500": 1500,
+        "最长边 1000": 1000,
+    }
+    
     def __init__(self, root):
         """初始化应用程序"""
         self.root = root
@@ -83,14 +93,8 @@ class ImageToPDFApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -107,24 +111,13 @@ class ImageToPDFApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -139,6 +132,7 @@ class ImageToPDFApp:
         # 应用程序变量
         self.image_paths = []
         self.output_path = tk.StringVar()
+        self.job = None
         
         # 创建主框架
         self.main_frame = ttk.Frame(self.root)
@@ -196,7 +190,19 @@ class ImageToPDFApp:
         status_label.pack(side=tk.LEFT, padx=5, pady=5)
         
         # 转换按钮
-        ttk.Button(action_frame, text="开始转换", command=self._start_conversion).pack(side=tk.RIGHT, padx=5, pady=5)
+        self.convert_btn = ttk.Button(action_frame, text="开始转换", command=self._start_conversion)
+        self.convert_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        # 图片尺寸：照片较大时缩小后再嵌入，输出文件更小
+        self.image_size = tk.StringVar(value="原图")
+        ttk.Combobox(
+            action_frame,
+            textvariable=self.image_size,
+            values=list(self.IMAGE_SIZES),
+            state="readonly",
+            width=12
+        ).pack(side=tk.RIGHT, padx=5, pady=5)
+        ttk.Label(action_frame, text="图片尺寸:").pack(side=tk.RIGHT, pady=5)
     
     def _add_images(self):
         """添加图片到列表"""
@@ -266,46 +272,49 @@ class ImageToPDFApp:
             messagebox.showwarning("警告", "请选择输出PDF文件路径")
             return
         
-        try:
-            # 创建PDF文档
-            pdf_document = fitz.open()
-            
-            # 按顺序添加图片到PDF
-            for img_path in self.image_paths:
-                try:
-                    # 使用Pillow打开图片
-                    img = Image.open(img_path)
-                    
-                    # 创建PDF页面
-                    pdf_page = pdf_document.new_page(
-                        width=img.width,
-                        height=img.height
-                    )
-                    
-                    # 插入图片到PDF页面
-                    pdf_page.insert_image(
-                        fitz.Rect(0, 0, img.width, img.height),
-                        filename=img_path
-                    )
-                    
-                except Exception as e:
-                    messagebox.showwarning("警告", f"无法处理图片 {os.path.basename(img_path)}: {str(e)}")
-                    continue
-            
-            # 保存PDF
-            pdf_document.save(self.output_path.get())
-            pdf_document.close()
-            
-            # 完成提示
-            messagebox.showinfo("完成", f"已成功将 {len(self.image_paths)} 张图片转换为PDF\n保存位置: {self.output_path.get()}")
-            self.status_var.set("转换完成")
-            
-            # 在文件资源管理器中打开输出目录
-            self._open_output_folder(os.path.dirname(self.output_path.get()))
+        # 在后台按顺序添加图片到PDF，界面保持响应
+        output_path = self.output_path.get()
+        self.convert_btn.config(state=tk.DISABLED)
+        self.job = get_scheduler().submit(
+            images_to_pdf, list(self.image_paths), output_path,
+            max_side=self.IMAGE_SIZES[self.image_size.get()],
+            name="图片转PDF",
+            ui=self.root,
+            on_progress=self._on_conversion_progress,
+            on_done=lambda result: self._on_conversion_done(result, output_path),
+            on_error=self._on_conversion_error,
+        )
+    
+    def _on_conversion_progress(self, done, total):
+        elapsed = self.job.elapsed if self.job is not None else 0
+        rate = f"，{done / elapsed:.1f} 张/秒" if elapsed > 0 else ""
+        self.status_var.set(f"正在转换 ({done}/{total}){rate}")
+    
+    def _on_conversion_done(self, result, output_path):
+        added, skipped, saved_bytes = result
+        elapsed = self.job.elapsed
+        self.job = None
+        self.convert_btn.config(state=tk.NORMAL)
+        if skipped:
+            messagebox.showwarning("警告", "以下图片无法处理：\n" + "\n".join(
+                f"{os.path.basename(path)}: {error}" for path, error in skipped
+            ))
         
-        except Exception as e:
-            messagebox.showerror("错误", f"转换过程中出错: {str(e)}")
-            self.status_var.set("转换失败")
+        # 完成提示
+        message = f"已成功将 {added} 张图片转换为PDF\n保存位置: {output_path}"
+        if saved_bytes:
+            message += f"\n重复的图片只嵌入一次，节省 {saved_bytes / (1024 * 1024):.1f} MB"
+        messagebox.showinfo("完成", message)
+        self.status_var.set(f"转换完成，{added} 张图片，{elapsed:.1f} 秒")
+        
+        # 在文件资源管理器中打开输出目录
+        self._open_output_folder(os.path.dirname(output_path))
+    
+    def _on_conversion_error(self, error):
+        self.job = None
+        self.convert_btn.config(state=tk.NORMAL)
+        messagebox.showerror("错误", f"转换过程中出错: {str(error)}")
+        self.status_var.set("转换失败")
     
     def _open_output_folder(self, folder_path):
         """在文件资源管理器中打开输出文件夹"""
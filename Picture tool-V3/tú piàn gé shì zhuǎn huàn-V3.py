@@ -4,23 +4,19 @@ sys.dont_write_bytecode = True
 
 import os
 import sys
-import threading
 import json
-import subprocess
 from queue import Queue
 from datetime import datetime
 from pathlib import Path
-from PIL import Image
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from ImageCore import SUPPORTED_FORMATS, convert_images, list_images
+from JobScheduler import get_scheduler
 from tkinter import Tk, filedialog, messagebox, StringVar, OptionMenu, IntVar, font
 from tkinter.ttk import Frame, Button, Label, Entry, Checkbutton, Radiobutton, Progressbar, Separator, Style
 
 class ImageConverter:
-    SUPPORTED_FORMATS = [
-        'jpg', 'jpeg', 'png', 'webp', 
-        'bmp', 'gif', 'tiff', 'psd'
-    ]
-    
     def __init__(self):
         # 首先检查开源协议文档是否存在并验证完整性
         if not self.check_license():
@@ -39,6 +35,9 @@ class ImageConverter:
             
         self.task_queue = Queue()
         self.running = False
+        self.job = None
+        self.batch_mode = False
+        self.skipped_count = 0
         self.status_var = StringVar()
         
         self.setup_ui()
@@ -89,14 +88,8 @@ class ImageConverter:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -113,24 +106,13 @@ class ImageConverter:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -173,7 +155,7 @@ class ImageConverter:
         label = Label(main_frame, text="输出格式:")
         label.grid(row=3, column=0, sticky='w')
         self.format_var = StringVar(value='png')
-        option_menu = OptionMenu(main_frame, self.format_var, *self.SUPPORTED_FORMATS)
+        option_menu = OptionMenu(main_frame, self.format_var, *SUPPORTED_FORMATS)
         option_menu.grid(row=3, column=1, sticky='w')
         
         # 质量设置
@@ -206,6 +188,10 @@ class ImageConverter:
         convert_button = Button(button_frame, text="转换", command=self.start_conversion)
         convert_button.pack(side='right', padx=5)
         
+        # 取消按钮
+        self.cancel_button = Button(button_frame, text="取消", command=self.cancel_conversion, state='disabled')
+        self.cancel_button.pack(side='right', padx=5)
+        
         # 状态标签
         self.status_var = StringVar(value="就绪")
         status_label = Label(main_frame, textvariable=self.status_var)
@@ -248,62 +234,59 @@ class ImageConverter:
             self.input_entry.insert(0, filepath)
     
     def start_conversion(self):
-        """启动转换线程"""
+        """收集待转换的图片并提交到后台任务"""
         if self.running:
             return
+        tasks = self.collect_tasks()
+        if not tasks:
+            return
             
         self.running = True
         self.progress['value'] = 0
+        self.progress['maximum'] = len(tasks)
         self.status_var.set("转换中...")
-        threading.Thread(target=self.convert, daemon=True).start()
+        self.cancel_button.config(state='normal')
+        self.batch_mode = self.mode_var.get() != 'single'
+        self.job = get_scheduler().submit(
+            convert_images, tasks,
+            name="图片格式转换",
+            ui=self.root,
+            on_progress=self.update_progress,
+            on_done=self.on_conversion_done,
+            on_error=self.on_conversion_error,
+            on_cancel=self.on_conversion_cancel,
+        )
         
-    def convert_single_image(self, input_path, output_path, output_format):
-        """转换单个图片"""
-        try:
-            # 检查输出文件是否已存在
-            if os.path.exists(output_path):
-                if not messagebox.askyesno("确认", f"文件 {os.path.basename(output_path)} 已存在，是否覆盖？"):
-                    return "用户取消操作"
-            
-            quality = max(1, min(100, self.quality_var.get()))
-            img = Image.open(input_path)
-            
-            # 根据格式设置保存参数
-            save_args = {'format': output_format.upper()}
-            if output_format.lower() in ['jpg', 'jpeg', 'webp']:
-                save_args['quality'] = quality
-            elif output_format.lower() == 'png':
-                save_args['compress_level'] = 9 - int(quality / 11.11)  # 将1-100映射到9-0
-            
-            img.save(output_path, **save_args)
-            return True
-            
-        except IOError as e:
-            error_msg = f"文件读写错误: {str(e)}"
-            return error_msg
-        except Image.DecompressionBombError:
-            error_msg = "图片尺寸过大，可能造成内存溢出"
-            return error_msg
-        except Exception as e:
-            error_msg = f"未知错误: {str(e)}"
-            return error_msg
+    def cancel_conversion(self):
+        if self.running:
+            self.job.cancel()
+        
+    def confirm_overwrite(self, output_path):
+        """输出文件已存在时询问是否覆盖"""
+        if os.path.exists(output_path):
+            return messagebox.askyesno("确认", f"文件 {os.path.basename(output_path)} 已存在，是否覆盖？")
+        return True
     
-    def update_progress(self, value):
+    def update_progress(self, done, total):
         """更新进度条"""
-        self.progress['value'] = value
-        self.root.update_idletasks()
+        self.progress['value'] = done
+        
+    def collect_tasks(self):
+        """
+        在界面线程中校验输入、询问保存位置和是否覆盖
         
-    def convert(self):
-        """主转换逻辑"""
+        Returns:
+            list: [(输入路径, 输出路径, 目标格式, 质量), ...],没有可转换的图片时为空列表
+        """
         output_format = self.format_var.get()
         output_dir = self.output_entry.get()
+        quality = self.quality_var.get()
         
         if self.mode_var.get() == 'single':
             input_path = self.input_entry.get()
             if not input_path:
                 messagebox.showerror("错误", "请先选择输入文件")
-                self.running = False
-                return
+                return []
                 
             if not output_dir:
                 output_path = filedialog.asksaveasfilename(
@@ -316,61 +299,69 @@ class ImageConverter:
                 name, ext = os.path.splitext(filename)
                 output_path = os.path.join(output_dir, f"{name}.{output_format}")
                 
-            if output_path:
-                result = self.convert_single_image(input_path, output_path, output_format)
-                if result is True:
-                    self.status_var.set("转换完成！")
-                    messagebox.showinfo("成功", "图片转换完成！")
-                else:
-                    messagebox.showerror("错误", result)
-        else:
-            input_dir = self.batch_entry.get()
-            if not input_dir:
-                messagebox.showerror("错误", "请先选择输入目录")
-                self.running = False
-                return
-                
-            if not output_dir:
-                messagebox.showerror("错误", "请先选择输出目录")
-                self.running = False
-                return
-                
-            try:
-                # 收集所有图片文件
-                image_files = [
-                    f for f in os.listdir(input_dir) 
-                    if f.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tiff', '.psd'))
-                ]
-                
-                total = len(image_files)
-                if total == 0:
-                    messagebox.showwarning("警告", "指定目录中没有找到支持的图片文件")
-                    self.running = False
-                    return
-                    
-                self.progress['maximum'] = total
-                
-                # 处理每个文件
-                success_count = 0
-                for i, filename in enumerate(image_files):
-                    input_path = os.path.join(input_dir, filename)
-                    name, ext = os.path.splitext(filename)
-                    output_path = os.path.join(output_dir, f"{name}.{output_format}")
-                    
-                    result = self.convert_single_image(input_path, output_path, output_format)
-                    if result is True:
-                        success_count += 1
-                    
-                    self.update_progress(i + 1)
-                
-                self.status_var.set(f"批量转换完成 - 成功: {success_count}, 失败: {total - success_count}")
-                messagebox.showinfo("完成", 
-                    f"批量转换完成！\n成功: {success_count}\n失败: {total - success_count}")
-                    
-            except Exception as e:
-                messagebox.showerror("错误", f"批量转换失败: {str(e)}")
-                
+            if not output_path or not self.confirm_overwrite(output_path):
+                return []
+            return [(input_path, output_path, output_format, quality)]
+        
+        input_dir = self.batch_entry.get()
+        if not input_dir:
+            messagebox.showerror("错误", "请先选择输入目录")
+            return []
+            
+        if not output_dir:
+            messagebox.showerror("错误", "请先选择输出目录")
+            return []
+            
+        try:
+            # 收集所有图片文件
+            image_files = list_images(input_dir)
+        except Exception as e:
+            messagebox.showerror("错误", f"批量转换失败: {str(e)}")
+            return []
+            
+        if not image_files:
+            messagebox.showwarning("警告", "指定目录中没有找到支持的图片文件")
+            return []
+            
+        tasks = []
+        self.skipped_count = 0
+        for filename in image_files:
+            name, ext = os.path.splitext(filename)
+            output_path = os.path.join(output_dir, f"{name}.{output_format}")
+            if self.confirm_overwrite(output_path):
+                tasks.append((os.path.join(input_dir, filename), output_path, output_format, quality))
+            else:
+                self.skipped_count += 1
+        return tasks
+        
+    def on_conversion_done(self, result):
+        success_count, failed = result
+        self.running = False
+        self.cancel_button.config(state='disabled')
+        if not self.batch_mode:
+            if failed:
+                self.status_var.set("就绪")
+                messagebox.showerror("错误", failed[0][1])
+            else:
+                self.status_var.set("转换完成！")
+                messagebox.showinfo("成功", "图片转换完成！")
+            return
+        
+        failed_count = len(failed) + self.skipped_count
+        self.status_var.set(f"批量转换完成 - 成功: {success_count}, 失败: {failed_count}")
+        messagebox.showinfo("完成", 
+            f"批量转换完成！\n成功: {success_count}\n失败: {failed_count}\n耗时: {self.job.elapsed:.1f} 秒")
+        
+    def on_conversion_error(self, error):
+        self.running = False
+        self.cancel_button.config(state='disabled')
+        self.status_var.set("就绪")
+        messagebox.showerror("错误", f"批量转换失败: {str(error)}")
+        
+    def on_conversion_cancel(self):
         self.running = False
+        self.cancel_button.config(state='disabled')
+        self.status_var.set("已取消")
 
 if __name__ == "__main__":
     converter = ImageConverter()
@@ -1,14 +1,19 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
 import os
 import sys
-import subprocess
 import threading
-import math
 import json
 from pathlib import Path
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from LazyImport import lazy_import
+import ImageCore
+
+# 重型依赖按需导入，首次使用时才加载
+Image = lazy_import('PIL.Image')
+ImageTk = lazy_import('PIL.ImageTk')
 
 
 class ImageCombinerApp:
@@ -86,14 +91,8 @@ class ImageCombinerApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -111,24 +110,13 @@ class ImageCombinerApp:
             self.master.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -346,7 +334,6 @@ class ImageCombinerApp:
             try:
                 # 获取基本文件名和扩展名
                 base, ext = os.path.splitext(save_path)
-                ext = ext.lower()
                 
                 # 保存多张图片
                 count = self.export_count.get()
@@ -362,15 +349,7 @@ class ImageCombinerApp:
                     else:
                         current_path = save_path
                     
-                    # 根据文件格式保存
-                    if ext in (".jpg", ".jpeg"):
-                        combined.save(current_path, "JPEG", quality=95)
-                    elif ext == ".png":
-                        combined.save(current_path, "PNG")
-                    elif ext == ".bmp":
-                        combined.save(current_path, "BMP")
-                    else:
-                        combined.save(current_path)  # 默认格式
+                    ImageCore.save_combined(combined, current_path)
                 
                 messagebox.showinfo("成功", f"已保存 {count} 张图片到: {os.path.dirname(save_path)}")
                 
@@ -413,194 +392,32 @@ class ImageCombinerApp:
             self.status_var.set("批量处理完成")
     
     def combine_images(self):
-        """核心图片合成方法"""
+        """核心图片合成方法（布局与压缩逻辑见 Core/ImageCore.py）"""
         if not self.image_paths:
             return None
-            
-        try:
-            self.status_var.set("正在加载图片...")
-            self.master.update()
-            
-            # 随机选择指定数量的图片
-            select_count = self.random_select_count.get()
-            if select_count > 0 and select_count < len(self.image_paths):
-                import random
-                selected_paths = random.sample(self.image_paths, select_count)
-                self.status_var.set(f"已随机选择 {select_count} 张图片")
-            else:
-                selected_paths = self.image_paths
-                
-            # 加载选中的图片
-            images = []
-            total_size = 0
-            for i, path in enumerate(selected_paths):
-                self.status_var.set(f"正在加载图片 ({i+1}/{len(selected_paths)})...")
-                self.master.update()
-                img = Image.open(path)
-                total_size += os.path.getsize(path)
-                images.append(img)
-                
-            # 自动压缩大图片
-            if total_size > 10 * 1024 * 1024:  # 10MB
-                self.status_var.set("正在压缩大图片...")
-                self.master.update()
-                images = [self.compress_image(img) for img in images]
-                
-            # 根据布局模式合成图片
-            mode = self.layout_mode.get()
-            self.status_var.set(f"正在合成图片 ({mode}布局)...")
+
+        def on_load(done, total):
+            self.status_var.set(f"正在加载图片 ({done}/{total})...")
             self.master.update()
-            
-            if self.random_distribute.get():
-                result = self._random_layout(images)
-            elif mode == "uniform":
-                result = self._uniform_layout(images)
-            elif mode == "horizontal":
-                result = self._horizontal_layout(images)
-            elif mode == "vertical":
-                result = self._vertical_layout(images)
-                
+
+        try:
+            layout = "random" if self.random_distribute.get() else self.layout_mode.get()
+            result = ImageCore.combine_images(
+                self.image_paths,
+                layout,
+                select_count=self.random_select_count.get(),
+                progress=on_load
+            )
             self.status_var.set("图片合成完成")
             return result
-                
+
         except Exception as e:
             messagebox.showerror("错误", f"图片合成失败: {str(e)}")
             self.status_var.set("图片合成失败")
             return None
         finally:
             self.master.update()
-    
-    def _uniform_layout(self, images):
-        """均匀分布布局"""
-        # 计算网格行列数
-        img_count = len(images)
-        cols = math.ceil(math.sqrt(img_count))
-        rows = math.ceil(img_count / cols)
-        
-        # 计算每张图片的最大尺寸
-        max_width = max(img.size[0] for img in images)
-        max_height = max(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas_width = cols * max_width
-        canvas_height = rows * max_height
-        canvas = Image.new('RGB', (canvas_width, canvas_height), (255, 255, 255))
-        
-        # 排列图片
-        for i, img in enumerate(images):
-            row = i // cols
-            col = i % cols
-            x = col * max_width
-            y = row * max_height
-            canvas.paste(img, (x, y))
-            
-        return canvas
-    
-    def _horizontal_layout(self, images):
-        """水平排列布局"""
-        # 计算总宽度和最大高度
-        total_width = sum(img.size[0] for img in images)
-        max_height = max(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas = Image.new('RGB', (total_width, max_height), (255, 255, 255))
-        
-        # 水平排列图片
-        x_offset = 0
-        for img in images:
-            canvas.paste(img, (x_offset, 0))
-            x_offset += img.size[0]
-            
-        return canvas
-    
-    def _vertical_layout(self, images):
-        """垂直排列布局"""
-        # 计算最大宽度和总高度
-        max_width = max(img.size[0] for img in images)
-        total_height = sum(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas = Image.new('RGB', (max_width, total_height), (255, 255, 255))
-        
-        # 垂直排列图片
-        y_offset = 0
-        for img in images:
-            canvas.paste(img, (0, y_offset))
-            y_offset += img.size[1]
-            
-        return canvas
-    
-    def _random_layout(self, images):
-        """随机分布布局"""
-        import random
-
-        # 计算画布大小 (所有图片总面积的1.5倍)
-        total_area = sum(img.size[0] * img.size[1] for img in images)
-        canvas_size = int(math.sqrt(total_area) * 1.5)
 
-        # 创建画布
-        canvas = Image.new('RGB', (canvas_size, canvas_size), (255, 255, 255))
-        
-        # 随机放置图片
-        placed = []
-        for img in images:
-            placed_success = False
-            attempts = 0
-            max_attempts = 100
-            
-            while not placed_success and attempts < max_attempts:
-                attempts += 1
-                x = random.randint(0, canvas_size - img.size[0])
-                y = random.randint(0, canvas_size - img.size[1])
-                
-                # 检查是否与其他图片重叠
-                overlap = False
-                new_rect = (x, y, x + img.size[0], y + img.size[1])
-                
-                for existing in placed:
-                    if self._check_overlap(new_rect, existing):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    canvas.paste(img, (x, y))
-                    placed.append(new_rect)
-                    placed_success = True
-        
-        return canvas
-    
-    def _check_overlap(self, rect1, rect2):
-        """检查两个矩形是否重叠"""
-        return not (rect1[2] <= rect2[0] or
-                   rect1[0] >= rect2[2] or
-                   rect1[3] <= rect2[1] or
-                   rect1[1] >= rect2[3])
-
-
-    def compress_image(self, image):
-        """图片压缩方法"""
-        try:
-            # 计算压缩比例 (目标大小: 1MB)
-            original_size = image.size[0] * image.size[1]
-            target_size = 1024 * 1024  # 1MB
-            if original_size <= target_size:
-                return image
-                
-            # 计算压缩比例
-            ratio = math.sqrt(target_size / original_size)
-            new_width = int(image.size[0] * ratio)
-            new_height = int(image.size[1] * ratio)
-            
-            # 高质量压缩
-            return image.resize(
-                (new_width, new_height),
-                Image.Resampling.LANCZOS
-            )
-            
-        except Exception as e:
-            messagebox.showwarning("警告", f"图片压缩失败: {str(e)}")
-            return image
-            
 
 if __name__ == "__main__":
     root = tk.Tk()
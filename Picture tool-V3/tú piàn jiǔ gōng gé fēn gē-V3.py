@@ -2,13 +2,15 @@
 import sys
 sys.dont_write_bytecode = True
 
-from PIL import Image
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import subprocess
 from pathlib import Path
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from ImageCore import split_grid
+from JobScheduler import get_scheduler
 
 
 class ImageSplitterApp:
@@ -76,14 +78,8 @@ class ImageSplitterApp:
             PROJECT_ROOT = Path(__file__).resolve().parent.parent
             CORE_DIR = PROJECT_ROOT / "Core"
             license_exe_path = CORE_DIR / "LICENSE.exe"
-            if license_exe_path.exists():
-                result = subprocess.run(
-                    [str(license_exe_path), '--quiet'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.returncode == 0
+            # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=5)[0]
         except Exception as e:
             print(f"许可证验证异常: {e}")
             return False
@@ -100,24 +96,13 @@ class ImageSplitterApp:
             self.root.destroy()
             return
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         from tkinter import font as tkfont
         self.current_font = (font_name, 10)
@@ -142,7 +127,8 @@ class ImageSplitterApp:
         self.progress.grid(row=2, column=0, columnspan=3, padx=5, pady=10)
         
         # 分割按钮
-        tk.Button(self.root, text="开始分割", command=self.start_split, font=(self.current_font[0], 10)).grid(row=3, column=0, columnspan=3, pady=10)
+        self.split_button = tk.Button(self.root, text="开始分割", command=self.start_split, font=(self.current_font[0], 10))
+        self.split_button.grid(row=3, column=0, columnspan=3, pady=10)
         
     def browse_input(self):
         filepath = filedialog.askopenfilename(
@@ -166,52 +152,33 @@ class ImageSplitterApp:
             messagebox.showerror("错误", "请选择输入图片和输出目录")
             return
         
-        try:
-            self.progress["value"] = 0
-            self.root.update()
-            
-            # 获取输入文件名(不带扩展名)
-            base_name = os.path.splitext(os.path.basename(input_path))[0]
-            # 创建子文件夹路径
-            save_dir = os.path.join(output_dir, base_name + "_split")
-            
-            # 确保输出目录存在
-            os.makedirs(save_dir, exist_ok=True)
-            
-            # 打开图片
-            with Image.open(input_path) as img:
-                width, height = img.size
-                
-                # 计算每个小块的尺寸
-                tile_width = width // 3
-                tile_height = height // 3
-                
-                # 分割图片
-                total = 9
-                for i in range(3):
-                    for j in range(3):
-                        left = j * tile_width
-                        upper = i * tile_height
-                        right = left + tile_width
-                        lower = upper + tile_height
-                        
-                        # 裁剪图片
-                        tile = img.crop((left, upper, right, lower))
-                        
-                        # 保存小块
-                        tile.save(os.path.join(save_dir, f'{base_name}_tile_{i}_{j}.png'))
-                        
-                        # 更新进度
-                        self.progress["value"] = ((i * 3) + j + 1) / total * 100
-                        self.root.update()
-            
+        def on_progress(done, total):
+            # 更新进度
+            self.progress["value"] = done / total * 100
+
+        def on_done(result):
+            save_dir, _ = result
+            self.split_button.config(state=tk.NORMAL)
             messagebox.showinfo("完成", f"图片已成功分割为9份，保存在 {save_dir}")
             self.progress["value"] = 0
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"处理图片时出错: {e}")
+
+        def on_error(error):
+            self.split_button.config(state=tk.NORMAL)
+            messagebox.showerror("错误", f"处理图片时出错: {error}")
             self.progress["value"] = 0
 
+        # 分割图片，保存在以输入文件名命名的子文件夹中（后台执行，界面保持响应）
+        self.progress["value"] = 0
+        self.split_button.config(state=tk.DISABLED)
+        get_scheduler().submit(
+            split_grid, input_path, output_dir, 3, 3,
+            name="九宫格分割",
+            ui=self.root,
+            on_progress=on_progress,
+            on_done=on_done,
+            on_error=on_error,
+        )
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -2,11 +2,28 @@
 import sys
 sys.dont_write_bytecode = True
 
+import time
+# 记录启动时刻，用于统计首屏耗时
+LAUNCH_STARTED_AT = time.perf_counter()
+
 import os
+import threading
 import subprocess
 import flet as ft
 from pathlib import Path
-from fontTools.ttLib import TTFont
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from ToolHost import ToolHost, SharedToolHost, get_worker_command, get_run_command, worker_main
+from LaunchTelemetry import LaunchTelemetry, install_child_hooks
+from ToolIndex import ToolIndex
+from ToolManifest import get_tools, get_category_map, get_isolated_tools
+
+# 由启动器运行的工具进程都带有的环境变量(已通过授权验证)
+TOOL_ENV = {'MAIN_APP_AUTHORIZED': '1'}
+
+
 def get_font_name():
     """获取自定义字体名称并注册到系统"""
     base_dir = Path(__file__).resolve().parent
@@ -16,24 +33,13 @@ def get_font_name():
         print(f"警告：找不到字体文件：{font_path}")
         return None
     
-    # 使用 fonttools 获取字体名称
-    tt = TTFont(str(font_path))
-    font_name = None
-    for record in tt['name'].names:
-        if record.nameID == 1:  # Font Family
-            font_name = record.toUnicode()
-            break
+    # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+    font_name = FontManager.get_family_name(font_path)
     if not font_name:
         raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-    tt.close()
     
-    # 在 Windows 上注册字体
-    if os.name == 'nt':
-        import ctypes
-        GDI32 = ctypes.windll.gdi32
-        font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-        GDI32.AddFontResourceW(font_path_str)
-        print(f"成功加载自定义字体: {font_path}")
+    # 使用 Windows API 注册字体
+    FontManager.register_font(font_path)
     return font_name
 # 加载自定义字体
 CUSTOM_FONT_NAME = get_font_name()
@@ -49,26 +55,9 @@ class LicenseValidator:
             base_dir = PathUtils.get_base_dir()
             license_exe_path = os.path.join(base_dir, 'Core', 'LICENSE.exe')
             
-            if not os.path.exists(license_exe_path):
-                return False, "未找到授权验证程序：Core/LICENSE.exe"
-            
-            # 运行 LICENSE.exe 进行授权验证
-            result = subprocess.run(
-                [license_exe_path, '--quiet'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # 退出码为 0 表示验证通过
-            if result.returncode == 0:
-                return True, "授权验证通过"
-            else:
-                error_msg = result.stderr.strip() if result.stderr else "授权验证失败"
-                return False, error_msg
+            # 近期验证通过时直接使用缓存令牌，不再阻塞等待 LICENSE.exe，过期前在后台重新验证
+            return LicenseCache.verify(license_exe_path, timeout=10)
                 
-        except subprocess.TimeoutExpired:
-            return False, "授权验证超时"
         except Exception as e:
             return False, f"授权验证出错：{str(e)}"
 
@@ -84,86 +73,86 @@ class PathUtils:
     def get_tool_path(category, file_name):
         """根据分类获取工具路径"""
         base_dir = PathUtils.get_base_dir()
-        category_map = {
-            'PDF工具': 'PDF tool-V3',
-            '图片工具': 'Picture tool-V3',
-            '音频工具': 'Audio tool-V3',
-            '文件工具': 'File tool-V3',
-            '其他工具': 'Other tool-V3',
-            'B站专用工具': 'Station B tool-V3',
-            '计算器工具': 'Calculator tool-V3',
-            '下载工具': 'Download tool-V3',
-            '小游戏': 'Mini-games-V3',
-        }
+        category_map = get_category_map()
         sub_dir = category_map.get(category)
         return os.path.join(base_dir, sub_dir, file_name) if sub_dir else os.path.join(base_dir, file_name)
 
+# 启动统计标签页，排在所有工具分类之后
+PERF_TAB = "性能"
+
 class ToolLauncher:
     def __init__(self):
-        self.tools = {
-            'PDF工具': {
-                'PDF拆分': 'PDF chāi fēn-V3.py',
-                'PDF合并': 'PDF hé bìng-V3.py',
-                'PDF转Word': 'PDF zhuǎn Word-V3.py',
-                'PDF加水印': 'PDF jiā shuǐ yìn-V3.py',
-                'PDF转图片': 'PDF zhuǎn tú piàn-V3.py',
-                '图片转PDF': 'tú piàn zhuǎn PDF-V3.py'
-            },
-            '图片工具': {
-                '九宫格分割': 'tú piàn jiǔ gōng gé fēn gē-V3.py',
-                '格式转换': 'tú piàn gé shì zhuǎn huàn-V3.py',
-                'ICO转换': 'tú piàn zhuǎn tú biāo-V3.py',
-                '图片合成': 'tú piàn hé chéng-V3.py',
-            },
-            '音频工具': {
-                '音频提取': 'shì pín yīn pín tí qǔ-V3.py'
-            },
-            '文件工具': {
-                '目录树生成器': 'wén jiàn mù lù shù shēng chéng qì-V3.py',
-                '文件时间修改器': 'wén jiàn shí jiān xiū gǎi qì-V3.py',
-                '空文件夹清理': 'kōng wén jiàn jiā qīng lǐ-V3.py',
-            },
-            '其他工具': {
-                '数字小写转大写': 'shù zì xiǎo xiě zhuǎn dà xiě-V3.py',
-                '长度单位换算': 'cháng dù dān wèi huàn suàn-V3.py',
-                '英文大小写转换': 'yīng wén dà xiǎo xiě zhuǎn huàn-V3.py',
-                '字符频率分析器': 'zìfú pín lǜ fēn xī-V3.py',
-                '内存压缩管理工具': 'nèi cún yā suō guǎn lǐ-V3.py',
-            },
-            'B站专用工具': {
-                '封面与表情包图片批量压缩': 'fēng miàn yǔ biǎo qíng bāo tú piàn yā suō-V3.py',
-                '带货链接分批处理工具': 'dài huò liàn jiē fēn pī chù lǐ-V3.py',
-            },
-            '计算器工具': {
-                '数学和统计计算器': 'shù xué hé tǒng jì jì suàn qì-V3.py',
-                '分数计算器': 'fēn shù jì suàn qì-V3.py',
-                '代数计算器': 'dài shù jì suàn qì-V3.py',
-                '三角函数计算器': 'sān jiǎo hán shù jì suàn qì-V3.py',
-                '二进制计算器': 'èr jìn zhì jì suàn qì-V3.py',
-                '体积计算器': 'tǐ jī jì suàn qì-V3.py',
-                '面积计算器': 'miàn jī jì suàn qì-V3.py',
-                '表面积计算器': 'biǎo miàn jī  jì suàn qì-V3.py',
-                '周长计算器': 'zhōu cháng jì suàn qì-V3.py',
-                '圆周率计算器': 'yuán zhōu lǜ jì suàn qì-V3.py',
-            },
-            '小游戏': {
-                '24点小游戏': '24diǎn yóu xì-V3.py',
-                '数独小游戏': 'cāishùzì yóuxì-V3.py',
-                '猜数字小游戏': 'cāishùzì yóuxì-V3.py',
-                '2048': '2048-V3.py',
-            }
-            ,
-            '下载工具': {
-                'huggingface模型下载器': 'Hugging Face mó xíng xià zǎi qì-V3.py',
-                'ModelScope 模型下载器': 'ModelScope mó xíng xià zǎi qì-V3.py',
-                '图片下载': 'tú piàn xià zǎi-V3.py',
-            },
-        }
-        self.tool_cache = {}
+        # 工具清单登记在 Core/tools.json 中
+        self.tools = get_tools()
+        self.tool_index = None
+        self.built_tabs = set()
+        # 设置 SNOW_EAGER_TABS=1 可恢复一次性构建全部分类，用于对比首屏耗时
+        self.eager_tabs = os.environ.get('SNOW_EAGER_TABS') == '1'
         self.page = None
         self.tools_tabs = None
         self.status_text = None
         self.font_family = CUSTOM_FONT_NAME
+        self.tool_host = None
+        # 共享进程模式：工具在同一个常驻宿主进程中运行，设置 SNOW_SHARED_HOST=1 默认开启
+        self.shared_mode = os.environ.get('SNOW_SHARED_HOST') == '1'
+        self.shared_host = None
+        # 需要独立进程运行的工具（清单中标记的，以及在共享进程中出错的）
+        self.isolated_tools = set(get_isolated_tools())
+        self.shared_launches = {}
+        self.telemetry = LaunchTelemetry()
+        self.perf_content = None
+
+    def get_host_command(self):
+        """工具宿主子进程的启动命令"""
+        if getattr(sys, 'frozen', False):
+            return [sys.executable, '--tool-host']
+        return get_worker_command()
+
+    def start_tool_host(self):
+        """启动预热的工具宿主进程池"""
+        self.tool_host = ToolHost(self.get_host_command(), pool_size=1)
+        self.tool_host.start()
+
+    def get_shared_host(self):
+        """获取共享工具宿主（首次使用时创建）"""
+        if self.shared_host is None:
+            self.shared_host = SharedToolHost(self.get_host_command(), on_tool_failed=self.on_shared_tool_failed,
+                                              env=TOOL_ENV)
+        return self.shared_host
+
+    def on_shared_mode_change(self, event):
+        self.shared_mode = bool(event.control.value)
+        if not self.shared_mode and self.shared_host is not None:
+            self.shared_host.shutdown()
+            self.shared_host = None
+        self.show_status("已开启共享进程运行" if self.shared_mode else "已关闭共享进程运行")
+
+    def on_shared_tool_failed(self, tool_path, error):
+        """工具在共享进程中出错：之后改为独立进程运行，并立即以独立进程重新启动"""
+        launch = self.shared_launches.pop(tool_path, None)
+        if launch is None:
+            return
+        category, file_name = launch
+        self.isolated_tools.add(file_name)
+        tool_base_name = os.path.splitext(file_name)[0]
+        try:
+            self.launch_isolated(category, file_name, tool_path, *self.new_launch(file_name))
+            self.show_status(f"{tool_base_name} 在共享进程中运行出错，已改用独立进程启动：{error}", success=False)
+        except Exception as e:
+            self.show_status(f"启动失败：{e}", success=False)
+
+    def start_tool_index(self):
+        """使用上次的索引立即渲染，并在后台扫描工具目录、监视目录变化"""
+        directories = {
+            os.path.dirname(PathUtils.get_tool_path(category, file_name))
+            for category, tools in self.tools.items()
+            for file_name in tools.values()
+        }
+        if getattr(sys, 'frozen', False):
+            directories.add(os.path.dirname(sys.executable))
+        self.tool_index = ToolIndex(directories)
+        self.tool_index.load_cached()
+        self.tool_index.start_watching(self.on_tool_index_changed)
 
     def build(self, page: ft.Page):
         self.page = page
@@ -180,7 +169,7 @@ class ToolLauncher:
             page.window.icon = icon_path
 
         self.status_text = ft.Text("就绪", size=14, color=ft.Colors.BLUE_GREY_700, font_family=self.font_family)
-        self.tools_tabs = ft.Tabs(expand=True)
+        self.tools_tabs = ft.Tabs(expand=True, on_change=self.on_tab_change)
 
         page.add(
             ft.Row(
@@ -196,7 +185,7 @@ class ToolLauncher:
                     ),
                     ft.Row(
                         [
-                            ft.ElevatedButton("刷新", on_click=self.on_refresh_click, icon=ft.Icons.REFRESH),
+                            ft.Switch(label="共享进程运行", value=self.shared_mode, on_change=self.on_shared_mode_change),
                             ft.ElevatedButton("项目开源协议", on_click=self.on_license_click, icon=ft.Icons.DESCRIPTION),
                         ], spacing=8
                     ),
@@ -207,52 +196,148 @@ class ToolLauncher:
             ft.Container(content=self.status_text, padding=ft.padding.symmetric(vertical=8, horizontal=12), bgcolor=ft.Colors.BLUE_GREY_50, border_radius=8, border=ft.border.all(1, ft.Colors.GREY_300)),
         )
 
+        self.start_tool_index()
         self.refresh_tools()
-        missing_tools = self.check_tools()
-        if missing_tools:
-            self.show_warning("以下工具未找到：\n\n" + "\n".join(missing_tools))
+        first_paint_ms = (time.perf_counter() - LAUNCH_STARTED_AT) * 1000
+        mode_text = "全部构建" if self.eager_tabs else "按需构建"
+        self.show_status(f"就绪 - 首屏耗时 {first_paint_ms:.0f} ms（{mode_text}，已构建 {len(self.built_tabs)}/{len(self.tools)} 个分类）")
+        self.start_tool_host()
         return page
 
     def build_tool_tabs(self):
+        """创建分类标签页，只有当前选中（或已打开过）的分类会构建工具按钮"""
+        selected = self.tools_tabs.selected_index or 0
         tabs = []
-        for category, tools in self.tools.items():
-            controls = []
-            for tool_name, file_name in tools.items():
-                exists = self.check_tool_exists(category, file_name)
-                status_chip = ft.Text(
-                    "可用" if exists else "缺失",
-                    color=ft.Colors.GREEN if exists else ft.Colors.RED,
-                    weight=ft.FontWeight.BOLD,
-                    font_family=self.font_family,
-                )
-                tool_button = ft.ElevatedButton(
-                    tool_name,
-                    on_click=lambda e, c=category, f=file_name: self.run_tool(c, f),
-                    disabled=not exists,
-                    expand=True,
-                )
-                controls.append(
-                    ft.Container(
-                        ft.Row(
-                            [tool_button, status_chip],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                            vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                        ),
-                        padding=ft.padding.all(10),
-                        border_radius=10,
-                        bgcolor=ft.Colors.WHITE,
-                        border=ft.border.all(1, ft.Colors.GREY_200),
-                    )
-                )
-            if not controls:
-                controls.append(ft.Text("此分类暂时没有可用工具。", color=ft.Colors.BLUE_GREY_500, font_family=self.font_family))
-            tabs.append(
-                ft.Tab(
-                    text=category,
-                    content=ft.Column(controls, spacing=10, scroll=ft.ScrollMode.AUTO, expand=True),
+        for index, category in enumerate(self.tools):
+            if self.eager_tabs or index == selected or category in self.built_tabs:
+                content = self.build_category_content(category)
+                self.built_tabs.add(category)
+            else:
+                content = ft.Container()
+            tabs.append(ft.Tab(text=category, content=content))
+        self.perf_content = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO, expand=True)
+        tabs.append(ft.Tab(text=PERF_TAB, content=self.perf_content))
+        self.tools_tabs.tabs = tabs
+        if selected == len(self.tools):
+            self.refresh_perf_content()
+
+    def build_category_content(self, category):
+        """构建单个分类标签页中的工具按钮"""
+        controls = []
+        for tool_name, file_name in self.tools[category].items():
+            exists = self.check_tool_exists(category, file_name)
+            if exists is None:
+                chip_text, chip_color = "检查中", ft.Colors.GREY
+            elif exists:
+                chip_text, chip_color = "可用", ft.Colors.GREEN
+            else:
+                chip_text, chip_color = "缺失", ft.Colors.RED
+            status_chip = ft.Text(
+                chip_text,
+                color=chip_color,
+                weight=ft.FontWeight.BOLD,
+                font_family=self.font_family,
+            )
+            tool_button = ft.ElevatedButton(
+                tool_name,
+                on_click=lambda e, c=category, f=file_name: self.run_tool(c, f),
+                disabled=not exists,
+                expand=True,
+            )
+            controls.append(
+                ft.Container(
+                    ft.Row(
+                        [tool_button, status_chip],
+                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    ),
+                    padding=ft.padding.all(10),
+                    border_radius=10,
+                    bgcolor=ft.Colors.WHITE,
+                    border=ft.border.all(1, ft.Colors.GREY_200),
                 )
             )
-        self.tools_tabs.tabs = tabs
+        if not controls:
+            controls.append(ft.Text("此分类暂时没有可用工具。", color=ft.Colors.BLUE_GREY_500, font_family=self.font_family))
+        return ft.Column(controls, spacing=10, scroll=ft.ScrollMode.AUTO, expand=True)
+
+    def on_tab_change(self, event=None):
+        """首次切换到某个分类时才构建其中的控件"""
+        index = self.tools_tabs.selected_index or 0
+        if index >= len(self.tools):
+            # 性能标签页每次打开都重新统计
+            self.refresh_perf_content()
+            self.page.update()
+            return
+        category = list(self.tools)[index]
+        if category in self.built_tabs:
+            return
+        self.tools_tabs.tabs[index].content = self.build_category_content(category)
+        self.built_tabs.add(category)
+        self.page.update()
+
+    def refresh_perf_content(self):
+        """按工具统计启动耗时分位数和内存"""
+        def fmt(value, unit):
+            return f"{value:.0f} {unit}" if value is not None else "-"
+
+        headers = ["工具", "次数", "失败", "拉起 p50", "首窗 p50", "首窗 p90", "首窗 p99", "内存 p50", "内存峰值"]
+        rows = []
+        for item in self.telemetry.summary():
+            cells = [
+                os.path.splitext(item['tool'])[0],
+                str(item['count']),
+                str(item['failures']),
+                fmt(item['spawn_p50'], "ms"),
+                fmt(item['window_p50'], "ms"),
+                fmt(item['window_p90'], "ms"),
+                fmt(item['window_p99'], "ms"),
+                fmt(item['rss_p50'], "MB"),
+                fmt(item['rss_max'], "MB"),
+            ]
+            rows.append(ft.DataRow(cells=[ft.DataCell(ft.Text(c, font_family=self.font_family)) for c in cells]))
+
+        controls = [
+            ft.Row(
+                [
+                    ft.Text("启动记录保存在 Core/launch_telemetry.db", color=ft.Colors.BLUE_GREY_500, font_family=self.font_family),
+                    ft.ElevatedButton("导出 CSV", on_click=self.on_export_telemetry_click, icon=ft.Icons.DOWNLOAD),
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+            )
+        ]
+        if rows:
+            controls.append(ft.DataTable(
+                columns=[ft.DataColumn(ft.Text(h, weight=ft.FontWeight.BOLD, font_family=self.font_family)) for h in headers],
+                rows=rows,
+            ))
+        else:
+            controls.append(ft.Text("还没有启动记录，启动几个工具后再来查看。", color=ft.Colors.BLUE_GREY_500, font_family=self.font_family))
+        self.perf_content.controls = controls
+
+    def on_export_telemetry_click(self, event=None):
+        """把启动记录导出到 Core/launch_telemetry.csv"""
+        csv_path = os.path.join(PathUtils.get_base_dir(), 'Core', 'launch_telemetry.csv')
+        try:
+            self.telemetry.export_csv(csv_path)
+            self.show_status(f"已导出启动记录：{csv_path}")
+        except OSError as e:
+            self.show_status(f"导出失败：{e}", success=False)
+
+    def new_launch(self, file_name):
+        """记录一次启动请求，返回 (启动编号, 点击时刻, 传给工具进程的环境变量)"""
+        launched_at = time.time()
+        launch_id = self.telemetry.record_launch(file_name, launched_at)
+        env = dict(TOOL_ENV)
+        if launch_id is not None:
+            env['SNOW_LAUNCH_ID'] = str(launch_id)
+            env['SNOW_LAUNCH_AT'] = repr(launched_at)
+        return launch_id, launched_at, env
+
+    def on_launch_exit(self, launch_id):
+        """生成记录工具退出码的回调（启动记录写入失败时返回 None）"""
+        if launch_id is None:
+            return None
+        return lambda code: self.telemetry.record_exit(launch_id, code)
 
     def refresh_tools(self):
         """刷新工具列表"""
@@ -267,9 +352,9 @@ class ToolLauncher:
         )
         self.page.update()
 
-    def on_refresh_click(self, event=None):
-        self.tool_cache.clear()
-        self.build_tool_tabs()
+    def on_tool_index_changed(self, first_scan):
+        """工具目录扫描完成或目录内容变化时刷新界面（在后台线程中调用）"""
+        self.refresh_tools()
         total_tools = sum(len(tools) for tools in self.tools.values())
         available_tools = sum(
             1
@@ -277,7 +362,13 @@ class ToolLauncher:
             for file_name in tools.values()
             if self.check_tool_exists(category, file_name)
         )
-        self.show_status(f"刷新完成 - 可用工具: {available_tools}/{total_tools}")
+        if first_scan:
+            missing_tools = self.check_tools()
+            if missing_tools:
+                self.show_warning("以下工具未找到：\n\n" + "\n".join(missing_tools))
+            self.show_status(f"工具检查完成 - 可用工具: {available_tools}/{total_tools}")
+        else:
+            self.show_status(f"工具目录已变化，列表已更新 - 可用工具: {available_tools}/{total_tools}")
 
     def on_license_click(self, event=None):
         """打开软件开源协议文件"""
@@ -317,22 +408,21 @@ class ToolLauncher:
             self.page.update()
 
     def check_tool_exists(self, category, file_name):
-        cache_key = (category, file_name)
-        if cache_key in self.tool_cache:
-            return self.tool_cache[cache_key]
+        """
+        通过工具目录索引判断工具是否存在
+        返回: True/False，索引尚未建立时返回 None
+        """
+        if self.tool_index is None:
+            return None
 
-        tool_base_name = os.path.splitext(file_name)[0]
-        if getattr(sys, 'frozen', False):
-            exe_dir = os.path.dirname(sys.executable)
+        py_path = PathUtils.get_tool_path(category, file_name)
+        exists = self.tool_index.contains(os.path.dirname(py_path), file_name)
+        if getattr(sys, 'frozen', False) and not exists:
+            tool_base_name = os.path.splitext(file_name)[0]
             exe_name = tool_base_name.replace(' ', '') + '.exe'
-            exe_path = os.path.join(exe_dir, exe_name)
-            py_path = PathUtils.get_tool_path(category, file_name)
-            exists = os.path.exists(exe_path) or os.path.exists(py_path)
-        else:
-            tool_path = PathUtils.get_tool_path(category, file_name)
-            exists = os.path.exists(tool_path)
-
-        self.tool_cache[cache_key] = exists
+            exe_exists = self.tool_index.contains(os.path.dirname(sys.executable), exe_name)
+            if exe_exists is not None:
+                exists = exe_exists or bool(exists)
         return exists
 
     def get_tool_path(self, category, file_name):
@@ -372,27 +462,75 @@ class ToolLauncher:
             if not os.path.exists(tool_path):
                 raise FileNotFoundError(f"找不到工具文件：{file_name}")
 
-            env = os.environ.copy()
-            env['MAIN_APP_AUTHORIZED'] = '1'
-
-            if getattr(sys, 'frozen', False):
-                # 打包后：启动自身新实例来运行子工具（新实例拥有所有打包的模块）
-                subprocess.Popen(
-                    [sys.executable, '--run-tool', category, file_name],
-                    env=env,
-                    stdin=subprocess.DEVNULL,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-            else:
-                # 开发模式：直接用 Python 解释器运行
-                subprocess.Popen([sys.executable, tool_path], env=env)
+            launch_id, launched_at, env = self.new_launch(file_name)
+
+            if self.shared_mode and file_name not in self.isolated_tools:
+                try:
+                    shared_host = self.get_shared_host()
+                    self.shared_launches[tool_path] = (category, file_name)
+                    elapsed = shared_host.launch(tool_path, env=env, on_exit=self.on_launch_exit(launch_id))
+                    self.telemetry.record_spawn(launch_id, 'shared', elapsed * 1000)
+                    self.show_status(f"已启动：{tool_base_name}（共享进程 {elapsed * 1000:.0f} ms）")
+                    return
+                except Exception as e:
+                    self.shared_launches.pop(tool_path, None)
+                    print(f"共享工具宿主不可用，改用独立进程启动：{e}")
+
+            if self.tool_host is not None:
+                try:
+                    mode, elapsed = self.tool_host.launch(tool_path, env=env, on_exit=self.on_launch_exit(launch_id))
+                    self.telemetry.record_spawn(launch_id, mode, elapsed * 1000)
+                    mode_text = "预热启动" if mode == 'warm' else "冷启动"
+                    self.show_status(
+                        f"已启动：{tool_base_name}（{mode_text} {elapsed * 1000:.0f} ms；{self.tool_host.latency_summary()}）"
+                    )
+                    return
+                except Exception as e:
+                    print(f"工具宿主进程不可用，改用独立进程启动：{e}")
 
+            self.launch_isolated(category, file_name, tool_path, launch_id, launched_at, env)
             self.show_status(f"已启动：{tool_base_name}")
         except Exception as e:
             self.show_status(f"启动失败：{e}", success=False)
 
+    def launch_isolated(self, category, file_name, tool_path, launch_id, launched_at, launch_env):
+        """在全新的独立进程中运行工具"""
+        env = os.environ.copy()
+        env.update(launch_env)
+
+        if getattr(sys, 'frozen', False):
+            # 打包后：启动自身新实例来运行子工具（新实例拥有所有打包的模块）
+            process = subprocess.Popen(
+                [sys.executable, '--run-tool', category, file_name],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
+            # 开发模式：用 Python 解释器运行（经由 ToolHost 安装启动统计钩子）
+            process = subprocess.Popen(get_run_command(tool_path), env=env)
+
+        on_exit = self.on_launch_exit(launch_id)
+        if on_exit is not None:
+            self.telemetry.record_spawn(launch_id, 'isolated', (time.time() - launched_at) * 1000)
+            threading.Thread(target=lambda: on_exit(process.wait()), daemon=True).start()
+
 if __name__ == "__main__":
+    # 打包版中工具的 CPU 进程池以本程序作为子进程启动，需先交给 multiprocessing 处理
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # 处理 --tool-host 参数：作为预热的工具宿主子进程运行
+    if len(sys.argv) >= 2 and sys.argv[1] == '--tool-host':
+        worker_main(preload='--no-preload' not in sys.argv, shared='--shared' in sys.argv)
+        sys.exit(0)
+
+    # 处理 snow 参数：打包版的命令行模式（snow pdf split ... 等，不启动图形界面）
+    if len(sys.argv) >= 2 and sys.argv[1] == 'snow':
+        from SnowCLI import main as snow_main
+        sys.exit(snow_main(sys.argv[2:]))
+
     # 处理 --run-tool 参数：由主程序自身新实例运行子工具
     if len(sys.argv) >= 4 and sys.argv[1] == '--run-tool':
         category = sys.argv[2]
@@ -402,6 +540,7 @@ if __name__ == "__main__":
             import runpy
             # 设置环境变量以绕过子工具自身的授权验证
             os.environ['MAIN_APP_AUTHORIZED'] = '1'
+            install_child_hooks()
             try:
                 runpy.run_path(tool_path, run_name='__main__')
             except Exception as e:
@@ -2,10 +2,12 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk, font
 import json
 import os
-import subprocess
 import sys
 from pathlib import Path
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from LinkCore import parse_links, split_links, format_batches
 
 
 # ============ 授权验证 ============
@@ -21,14 +23,8 @@ def check_license():
         PROJECT_ROOT = Path(__file__).resolve().parent.parent
         CORE_DIR = PROJECT_ROOT / "Core"
         license_exe_path = CORE_DIR / "LICENSE.exe"
-        if license_exe_path.exists():
-            result = subprocess.run(
-                [str(license_exe_path), '--quiet'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
+        # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+        return LicenseCache.verify(license_exe_path, timeout=5)[0]
     except Exception as e:
         print(f"许可证验证异常: {e}")
         return False
@@ -87,24 +83,13 @@ def load_font(root):
         root.destroy()
         sys.exit(1)
     
-    # 使用 fonttools 获取字体名称
-    tt = TTFont(str(font_path))
-    font_name = None
-    for record in tt['name'].names:
-        if record.nameID == 1:  # Font Family
-            font_name = record.toUnicode()
-            break
+    # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+    font_name = FontManager.get_family_name(font_path)
     if not font_name:
         raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-    tt.close()
     
     # 使用 Windows API 注册字体
-    if os.name == 'nt':
-        import ctypes
-        GDI32 = ctypes.windll.gdi32
-        font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-        GDI32.AddFontResourceW(font_path_str)
-        print(f"成功加载自定义字体: {font_path}")
+    FontManager.register_font(font_path)
     
     from tkinter import font as tkfont
     current_font = (font_name, 10)
@@ -112,15 +97,6 @@ def load_font(root):
     return current_font
 
 
-def split_links(links, batch_size=30):
-    """
-    将链接列表按指定大小分批
-    :param links: 链接列表
-    :param batch_size: 每批链接数量，默认为30
-    :return: 分批后的链接列表
-    """
-    return [links[i:i + batch_size] for i in range(0, len(links), batch_size)]
-
 class LinkBatchApp:
     def __init__(self, root):
         # 首先检查授权
@@ -295,28 +271,6 @@ class LinkBatchApp:
             except Exception as e:
                 messagebox.showerror("错误", f"读取文件失败: {str(e)}")
     
-    def extract_url_from_line(self, line):
-        """从一行文本中提取URL链接"""
-        line = line.strip()
-        # 查找"http"或"https"开头的部分
-        url_start = line.find("http")
-        if url_start == -1:
-            return ""  # 如果没有找到http，返回空字符串
-            
-        # 提取从http开始到行尾或非URL字符前的部分
-        url = line[url_start:]
-        # 查找URL结束位置(遇到空格、引号、括号等符号时结束)
-        for end_char in [' ', '"', "'", ')', ']', '}', '>', '\t', '\n']:
-            end_pos = url.find(end_char)
-            if end_pos != -1:
-                url = url[:end_pos]
-        
-        # 移除URL末尾可能存在的标点符号
-        while url and url[-1] in ['.', ',', ';', ':', '!', '?']:
-            url = url[:-1]
-            
-        return url.strip()
-
     def process_links(self):
         input_text = self.text_input.get("1.0", tk.END).strip()
         if not input_text:
@@ -327,18 +281,7 @@ class LinkBatchApp:
         extract_only = hasattr(self, "extract_only") and self.extract_only.get()
         
         # 处理输入文本，过滤空行和无效链接
-        links = []
-        for line in input_text.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-                
-            if extract_only:
-                url = self.extract_url_from_line(line)
-                if url:  # 只保留非空URL
-                    links.append(url)
-            else:
-                links.append(line)
+        links = parse_links(input_text, extract_only)
                 
         if not links:
             messagebox.showwarning("警告", "没有有效的链接可处理！")
@@ -347,9 +290,6 @@ class LinkBatchApp:
         self.all_batches = split_links(links, self.batch_size.get())
         self.current_batch = 0
         
-        # 构建输出文本
-        output_text = f"共 {len(links)} 条链接，分成 {len(self.all_batches)} 批，每批最多 {self.batch_size.get()} 条：\n"
-        
         # 显示第一组并自动复制
         self.show_current_batch()
         
@@ -358,11 +298,7 @@ class LinkBatchApp:
         self.status_var.set(f"当前组: 1/{len(self.all_batches)}")
         
         # 格式化输出
-        for i, batch in enumerate(self.all_batches, 1):
-            if i > 1:  # 第一组前不加空行
-                output_text += "\n"
-            output_text += f"第 {i} 批链接({len(batch)}条):\n"
-            output_text += "\n".join(batch)
+        output_text = format_batches(self.all_batches, self.batch_size.get())
         
         self.text_output.delete("1.0", tk.END)
         self.text_output.insert(tk.END, output_text)
@@ -1,14 +1,13 @@
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
-import threading
 from pathlib import Path
-from typing import Tuple, Optional
-import io
-import subprocess
 import sys
-from fontTools.ttLib import TTFont
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Core"))
+from FontManager import FontManager
+from LicenseCache import LicenseCache
+from ImageCore import BILI_INPUT_EXTENSIONS, compress_bili_images, list_images
+from JobScheduler import get_scheduler, TkDispatcher
 
 
 # ============ 授权验证 ============
@@ -24,246 +23,13 @@ def check_license():
         PROJECT_ROOT = Path(__file__).resolve().parent.parent
         CORE_DIR = PROJECT_ROOT / "Core"
         license_exe_path = CORE_DIR / "LICENSE.exe"
-        if license_exe_path.exists():
-            result = subprocess.run(
-                [str(license_exe_path), '--quiet'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
+        # 近期验证通过时直接使用缓存令牌，过期前在后台重新验证
+        return LicenseCache.verify(license_exe_path, timeout=5)[0]
     except Exception as e:
         print(f"许可证验证异常: {e}")
         return False
 
 
-class ImageProcessor:
-    """图片处理核心类"""
-    
-    def __init__(self):
-        # 定义图片类型的尺寸和大小限制
-        self.IMAGE_SPECS = {
-            'cover': {
-                'size': (360, 360),
-                'max_size': 300 * 1024,  # 300KB
-                'min_quality': 60,        # 最低质量限制
-                'allow_webp': False       # 不允许转换为WebP
-            },
-            'emoji': {
-                'size': (162, 162),
-                'max_size': 16 * 1024,    # 16KB
-                'min_quality': 30,        # 允许更低的质量
-                'allow_webp': True        # 允许转换为WebP
-            }
-        }
-        
-    def resize_image(self, image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
-        """调整图片尺寸，保持宽高比并优化图片质量"""
-        # 计算目标尺寸
-        target_ratio = target_size[0] / target_size[1]
-        img_ratio = image.width / image.height
-        
-        if img_ratio > target_ratio:
-            # 图片更宽，以高度为准
-            new_height = target_size[1]
-            new_width = int(new_height * img_ratio)
-        else:
-            # 图片更高，以宽度为准
-            new_width = target_size[0]
-            new_height = int(new_width / img_ratio)
-            
-        print(f"调整尺寸: {image.size} -> ({new_width}, {new_height})")
-        
-        # 使用高质量的重采样方法
-        resized = image.resize((new_width, new_height), 
-                             Image.Resampling.LANCZOS,
-                             reducing_gap=2.0)
-        
-        # 创建目标尺寸的新图片（居中放置）
-        new_img = Image.new('RGBA', target_size, (0, 0, 0, 0))
-        paste_x = (target_size[0] - new_width) // 2
-        paste_y = (target_size[1] - new_height) // 2
-        
-        # 如果是RGBA模式，使用alpha通道作为mask
-        if resized.mode == 'RGBA':
-            new_img.paste(resized, (paste_x, paste_y), resized)
-        else:
-            new_img.paste(resized, (paste_x, paste_y))
-        
-        print(f"最终尺寸: {new_img.size}")
-        return new_img
-    
-    def compress_image(self, image: Image.Image, max_size: int, min_quality: int = 30) -> Optional[bytes]:
-        """压缩图片到指定大小以下"""
-        
-        def try_save_image(img: Image.Image, format: str, **save_args) -> Optional[bytes]:
-            """尝试保存图片并返回字节数据"""
-            buffer = io.BytesIO()
-            img.save(buffer, format, **save_args)
-            size = buffer.tell()
-            print(f"尝试 {format} 格式，参数：{save_args}，大小：{size/1024:.1f}KB")
-            if size <= max_size:
-                buffer.seek(0)
-                return buffer.getvalue()
-            return None
-            
-        # 如果是RGBA模式（带透明通道）
-        if image.mode == 'RGBA':
-            # 1. 首先尝试直接优化PNG
-            result = try_save_image(image, 'PNG', optimize=True)
-            if result:
-                return result
-                
-            # 2. 尝试减少颜色数量
-            for colors in [256, 128, 64, 32]:
-                quantized = image.quantize(colors=colors, method=2)  # method=2 使用中位切分法
-                converted = quantized.convert('RGBA')  # 转回RGBA模式
-                result = try_save_image(converted, 'PNG', optimize=True)
-                if result:
-                    return result
-            
-            # 3. 尝试更激进的压缩方法
-            for colors in [256, 128, 64, 32]:
-                # 分离透明通道
-                rgb = image.convert('RGB')
-                alpha = image.split()[3]
-                
-                # 对RGB部分进行量化
-                quantized_rgb = rgb.quantize(colors=colors, method=2)
-                
-                # 重新组合透明通道
-                quantized_rgba = Image.new('RGBA', image.size)
-                quantized_rgba.paste(quantized_rgb, mask=alpha)
-                
-                result = try_save_image(quantized_rgba, 'PNG', optimize=True)
-                if result:
-                    return result
-                    
-            print("警告：无法将PNG压缩到目标大小，尝试转换为带透明度的WebP格式")
-            # 4. 最后尝试WebP格式（支持透明度的有损压缩）
-            quality = 90
-            while quality >= min_quality:
-                result = try_save_image(image, 'WEBP', quality=quality, lossless=False)
-                if result:
-                    return result
-                quality -= 5
-                
-        else:  # 非透明图片使用JPEG
-            quality = 95
-            while quality >= min_quality:
-                result = try_save_image(image, 'JPEG', quality=quality, optimize=True)
-                if result:
-                    return result
-                quality -= 5
-        
-        return None
-    
-    def process_image(self, input_path: str, output_path: str, image_type: str) -> bool:
-        """处理单个图片"""
-        try:
-            # 获取目标规格
-            if image_type not in self.IMAGE_SPECS:
-                print(f"错误: 未知的图片类型: {image_type}")
-                return False
-                
-            specs = self.IMAGE_SPECS[image_type]
-            print(f"\n{'='*50}")
-            print(f"开始处理图片:")
-            print(f"输入文件: {input_path}")
-            print(f"输出路径: {output_path}")
-            print(f"处理类型: {image_type}")
-            print(f"目标参数: 尺寸={specs['size']}, 最大大小={specs['max_size']/1024:.1f}KB")
-            print(f"压缩选项: 最低质量={specs['min_quality']}, 允许WebP={specs['allow_webp']}")
-            
-            # 检查输入文件
-            if not os.path.exists(input_path):
-                print(f"错误: 输入文件不存在: {input_path}")
-                return False
-            
-            # 检查文件大小
-            input_size = os.path.getsize(input_path)
-            print(f"原始文件大小: {input_size/1024:.1f}KB")
-            
-            # 如果原始文件已经小于目标大小，检查是否需要调整尺寸
-            if input_size <= specs['max_size']:
-                print("文件大小已符合要求，检查是否需要调整尺寸...")
-            
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # 打开并验证图片
-            try:
-                with Image.open(input_path) as img:
-                    print(f"图片信息: 尺寸={img.size}, 模式={img.mode}, 格式={img.format}")
-                    
-                    # 检查是否是支持的格式
-                    if img.format not in ['PNG', 'JPEG', 'JPG']:
-                        print(f"警告: 不支持的图片格式: {img.format}")
-                    
-                    # 转换颜色模式
-                    if img.mode not in ['RGB', 'RGBA']:
-                        print(f"转换颜色模式: {img.mode} -> RGBA")
-                        img = img.convert('RGBA')
-                    
-                    # 调整尺寸
-                    resized_img = self.resize_image(img, specs['size'])
-                    
-                    # 压缩图片
-                    print("\n开始压缩图片...")
-                    compressed_data = self.compress_image(
-                        resized_img, 
-                        specs['max_size'],
-                        specs['min_quality']
-                    )
-                    
-                    if compressed_data is None:
-                        print("错误: 无法将图片压缩到目标大小")
-                        print("建议: 尝试手动优化图片或调整压缩参数")
-                        return False
-                    
-                    compressed_size = len(compressed_data)
-                    print(f"压缩后大小: {compressed_size/1024:.1f}KB")
-                    print(f"压缩率: {(1 - compressed_size/input_size) * 100:.1f}%")
-                    
-                    # 保存压缩后的图片
-                    try:
-                        with open(output_path, 'wb') as f:
-                            f.write(compressed_data)
-                        
-                        # 验证输出文件
-                        if os.path.exists(output_path):
-                            output_size = os.path.getsize(output_path)
-                            print(f"\n处理完成:")
-                            print(f"输出文件: {output_path}")
-                            print(f"最终大小: {output_size/1024:.1f}KB")
-                            
-                            # 验证输出文件可以被正常打开
-                            try:
-                                with Image.open(output_path) as verify_img:
-                                    print(f"输出格式: {verify_img.format}")
-                                    print(f"输出尺寸: {verify_img.size}")
-                                return True
-                            except Exception as e:
-                                print(f"警告: 输出文件完整性检查失败: {str(e)}")
-                                return False
-                        else:
-                            print("错误: 文件保存失败，无法找到输出文件")
-                            return False
-                            
-                    except Exception as e:
-                        print(f"保存文件时出错: {str(e)}")
-                        return False
-                    
-            except Exception as e:
-                print(f"处理图片时出错: {str(e)}")
-                return False
-                
-        except Exception as e:
-            print(f"发生未预期的错误: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return False
-
 class CompressorGUI:
     """图形界面类"""
     
@@ -283,7 +49,6 @@ class CompressorGUI:
         # 统一在 __init__ 中处理图标和字体
         self._setup_icon_and_font()
         
-        self.processor = ImageProcessor()
         self.setup_gui()
         
     def _setup_icon_and_font(self):
@@ -331,24 +96,13 @@ class CompressorGUI:
             self.window.destroy()
             sys.exit(1)
         
-        # 使用 fonttools 获取字体名称
-        tt = TTFont(str(font_path))
-        font_name = None
-        for record in tt['name'].names:
-            if record.nameID == 1:  # Font Family
-                font_name = record.toUnicode()
-                break
+        # 通过 FontManager 获取字体名称（结果缓存在 Core/font_cache.json）
+        font_name = FontManager.get_family_name(font_path)
         if not font_name:
             raise RuntimeError(f"无法从字体文件获取字体名称：{font_path}")
-        tt.close()
         
         # 使用 Windows API 注册字体
-        if os.name == 'nt':
-            import ctypes
-            GDI32 = ctypes.windll.gdi32
-            font_path_str = str(font_path).encode('utf-16-le') + b'\x00'
-            GDI32.AddFontResourceW(font_path_str)
-            print(f"成功加载自定义字体: {font_path}")
+        FontManager.register_font(font_path)
         
         self.current_font = (font_name, 10)
         self.window.option_add("*Font", self.current_font)
@@ -448,7 +202,7 @@ class CompressorGUI:
             self.output_path.set(directory)
             
     def process_images(self):
-        """处理所有图片"""
+        """检查目录后把压缩任务提交到后台(多进程并行压缩)"""
         try:
             input_dir = self.input_path.get()
             output_dir = self.output_path.get()
@@ -485,9 +239,7 @@ class CompressorGUI:
                 return
             
             # 获取所有图片文件
-            image_files = []
-            for ext in ('.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG'):
-                image_files.extend(Path(input_dir).glob(f'*{ext}'))
+            image_files = list_images(input_dir, BILI_INPUT_EXTENSIONS)
             
             if not image_files:
                 messagebox.showwarning("警告", "未找到支持的图片文件！\n支持的格式：PNG、JPG、JPEG")
@@ -504,52 +256,60 @@ class CompressorGUI:
             self.log_text.insert(tk.END, f"开始处理...\n\n")
             self.log_text.see(tk.END)
             
-            # 处理每个图片
-            total = len(image_files)
-            success_count = 0
-            failed_files = []
-            
-            for i, img_path in enumerate(image_files):
-                self.log_text.insert(tk.END, f"处理: {img_path.name}\n")
-                self.log_text.see(tk.END)
-                
-                output_path = Path(output_dir) / img_path.name
-                
-                if self.processor.process_image(str(img_path), str(output_path), image_type):
-                    success_count += 1
-                    self.log_text.insert(tk.END, f"成功: {img_path.name}\n")
-                else:
-                    failed_files.append(img_path.name)
-                    self.log_text.insert(tk.END, f"失败: {img_path.name}\n")
-                
-                self.log_text.insert(tk.END, "-" * 50 + "\n")
-                self.log_text.see(tk.END)
-                
-                # 更新进度
-                progress = (i + 1) / total * 100
-                self.progress_var.set(progress)
-                self.status_text.set(f"处理中... {i+1}/{total}")
-                self.window.update_idletasks()
+            # 后台线程中逐个文件的回调转交给界面线程
+            post = TkDispatcher.for_root(self.window).post
             
-            # 完成处理
-            self.status_text.set(f"完成！成功处理 {success_count}/{total} 个文件")
-            self.start_button['state'] = 'normal'
+            def on_file(name, ok, message):
+                post(self.log_file_result, name, ok, message)
             
-            # 显示详细结果
-            result_message = f"处理完成！\n\n成功: {success_count}\n失败: {total-success_count}"
-            if failed_files:
-                result_message += "\n\n失败的文件:\n" + "\n".join(failed_files)
+            def on_progress(done, total):
+                # 更新进度
+                self.progress_var.set(done / total * 100)
+                self.status_text.set(f"处理中... {done}/{total}")
             
-            messagebox.showinfo("完成", result_message)
+            # 处理每个图片
+            get_scheduler().submit(
+                compress_bili_images, input_dir, output_dir, image_type,
+                name="B站图片压缩",
+                ui=self.window,
+                on_progress=on_progress,
+                on_done=self.on_processing_done,
+                on_error=self.on_processing_error,
+                on_file=on_file,
+            )
             
         except Exception as e:
-            import traceback
-            error_msg = f"处理过程中出错：\n{str(e)}\n\n{traceback.format_exc()}"
+            self.on_processing_error(e)
+    
+    def log_file_result(self, name, ok, message):
+        self.log_text.insert(tk.END, f"成功: {name}\n" if ok else f"失败: {name}（{message}）\n")
+        self.log_text.insert(tk.END, "-" * 50 + "\n")
+        self.log_text.see(tk.END)
+    
+    def on_processing_done(self, result):
+        total, failed_files = result
+        success_count = total - len(failed_files)
+        
+        # 完成处理
+        self.status_text.set(f"完成！成功处理 {success_count}/{total} 个文件")
+        self.start_button['state'] = 'normal'
+        
+        # 显示详细结果
+        result_message = f"处理完成！\n\n成功: {success_count}\n失败: {total-success_count}"
+        if failed_files:
+            result_message += "\n\n失败的文件:\n" + "\n".join(failed_files)
+        
+        messagebox.showinfo("完成", result_message)
+    
+    def on_processing_error(self, e):
+        import traceback
+        error_msg = f"处理过程中出错：\n{str(e)}\n\n{''.join(traceback.format_exception(type(e), e, e.__traceback__))}"
+        if hasattr(self, 'log_text'):
             self.log_text.insert(tk.END, f"\n错误：\n{error_msg}\n")
             self.log_text.see(tk.END)
-            messagebox.showerror("错误", f"处理过程中出错：\n{str(e)}")
-            self.status_text.set("处理出错")
-            self.start_button['state'] = 'normal'
+        messagebox.showerror("错误", f"处理过程中出错：\n{str(e)}")
+        self.status_text.set("处理出错")
+        self.start_button['state'] = 'normal'
         
     def show_help(self):
         """显示帮助信息"""
@@ -587,10 +347,8 @@ class CompressorGUI:
         self.status_text.set("准备处理...")
         self.progress_var.set(0)
         
-        # 在新线程中处理图片
-        thread = threading.Thread(target=self.process_images)
-        thread.daemon = True
-        thread.start()
+        # 检查目录后提交后台任务
+        self.process_images()
         
     def run(self):
         """运行GUI程序"""
@@ -0,0 +1,16 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+"""
+宁宝工具集命令行入口,用法见 Core/SnowCLI.py 或运行 python snow.py --help
+"""
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "Core"))
+from SnowCLI import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())